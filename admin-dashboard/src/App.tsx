@@ -8,6 +8,7 @@ import ToolUsageChart from './components/ToolUsageChart'
 import EndpointPieChart from './components/EndpointPieChart'
 import StackedTokenChart from './components/StackedTokenChart'
 import ToolUserBreakdown from './components/ToolUserBreakdown'
+import ToolLatencyTable from './components/ToolLatencyTable'
 import ChatPill from './components/ChatPill'
 
 type Tab = 'overview' | 'users' | 'tools' | 'endpoints'
@@ -194,6 +195,9 @@ export default function App() {
                   <div className="mt-6">
                     <ToolUserBreakdown toolCalls={toolCalls} uidToName={uidToName} />
                   </div>
+                  <div className="mt-6">
+                    <ToolLatencyTable toolLatency={summary.tool_latency ?? {}} />
+                  </div>
                 </>
               )}
               {tab === 'endpoints' && <EndpointPieChart tokenUsage={tokenUsage} />}
@@ -18,6 +18,16 @@ export async function fetchAnalytics(days: number) {
   return res.data
 }
 
+export async function fetchUsageRecords(
+  days: number,
+  opts: { uid?: string; cursor?: string | null; limit?: number } = {},
+) {
+  const res = await client.get('/admin/analytics/records', {
+    params: { days, uid: opts.uid, cursor: opts.cursor ?? undefined, limit: opts.limit ?? 100 },
+  })
+  return res.data
+}
+
 export async function streamChat(
   message: string,
   history: { role: string; content: string }[],
@@ -61,17 +61,17 @@ function buildAggregateContext(
     if (!byDate[date]) byDate[date] = { input_tokens: 0, output_tokens: 0, count: 0 }
     byDate[date].input_tokens += doc.input_tokens
     byDate[date].output_tokens += doc.output_tokens
-    byDate[date].count += 1
+    byDate[date].count += doc.calls ?? 1
   }
 
   const byTool: Record<string, number> = {}
   for (const doc of toolCalls) {
-    byTool[doc.tool_name] = (byTool[doc.tool_name] || 0) + 1
+    byTool[doc.tool_name] = (byTool[doc.tool_name] || 0) + (doc.calls ?? 1)
   }
 
   const byEndpoint: Record<string, number> = {}
   for (const doc of tokenUsage) {
-    byEndpoint[doc.endpoint] = (byEndpoint[doc.endpoint] || 0) + 1
+    byEndpoint[doc.endpoint] = (byEndpoint[doc.endpoint] || 0) + (doc.calls ?? 1)
   }
 
   return {
@@ -25,7 +25,7 @@ export default function DailyActivityChart({ tokenUsage, filterUid, title }: Pro
     for (const doc of docs) {
       const date = doc.timestamp ? doc.timestamp.slice(0, 10) : 'unknown'
       if (!byDay[date]) byDay[date] = { date, calls: 0, tokens: 0 }
-      byDay[date].calls += 1
+      byDay[date].calls += doc.calls ?? 1
       byDay[date].tokens += (doc.input_tokens || 0) + (doc.output_tokens || 0)
     }
     return Object.values(byDay).sort((a, b) => a.date.localeCompare(b.date))
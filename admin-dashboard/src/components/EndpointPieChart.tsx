@@ -15,7 +15,7 @@ export default function EndpointPieChart({ tokenUsage }: Props) {
     const counts: Record<string, number> = {}
     for (const doc of tokenUsage) {
       const ep = doc.endpoint || 'unknown'
-      counts[ep] = (counts[ep] || 0) + 1
+      counts[ep] = (counts[ep] || 0) + (doc.calls ?? 1)
     }
     return Object.entries(counts)
       .map(([name, value]) => ({ name, value }))
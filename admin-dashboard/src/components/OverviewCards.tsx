@@ -18,16 +18,18 @@ export default function OverviewCards({ summary, toolCalls }: Props) {
   // Find top tool by count
   const toolCounts: Record<string, number> = {}
   for (const tc of toolCalls) {
-    toolCounts[tc.tool_name] = (toolCounts[tc.tool_name] || 0) + 1
+    toolCounts[tc.tool_name] = (toolCounts[tc.tool_name] || 0) + (tc.calls ?? 1)
   }
   const topTool = Object.entries(toolCounts).sort((a, b) => b[1] - a[1])[0]?.[0] ?? '—'
 
   const totalTokens = (summary.total_input_tokens + summary.total_output_tokens).toLocaleString()
+  const cacheHitRate = `${(summary.cache_hit_rate * 100).toFixed(1)}%`
 
   return (
-    <div className="grid grid-cols-2 lg:grid-cols-4 gap-4">
+    <div className="grid grid-cols-2 lg:grid-cols-5 gap-4">
       <Card label="API Calls" value={summary.total_api_calls.toLocaleString()} />
       <Card label="Total Tokens" value={totalTokens} />
+      <Card label="Prompt Cache Hits" value={cacheHitRate} />
       <Card label="Unique Users" value={summary.unique_users.toString()} />
       <Card label="Top Tool" value={topTool} />
     </div>
@@ -73,7 +73,7 @@ export default function StackedTokenChart({ tokenUsage, toolCalls, uidToName }:
         if (!enabled.has(doc.uid)) continue
         const date = doc.timestamp ? doc.timestamp.slice(0, 10) : 'unknown'
         if (!byDay[date]) byDay[date] = {}
-        byDay[date][doc.uid] = (byDay[date][doc.uid] || 0) + 1
+        byDay[date][doc.uid] = (byDay[date][doc.uid] || 0) + (doc.calls ?? 1)
       }
     }
 
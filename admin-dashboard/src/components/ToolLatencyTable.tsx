@@ -0,0 +1,55 @@
+import { useMemo } from 'react'
+import type { ToolLatencyStats } from '../types'
+
+interface Props {
+  toolLatency: Record<string, ToolLatencyStats>
+}
+
+function formatMs(ms: number) {
+  return ms >= 1000 ? `${(ms / 1000).toFixed(2)}s` : `${Math.round(ms)}ms`
+}
+
+export default function ToolLatencyTable({ toolLatency }: Props) {
+  // Slowest tools first
+  const rows = useMemo(
+    () => Object.entries(toolLatency).sort((a, b) => b[1].p95_ms - a[1].p95_ms),
+    [toolLatency]
+  )
+
+  return (
+    <div className="bg-gray-900 border border-gray-800 rounded-xl overflow-hidden">
+      <div className="p-5 border-b border-gray-800">
+        <h2 className="text-sm font-semibold text-gray-400">Tool Latency</h2>
+      </div>
+      <div className="overflow-x-auto">
+        <table className="w-full text-sm">
+          <thead>
+            <tr className="border-b border-gray-800">
+              {['Tool', 'Calls', 'Errors', 'p50', 'p95'].map((label) => (
+                <th key={label} className="text-left px-4 py-3 text-gray-500 font-medium">{label}</th>
+              ))}
+            </tr>
+          </thead>
+          <tbody>
+            {rows.map(([tool, stats]) => (
+              <tr key={tool} className="border-b border-gray-800/50">
+                <td className="px-4 py-3 text-indigo-400">{tool}</td>
+                <td className="px-4 py-3 text-gray-300">{stats.calls.toLocaleString()}</td>
+                <td className={`px-4 py-3 ${stats.errors ? 'text-red-400' : 'text-gray-500'}`}>
+                  {stats.errors.toLocaleString()}
+                </td>
+                <td className="px-4 py-3 text-gray-300">{formatMs(stats.p50_ms)}</td>
+                <td className="px-4 py-3 text-gray-300">{formatMs(stats.p95_ms)}</td>
+              </tr>
+            ))}
+            {rows.length === 0 && (
+              <tr>
+                <td colSpan={5} className="px-4 py-8 text-center text-gray-600">No data</td>
+              </tr>
+            )}
+          </tbody>
+        </table>
+      </div>
+    </div>
+  )
+}
@@ -23,7 +23,7 @@ export default function ToolUsageChart({ toolCalls }: Props) {
     const counts: Record<string, number> = {}
     const uniqueUsers: Record<string, Set<string>> = {}
     for (const tc of toolCalls) {
-      counts[tc.tool_name] = (counts[tc.tool_name] || 0) + 1
+      counts[tc.tool_name] = (counts[tc.tool_name] || 0) + (tc.calls ?? 1)
       if (!uniqueUsers[tc.tool_name]) uniqueUsers[tc.tool_name] = new Set()
       uniqueUsers[tc.tool_name].add(tc.uid)
     }
@@ -27,7 +27,7 @@ export default function ToolUserBreakdown({ toolCalls, uidToName }: Props) {
         toolUserCounts[tc.tool_name] = {}
         toolUniqueUsers[tc.tool_name] = new Set()
       }
-      toolUserCounts[tc.tool_name][tc.uid] = (toolUserCounts[tc.tool_name][tc.uid] || 0) + 1
+      toolUserCounts[tc.tool_name][tc.uid] = (toolUserCounts[tc.tool_name][tc.uid] || 0) + (tc.calls ?? 1)
       toolUniqueUsers[tc.tool_name].add(tc.uid)
     }
 
@@ -32,7 +32,7 @@ export default function UserTable({ tokenUsage, toolCalls, uidToName, selectedUi
       if (!byUid[uid]) {
         byUid[uid] = { uid, name: uidToName[uid] || uid, calls: 0, tokensIn: 0, tokensOut: 0, topTool: '—', lastActive: '' }
       }
-      byUid[uid].calls += 1
+      byUid[uid].calls += doc.calls ?? 1
       byUid[uid].tokensIn += doc.input_tokens || 0
       byUid[uid].tokensOut += doc.output_tokens || 0
       if (doc.timestamp && doc.timestamp > byUid[uid].lastActive) {
@@ -44,7 +44,7 @@ export default function UserTable({ tokenUsage, toolCalls, uidToName, selectedUi
     const toolByUid: Record<string, Record<string, number>> = {}
     for (const tc of toolCalls) {
       if (!toolByUid[tc.uid]) toolByUid[tc.uid] = {}
-      toolByUid[tc.uid][tc.tool_name] = (toolByUid[tc.uid][tc.tool_name] || 0) + 1
+      toolByUid[tc.uid][tc.tool_name] = (toolByUid[tc.uid][tc.tool_name] || 0) + (tc.calls ?? 1)
     }
     for (const uid of Object.keys(byUid)) {
       const tools = toolByUid[uid]
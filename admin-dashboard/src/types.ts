@@ -7,26 +7,55 @@ export interface User {
   created_at: number | null
 }
 
+// A raw token_usage record, or a daily aggregate of them (calls > 1)
 export interface TokenUsageDoc {
   uid: string
   model: string
+  provider?: string
+  day?: string // YYYY-MM-DD, on daily aggregates
+  calls?: number // records aggregated into this row (1 if absent)
   input_tokens: number
   output_tokens: number
+  cache_read_tokens?: number
+  cache_write_tokens?: number
+  ttft_ms?: number
   endpoint: string
   timestamp: string // ISO string
 }
 
+// Tool calls for one user and tool on one day
 export interface ToolCallDoc {
   uid: string
   tool_name: string
-  conversation_id: string
+  day?: string
+  calls?: number
+  conversation_id?: string
   timestamp: string | null
 }
 
+export interface TtftStats {
+  calls: number
+  p50_ms: number
+  p95_ms: number
+}
+
+// Per-tool execution stats from the tool event log
+export interface ToolLatencyStats {
+  calls: number
+  errors: number
+  p50_ms: number
+  p95_ms: number
+}
+
 export interface AnalyticsSummary {
   total_api_calls: number
   total_input_tokens: number
   total_output_tokens: number
+  total_cache_read_tokens: number
+  total_cache_write_tokens: number
+  cache_hit_rate: number
+  ttft_by_provider: Record<string, TtftStats>
+  tool_latency: Record<string, ToolLatencyStats>
   unique_users: number
   date_range_days: number
 }
@@ -37,6 +66,11 @@ export interface AnalyticsResponse {
   summary: AnalyticsSummary
 }
 
+export interface TokenUsagePage {
+  records: TokenUsageDoc[]
+  next_cursor: string | null
+}
+
 export interface UsersResponse {
   users: User[]
 }
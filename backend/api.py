@@ -11,6 +11,7 @@ Endpoints:
 
 import os
 import hmac
+import asyncio
 import logging
 from datetime import datetime, date
 from typing import Literal, Optional, List, Union
@@ -32,6 +33,7 @@ env_path = Path(__file__).parent.parent / ".env"
 load_dotenv(env_path, override=True)
 
 from fastapi import FastAPI, Request, File, Form, UploadFile, HTTPException, Header, Depends, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field, field_validator
@@ -39,18 +41,25 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
-from .firebase_client import FirebaseClient
+from .async_firebase_client import AsyncFirebaseClient, run_blocking, shutdown_firestore_executor
+from .firebase_client import expense_cursor, get_user_cache_stats, ttft_percentile
+from .token_cache import get_token_cache_stats
+from .tool_events import get_tool_event_stats, shutdown_tool_events, summarize_tool_latency
+from .mcp.tool_catalog import get_tool_catalog_stats
+from .provider_clients import close_provider_clients, get_async_anthropic_client, get_provider_client_stats
 from .budget_manager import BudgetManager
 from .output_schemas import Expense, ExpenseType, Date, CategoryCreate, CategoryUpdate, CategoryReorder
 from .recurring_manager import RecurringManager
+from .recurring_sweep import run_recurring_sweep
 from .auth import get_current_user, get_optional_user, AuthenticatedUser
 from .category_defaults import DEFAULT_CATEGORIES, MAX_CATEGORIES
 from .exceptions import DocumentNotFoundError
 from .chat_helpers import (
     get_or_create_conversation, build_message_context,
-    run_claude_tool_loop, save_conversation_history, ToolLoopResult
+    run_claude_tool_loop, schedule_conversation_history_save, ToolLoopResult,
+    drain_conversation_history_saves,
 )
-from .model_client import SUPPORTED_MODELS, DEFAULT_MODEL
+from .model_client import SUPPORTED_MODELS, DEFAULT_MODEL, apply_anthropic_prompt_cache
 
 # Initialize rate limiter
 limiter = Limiter(key_func=get_remote_address)
@@ -88,8 +97,8 @@ app.add_middleware(
 )
 
 # Initialize Firebase client and budget manager
-firebase_client = FirebaseClient()
-budget_manager = BudgetManager(firebase_client)
+firebase_client = AsyncFirebaseClient()
+budget_manager = BudgetManager(firebase_client.sync)
 
 # MCP Client (initialized on startup)
 _mcp_client = None
@@ -100,6 +109,19 @@ USER_TIMEZONE = pytz.timezone(os.getenv("USER_TIMEZONE", "America/Chicago"))
 
 # ==================== Helpers ====================
 
+# Upper bound on messages returned by one GET /conversations/{id} page
+MAX_CONVERSATION_PAGE_SIZE = 500
+# Upper bound on records returned by one GET /admin/analytics/records page
+MAX_ANALYTICS_PAGE_SIZE = 500
+# Upper bound on expenses returned by one GET /expenses page
+MAX_EXPENSE_PAGE_SIZE = 500
+# Page size for GET /expenses when a cursor is given without a limit
+DEFAULT_EXPENSE_PAGE_SIZE = 100
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Per-call time budget for /admin/cleanup-conversations; unfinished runs resume
+CLEANUP_MAX_SECONDS = float(os.getenv("CLEANUP_MAX_SECONDS", "240"))
+
+
 def _format_timestamps(data: dict, fields: list = None) -> None:
     """Convert Firestore timestamp objects to ISO format strings in-place."""
     if fields is None:
@@ -262,17 +284,17 @@ def _parse_date_query(value: Optional[str], field_name: str) -> Optional[date]:
         ) from exc
 
 
-def _resolve_expense_category_filter(
-    user_firebase: FirebaseClient,
+async def _resolve_expense_category_filter(
+    user_firebase: AsyncFirebaseClient,
     category: Optional[str],
 ) -> Optional[str]:
     """Resolve a category filter against user categories or legacy enum values."""
     if not category:
         return None
 
-    if user_firebase.has_categories_setup():
+    if await user_firebase.has_categories_setup():
         needle = category.lower()
-        for cat in user_firebase.get_user_categories():
+        for cat in await user_firebase.get_user_categories():
             category_id = cat.get("category_id", "")
             display_name = cat.get("display_name", "")
             if category_id.lower() == needle or display_name.lower() == needle:
@@ -387,75 +409,6 @@ async def process_expense_with_mcp(
     return result
 
 
-# ==================== Recurring Check Logic ====================
-
-async def _check_recurring_expenses_logic(user_firebase: FirebaseClient = None) -> dict:
-    """
-    Core logic for checking and creating pending expenses from recurring templates.
-
-    Used by both startup event (local dev) and /admin/check-recurring endpoint (production).
-
-    Args:
-        user_firebase: User-scoped FirebaseClient. If None, uses global client (legacy).
-
-    Returns:
-        dict with created_count, total_recurring, message, and details
-    """
-    from .recurring_manager import get_today_in_user_timezone
-
-    # Use provided client or fallback to global (legacy mode)
-    fb = user_firebase or firebase_client
-
-    # Get all active recurring expenses
-    recurring_expenses = fb.get_all_recurring_expenses(active_only=True)
-
-    if not recurring_expenses:
-        return {"created_count": 0, "message": "No active recurring expenses found", "details": []}
-
-    # Use timezone-aware today
-    today = get_today_in_user_timezone()
-    today_date = Date(day=today.day, month=today.month, year=today.year)
-
-    created_count = 0
-    details = []
-
-    for recurring in recurring_expenses:
-        # Check if we should create a pending expense
-        should_create, trigger_date = RecurringManager.should_create_pending(recurring)
-
-        if should_create and trigger_date:
-            # Check if pending already exists for this template
-            existing_pending = fb.get_pending_by_template(recurring.template_id)
-
-            if existing_pending:
-                details.append(f"Skipped {recurring.expense_name} - pending already exists")
-                continue
-
-            # Create pending expense
-            pending = RecurringManager.create_pending_expense_from_recurring(recurring, trigger_date)
-            pending_id = fb.save_pending_expense(pending)
-
-            # Update last_reminded
-            fb.update_recurring_expense(
-                recurring.template_id,
-                {"last_reminded": {
-                    "day": today_date.day,
-                    "month": today_date.month,
-                    "year": today_date.year
-                }}
-            )
-
-            created_count += 1
-            details.append(f"Created pending for {recurring.expense_name} (due {trigger_date.month}/{trigger_date.day})")
-
-    return {
-        "created_count": created_count,
-        "total_recurring": len(recurring_expenses),
-        "message": f"Created {created_count} pending expense(s)" if created_count > 0 else "All recurring expenses up to date",
-        "details": details
-    }
-
-
 # ==================== Startup Events ====================
 
 @app.on_event("startup")
@@ -474,7 +427,7 @@ async def check_recurring_expenses():
 
     try:
         logger.info("Checking for due recurring expenses on startup...")
-        result = await _check_recurring_expenses_logic()
+        result = await run_recurring_sweep()
         logger.info(result['message'])
         for detail in result.get("details", []):
             logger.info("  %s", detail)
@@ -524,6 +477,40 @@ async def startup_mcp():
         logger.warning("MCP pre-connection error (non-fatal): %s", e)
 
 
+@app.on_event("shutdown")
+async def shutdown_mcp():
+    """Terminate the MCP server pool subprocesses."""
+    if _mcp_client:
+        try:
+            await _mcp_client.cleanup()
+        except Exception as e:
+            logger.warning("MCP shutdown error (non-fatal): %s", e)
+
+
+@app.on_event("shutdown")
+async def shutdown_provider_clients():
+    """Drain the shared LLM provider HTTP connection pools."""
+    await close_provider_clients()
+
+
+@app.on_event("shutdown")
+async def shutdown_conversation_saves():
+    """Let chat history writes scheduled after [DONE] finish."""
+    await drain_conversation_history_saves()
+
+
+@app.on_event("shutdown")
+async def shutdown_tool_event_log():
+    """Write any buffered tool events."""
+    await shutdown_tool_events()
+
+
+@app.on_event("shutdown")
+async def shutdown_firestore():
+    """Release the Firestore worker threads used by AsyncFirebaseClient."""
+    shutdown_firestore_executor(wait=False)
+
+
 # ==================== Pydantic Models ====================
 
 class ExpenseResponse(BaseModel):
@@ -690,8 +677,8 @@ async def mcp_process_expense(
             logger.info("Image uploaded: %d bytes, type: %s", len(image_bytes), image.content_type)
 
         # Resolve the user's selected model
-        user_firebase = FirebaseClient.for_user(current_user.uid)
-        user_settings = user_firebase.get_user_settings(current_user.uid)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
+        user_settings = await user_firebase.get_user_settings(current_user.uid)
         selected_model = user_settings.get("selected_model", DEFAULT_MODEL)
         if selected_model not in SUPPORTED_MODELS:
             selected_model = DEFAULT_MODEL
@@ -734,6 +721,9 @@ async def get_expenses(
     category: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    accept: Optional[str] = Header(None),
 ):
     """
     Get expense history with optional filters.
@@ -746,12 +736,27 @@ async def get_expenses(
     - category: Filter by category (e.g., "FOOD_OUT")
     - start_date/end_date: Optional YYYY-MM-DD date-range filter. When provided,
       both must be present and take precedence over year/month.
+    - limit: Page size (max 500). With limit or cursor the expenses come one
+      page at a time, newest date first, and next_cursor fetches the next page
+      (null on the last page). Without either, every matching expense is
+      returned, most recently added first, and next_cursor is null.
+    - cursor: next_cursor from the previous page
 
     Returns list of expenses matching filters.
+
+    With "Accept: application/x-ndjson" the response is streamed as
+    newline-delimited JSON in page order, without being buffered: a first line
+    with year/month/category/start_date/end_date, one line per expense, and a
+    last line with count and next_cursor.
     """
+    if limit is not None and not 1 <= limit <= MAX_EXPENSE_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_EXPENSE_PAGE_SIZE}")
+    if cursor and limit is None:
+        limit = DEFAULT_EXPENSE_PAGE_SIZE
+
     try:
         # Create user-scoped Firebase client
-        user_firebase = FirebaseClient.for_user(current_user.uid)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
 
         start_date_obj = _parse_date_query(start_date, "start_date")
         end_date_obj = _parse_date_query(end_date, "end_date")
@@ -774,30 +779,61 @@ async def get_expenses(
             year = year or now.year
             month = month or now.month
 
-        category_filter = _resolve_expense_category_filter(user_firebase, category)
+        category_filter = await _resolve_expense_category_filter(user_firebase, category)
 
-        # Get expenses from Firebase (user-scoped)
         if start_date_obj and end_date_obj:
-            expenses = user_firebase.get_expenses_in_date_range(
-                Date(day=start_date_obj.day, month=start_date_obj.month, year=start_date_obj.year),
-                Date(day=end_date_obj.day, month=end_date_obj.month, year=end_date_obj.year),
-                category_filter,
-            )
+            range_start = Date(day=start_date_obj.day, month=start_date_obj.month, year=start_date_obj.year)
+            range_end = Date(day=end_date_obj.day, month=end_date_obj.month, year=end_date_obj.year)
             response_year = start_date_obj.year
             response_month = start_date_obj.month
         else:
-            expenses = user_firebase.get_monthly_expenses(year, month, category_filter)
+            range_start = Date(day=1, month=month, year=year)
+            range_end = Date(day=31, month=month, year=year)
             response_year = year
             response_month = month
 
-        return {
+        header = {
             "year": response_year,
             "month": response_month,
             "category": category,
             "start_date": start_date_obj.isoformat() if start_date_obj else None,
             "end_date": end_date_obj.isoformat() if end_date_obj else None,
+        }
+
+        if accept and NDJSON_MEDIA_TYPE in accept:
+            try:
+                # One extra expense tells whether there is a next page
+                expenses = await user_firebase.iter_expenses(
+                    range_start, range_end, category_filter,
+                    cursor=cursor, limit=limit + 1 if limit else None,
+                )
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            return StreamingResponse(
+                _ndjson_expense_lines(header, expenses, limit), media_type=NDJSON_MEDIA_TYPE
+            )
+
+        # Get expenses from Firebase (user-scoped)
+        next_cursor = None
+        if limit:
+            try:
+                page = await user_firebase.get_expense_page(
+                    range_start, range_end, category_filter, limit=limit, cursor=cursor
+                )
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            expenses = page["expenses"]
+            next_cursor = page["next_cursor"]
+        elif start_date_obj and end_date_obj:
+            expenses = await user_firebase.get_expenses_in_date_range(range_start, range_end, category_filter)
+        else:
+            expenses = await user_firebase.get_monthly_expenses(year, month, category_filter)
+
+        return {
+            **header,
             "count": len(expenses),
-            "expenses": expenses
+            "expenses": expenses,
+            "next_cursor": next_cursor,
         }
 
     except HTTPException:
@@ -807,6 +843,32 @@ async def get_expenses(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+def _ndjson_expense_lines(header: dict, expenses, limit: Optional[int]):
+    """
+    NDJSON body for GET /expenses: header line, one line per expense, then count/next_cursor.
+
+    A plain generator so StreamingResponse pulls each expense off the
+    Firestore stream in a worker thread as the client reads.
+    """
+    yield json.dumps(header) + "\n"
+    count = 0
+    next_cursor = None
+    last = None
+    try:
+        for expense in expenses:
+            if limit and count == limit:
+                next_cursor = expense_cursor(last)
+                break
+            yield json.dumps(jsonable_encoder(expense)) + "\n"
+            count += 1
+            last = expense
+    except Exception as e:
+        # Headers are already sent; the client sees a truncated stream
+        logger.error("Error streaming /expenses: %s", e)
+        raise
+    yield json.dumps({"count": count, "next_cursor": next_cursor}) + "\n"
+
+
 class ExpenseCreateRequest(BaseModel):
     """Request body for creating an expense directly."""
     expense_name: str
@@ -835,7 +897,7 @@ async def create_expense(
     Returns the created expense ID.
     """
     try:
-        user_firebase = FirebaseClient.for_user(current_user.uid)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
 
         try:
             date_obj = Date(
@@ -859,7 +921,7 @@ async def create_expense(
             category=expense_type
         )
 
-        expense_id = user_firebase.save_expense(
+        expense_id = await user_firebase.save_expense(
             expense,
             input_type="manual",
             category_str=expense_data.category.upper(),
@@ -882,8 +944,8 @@ async def get_expense(
 ):
     """Fetch a single expense by ID for live widget hydration/edit flows."""
     try:
-        user_firebase = FirebaseClient.for_user(current_user.uid)
-        expense = user_firebase.get_expense_by_id(expense_id)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
+        expense = await user_firebase.get_expense_by_id(expense_id)
         if not expense:
             raise HTTPException(status_code=404, detail="Expense not found")
         return {"expense": expense}
@@ -911,11 +973,11 @@ async def delete_expense(
     """
     try:
         # Create user-scoped Firebase client
-        user_firebase = FirebaseClient.for_user(current_user.uid)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
 
         # Delete the expense
         try:
-            user_firebase.delete_expense(expense_id)
+            await user_firebase.delete_expense(expense_id)
         except DocumentNotFoundError:
             raise HTTPException(status_code=404, detail="Expense not found")
 
@@ -960,7 +1022,7 @@ async def update_expense(
     """
     try:
         # Create user-scoped Firebase client
-        user_firebase = FirebaseClient.for_user(current_user.uid)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
 
         # Parse date dict to Date object if provided
         date_obj = None
@@ -990,7 +1052,7 @@ async def update_expense(
 
         # Update the expense
         try:
-            user_firebase.update_expense(
+            await user_firebase.update_expense(
                 expense_id=expense_id,
                 expense_name=update_data.expense_name,
                 amount=update_data.amount,
@@ -1047,14 +1109,14 @@ async def get_budget_status(
 
     try:
         # Create user-scoped Firebase client and budget manager
-        user_firebase = FirebaseClient.for_user(current_user.uid)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
 
         # Silent migration if needed
-        if not user_firebase.has_categories_setup():
-            user_firebase.migrate_from_budget_caps()
+        if not await user_firebase.has_categories_setup():
+            await user_firebase.migrate_from_budget_caps()
 
         # Load period settings
-        period_settings = user_firebase.get_budget_period_settings(current_user.uid)
+        period_settings = await user_firebase.get_budget_period_settings(current_user.uid)
         month_start_day = period_settings.get("budget_month_start_day", 1)
 
         if period_offset is not None:
@@ -1087,21 +1149,13 @@ async def get_budget_status(
             budget_period = _gcp(month_start_day=1, as_of=_date(year, month, 15))
 
         # Get user's custom categories
-        user_categories = user_firebase.get_user_categories()
-
-        # Get spending by category for the period
-        from .output_schemas import Date as DateModel
-        start_date = DateModel(
-            day=budget_period.start_date.day,
-            month=budget_period.start_date.month,
-            year=budget_period.start_date.year,
-        )
-        end_date = DateModel(
-            day=budget_period.end_date.day,
-            month=budget_period.end_date.month,
-            year=budget_period.end_date.year,
+        user_categories = await user_firebase.get_user_categories()
+
+        # Get spending by category for the period (served from the period's
+        # spending rollup when it matches the user's cadence)
+        spending_by_category = await run_blocking(
+            BudgetManager(user_firebase.sync).get_period_spending_by_category, budget_period
         )
-        spending_by_category = user_firebase.get_spending_by_category(start_date, end_date)
 
         # Build category list and track excluded categories
         category_list = []
@@ -1142,7 +1196,7 @@ async def get_budget_status(
                 total_spending_filtered += spending
 
         # Get total budget cap
-        monthly_total_cap_raw = user_firebase.get_total_monthly_budget() or 0
+        monthly_total_cap_raw = await user_firebase.get_total_monthly_budget() or 0
         prorated_excluded = calc_prorate_cap(excluded_cap_total_raw, budget_period) if excluded_cap_total_raw > 0 else 0
         prorated_total = calc_prorate_cap(monthly_total_cap_raw, budget_period) if monthly_total_cap_raw > 0 else 0
         total_cap = prorated_total - prorated_excluded
@@ -1201,7 +1255,7 @@ async def bulk_update_budget_caps(
     """
     try:
         # Create user-scoped Firebase client
-        user_firebase = FirebaseClient.for_user(current_user.uid)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
 
         # Validate that sum of category budgets doesn't exceed total
         total_allocated = sum(request.category_budgets.values())
@@ -1222,15 +1276,11 @@ async def bulk_update_budget_caps(
                 detail=f"Invalid category names: {', '.join(invalid_categories)}"
             )
 
-        # Update total budget cap (user-scoped)
-        user_firebase.set_budget_cap("TOTAL", request.total_budget)
-
-        # Update all category budget caps (user-scoped)
-        for category, amount in request.category_budgets.items():
-            user_firebase.set_budget_cap(category, amount)
+        # Update the total and every category budget cap in one batch (user-scoped)
+        await user_firebase.set_budget_caps({"TOTAL": request.total_budget, **request.category_budgets})
 
         # Return updated caps
-        all_caps = user_firebase.get_all_budget_caps()
+        all_caps = await user_firebase.get_all_budget_caps()
 
         return BulkBudgetUpdateResponse(
             success=True,
@@ -1259,14 +1309,14 @@ async def get_categories(
     Returns list of categories sorted by sort_order.
     """
     try:
-        user_firebase = FirebaseClient.for_user(current_user.uid)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
 
         # Silent migration if needed
-        if not user_firebase.has_categories_setup():
-            user_firebase.migrate_from_budget_caps()
+        if not await user_firebase.has_categories_setup():
+            await user_firebase.migrate_from_budget_caps()
 
-        categories = user_firebase.get_user_categories()
-        total_budget = user_firebase.get_total_monthly_budget()
+        categories = await user_firebase.get_user_categories()
+        total_budget = await user_firebase.get_total_monthly_budget()
 
         return {
             "categories": categories,
@@ -1292,16 +1342,16 @@ async def create_category(
     - Cap <= available budget
     """
     try:
-        user_firebase = FirebaseClient.for_user(current_user.uid)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
 
         # Ensure categories are set up
-        if not user_firebase.has_categories_setup():
-            user_firebase.migrate_from_budget_caps()
+        if not await user_firebase.has_categories_setup():
+            await user_firebase.migrate_from_budget_caps()
 
         # Check available budget against the OTHER category cap.
         # OTHER is the auto-recalculated remainder (total - sum of all non-OTHER caps),
         # so the new cap must fit within what OTHER currently holds.
-        categories = user_firebase.get_user_categories()
+        categories = await user_firebase.get_user_categories()
         other_category = next((cat for cat in categories if cat.get("category_id") == "OTHER"), None)
         other_cap = other_category.get("monthly_cap", 0) if other_category else 0
 
@@ -1312,7 +1362,7 @@ async def create_category(
             )
 
         # Create category
-        category_id = user_firebase.create_category({
+        category_id = await user_firebase.create_category({
             "display_name": category.display_name,
             "icon": category.icon,
             "color": category.color,
@@ -1320,7 +1370,7 @@ async def create_category(
         })
 
         # Recalculate OTHER cap
-        user_firebase.recalculate_other_cap()
+        await user_firebase.recalculate_other_cap()
 
         return {
             "success": True,
@@ -1348,9 +1398,9 @@ async def reorder_categories(
     Update the sort order of categories.
     """
     try:
-        user_firebase = FirebaseClient.for_user(current_user.uid)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
 
-        success = user_firebase.reorder_categories(reorder.category_ids)
+        success = await user_firebase.reorder_categories(reorder.category_ids)
 
         return {
             "success": success,
@@ -1395,17 +1445,17 @@ async def update_category(
     Update a category for the authenticated user.
     """
     try:
-        user_firebase = FirebaseClient.for_user(current_user.uid)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
 
         # Get existing category
-        existing = user_firebase.get_category(category_id)
+        existing = await user_firebase.get_category(category_id)
         if not existing:
             raise HTTPException(status_code=404, detail="Category not found")
 
         # If updating monthly_cap, validate against available budget
         if updates.monthly_cap is not None:
-            total_budget = user_firebase.get_total_monthly_budget()
-            categories = user_firebase.get_user_categories()
+            total_budget = await user_firebase.get_total_monthly_budget()
+            categories = await user_firebase.get_user_categories()
 
             # Calculate allocated (excluding this category)
             allocated = sum(
@@ -1424,13 +1474,13 @@ async def update_category(
         # Update category
         update_dict = updates.model_dump(exclude_none=True)
         try:
-            user_firebase.update_category(category_id, update_dict)
+            await user_firebase.update_category(category_id, update_dict)
         except DocumentNotFoundError:
             raise HTTPException(status_code=404, detail="Category not found")
 
         # Recalculate OTHER cap if monthly_cap was updated
         if updates.monthly_cap is not None:
-            user_firebase.recalculate_other_cap()
+            await user_firebase.recalculate_other_cap()
 
         return {
             "success": True,
@@ -1457,11 +1507,11 @@ async def delete_category(
     - reassign_to: Category to reassign expenses to (default: OTHER)
     """
     try:
-        user_firebase = FirebaseClient.for_user(current_user.uid)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
 
         # Verify reassign_to category exists
         if reassign_to != "OTHER":
-            target = user_firebase.get_category(reassign_to)
+            target = await user_firebase.get_category(reassign_to)
             if not target:
                 raise HTTPException(
                     status_code=400,
@@ -1469,10 +1519,10 @@ async def delete_category(
                 )
 
         # Delete category
-        reassigned_count = user_firebase.delete_category(category_id, reassign_to)
+        reassigned_count = await user_firebase.delete_category(category_id, reassign_to)
 
         # Recalculate OTHER cap
-        user_firebase.recalculate_other_cap()
+        await user_firebase.recalculate_other_cap()
 
         return {
             "success": True,
@@ -1500,14 +1550,14 @@ async def get_total_budget(
     Get the user's total monthly budget.
     """
     try:
-        user_firebase = FirebaseClient.for_user(current_user.uid)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
 
         # Ensure categories are set up
-        if not user_firebase.has_categories_setup():
-            user_firebase.migrate_from_budget_caps()
+        if not await user_firebase.has_categories_setup():
+            await user_firebase.migrate_from_budget_caps()
 
-        total_budget = user_firebase.get_total_monthly_budget()
-        categories = user_firebase.get_user_categories()
+        total_budget = await user_firebase.get_total_monthly_budget()
+        categories = await user_firebase.get_user_categories()
         allocated = sum(cat.get("monthly_cap", 0) for cat in categories)
 
         return {
@@ -1536,11 +1586,11 @@ async def update_total_budget(
     Recalculates OTHER category cap.
     """
     try:
-        user_firebase = FirebaseClient.for_user(current_user.uid)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
 
         # Ensure categories are set up
-        if not user_firebase.has_categories_setup():
-            user_firebase.migrate_from_budget_caps()
+        if not await user_firebase.has_categories_setup():
+            await user_firebase.migrate_from_budget_caps()
 
         if update.total_monthly_budget < 0:
             raise HTTPException(
@@ -1549,10 +1599,10 @@ async def update_total_budget(
             )
 
         # Update total budget
-        user_firebase.set_total_monthly_budget(update.total_monthly_budget)
+        await user_firebase.set_total_monthly_budget(update.total_monthly_budget)
 
         # Recalculate OTHER cap
-        other_cap = user_firebase.recalculate_other_cap()
+        other_cap = await user_firebase.recalculate_other_cap()
 
         return {
             "success": True,
@@ -1614,7 +1664,7 @@ async def complete_onboarding(
     5. Recalculate OTHER cap for unallocated budget
     """
     try:
-        user_firebase = FirebaseClient.for_user(current_user.uid)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
 
         # Validate total budget
         if request.total_budget <= 0:
@@ -1634,53 +1684,34 @@ async def complete_onboarding(
                 detail=f"Category caps (${total_caps:.2f}) exceed total budget (${request.total_budget:.2f})"
             )
 
-        # Initialize categories with selected defaults
-        user_firebase.initialize_default_categories(
+        # Create the selected defaults and custom categories, apply caps and
+        # exclusions, and give OTHER the unallocated budget, in one batch
+        result = await user_firebase.complete_onboarding(
             total_budget=request.total_budget,
-            selected_ids=request.selected_category_ids
-        )
-
-        # Update caps for default categories
-        for category_id, cap in request.category_caps.items():
-            # Skip custom category IDs (they start with CUSTOM_)
-            if not category_id.startswith("CUSTOM_"):
-                try:
-                    user_firebase.update_category(category_id, {"monthly_cap": cap})
-                except DocumentNotFoundError:
-                    logger.warning("Category %s not found during onboarding cap update", category_id)
-
-        # Create custom categories
-        custom_created = 0
-        if request.custom_categories:
-            for custom in request.custom_categories:
-                user_firebase.create_category({
+            selected_ids=request.selected_category_ids,
+            category_caps=request.category_caps,
+            custom_categories=[
+                {
                     "display_name": custom.display_name,
                     "icon": custom.icon,
                     "color": custom.color,
                     "monthly_cap": custom.monthly_cap
-                })
-                custom_created += 1
-
-        # Set exclude_from_total for any categories the user opted out of total tracking
-        for cat_id in request.excluded_category_ids:
-            try:
-                user_firebase.update_category(cat_id, {"exclude_from_total": True})
-            except Exception as e:
-                logger.warning("Could not set exclude_from_total for %s: %s", cat_id, e)
-
-        # Recalculate OTHER cap (gets the unallocated budget)
-        other_cap = user_firebase.recalculate_other_cap()
+                }
+                for custom in request.custom_categories or []
+            ],
+            excluded_ids=request.excluded_category_ids,
+        )
 
         # Save budget period settings
-        user_firebase.set_budget_period_settings(current_user.uid, {
+        await user_firebase.set_budget_period_settings(current_user.uid, {
             "budget_month_start_day": request.budget_month_start_day,
         })
 
         return {
             "success": True,
             "total_budget": request.total_budget,
-            "categories_created": len(request.selected_category_ids) + custom_created,
-            "other_cap": other_cap,
+            "categories_created": result["categories_created"],
+            "other_cap": result["other_cap"],
             "message": "Onboarding complete! Your budget is set up."
         }
     except HTTPException:
@@ -1698,8 +1729,8 @@ async def get_recurring_expenses(
 ):
     """Get all recurring expense templates. Requires authentication."""
     try:
-        user_firebase = FirebaseClient.for_user(current_user.uid)
-        recurring_expenses = user_firebase.get_all_recurring_expenses(active_only=False)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
+        recurring_expenses = await user_firebase.get_all_recurring_expenses(active_only=False)
 
         # Convert to dict format for JSON response
         result = []
@@ -1738,8 +1769,8 @@ async def get_pending_expenses(
 ):
     """Get all pending expenses awaiting confirmation. Requires authentication."""
     try:
-        user_firebase = FirebaseClient.for_user(current_user.uid)
-        pending_expenses = user_firebase.get_all_pending_expenses(awaiting_only=True)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
+        pending_expenses = await user_firebase.get_all_pending_expenses(awaiting_only=True)
         return {"pending_expenses": pending_expenses}
     except Exception as e:
         logger.error("Error in /pending: %s", e)
@@ -1754,10 +1785,10 @@ async def confirm_pending_expense(
 ):
     """Confirm a pending expense and save it as a regular expense. Requires authentication."""
     try:
-        user_firebase = FirebaseClient.for_user(current_user.uid)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
 
         # Get pending expense
-        pending = user_firebase.get_pending_expense(pending_id)
+        pending = await user_firebase.get_pending_expense(pending_id)
         if not pending:
             raise HTTPException(status_code=404, detail="Pending expense not found")
 
@@ -1765,13 +1796,13 @@ async def confirm_pending_expense(
         expense = RecurringManager.pending_to_expense(pending, adjusted_amount)
 
         # Save expense
-        doc_id = user_firebase.save_expense(expense, input_type="recurring")
+        doc_id = await user_firebase.save_expense(expense, input_type="recurring")
 
         # Update recurring template's last_user_action
         if pending.template_id:
             today = date.today()
             try:
-                user_firebase.update_recurring_expense(
+                await user_firebase.update_recurring_expense(
                     pending.template_id,
                     {"last_user_action": {
                         "day": today.day,
@@ -1783,7 +1814,7 @@ async def confirm_pending_expense(
                 logger.warning("Could not update recurring template %s: %s", pending.template_id, e)
 
         # Delete pending expense
-        user_firebase.delete_pending_expense(pending_id)
+        await user_firebase.delete_pending_expense(pending_id)
 
         return {"success": True, "expense_id": doc_id, "message": "Expense confirmed"}
     except HTTPException:
@@ -1800,10 +1831,10 @@ async def delete_pending_expense(
 ):
     """Skip/delete a pending expense. Requires authentication."""
     try:
-        user_firebase = FirebaseClient.for_user(current_user.uid)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
 
         # Get pending to find template_id
-        pending_dict = user_firebase.get_all_pending_expenses(awaiting_only=False)
+        pending_dict = await user_firebase.get_all_pending_expenses(awaiting_only=False)
         template_id = None
         for p in pending_dict:
             if p.get("pending_id") == pending_id:
@@ -1814,7 +1845,7 @@ async def delete_pending_expense(
             # Update last_user_action
             today = date.today()
             today_date = Date(day=today.day, month=today.month, year=today.year)
-            user_firebase.update_recurring_expense(
+            await user_firebase.update_recurring_expense(
                 template_id,
                 {"last_user_action": {
                     "day": today_date.day,
@@ -1824,7 +1855,7 @@ async def delete_pending_expense(
             )
 
         # Delete pending expense
-        user_firebase.delete_pending_expense(pending_id)
+        await user_firebase.delete_pending_expense(pending_id)
 
         return {"success": True, "message": "Pending expense deleted"}
     except Exception as e:
@@ -1839,8 +1870,8 @@ async def delete_recurring_template(
 ):
     """Delete/deactivate a recurring expense template. Requires authentication."""
     try:
-        user_firebase = FirebaseClient.for_user(current_user.uid)
-        user_firebase.delete_recurring_expense(template_id)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
+        await user_firebase.delete_recurring_expense(template_id)
         return {"success": True, "message": "Recurring expense deleted"}
     except Exception as e:
         logger.error("Error in /recurring/%s: %s", template_id, e)
@@ -1863,8 +1894,8 @@ async def list_conversations(
     Returns list of conversations ordered by last activity (most recent first).
     """
     try:
-        user_firebase = FirebaseClient.for_user(current_user.uid)
-        conversations = user_firebase.list_conversations(limit=limit)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
+        conversations = await user_firebase.list_conversations(limit=limit)
 
         # Format timestamps for JSON serialization
         for conv in conversations:
@@ -1879,29 +1910,42 @@ async def list_conversations(
 @app.get("/conversations/{conversation_id}")
 async def get_conversation(
     conversation_id: str,
-    current_user: AuthenticatedUser = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    limit: int = 100,
+    before: Optional[int] = None,
 ):
     """
     Get a specific conversation by ID.
 
-    Returns the conversation with all messages and metadata.
+    Returns the conversation metadata and its most recent messages, oldest
+    first. Older messages are paged with the returned cursor.
+
+    Query Parameters:
+    - limit: Maximum number of stored messages to return (default 100, max 500)
+    - before: Cursor from a previous response's next_cursor, to load older messages
+
+    Returns the conversation with messages, plus next_cursor (null once the
+    first message has been returned).
     """
+    limit = max(1, min(limit, MAX_CONVERSATION_PAGE_SIZE))
     try:
-        user_firebase = FirebaseClient.for_user(current_user.uid)
-        conversation = user_firebase.get_conversation(conversation_id)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
+        conversation = await user_firebase.get_conversation(conversation_id)
 
         if not conversation:
             raise HTTPException(status_code=404, detail="Conversation not found")
 
+        page = await user_firebase.get_conversation_messages(
+            conversation_id, limit=limit, before_seq=before
+        )
+
         # Format timestamps for JSON serialization
         _format_timestamps(conversation)
 
         # Process messages: merge tool_use/tool_result blocks into
         # frontend-friendly format with separate content and tool_calls
-        if "messages" in conversation:
-            conversation["messages"] = _process_conversation_messages(
-                conversation["messages"]
-            )
+        conversation["messages"] = _process_conversation_messages(page["messages"])
+        conversation["next_cursor"] = page["next_cursor"]
 
         return conversation
     except HTTPException:
@@ -1929,9 +1973,9 @@ async def add_deleted_expense(
     so the frontend can render the expense card as deleted on reload.
     """
     try:
-        user_firebase = FirebaseClient.for_user(current_user.uid)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
         try:
-            user_firebase.add_deleted_expense_to_conversation(
+            await user_firebase.add_deleted_expense_to_conversation(
                 conversation_id, request.expense_id
             )
         except DocumentNotFoundError:
@@ -1961,8 +2005,8 @@ async def verify_expenses(
     Returns the subset of provided IDs that still exist.
     """
     try:
-        user_firebase = FirebaseClient.for_user(current_user.uid)
-        existing_ids = user_firebase.verify_expenses_exist(request.expense_ids)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
+        existing_ids = await user_firebase.verify_expenses_exist(request.expense_ids)
 
         return {"existing_ids": existing_ids}
     except Exception as e:
@@ -1977,9 +2021,9 @@ async def delete_conversation(
 ):
     """Delete a specific conversation. Requires authentication."""
     try:
-        user_firebase = FirebaseClient.for_user(current_user.uid)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
         try:
-            user_firebase.delete_conversation(conversation_id)
+            await user_firebase.delete_conversation(conversation_id)
         except DocumentNotFoundError:
             raise HTTPException(status_code=404, detail="Conversation not found")
 
@@ -2001,8 +2045,8 @@ async def create_conversation(
     Returns the new conversation ID.
     """
     try:
-        user_firebase = FirebaseClient.for_user(current_user.uid)
-        conversation_id = user_firebase.create_conversation()
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
+        conversation_id = await user_firebase.create_conversation()
         return {"conversation_id": conversation_id}
     except Exception as e:
         logger.error("Error in POST /conversations: %s", e)
@@ -2021,14 +2065,17 @@ async def admin_check_recurring(request: Request, x_api_key: Optional[str] = Hea
     """
     Check for due recurring expenses and create pending expenses for ALL users.
 
-    This endpoint is designed to be called by Cloud Scheduler daily.
+    This endpoint is designed to be called by Cloud Scheduler daily. Only
+    templates whose next_trigger_date has arrived are read (see
+    backend/recurring_sweep.py); safe to rerun if a run is interrupted.
     Requires ADMIN_API_KEY header for authentication.
 
     Headers:
         X-API-Key: The admin API key (must match ADMIN_API_KEY env var)
 
     Returns:
-        JSON with total created_count and per-user details
+        JSON with created_count, templates_due, users_checked, failed_users,
+        per-user details and timing
     """
     # Verify API key
     if not ADMIN_API_KEY:
@@ -2045,37 +2092,9 @@ async def admin_check_recurring(request: Request, x_api_key: Optional[str] = Hea
 
     try:
         logger.info("[Admin] Checking for due recurring expenses for all users...")
-
-        # Get all user IDs from the users collection
-        from google.cloud import firestore as gc_firestore
-        users_ref = firebase_client.db.collection("users")
-        user_docs = users_ref.stream()
-
-        total_created = 0
-        all_details = []
-        users_checked = 0
-
-        for user_doc in user_docs:
-            user_id = user_doc.id
-            users_checked += 1
-            logger.debug("Checking user: %s", user_id)
-
-            user_firebase = FirebaseClient.for_user(user_id)
-            result = await _check_recurring_expenses_logic(user_firebase)
-
-            total_created += result.get("created_count", 0)
-            if result.get("details"):
-                all_details.extend([f"[{user_id}] {d}" for d in result["details"]])
-
-        message = f"Checked {users_checked} user(s), created {total_created} pending expense(s)"
-        logger.info("[Admin] %s", message)
-
-        return {
-            "created_count": total_created,
-            "users_checked": users_checked,
-            "message": message,
-            "details": all_details
-        }
+        result = await run_recurring_sweep()
+        logger.info("[Admin] %s (%.0f ms)", result["message"], result["timing"]["total_ms"])
+        return result
     except Exception as e:
         logger.exception("[Admin] Error checking recurring expenses")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -2086,12 +2105,17 @@ async def admin_check_recurring(request: Request, x_api_key: Optional[str] = Hea
 async def admin_cleanup_conversations(
     request: Request,
     x_api_key: Optional[str] = Header(None),
-    ttl_hours: int = 1440  # 60 days default (60 * 24 = 1440 hours)
+    ttl_hours: int = 1440,  # 60 days default (60 * 24 = 1440 hours)
+    page_size: Optional[int] = None,
+    max_seconds: Optional[float] = CLEANUP_MAX_SECONDS,
 ):
     """
     Delete old conversations for ALL users.
 
-    This endpoint is designed to be called by Cloud Scheduler daily.
+    This endpoint is designed to be called by Cloud Scheduler daily. Expired
+    conversations are found with one collection group query and deleted
+    through a throttled BulkWriter, with a checkpoint after each page. A run
+    that hits max_seconds returns complete=false; calling again resumes it.
     Requires ADMIN_API_KEY header for authentication.
 
     Headers:
@@ -2099,9 +2123,11 @@ async def admin_cleanup_conversations(
 
     Query Parameters:
         ttl_hours: Delete conversations older than this many hours (default 1440 = 60 days)
+        page_size: Conversations per page (default CLEANUP_PAGE_SIZE)
+        max_seconds: Time budget for this call (default CLEANUP_MAX_SECONDS)
 
     Returns:
-        JSON with total deleted count and per-user details
+        JSON with total deleted count, per-user details and progress
     """
     # Verify API key
     if not ADMIN_API_KEY:
@@ -2118,18 +2144,16 @@ async def admin_cleanup_conversations(
 
     try:
         logger.info("[Admin] Cleaning up conversations older than %d hours...", ttl_hours)
-        results = FirebaseClient.cleanup_all_users_conversations(ttl_hours=ttl_hours)
+        results = await AsyncFirebaseClient.cleanup_all_users_conversations(
+            ttl_hours=ttl_hours, page_size=page_size, max_seconds=max_seconds,
+        )
 
-        total_deleted = results.pop("_total", 0)
-        message = f"Deleted {total_deleted} old conversation(s)"
+        message = f"Deleted {results['deleted_count']} old conversation(s)"
+        if not results["complete"]:
+            message += " so far (time budget reached; call again to resume)"
         logger.info("[Admin] %s", message)
 
-        return {
-            "deleted_count": total_deleted,
-            "ttl_hours": ttl_hours,
-            "message": message,
-            "per_user": results
-        }
+        return {**results, "ttl_hours": ttl_hours, "message": message}
     except Exception as e:
         logger.exception("[Admin] Error cleaning up conversations")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -2169,6 +2193,28 @@ async def admin_get_users(request: Request, x_api_key: Optional[str] = Header(No
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@app.get("/admin/cache-stats")
+@limiter.limit("5/minute")
+async def admin_get_cache_stats(request: Request, x_api_key: Optional[str] = Header(None)):
+    """
+    Hit/miss counters for this process's user settings/category,
+    verified-token and MCP tool catalog caches, plus provider client reuse.
+    Requires X-API-Key header.
+    """
+    if not ADMIN_API_KEY:
+        raise HTTPException(status_code=500, detail="ADMIN_API_KEY not configured on server")
+    if not x_api_key or not hmac.compare_digest(x_api_key, ADMIN_API_KEY):
+        raise HTTPException(status_code=401, detail="Invalid or missing X-API-Key header")
+
+    return {
+        "user_cache": get_user_cache_stats(),
+        "token_cache": get_token_cache_stats(),
+        "tool_catalog": get_tool_catalog_stats(),
+        "provider_clients": get_provider_client_stats(),
+        "tool_events": get_tool_event_stats(),
+    }
+
+
 @app.get("/admin/analytics")
 @limiter.limit("5/minute")
 async def admin_get_analytics(
@@ -2178,7 +2224,12 @@ async def admin_get_analytics(
 ):
     """
     Get usage analytics across all users.
-    Returns token_usage docs, extracted tool_calls, and summary stats.
+
+    Reads the pre-aggregated daily usage documents (one per user, day, model
+    and endpoint), so the cost scales with the date range rather than with
+    total history, and tool usage from the tool_events log, including
+    per-tool latency percentiles. Rows carry a "calls" count; raw records are
+    paged via /admin/analytics/records.
     Requires X-API-Key header.
     """
     if not ADMIN_API_KEY:
@@ -2188,40 +2239,83 @@ async def admin_get_analytics(
 
     try:
         # Use a global (no user_id) FirebaseClient for collection group queries
-        global_firebase = FirebaseClient()
-        token_usage = global_firebase.get_all_token_usage(days=days)
-        conversations = global_firebase.get_all_conversations(days=days)
+        global_firebase = AsyncFirebaseClient()
+        usage_rows, tool_events = await asyncio.gather(
+            global_firebase.get_usage_daily(days=days),
+            global_firebase.get_tool_events(days=days),
+        )
 
-        # Extract tool calls from conversation messages
-        tool_calls = []
-        for conv in conversations:
-            uid = conv.get('uid', 'unknown')
-            conv_id = conv.get('conversation_id', '')
-            messages = conv.get('messages', [])
-            for msg in messages:
-                # Each message may have tool_calls list: [{id, name, args, result}]
-                for tc in msg.get('tool_calls', []):
-                    tool_name = tc.get('name', '')
-                    if tool_name:
-                        tool_calls.append({
-                            "uid": uid,
-                            "tool_name": tool_name,
-                            "conversation_id": conv_id,
-                            "timestamp": msg.get('timestamp'),
-                        })
+        token_usage = [
+            {
+                "uid": row.get('uid'),
+                "day": row.get('day'),
+                "model": row.get('model'),
+                "provider": row.get('provider'),
+                "endpoint": row.get('endpoint'),
+                "calls": row.get('calls', 0),
+                "input_tokens": row.get('input_tokens', 0),
+                "output_tokens": row.get('output_tokens', 0),
+                "cache_read_tokens": row.get('cache_read_tokens', 0),
+                "cache_write_tokens": row.get('cache_write_tokens', 0),
+                "timestamp": row.get('last_activity') or row.get('day'),
+            }
+            for row in usage_rows
+        ]
+
+        # One row per (user, day, tool)
+        tool_counts: dict = {}
+        for event in tool_events:
+            key = (event.get('uid'), event.get('day'), event.get('tool'))
+            tool_counts[key] = tool_counts.get(key, 0) + 1
+        tool_calls = [
+            {
+                "uid": uid,
+                "tool_name": tool_name,
+                "day": day,
+                "calls": calls,
+                "timestamp": day,
+            }
+            for (uid, day, tool_name), calls in tool_counts.items()
+        ]
 
         # Build summary
-        total_input = sum(d.get('input_tokens', 0) for d in token_usage)
-        total_output = sum(d.get('output_tokens', 0) for d in token_usage)
-        unique_users = len(set(d.get('uid') for d in token_usage))
+        total_calls = sum(d['calls'] for d in token_usage)
+        total_input = sum(d['input_tokens'] for d in token_usage)
+        total_output = sum(d['output_tokens'] for d in token_usage)
+        total_cache_read = sum(d['cache_read_tokens'] for d in token_usage)
+        total_cache_write = sum(d['cache_write_tokens'] for d in token_usage)
+        total_prompt = total_input + total_cache_read + total_cache_write
+        unique_users = len(set(d['uid'] for d in token_usage))
+
+        # Time to first streamed token, per provider, from the daily histograms
+        ttft_buckets: dict = {}
+        for row in usage_rows:
+            merged = ttft_buckets.setdefault(row.get('provider', 'unknown'), {})
+            for bucket, count in (row.get('ttft_buckets') or {}).items():
+                merged[bucket] = merged.get(bucket, 0) + count
+        ttft_by_provider = {
+            provider_name: {
+                "calls": sum(buckets.values()),
+                "p50_ms": ttft_percentile(buckets, 0.5),
+                "p95_ms": ttft_percentile(buckets, 0.95),
+            }
+            for provider_name, buckets in ttft_buckets.items()
+            if buckets
+        }
 
         return {
             "token_usage": token_usage,
             "tool_calls": tool_calls,
             "summary": {
-                "total_api_calls": len(token_usage),
+                "total_api_calls": total_calls,
                 "total_input_tokens": total_input,
                 "total_output_tokens": total_output,
+                "total_cache_read_tokens": total_cache_read,
+                "total_cache_write_tokens": total_cache_write,
+                # Share of prompt tokens served from the prompt cache
+                "cache_hit_rate": round(total_cache_read / total_prompt, 4) if total_prompt else 0.0,
+                "ttft_by_provider": ttft_by_provider,
+                "tool_latency": summarize_tool_latency(tool_events),
                 "unique_users": unique_users,
                 "date_range_days": days,
             }
@@ -2231,6 +2325,40 @@ async def admin_get_analytics(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@app.get("/admin/analytics/records")
+@limiter.limit("30/minute")
+async def admin_get_analytics_records(
+    request: Request,
+    x_api_key: Optional[str] = Header(None),
+    days: int = 30,
+    uid: Optional[str] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+):
+    """
+    Page through raw token_usage records, newest first.
+
+    Drill-down for /admin/analytics. Pass the returned next_cursor to get the
+    next page; optionally restrict to one user with uid.
+    Requires X-API-Key header.
+    """
+    if not ADMIN_API_KEY:
+        raise HTTPException(status_code=500, detail="ADMIN_API_KEY not configured on server")
+    if not x_api_key or not hmac.compare_digest(x_api_key, ADMIN_API_KEY):
+        raise HTTPException(status_code=401, detail="Invalid or missing X-API-Key header")
+    if not 1 <= limit <= MAX_ANALYTICS_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_ANALYTICS_PAGE_SIZE}")
+
+    try:
+        global_firebase = AsyncFirebaseClient()
+        return await global_firebase.get_token_usage_page(days=days, limit=limit, cursor=cursor, uid=uid)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    except Exception as e:
+        logger.exception("[Admin] Error fetching analytics records")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 class AdminChatRequest(BaseModel):
     """Request model for admin chat."""
     message: str
@@ -2255,8 +2383,6 @@ async def admin_chat(
     if not x_api_key or not hmac.compare_digest(x_api_key, ADMIN_API_KEY):
         raise HTTPException(status_code=401, detail="Invalid or missing X-API-Key header")
 
-    import anthropic
-
     system_prompt = (
         "You are an analytics assistant for a personal finance app's admin dashboard. "
         "You have access to aggregate usage data below. Answer questions about token usage, "
@@ -2271,12 +2397,15 @@ async def admin_chat(
 
     async def event_stream():
         try:
-            client = anthropic.AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+            client = get_async_anthropic_client()
+            # The dashboard data in the system prompt is the same for every
+            # question in a session, so cache it
+            cached_system, cached_messages, _ = apply_anthropic_prompt_cache(system_prompt, messages, [])
             async with client.messages.stream(
                 model="claude-haiku-4-5-20251001",
                 max_tokens=1024,
-                system=system_prompt,
-                messages=messages,
+                system=cached_system,
+                messages=cached_messages,
             ) as stream:
                 async for text in stream.text_stream:
                     yield f"data: {json.dumps({'text': text})}\n\n"
@@ -2325,12 +2454,12 @@ async def get_user_settings(
     Returns model preference and budget period configuration.
     """
     try:
-        user_firebase = FirebaseClient.for_user(current_user.uid)
-        settings = user_firebase.get_user_settings(current_user.uid)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
+        settings = await user_firebase.get_user_settings(current_user.uid)
         selected_model = settings.get("selected_model", DEFAULT_MODEL)
         if selected_model not in SUPPORTED_MODELS:
             selected_model = DEFAULT_MODEL
-        period_settings = user_firebase.get_budget_period_settings(current_user.uid)
+        period_settings = await user_firebase.get_budget_period_settings(current_user.uid)
         return UserSettingsResponse(
             selected_model=selected_model,
             budget_month_start_day=period_settings.get("budget_month_start_day", 1),
@@ -2351,7 +2480,7 @@ async def update_user_settings(
     All fields are optional. Validates selected_model against SUPPORTED_MODELS.
     """
     try:
-        user_firebase = FirebaseClient.for_user(current_user.uid)
+        user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
         updates: dict = {}
 
         if body.selected_model is not None:
@@ -2368,16 +2497,16 @@ async def update_user_settings(
             period_updates["budget_month_start_day"] = body.budget_month_start_day
 
         if updates:
-            user_firebase.update_user_settings(current_user.uid, updates)
+            await user_firebase.update_user_settings(current_user.uid, updates)
         if period_updates:
-            user_firebase.set_budget_period_settings(current_user.uid, period_updates)
+            await user_firebase.set_budget_period_settings(current_user.uid, period_updates)
 
         # Return current state
-        settings = user_firebase.get_user_settings(current_user.uid)
+        settings = await user_firebase.get_user_settings(current_user.uid)
         selected_model = settings.get("selected_model", DEFAULT_MODEL)
         if selected_model not in SUPPORTED_MODELS:
             selected_model = DEFAULT_MODEL
-        period_settings = user_firebase.get_budget_period_settings(current_user.uid)
+        period_settings = await user_firebase.get_budget_period_settings(current_user.uid)
         return UserSettingsResponse(
             selected_model=selected_model,
             budget_month_start_day=period_settings.get("budget_month_start_day", 1),
@@ -2575,27 +2704,28 @@ async def chat_stream(
     """
     from .mcp.connection_manager import get_connection_manager
 
-    conn_manager = get_connection_manager()
-
-    # Ensure the default shared chat server is ready.
-    success, error = await _ensure_default_chat_server_connected()
-    if not success:
-        async def error_stream():
-            yield f"data: [ERROR] {error or 'MCP server unavailable'}\n\n"
-        return StreamingResponse(error_stream(), media_type="text/event-stream")
+    if _mcp_client and _mcp_client.client:
+        # Dispatch tool calls across the shared MCP server pool
+        client = _mcp_client.client
+    else:
+        # Pool not up (startup failed) — fall back to the single shared connection
+        success, error = await _ensure_default_chat_server_connected()
+        if not success:
+            async def error_stream():
+                yield f"data: [ERROR] {error or 'MCP server unavailable'}\n\n"
+            return StreamingResponse(error_stream(), media_type="text/event-stream")
+        client = get_connection_manager().get_client()
 
-    # Get client and tools
-    client = conn_manager.get_client()
     if not client or not client.session:
         async def error_stream():
             yield "data: [ERROR] MCP client not initialized\n\n"
         return StreamingResponse(error_stream(), media_type="text/event-stream")
 
     # Set up user-scoped Firebase client
-    user_firebase = FirebaseClient.for_user(current_user.uid)
+    user_firebase = AsyncFirebaseClient.for_user(current_user.uid)
 
     # Resolve the user's selected model
-    user_settings = user_firebase.get_user_settings(current_user.uid)
+    user_settings = await user_firebase.get_user_settings(current_user.uid)
     selected_model = user_settings.get("selected_model", DEFAULT_MODEL)
     if selected_model not in SUPPORTED_MODELS:
         selected_model = DEFAULT_MODEL
@@ -2612,7 +2742,7 @@ async def chat_stream(
         selected_model = chat_message.model_override
 
     # Step 1: Resolve conversation
-    conversation_id, conversation_messages = get_or_create_conversation(
+    conversation_id, conversation_messages, context_summary = await get_or_create_conversation(
         user_firebase, chat_message.conversation_id, USER_TIMEZONE
     )
 
@@ -2624,11 +2754,14 @@ async def chat_stream(
             yield f"data: {json.dumps(conv_event)}\n\n"
 
             # Step 2: Build messages
-            messages = build_message_context(conversation_messages, chat_message.message)
+            context = build_message_context(
+                conversation_messages, chat_message.message, context_summary
+            )
+            messages = context.messages
 
             # Step 3: Tool loop
             from .system_prompts import get_expense_parsing_system_prompt
-            user_categories = user_firebase.get_user_categories() if user_firebase else None
+            user_categories = await user_firebase.get_user_categories() if user_firebase else None
             system_prompt = get_expense_parsing_system_prompt(user_categories)
 
             result = ToolLoopResult()
@@ -2642,15 +2775,17 @@ async def chat_stream(
             ):
                 yield sse_event
 
-            # Step 4: Save history (skip if tool loop errored)
+            # Step 4: Save history (skip if tool loop errored). Runs in the
+            # background so [DONE] goes out as soon as the model stops.
             if not result.had_error:
-                save_conversation_history(
+                schedule_conversation_history_save(
                     user_firebase, conversation_id,
                     chat_message.message,
                     "\n".join(result.final_response_text),
                     result.all_tool_calls,
                     conversation_messages,
                     content_blocks=result.content_blocks or None,
+                    context_summary=context.context_summary if context.summary_changed else None,
                 )
 
             # Send done signal
@@ -2691,7 +2826,6 @@ async def ws_realtime(websocket: WebSocket, mode: str = "voice"):
     # Auth: require first-message auth (token must not be sent via query string)
     token = None
     try:
-        import asyncio
         raw = await asyncio.wait_for(websocket.receive_text(), timeout=10.0)
         auth_msg = json.loads(raw)
         if auth_msg.get("type") == "auth" and auth_msg.get("token"):
@@ -2706,8 +2840,8 @@ async def ws_realtime(websocket: WebSocket, mode: str = "voice"):
             return
 
     try:
-        import firebase_admin.auth as firebase_auth_mod
-        decoded = firebase_auth_mod.verify_id_token(token)
+        from .token_cache import verify_id_token_cached
+        decoded = verify_id_token_cached(token)
         from .auth import AuthenticatedUser
         user = AuthenticatedUser(
             uid=decoded["uid"],
@@ -2732,10 +2866,10 @@ async def ws_realtime(websocket: WebSocket, mode: str = "voice"):
 
     # Fetch user categories for dynamic tool schemas
     try:
-        user_firebase = FirebaseClient.for_user(user.uid)
-        if not user_firebase.has_categories_setup():
-            user_firebase.migrate_from_budget_caps()
-        user_categories = user_firebase.get_user_categories()
+        user_firebase = AsyncFirebaseClient.for_user(user.uid)
+        if not await user_firebase.has_categories_setup():
+            await user_firebase.migrate_from_budget_caps()
+        user_categories = await user_firebase.get_user_categories()
     except Exception:
         user_categories = None
 
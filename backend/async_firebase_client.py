@@ -0,0 +1,143 @@
+"""
+Async Firebase Client - Non-blocking facade over FirebaseClient.
+
+The Firebase Admin SDK only ships a blocking Firestore client. Calling it
+directly from an ``async def`` route stalls the event loop for the whole
+round trip, so every concurrent request queues behind it. This module mirrors
+FirebaseClient's public API as coroutines that run the blocking call on a
+bounded thread pool shared by the whole process.
+
+Usage:
+    user_firebase = AsyncFirebaseClient.for_user(uid)
+    categories = await user_firebase.get_user_categories()
+
+    # Anything else that touches Firestore synchronously (e.g. BudgetManager)
+    budget_manager = BudgetManager(user_firebase.sync)
+    data = await run_blocking(budget_manager.get_budget_status_data, ...)
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from .firebase_client import FirebaseClient
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on concurrent blocking Firestore calls per process. Firestore
+# round trips are I/O bound, so this can comfortably exceed the CPU count.
+FIRESTORE_MAX_WORKERS = int(os.getenv("FIRESTORE_MAX_WORKERS", "32"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_firestore_executor() -> ThreadPoolExecutor:
+    """Return the shared thread pool used for blocking Firestore calls."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=FIRESTORE_MAX_WORKERS,
+                    thread_name_prefix="firestore",
+                )
+    return _executor
+
+
+def shutdown_firestore_executor(wait: bool = True) -> None:
+    """Shut down the shared Firestore thread pool (called on app shutdown)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking callable on the shared Firestore thread pool.
+
+    Args:
+        func: Synchronous callable (usually a FirebaseClient/BudgetManager method)
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Whatever func returns; exceptions propagate unchanged
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_firestore_executor(), functools.partial(func, *args, **kwargs)
+    )
+
+
+class AsyncFirebaseClient:
+    """
+    Awaitable mirror of FirebaseClient.
+
+    Every public FirebaseClient method is available here with the same name
+    and signature, returning a coroutine. The wrapped synchronous client is
+    exposed as ``sync`` for code that must stay synchronous (BudgetManager,
+    RecurringManager helpers) and is dispatched through ``run_blocking``.
+    """
+
+    def __init__(self, user_id: Optional[str] = None, client: Optional[FirebaseClient] = None):
+        """
+        Args:
+            user_id: Optional user ID for user-scoped operations
+            client: Existing FirebaseClient to wrap (takes precedence over user_id)
+        """
+        self.sync = client if client is not None else FirebaseClient(user_id=user_id)
+
+    @classmethod
+    def for_user(cls, user_id: str) -> "AsyncFirebaseClient":
+        """
+        Create an AsyncFirebaseClient scoped to a specific user.
+
+        Args:
+            user_id: Firebase Auth UID of the user
+
+        Returns:
+            AsyncFirebaseClient instance scoped to the user
+        """
+        return cls(user_id=user_id)
+
+    @property
+    def user_id(self) -> Optional[str]:
+        return self.sync.user_id
+
+    @property
+    def db(self):
+        return self.sync.db
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run an arbitrary blocking callable on the Firestore thread pool."""
+        return await run_blocking(func, *args, **kwargs)
+
+    @classmethod
+    async def cleanup_all_users_conversations(cls, ttl_hours: int = 24, **kwargs) -> Dict[str, Any]:
+        """Async version of FirebaseClient.cleanup_all_users_conversations."""
+        return await run_blocking(FirebaseClient.cleanup_all_users_conversations, ttl_hours, **kwargs)
+
+
+def _make_async_method(name: str) -> Callable[..., Any]:
+    sync_method = getattr(FirebaseClient, name)
+
+    @functools.wraps(sync_method)
+    async def method(self, *args, **kwargs):
+        return await run_blocking(getattr(self.sync, name), *args, **kwargs)
+
+    return method
+
+
+# Mirror every public instance method so new FirebaseClient methods are
+# automatically awaitable without touching this module.
+for _name, _member in inspect.getmembers(FirebaseClient, inspect.isfunction):
+    if not _name.startswith("_") and not hasattr(AsyncFirebaseClient, _name):
+        setattr(AsyncFirebaseClient, _name, _make_async_method(_name))
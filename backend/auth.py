@@ -15,6 +15,8 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import firebase_admin.auth as firebase_auth
 from pydantic import BaseModel
 
+from .token_cache import verify_id_token_cached
+
 logger = logging.getLogger(__name__)
 
 
@@ -54,8 +56,8 @@ async def get_current_user(
         )
 
     try:
-        # Verify the Firebase ID token
-        decoded_token = firebase_auth.verify_id_token(credentials.credentials)
+        # Verify the Firebase ID token (cached until the token's exp)
+        decoded_token = verify_id_token_cached(credentials.credentials)
 
         return AuthenticatedUser(
             uid=decoded_token["uid"],
@@ -53,16 +53,7 @@ class BudgetManager:
         Returns:
             Total amount spent in the category for the month
         """
-        # Get all expenses for the month
-        expenses = self.firebase.get_monthly_expenses(year, month, category=None)
-
-        # Sum amounts for matching category
-        total = 0
-        for expense in expenses:
-            if expense.get("category") == category_id:
-                total += expense.get("amount", 0)
-
-        return total
+        return self.firebase.calculate_monthly_total(year, month, category_id)
 
     def calculate_total_monthly_spending(self, year: int, month: int) -> float:
         """
@@ -88,15 +79,14 @@ class BudgetManager:
         Returns:
             Total amount spent in the category for the period
         """
+        rollup = self.firebase.get_period_spending_rollup(period)
+        if rollup is not None:
+            return rollup.get("categories", {}).get(category_id, {}).get("total", 0.0)
+
         start = Date(day=period.start_date.day, month=period.start_date.month, year=period.start_date.year)
         end = Date(day=period.end_date.day, month=period.end_date.month, year=period.end_date.year)
-        expenses = self.firebase.get_expenses_in_date_range(start, end)
-
-        total = 0.0
-        for expense in expenses:
-            if expense.get("category") == category_id:
-                total += expense.get("amount", 0)
-        return total
+        rows = self.firebase.get_expenses_in_date_range(start, end, category_id, fields=["amount"])
+        return sum(row.amount or 0 for row in rows)
 
     def calculate_total_period_spending(self, period: BudgetPeriod) -> float:
         """
@@ -108,14 +98,21 @@ class BudgetManager:
         Returns:
             Total amount spent across all categories for the period
         """
+        rollup = self.firebase.get_period_spending_rollup(period)
+        if rollup is not None:
+            return rollup.get("total", 0.0)
+
         start = Date(day=period.start_date.day, month=period.start_date.month, year=period.start_date.year)
         end = Date(day=period.end_date.day, month=period.end_date.month, year=period.end_date.year)
-        expenses = self.firebase.get_expenses_in_date_range(start, end)
-        return sum(exp.get("amount", 0) for exp in expenses)
+        rows = self.firebase.get_expenses_in_date_range(start, end, fields=["amount"])
+        return sum(row.amount or 0 for row in rows)
 
     def get_period_spending_by_category(self, period: BudgetPeriod) -> Dict[str, float]:
         """
-        Get spending totals for ALL categories within a BudgetPeriod in one query.
+        Get spending totals for ALL categories within a BudgetPeriod.
+
+        Reads the period's spending rollup (a single document) when the period
+        matches the user's budget cadence, otherwise scans the period's expenses.
 
         Args:
             period: The BudgetPeriod to sum spending within
@@ -123,15 +120,21 @@ class BudgetManager:
         Returns:
             Dictionary mapping category IDs to spending amounts
         """
+        rollup = self.firebase.get_period_spending_rollup(period)
+        if rollup is not None:
+            return {
+                category_id: entry.get("total", 0.0)
+                for category_id, entry in rollup.get("categories", {}).items()
+            }
+
         start = Date(day=period.start_date.day, month=period.start_date.month, year=period.start_date.year)
         end = Date(day=period.end_date.day, month=period.end_date.month, year=period.end_date.year)
-        expenses = self.firebase.get_expenses_in_date_range(start, end)
+        rows = self.firebase.get_expenses_in_date_range(start, end, fields=["category", "amount"])
 
         category_totals: Dict[str, float] = {}
-        for expense in expenses:
-            category = expense.get("category", "OTHER")
-            amount = expense.get("amount", 0)
-            category_totals[category] = category_totals.get(category, 0) + amount
+        for row in rows:
+            category = row.category or "OTHER"
+            category_totals[category] = category_totals.get(category, 0) + (row.amount or 0)
         return category_totals
 
     def get_monthly_spending_by_category(self, year: int, month: int) -> Dict[str, float]:
@@ -149,15 +152,15 @@ class BudgetManager:
             Dictionary mapping category names to spending amounts
             Example: {"FOOD_OUT": 450.00, "COFFEE": 24.50, ...}
         """
-        # Fetch ALL expenses for the month in one query (no category filter)
-        all_expenses = self.firebase.get_monthly_expenses(year, month, category=None)
+        # Fetch ALL expenses for the month in one query (no category filter),
+        # reading only the fields needed to total them
+        rows = self.firebase.get_monthly_expenses(year, month, category=None, fields=["category", "amount"])
 
         # Group by category and sum amounts in memory
         category_totals = {}
-        for expense in all_expenses:
-            category = expense.get("category", "OTHER")
-            amount = expense.get("amount", 0)
-            category_totals[category] = category_totals.get(category, 0) + amount
+        for row in rows:
+            category = row.category or "OTHER"
+            category_totals[category] = category_totals.get(category, 0) + (row.amount or 0)
 
         return category_totals
 
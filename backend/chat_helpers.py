@@ -3,24 +3,28 @@ Chat stream helpers — decomposed from api.py chat_stream() endpoint.
 
 Helpers:
   get_or_create_conversation()  — resolve or create conversation
-  build_message_context()       — assemble Claude message list
+  build_message_context()       — assemble the model's message list within a token budget
   run_claude_tool_loop()        — async generator yielding SSE events
-  save_conversation_history()   — persist messages to Firestore
+  save_conversation_history()   — persist messages to Firestore (one commit)
+  schedule_conversation_history_save() — the same, run after the response
 """
 
-import os
 import json
-import copy
+import asyncio
 import logging
+import time
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Optional, AsyncGenerator, List, Dict
 
 import anthropic
-from anthropic import AsyncAnthropic
 
-from .firebase_client import FirebaseClient
+from .async_firebase_client import AsyncFirebaseClient
+from .context_builder import ConversationContext, build_context
 from .model_client import UnifiedModelClient, SUPPORTED_MODELS, DEFAULT_MODEL
+from .mcp.tool_catalog import get_tool_definitions
+from .mcp.tool_dispatch import run_tool_calls
+from .tool_events import record_tool_event
 
 logger = logging.getLogger(__name__)
 
@@ -42,27 +46,34 @@ class ToolLoopResult:
 MAX_CONVERSATION_MESSAGES = 100
 
 
-def get_or_create_conversation(
-    user_firebase: FirebaseClient,
+async def get_or_create_conversation(
+    user_firebase: AsyncFirebaseClient,
     conversation_id: Optional[str],
     user_timezone,
     inactivity_threshold_hours: int = 12,
-) -> tuple[str, list[dict]]:
+) -> tuple[str, list[dict], Optional[dict]]:
     """
     Resolve an existing conversation or create a new one.
 
-    If conversation_id is provided, checks staleness (> inactivity_threshold_hours).
+    If conversation_id is provided, waits for any pending background save of
+    its previous turn, then checks staleness (> inactivity_threshold_hours).
     Stale or missing conversations get a fresh ID.
 
     Returns:
-        (conversation_id, conversation_messages) where conversation_messages
-        is the existing history (empty list for new conversations), capped at
-        MAX_CONVERSATION_MESSAGES most recent messages to prevent memory exhaustion.
+        (conversation_id, conversation_messages, context_summary) where
+        conversation_messages is the existing history (empty list for new
+        conversations), capped at MAX_CONVERSATION_MESSAGES most recent
+        messages to prevent memory exhaustion, and context_summary is the
+        stored rolling summary of older turns (None if there isn't one).
     """
     conversation_messages: list[dict] = []
+    context_summary: Optional[dict] = None
 
     if conversation_id:
-        existing_conv = user_firebase.get_conversation(conversation_id)
+        # The previous turn may still be saving in the background; read the
+        # history (and last_activity) only once it has committed
+        await wait_for_conversation_history_save(conversation_id)
+        existing_conv = await user_firebase.get_conversation(conversation_id)
         if existing_conv:
             last_activity = existing_conv.get("last_activity")
             if last_activity:
@@ -84,70 +95,64 @@ def get_or_create_conversation(
                     )
                     conversation_id = None
                 else:
-                    # Get existing messages for context, capped to prevent
-                    # memory exhaustion and runaway token costs
-                    all_messages = existing_conv.get("messages", [])
-                    conversation_messages = all_messages[-MAX_CONVERSATION_MESSAGES:]
+                    # Get existing messages for context — only the tail is
+                    # read, capped to bound memory and token costs
+                    page = await user_firebase.get_conversation_messages(
+                        conversation_id, limit=MAX_CONVERSATION_MESSAGES
+                    )
+                    conversation_messages = page["messages"]
+                    context_summary = existing_conv.get("context_summary")
         else:
             conversation_id = None  # Conversation not found
 
     # Create new conversation if needed
     if not conversation_id:
-        conversation_id = user_firebase.create_conversation()
+        conversation_id = await user_firebase.create_conversation()
 
-    return conversation_id, conversation_messages
+    return conversation_id, conversation_messages, context_summary
 
 
 def build_message_context(
     conversation_messages: list[dict],
     current_message: str,
-) -> list[dict]:
-    """
-    Build the messages list for the Claude API call.
-
-    Prepends conversation history, appends the current user message.
-    Content fields that are JSON-encoded lists (structured tool_use / tool_result
-    blocks) are deserialized so the API receives proper content block arrays.
-    Plain-string content is passed through unchanged for backwards compatibility.
+    context_summary: Optional[dict] = None,
+) -> ConversationContext:
     """
-    messages = []
-
-    for msg in conversation_messages:
-        content = msg.get("content", "")
+    Build the messages list for the model call.
 
-        # Try to deserialize structured content blocks stored as JSON strings
-        if isinstance(content, str) and content.startswith("["):
-            try:
-                parsed = json.loads(content)
-                if isinstance(parsed, list):
-                    content = parsed
-            except (json.JSONDecodeError, TypeError):
-                pass  # keep as plain string
+    The newest turns are replayed verbatim within CONTEXT_TOKEN_BUDGET, older
+    ones are represented by the rolling context_summary, and the current user
+    message is appended. Content fields that are JSON-encoded lists
+    (structured tool_use / tool_result blocks) are deserialized so the API
+    receives proper content block arrays. See backend.context_builder.
 
-        messages.append({
-            "role": msg.get("role", "user"),
-            "content": content,
-        })
-
-    messages.append({
-        "role": "user",
-        "content": current_message,
-    })
-
-    return messages
+    Returns:
+        ConversationContext — use .messages for the model call, and pass
+        .context_summary to save_conversation_history() when .summary_changed.
+    """
+    context = build_context(conversation_messages, current_message, context_summary)
+    stats = context.stats
+    if stats.saved_tokens > 0:
+        logger.info(
+            "Conversation context: %d -> %d tokens (%d turns summarized, %d tool results digested)",
+            stats.raw_tokens, stats.context_tokens, stats.summarized_turns, stats.elided_results,
+        )
+    return context
 
 
 async def _execute_mcp_tool(
     client,
     tool_name: str,
     tool_args: dict,
+    user_id: Optional[str] = None,
 ) -> tuple[str, any]:
     """
     Execute a single MCP tool call and return (result_text, parsed_result).
 
     Returns a tuple of the raw result string and the parsed JSON (or raw string
-    if JSON parsing fails).
+    if JSON parsing fails). The call is recorded in the tool event log.
     """
+    started = time.perf_counter()
     try:
         tool_result = await client.session.call_tool(tool_name, tool_args)
     except Exception as tool_err:
@@ -170,10 +175,14 @@ async def _execute_mcp_tool(
     except (json.JSONDecodeError, TypeError):
         parsed_result = result_text
 
+    record_tool_event(
+        tool_name, user_id, (time.perf_counter() - started) * 1000,
+        result_text, parsed_result, source="chat",
+    )
     return result_text, parsed_result
 
 
-async def _run_anthropic_streaming_loop(
+async def _run_streaming_tool_loop(
     client,
     messages: list[dict],
     system_prompt: str,
@@ -185,235 +194,102 @@ async def _run_anthropic_streaming_loop(
     firebase_client_instance,
 ) -> AsyncGenerator[str, None]:
     """
-    Anthropic-specific tool loop using the streaming API for token-by-token text delivery.
+    Tool loop over UnifiedModelClient.astream() — token-by-token text for every provider.
+
+    Every provider produces the same SSE events: "text" per delta, "tool_start"
+    as soon as the model begins a tool call, "tool_end" once it has run.
 
     Yields SSE-formatted strings. Mutates *result* in-place.
     """
-    provider = "anthropic"
-    anthropic_client = AsyncAnthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+    model_client = UnifiedModelClient(model)
+    provider = SUPPORTED_MODELS[model]["provider"]
 
     while True:
-        accumulated_text = ""
-        # Each entry: {"id": str, "name": str, "input_json": str}
-        tool_blocks: list[dict] = []
-        current_block_type: Optional[str] = None
+        text_deltas: list[str] = []
+        announced: set[str] = set()
+        api_response = None
 
         try:
-            async with anthropic_client.messages.stream(
-                model=model,
-                max_tokens=2000,
+            async for event in model_client.astream(
                 system=system_prompt,
                 messages=messages,
                 tools=available_tools,
-            ) as stream:
-                async for event in stream:
-                    event_type = event.type
-
-                    if event_type == "content_block_start":
-                        block = event.content_block
-                        if block.type == "text":
-                            current_block_type = "text"
-                        elif block.type == "tool_use":
-                            current_block_type = "tool_use"
-                            tool_blocks.append({
-                                "id": block.id,
-                                "name": block.name,
-                                "input_json": "",
-                            })
-                            # Emit tool_start now (args will be empty — they arrive via deltas)
-                            tool_start_event = {
-                                "type": "tool_start",
-                                "id": block.id,
-                                "name": block.name,
-                                "args": {},
-                            }
-                            yield f"data: {json.dumps(tool_start_event)}\n\n"
-
-                    elif event_type == "content_block_delta":
-                        delta = event.delta
-                        if current_block_type == "text" and hasattr(delta, "text"):
-                            accumulated_text += delta.text
-                            text_event = {"type": "text", "content": delta.text}
-                            yield f"data: {json.dumps(text_event)}\n\n"
-                        elif current_block_type == "tool_use" and hasattr(delta, "partial_json"):
-                            if tool_blocks:
-                                tool_blocks[-1]["input_json"] += delta.partial_json
-
-                    elif event_type == "content_block_stop":
-                        current_block_type = None
-
-                # Retrieve the completed message for stop_reason and token counts
-                final_message = await stream.get_final_message()
-
+            ):
+                if event.type == "text":
+                    text_deltas.append(event.text)
+                    text_event = {"type": "text", "content": event.text}
+                    yield f"data: {json.dumps(text_event)}\n\n"
+                elif event.type == "tool_call":
+                    # Emitted when the call begins; args may still be empty
+                    announced.add(event.tool_call.id)
+                    tool_start_event = {
+                        "type": "tool_start",
+                        "id": event.tool_call.id,
+                        "name": event.tool_call.name,
+                        "args": {k: v for k, v in event.tool_call.arguments.items() if k != "auth_token"},
+                    }
+                    yield f"data: {json.dumps(tool_start_event)}\n\n"
+                elif event.type == "done":
+                    api_response = event.response
         except Exception as api_err:
-            logger.error("Anthropic streaming API error (%s): %s", model, api_err)
+            logger.error("Model streaming API error (%s): %s", model, api_err)
             result.had_error = True
             error_event = {"type": "error", "content": f"AI service error: {api_err}"}
             yield f"data: {json.dumps(error_event)}\n\n"
             return
 
-        # Log token usage
         if user_id and firebase_client_instance:
-            firebase_client_instance.log_token_usage(
+            await firebase_client_instance.log_token_usage(
                 user_id, model, provider,
-                final_message.usage.input_tokens,
-                final_message.usage.output_tokens,
-                "chat",
+                api_response.input_tokens, api_response.output_tokens, "chat",
+                cache_read_tokens=api_response.cache_read_tokens,
+                cache_write_tokens=api_response.cache_write_tokens,
+                ttft_ms=api_response.ttft_ms,
             )
 
-        stop_reason = final_message.stop_reason
-
-        if stop_reason == "end_turn":
-            # Accumulate final text for history persistence
-            if accumulated_text:
-                result.final_response_text.append(accumulated_text)
-                result.content_blocks.append({"type": "text", "text": accumulated_text})
-            break
+        text = "".join(text_deltas)
+        if not text and api_response.content:
+            # Provider returned text without streaming deltas
+            text = api_response.content
+            yield f"data: {json.dumps({'type': 'text', 'content': text})}\n\n"
 
-        elif stop_reason == "tool_use":
-            # Accumulate any leading text before tool calls
-            if accumulated_text:
-                result.final_response_text.append(accumulated_text)
-                result.content_blocks.append({"type": "text", "text": accumulated_text})
-
-            # Build the assistant message content block list
-            assistant_content = []
-            if accumulated_text:
-                assistant_content.append({"type": "text", "text": accumulated_text})
-
-            tool_results_for_messages: list[dict] = []
-
-            for tb in tool_blocks:
-                try:
-                    tool_input = json.loads(tb["input_json"]) if tb["input_json"] else {}
-                except json.JSONDecodeError:
-                    tool_input = {}
-
-                tool_name = tb["name"]
-                tool_use_id = tb["id"]
-
-                # Inject auth_token for MCP tool authentication (defense in depth)
-                tool_args = dict(tool_input)
-                tool_args["auth_token"] = current_user_token
-
-                # Execute the tool
-                result_text, parsed_result = await _execute_mcp_tool(client, tool_name, tool_args)
-
-                # Emit tool_end with result (strip auth_token from visible args)
-                safe_args = {k: v for k, v in tool_args.items() if k != "auth_token"}
-                tool_end_event = {
-                    "type": "tool_end",
-                    "id": tool_use_id,
-                    "name": tool_name,
-                    "result": parsed_result,
-                }
-                yield f"data: {json.dumps(tool_end_event)}\n\n"
-
-                # Persist tool call record (auth_token stripped)
-                result.all_tool_calls.append({
-                    "id": tool_use_id,
-                    "name": tool_name,
-                    "args": safe_args,
-                    "result": parsed_result,
-                })
-
-                # Record ordered content block for display
-                result.content_blocks.append({
-                    "type": "tool_call",
-                    "id": tool_use_id,
-                    "name": tool_name,
-                    "result": parsed_result,
-                })
-
-                # Add tool_use block to assistant message (input without auth_token)
-                assistant_content.append({
-                    "type": "tool_use",
-                    "id": tool_use_id,
-                    "name": tool_name,
-                    "input": {k: v for k, v in tool_input.items() if k != "auth_token"},
-                })
-
-                tool_results_for_messages.append({
-                    "type": "tool_result",
-                    "tool_use_id": tool_use_id,
-                    "content": result_text,
-                })
-
-            # Append assistant and tool result turns, then loop
-            messages.append({"role": "assistant", "content": assistant_content})
-            messages.append({"role": "user", "content": tool_results_for_messages})
+        # Accumulate text (including any leading text before tool calls)
+        if text:
+            result.final_response_text.append(text)
+            result.content_blocks.append({"type": "text", "text": text})
 
-        else:
-            # Unexpected stop reason — treat as done
-            logger.warning("Unexpected stop_reason from Anthropic streaming: %s", stop_reason)
-            if accumulated_text:
-                result.final_response_text.append(accumulated_text)
+        if api_response.stop_reason != "tool_use" or not api_response.tool_calls:
+            if api_response.stop_reason not in ("end_turn", "tool_use"):
+                logger.warning("Unexpected stop_reason from %s streaming: %s", provider, api_response.stop_reason)
             break
 
-
-async def _run_non_anthropic_tool_loop(
-    client,
-    messages: list[dict],
-    system_prompt: str,
-    current_user_token: str,
-    result: ToolLoopResult,
-    model: str,
-    available_tools: list[dict],
-    user_id: Optional[str],
-    firebase_client_instance,
-) -> AsyncGenerator[str, None]:
-    """
-    Non-Anthropic tool loop (OpenAI, Google) using UnifiedModelClient (non-streaming).
-
-    Yields SSE-formatted strings. Mutates *result* in-place.
-    """
-    model_client = UnifiedModelClient(model)
-    provider = SUPPORTED_MODELS[model]["provider"]
-
-    # Initial model call
-    try:
-        api_response = model_client.create(
-            system=system_prompt,
-            messages=messages,
-            tools=available_tools,
-        )
-    except Exception as api_err:
-        logger.error("Model API error (%s): %s", model, api_err)
-        result.had_error = True
-        error_event = {"type": "error", "content": f"AI service error: {api_err}"}
-        yield f"data: {json.dumps(error_event)}\n\n"
-        return
-
-    if user_id and firebase_client_instance:
-        firebase_client_instance.log_token_usage(
-            user_id, model, provider,
-            api_response.input_tokens, api_response.output_tokens, "chat"
-        )
-
-    while api_response.stop_reason == "tool_use":
+        # Build the assistant message content block list
         assistant_content = []
-        tool_results = []
+        if text:
+            assistant_content.append({"type": "text", "text": text})
 
-        if api_response.content:
-            assistant_content.append({"type": "text", "text": api_response.content})
-            result.content_blocks.append({"type": "text", "text": api_response.content})
+        tool_results_for_messages: list[dict] = []
 
+        pending_calls = []
         for tc in api_response.tool_calls:
-            tool_name = tc.name
-            tool_args = tc.arguments
-            tool_use_id = tc.id
-
-            tool_args = {**tool_args, "auth_token": current_user_token}
-
-            tool_start_event = {
-                "type": "tool_start",
-                "id": tool_use_id,
-                "name": tool_name,
-                "args": {k: v for k, v in tool_args.items() if k != "auth_token"},
-            }
-            yield f"data: {json.dumps(tool_start_event)}\n\n"
-
-            result_text, parsed_result = await _execute_mcp_tool(client, tool_name, tool_args)
+            # Inject auth_token for MCP tool authentication (defense in depth)
+            tool_args = {**tc.arguments, "auth_token": current_user_token}
+            pending_calls.append((tc.name, tool_args))
+
+            if tc.id not in announced:
+                tool_start_event = {"type": "tool_start", "id": tc.id, "name": tc.name, "args": tc.arguments}
+                yield f"data: {json.dumps(tool_start_event)}\n\n"
+
+        # Execute the tools: read-only calls overlap, writes run alone,
+        # results come back in the order the model requested them
+        async for index, (result_text, parsed_result) in run_tool_calls(
+            pending_calls,
+            lambda name, args: _execute_mcp_tool(client, name, args, user_id),
+        ):
+            tool_name, tool_args = pending_calls[index]
+            tool_use_id = api_response.tool_calls[index].id
+            # auth_token is never shown, persisted or sent back to the model
+            safe_args = {k: v for k, v in tool_args.items() if k != "auth_token"}
 
             tool_end_event = {
                 "type": "tool_end",
@@ -423,13 +299,15 @@ async def _run_non_anthropic_tool_loop(
             }
             yield f"data: {json.dumps(tool_end_event)}\n\n"
 
+            # Persist tool call record (auth_token stripped)
             result.all_tool_calls.append({
                 "id": tool_use_id,
                 "name": tool_name,
-                "args": {k: v for k, v in tool_args.items() if k != "auth_token"},
+                "args": safe_args,
                 "result": parsed_result,
             })
 
+            # Record ordered content block for display
             result.content_blocks.append({
                 "type": "tool_call",
                 "id": tool_use_id,
@@ -441,54 +319,18 @@ async def _run_non_anthropic_tool_loop(
                 "type": "tool_use",
                 "id": tool_use_id,
                 "name": tool_name,
-                "input": {k: v for k, v in tool_args.items() if k != "auth_token"},
+                "input": safe_args,
             })
 
-            tool_results.append({
+            tool_results_for_messages.append({
                 "type": "tool_result",
                 "tool_use_id": tool_use_id,
                 "content": result_text,
             })
 
+        # Append assistant and tool result turns, then loop
         messages.append({"role": "assistant", "content": assistant_content})
-        messages.append({"role": "user", "content": tool_results})
-
-        try:
-            api_response = model_client.create(
-                system=system_prompt,
-                messages=messages,
-                tools=available_tools,
-            )
-        except Exception as api_err:
-            logger.error("Model API error during tool loop (%s): %s", model, api_err)
-            result.had_error = True
-            error_event = {"type": "error", "content": f"AI service error: {api_err}"}
-            yield f"data: {json.dumps(error_event)}\n\n"
-            return
-
-        if user_id and firebase_client_instance:
-            firebase_client_instance.log_token_usage(
-                user_id, model, provider,
-                api_response.input_tokens, api_response.output_tokens, "chat"
-            )
-
-    # Emit final text as a single event (non-streaming)
-    if api_response.content:
-        text = api_response.content
-        result.final_response_text.append(text)
-        result.content_blocks.append({"type": "text", "text": text})
-        text_event = {"type": "text", "content": text}
-        yield f"data: {json.dumps(text_event)}\n\n"
-
-
-def _patch_category_enum(schema: dict, category_ids: list[str]) -> dict:
-    """Patch any 'category' property enum in a tool schema with the user's category IDs."""
-    schema = copy.deepcopy(schema)
-    props = schema.get("properties", {})
-    for prop_name, prop_schema in props.items():
-        if prop_name == "category" and "enum" in prop_schema:
-            prop_schema["enum"] = category_ids
-    return schema
+        messages.append({"role": "user", "content": tool_results_for_messages})
 
 
 async def run_claude_tool_loop(
@@ -506,11 +348,13 @@ async def run_claude_tool_loop(
     """
     Run the LLM tool-use loop, yielding SSE-formatted strings.
 
-    For Anthropic models: uses the async streaming API for token-by-token text delivery.
-    For OpenAI/Google models: uses the non-streaming UnifiedModelClient path.
+    Streams every provider token-by-token through UnifiedModelClient.astream()
+    (Anthropic Messages streaming, OpenAI Responses streaming, Gemini
+    generate_content_stream), so clients receive the same SSE events whichever
+    model is selected.
 
-    Calls client.session.list_tools() and client.session.call_tool()
-    for MCP interactions. Mutates *result* to accumulate response text
+    Reads tool definitions from the cached tool catalog and calls
+    client.session.call_tool() for MCP interactions. Mutates *result* to accumulate response text
     and tool calls.
 
     On API errors: sets result.had_error = True, yields an error event,
@@ -525,55 +369,31 @@ async def run_claude_tool_loop(
         result:                   ToolLoopResult accumulator (mutated in-place).
         model:                    Model identifier from SUPPORTED_MODELS.
         user_id:                  Firebase UID for token usage logging.
-        firebase_client_instance: FirebaseClient scoped to the user (optional).
+        firebase_client_instance: AsyncFirebaseClient scoped to the user (optional).
         user_categories:          User's custom categories for patching tool enums.
     """
-    # Build the category enum list from user categories (or fall back to ExpenseType)
-    if user_categories:
-        category_ids = [cat.get("category_id") for cat in user_categories]
-    else:
-        from .output_schemas import ExpenseType
-        category_ids = [e.name for e in ExpenseType]
-
-    # Get available tools from MCP server.
-    # Strip auth_token from schemas — it's injected server-side before execution,
-    # so models should never see or attempt to fill it.
-    mcp_response = await client.session.list_tools()
-    available_tools = []
-    for tool in mcp_response.tools:
-        schema = _patch_category_enum(tool.inputSchema, category_ids)
-        props = {k: v for k, v in schema.get("properties", {}).items() if k != "auth_token"}
-        required = [r for r in schema.get("required", []) if r != "auth_token"]
-        available_tools.append({
-            "name": tool.name,
-            "description": tool.description,
-            "input_schema": {**schema, "properties": props, "required": required},
-        })
+    # Tool definitions come from the per-connection catalog, patched with the
+    # user's category enum and with auth_token stripped (it's injected
+    # server-side before execution, so models should never see or fill it).
+    # The list is shared between requests — don't mutate it.
+    available_tools = await get_tool_definitions(client.session, "anthropic", user_categories)
 
-    provider = SUPPORTED_MODELS[model]["provider"]
-
-    if provider == "anthropic":
-        async for sse_event in _run_anthropic_streaming_loop(
-            client, messages, system_prompt, current_user_token, result,
-            model, available_tools, user_id, firebase_client_instance,
-        ):
-            yield sse_event
-    else:
-        async for sse_event in _run_non_anthropic_tool_loop(
-            client, messages, system_prompt, current_user_token, result,
-            model, available_tools, user_id, firebase_client_instance,
-        ):
-            yield sse_event
+    async for sse_event in _run_streaming_tool_loop(
+        client, messages, system_prompt, current_user_token, result,
+        model, available_tools, user_id, firebase_client_instance,
+    ):
+        yield sse_event
 
 
-def save_conversation_history(
-    user_firebase: FirebaseClient,
+async def save_conversation_history(
+    user_firebase: AsyncFirebaseClient,
     conversation_id: str,
     user_message: str,
     assistant_response: str,
     tool_calls: list[dict],
     conversation_messages: list[dict],
     content_blocks: list[dict] = None,
+    context_summary: Optional[dict] = None,
 ) -> None:
     """
     Persist user and assistant messages to the Firestore conversation.
@@ -590,12 +410,13 @@ def save_conversation_history(
 
     When no tools were called, stores the normal 2 messages (user + assistant text).
 
-    Sets the conversation summary from the first user message.
+    Sets the conversation summary from the first user message, and stores
+    context_summary (the rolling model-context summary) when given.
+
+    All messages and both summaries are written in a single commit.
     """
     # 1. Always store the user message
-    user_firebase.add_message_to_conversation(
-        conversation_id, "user", user_message
-    )
+    turn = [{"role": "user", "content": user_message}]
 
     if tool_calls:
         # Build structured tool_use blocks for the assistant turn
@@ -620,51 +441,93 @@ def save_conversation_history(
             })
 
         # 2. Assistant message with tool_use blocks (JSON-serialized list)
-        user_firebase.add_message_to_conversation(
-            conversation_id, "assistant", json.dumps(tool_use_blocks)
-        )
+        turn.append({"role": "assistant", "content": json.dumps(tool_use_blocks)})
 
         # 3. User message with tool_result blocks (JSON-serialized list)
-        user_firebase.add_message_to_conversation(
-            conversation_id, "user", json.dumps(tool_result_blocks)
-        )
+        turn.append({"role": "user", "content": json.dumps(tool_result_blocks)})
 
         # 4. Final assistant text response with content_blocks for display
         # content_blocks preserves the interleaved order of text and tool
         # calls as they occurred during streaming, enabling proper rendering
-        # when the conversation is loaded later.
-        extra_fields = {}
-        if content_blocks:
-            extra_fields["content_blocks"] = content_blocks
-
-        if assistant_response:
-            user_firebase.add_message_to_conversation(
-                conversation_id, "assistant", assistant_response,
-                tool_calls=[
+        # when the conversation is loaded later. Stored even without final
+        # text when there are content blocks (e.g., tools only).
+        if assistant_response or content_blocks:
+            final_message = {
+                "role": "assistant",
+                "content": assistant_response or "",
+                "tool_calls": [
                     {"id": tc["id"], "name": tc["name"], "result": tc.get("result")}
                     for tc in tool_calls
                 ],
-                **extra_fields,
-            )
-        elif content_blocks:
-            # No final text but we have content blocks (e.g., tools only)
-            user_firebase.add_message_to_conversation(
-                conversation_id, "assistant", "",
-                tool_calls=[
-                    {"id": tc["id"], "name": tc["name"], "result": tc.get("result")}
-                    for tc in tool_calls
-                ],
-                **extra_fields,
-            )
+            }
+            if content_blocks:
+                final_message["content_blocks"] = content_blocks
+            turn.append(final_message)
     elif assistant_response:
         # No tool calls — simple user + assistant pair
-        user_firebase.add_message_to_conversation(
-            conversation_id, "assistant", assistant_response
-        )
+        turn.append({"role": "assistant", "content": assistant_response})
 
     # Update conversation summary from first user message
+    summary = None
     if len(conversation_messages) == 0:
         summary = user_message[:50]
         if len(user_message) > 50:
             summary += "..."
-        user_firebase.update_conversation_summary(conversation_id, summary)
+
+    await user_firebase.append_conversation_messages(
+        conversation_id, turn, summary=summary, context_summary=context_summary,
+    )
+
+
+# Conversation writes scheduled to run after the response has finished
+# streaming, keyed by conversation_id. Each holds the latest save for its
+# conversation: a new save is chained behind the previous one so turns commit
+# in order, and get_or_create_conversation() waits for it before reading the
+# history. Held here so the tasks aren't garbage-collected mid-flight and can
+# be drained on shutdown.
+_pending_history_saves: dict[str, asyncio.Task] = {}
+
+
+def schedule_conversation_history_save(
+    user_firebase: AsyncFirebaseClient, conversation_id: str, *args, **kwargs
+) -> asyncio.Task:
+    """
+    Run save_conversation_history() in the background, off the response path.
+
+    Takes the same arguments as save_conversation_history(). Starts once any
+    earlier scheduled save for the same conversation has finished. Failures
+    are logged rather than raised — the client has already received [DONE].
+    """
+    previous = _pending_history_saves.get(conversation_id)
+
+    async def _save():
+        if previous is not None:
+            # Doesn't raise: the previous save logs its own failure
+            await asyncio.wait([previous])
+        try:
+            await save_conversation_history(user_firebase, conversation_id, *args, **kwargs)
+        except Exception:
+            logger.exception("Failed to save conversation history")
+
+    task = asyncio.create_task(_save())
+    _pending_history_saves[conversation_id] = task
+
+    def _forget(done: asyncio.Task) -> None:
+        if _pending_history_saves.get(conversation_id) is done:
+            del _pending_history_saves[conversation_id]
+
+    task.add_done_callback(_forget)
+    return task
+
+
+async def wait_for_conversation_history_save(conversation_id: str) -> None:
+    """Wait for this process's scheduled history saves for a conversation to finish."""
+    task = _pending_history_saves.get(conversation_id)
+    if task is not None:
+        await asyncio.wait([task])
+
+
+async def drain_conversation_history_saves(timeout: float = 10.0) -> None:
+    """Wait (up to *timeout* seconds) for scheduled history saves to finish."""
+    if _pending_history_saves:
+        await asyncio.wait(set(_pending_history_saves.values()), timeout=timeout)
@@ -0,0 +1,365 @@
+"""
+Context Builder - Fits conversation history into a token budget for the model.
+
+Replaying every stored message on every turn gets expensive fast: a single
+query_expenses result can be thousands of tokens, and it is re-sent with each
+later message. Instead, the history is assembled as:
+
+  1. A rolling summary of older turns — one line per turn (what the user
+     asked, which tools ran, what the assistant answered). It is stored on the
+     conversation document as "context_summary" and only ever extended, so
+     each turn is summarized once.
+  2. The newest turns verbatim, within CONTEXT_TOKEN_BUDGET tokens and
+     CONTEXT_MAX_TURNS turns. Stored tool results larger than
+     TOOL_RESULT_MAX_TOKENS are reduced to compact digests. The model saw
+     the full result in the turn that ran the tool; every later turn gets
+     the same digest, so a turn renders identically from one build to the
+     next.
+  3. The current user message.
+
+When the verbatim turns outgrow the budget, the oldest are folded into the
+summary until half the budget is left. Folding in bulk rather than one turn at
+a time keeps the start of the message list unchanged for several turns, so the
+provider's prompt cache keeps hitting between folds.
+
+Summaries are extractive (no model call), so building context adds no latency
+and can't fail. Token counts are estimates — there is no single tokenizer
+shared by all providers — which is all a budget needs.
+"""
+
+import json
+import logging
+import math
+import os
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Max estimated tokens of verbatim history (the summary and current message are extra)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "6000"))
+# Max verbatim turns. Keeps the unsummarized span well inside the stored-message
+# tail that chat_helpers reads (MAX_CONVERSATION_MESSAGES, up to 4 per turn).
+CONTEXT_MAX_TURNS = int(os.getenv("CONTEXT_MAX_TURNS", "20"))
+# Stored tool results above this size are replaced with a digest
+TOOL_RESULT_MAX_TOKENS = int(os.getenv("TOOL_RESULT_MAX_TOKENS", "300"))
+# The rolling summary drops its oldest lines beyond this size
+CONTEXT_SUMMARY_MAX_TOKENS = int(os.getenv("CONTEXT_SUMMARY_MAX_TOKENS", "800"))
+
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Digest shape: first few list items, long strings cut short
+DIGEST_LIST_ITEMS = 3
+DIGEST_STRING_CHARS = 120
+
+# Summary line field lengths
+SUMMARY_USER_CHARS = 160
+SUMMARY_ASSISTANT_CHARS = 200
+SUMMARY_ARG_CHARS = 40
+
+SUMMARY_HEADER = "Summary of earlier messages in this conversation:"
+SUMMARY_ACK = "Understood."
+SUMMARY_OMITTED_LINE = "- (earlier turns omitted)"
+
+
+# ==================== Token counting ====================
+
+def count_tokens(value: Any) -> int:
+    """Estimate the tokens in a string, or in any JSON-serializable value."""
+    if not isinstance(value, str):
+        value = json.dumps(value, separators=(",", ":"), default=str)
+    return math.ceil(len(value) / CHARS_PER_TOKEN)
+
+
+def message_tokens(message: dict) -> int:
+    """Estimate the tokens one API message costs, including per-message overhead."""
+    return count_tokens(message.get("content", "")) + MESSAGE_OVERHEAD_TOKENS
+
+
+# ==================== Turns ====================
+
+def decode_content(content: Any) -> Any:
+    """
+    Decode stored message content.
+
+    Structured tool_use / tool_result blocks are stored as JSON-encoded lists;
+    they're deserialized so the API receives proper content block arrays.
+    Plain-string content is returned unchanged.
+    """
+    if isinstance(content, str) and content.startswith("["):
+        try:
+            parsed = json.loads(content)
+            if isinstance(parsed, list):
+                return parsed
+        except (json.JSONDecodeError, TypeError):
+            pass  # keep as plain string
+    return content
+
+
+def _is_tool_result(message: dict) -> bool:
+    content = message["content"]
+    return isinstance(content, list) and any(
+        isinstance(block, dict) and block.get("type") == "tool_result" for block in content
+    )
+
+
+def split_turns(messages: list[dict]) -> list[list[dict]]:
+    """
+    Group decoded messages into turns.
+
+    A turn starts at each user message that isn't a tool_result, so a
+    tool_use / tool_result pair always stays within one turn.
+    """
+    turns: list[list[dict]] = []
+    for message in messages:
+        if not turns or (message["role"] == "user" and not _is_tool_result(message)):
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+# ==================== Tool result digests ====================
+
+def _digest_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _digest_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        head = [_digest_value(item) for item in value[:DIGEST_LIST_ITEMS]]
+        if len(value) > DIGEST_LIST_ITEMS:
+            head.append(f"... {len(value) - DIGEST_LIST_ITEMS} more")
+        return head
+    if isinstance(value, str) and len(value) > DIGEST_STRING_CHARS:
+        return value[:DIGEST_STRING_CHARS] + "..."
+    return value
+
+
+def digest_tool_result(content: str, max_tokens: int = TOOL_RESULT_MAX_TOKENS) -> str:
+    """
+    Reduce an oversized tool result to a compact digest.
+
+    JSON results keep their shape and every scalar (counts, totals, ids) but
+    only the first few items of each list. Anything still too large, or not
+    JSON, is truncated. Results within *max_tokens* are returned unchanged.
+    """
+    original_tokens = count_tokens(content)
+    if original_tokens <= max_tokens:
+        return content
+
+    try:
+        digest = json.dumps(_digest_value(json.loads(content)), default=str)
+    except (json.JSONDecodeError, TypeError):
+        digest = content
+
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(digest) > max_chars:
+        digest = digest[:max_chars] + "..."
+    return f"[digest of {original_tokens}-token result] {digest}"
+
+
+def _elide_tool_results(message: dict) -> tuple[dict, int]:
+    """Return *message* with oversized tool results digested, and how many were."""
+    if not _is_tool_result(message):
+        return message, 0
+
+    elided = 0
+    blocks = []
+    for block in message["content"]:
+        content = block.get("content") if isinstance(block, dict) else None
+        if isinstance(content, str) and count_tokens(content) > TOOL_RESULT_MAX_TOKENS:
+            block = {**block, "content": digest_tool_result(content)}
+            elided += 1
+        blocks.append(block)
+    return {**message, "content": blocks}, elided
+
+
+# ==================== Rolling summary ====================
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def _format_call(block: dict) -> str:
+    args = block.get("input") or {}
+    parts = [
+        f"{key}={_clip(json.dumps(value, default=str) if not isinstance(value, str) else value, SUMMARY_ARG_CHARS)}"
+        for key, value in args.items()
+    ]
+    return f"{block.get('name', '?')}({', '.join(parts)})"
+
+
+def summarize_turn(turn: list[dict]) -> str:
+    """One summary line for a turn: the request, the tools it ran, the answer."""
+    user_text = ""
+    calls: list[str] = []
+    answer = ""
+    for message in turn:
+        content = message["content"]
+        if message["role"] == "user" and isinstance(content, str) and not user_text:
+            user_text = content
+        elif message["role"] == "assistant":
+            if isinstance(content, list):
+                calls += [
+                    _format_call(block) for block in content
+                    if isinstance(block, dict) and block.get("type") == "tool_use"
+                ]
+            elif content:
+                answer = content
+
+    line = f'- User: "{_clip(user_text, SUMMARY_USER_CHARS)}"'
+    if calls:
+        line += f" | Tools: {'; '.join(calls)}"
+    if answer:
+        line += f' | Assistant: "{_clip(answer, SUMMARY_ASSISTANT_CHARS)}"'
+    return line
+
+
+def extend_summary(context_summary: Optional[dict], turns: list[list[dict]], through_seq: int) -> dict:
+    """
+    Fold *turns* into the rolling summary.
+
+    Args:
+        context_summary: The stored summary ({"text", "through_seq", "turns"}), or None
+        turns: Turns leaving the verbatim window, oldest first
+        through_seq: Sequence number of the last message in *turns*
+
+    Returns:
+        The new summary. Oldest lines are dropped past CONTEXT_SUMMARY_MAX_TOKENS.
+    """
+    previous = context_summary or {}
+    lines = [line for line in (previous.get("text") or "").split("\n") if line and line != SUMMARY_OMITTED_LINE]
+    omitted = SUMMARY_OMITTED_LINE in (previous.get("text") or "")
+    lines += [summarize_turn(turn) for turn in turns]
+
+    while len(lines) > 1 and count_tokens("\n".join(lines)) > CONTEXT_SUMMARY_MAX_TOKENS:
+        lines.pop(0)
+        omitted = True
+    if omitted:
+        lines.insert(0, SUMMARY_OMITTED_LINE)
+
+    return {
+        "text": "\n".join(lines),
+        "through_seq": through_seq,
+        "turns": previous.get("turns", 0) + len(turns),
+    }
+
+
+# ==================== Builder ====================
+
+@dataclass
+class ContextStats:
+    """Token accounting for one built context."""
+
+    raw_tokens: int = 0        # replaying every loaded message verbatim
+    context_tokens: int = 0    # what is actually sent
+    verbatim_turns: int = 0
+    summarized_turns: int = 0  # newly folded into the summary this turn
+    elided_results: int = 0
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.raw_tokens - self.context_tokens
+
+
+@dataclass
+class ConversationContext:
+    """Messages for the model, plus the summary to persist if it changed."""
+
+    messages: list[dict]
+    context_summary: Optional[dict] = None
+    summary_changed: bool = False
+    stats: ContextStats = field(default_factory=ContextStats)
+
+
+def build_context(
+    conversation_messages: list[dict],
+    current_message: str,
+    context_summary: Optional[dict] = None,
+    token_budget: Optional[int] = None,
+    max_turns: Optional[int] = None,
+) -> ConversationContext:
+    """
+    Build the model's message list from stored history within a token budget.
+
+    Args:
+        conversation_messages: Stored messages, oldest first (with "seq" when
+                               read from Firestore)
+        current_message: The new user message
+        context_summary: The conversation's stored rolling summary, if any
+        token_budget: Verbatim history budget (default CONTEXT_TOKEN_BUDGET)
+        max_turns: Verbatim turn cap (default CONTEXT_MAX_TURNS)
+
+    Returns:
+        ConversationContext. When summary_changed is set, context_summary
+        should be saved on the conversation document with the turn.
+    """
+    token_budget = CONTEXT_TOKEN_BUDGET if token_budget is None else token_budget
+    max_turns = CONTEXT_MAX_TURNS if max_turns is None else max_turns
+    through_seq = (context_summary or {}).get("through_seq", -1)
+    stats = ContextStats()
+
+    decoded = [
+        {
+            "role": msg.get("role", "user"),
+            "content": decode_content(msg.get("content", "")),
+            "seq": msg.get("seq", index),
+        }
+        for index, msg in enumerate(conversation_messages)
+    ]
+    current = {"role": "user", "content": current_message}
+    stats.raw_tokens = sum(message_tokens(m) for m in decoded) + message_tokens(current)
+
+    # Turns not yet covered by the summary, with oversized tool results
+    # digested. Every turn is treated the same, the newest included, so what
+    # was sent for a turn last time is sent again and the prefix cache hits.
+    pending = [turn for turn in split_turns(decoded) if turn[-1]["seq"] > through_seq]
+    compacted: list[list[dict]] = []
+    for turn in pending:
+        messages = []
+        for message in turn:
+            message, elided = _elide_tool_results(message)
+            stats.elided_results += elided
+            messages.append(message)
+        compacted.append(messages)
+    sizes = [sum(message_tokens(m) for m in turn) for turn in compacted]
+
+    # Over budget: fold the oldest turns down to half of it. The newest turn
+    # is always kept verbatim.
+    fold = 0
+    total = sum(sizes)
+    if total > token_budget or len(compacted) > max_turns:
+        while fold < len(compacted) - 1 and (
+            total > token_budget // 2 or len(compacted) - fold > max(1, max_turns // 2)
+        ):
+            total -= sizes[fold]
+            fold += 1
+
+    summary_changed = False
+    if fold:
+        context_summary = extend_summary(context_summary, pending[:fold], pending[fold - 1][-1]["seq"])
+        summary_changed = True
+        stats.summarized_turns = fold
+
+    messages: list[dict] = []
+    if context_summary and context_summary.get("text"):
+        messages.append({"role": "user", "content": f"{SUMMARY_HEADER}\n{context_summary['text']}"})
+        messages.append({"role": "assistant", "content": SUMMARY_ACK})
+    for turn in compacted[fold:]:
+        messages += [{"role": m["role"], "content": m["content"]} for m in turn]
+    messages.append(current)
+
+    stats.verbatim_turns = len(compacted) - fold
+    stats.context_tokens = sum(message_tokens(m) for m in messages)
+    logger.debug(
+        "Context: %d -> %d tokens (%d verbatim turns, %d summarized, %d tool results digested)",
+        stats.raw_tokens, stats.context_tokens, stats.verbatim_turns,
+        stats.summarized_turns, stats.elided_results,
+    )
+
+    return ConversationContext(
+        messages=messages,
+        context_summary=context_summary,
+        summary_changed=summary_changed,
+        stats=stats,
+    )
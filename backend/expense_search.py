@@ -0,0 +1,143 @@
+"""
+Expense Search - Trigram index terms and ranking for expense name search.
+
+Each expense stores ``search_terms``: the trigrams of every word in its
+normalized name, plus the words' bigrams and letters so one- and
+two-character queries still hit the index wherever they fall in a word.
+Terms live on the expense document itself, so save/update keep them
+current and deleting an expense removes them with it.
+
+A search pages through one indexed Firestore query: ``search_terms
+array-contains`` the query's most selective term, newest first,
+SEARCH_CANDIDATE_LIMIT candidates per page. It stops once the term's
+expenses run out, or once enough exact-name matches are found that no
+older expense could make the results; past SEARCH_MAX_CANDIDATES it stops
+and reports the results as truncated. The candidates are checked against
+the full query and ranked by match quality, then recency:
+
+  0. exact name
+  1. name starts with the query
+  2. the query starts a word
+  3. the query appears anywhere in the name
+  4. every query word appears, in any order
+
+Usage:
+    terms = search_terms("Whole Foods Market")   # ["a", "ar", "ark", ...]
+    term = query_term("foods")                     # "ods"
+    ranked = rank_matches(candidates, "foods", limit=20)
+"""
+
+import os
+import re
+import unicodedata
+from typing import Dict, List, Optional
+
+# Candidates read per page of the search query
+SEARCH_CANDIDATE_LIMIT = int(os.getenv("SEARCH_CANDIDATE_LIMIT", "500"))
+# Candidates read per search before the results are reported as truncated
+SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", "5000"))
+# Results returned after ranking
+SEARCH_RESULT_LIMIT = int(os.getenv("SEARCH_RESULT_LIMIT", "50"))
+
+# English letters from most to least common; rarer letters make a more
+# selective trigram. Digits and anything else count as rarest.
+_LETTER_FREQUENCY = "etaoinsrhldcumfpgwybvkxjqz"
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and collapse everything but letters/digits to single spaces."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    ascii_text = "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+    return _NON_ALNUM.sub(" ", ascii_text).strip()
+
+
+def _ngrams(word: str, n: int) -> List[str]:
+    return [word[i:i + n] for i in range(len(word) - n + 1)]
+
+
+def search_terms(name: str) -> List[str]:
+    """
+    Index terms for an expense name (stored as the expense's search_terms).
+
+    Args:
+        name: Expense name
+
+    Returns:
+        Sorted, de-duplicated list of the words' trigrams, bigrams and letters
+    """
+    terms = set()
+    for word in normalize(name).split():
+        for n in (1, 2, 3):
+            terms.update(_ngrams(word, n))
+    return sorted(terms)
+
+
+def _rarity(term: str) -> int:
+    return sum(
+        _LETTER_FREQUENCY.index(ch) if ch in _LETTER_FREQUENCY else len(_LETTER_FREQUENCY)
+        for ch in term
+    )
+
+
+def query_term(query: str) -> Optional[str]:
+    """
+    The single index term to look a query up by.
+
+    Every name that can match contains each query word inside one of its
+    own words, so it contains this term: the rarest trigram of the query's
+    words, or the rarest bigram or letter when every word is shorter.
+
+    Returns:
+        The term, or None if the query has no letters or digits
+    """
+    words = normalize(query).split()
+    if not words:
+        return None
+    n = min(3, max(len(word) for word in words))
+    return max((t for word in words for t in _ngrams(word, n)), key=_rarity)
+
+
+def match_quality(name: str, query: str) -> Optional[int]:
+    """
+    How well an expense name matches a query (lower is better).
+
+    Returns:
+        0-4 as listed in the module docstring, or None if it doesn't match
+    """
+    name_norm = normalize(name)
+    query_norm = normalize(query)
+    if not query_norm:
+        return None
+    if name_norm == query_norm:
+        return 0
+    if name_norm.startswith(query_norm):
+        return 1
+    if (" " + name_norm).find(" " + query_norm) != -1:
+        return 2
+    if query_norm in name_norm:
+        return 3
+    if all(word in name_norm for word in query_norm.split()):
+        return 4
+    return None
+
+
+def rank_matches(candidates: List[Dict], query: str, limit: Optional[int] = None) -> List[Dict]:
+    """
+    Keep the candidates that match the query, best match first, then newest.
+
+    Args:
+        candidates: Expense dicts with expense_name and date_key
+        query: The search text
+        limit: Max results (default SEARCH_RESULT_LIMIT)
+
+    Returns:
+        Matching expense dicts, ranked
+    """
+    scored = []
+    for expense in candidates:
+        quality = match_quality(expense.get("expense_name", ""), query)
+        if quality is not None:
+            scored.append((quality, -(expense.get("date_key") or 0), expense))
+    scored.sort(key=lambda item: item[:2])
+    return [expense for _quality, _recency, expense in scored[:limit or SEARCH_RESULT_LIMIT]]
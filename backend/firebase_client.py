@@ -3,10 +3,13 @@ Firebase Client - Handles all Firestore and Firebase Storage operations.
 """
 
 import os
+import copy
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import Any, Iterator, List, Optional, Dict
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -20,11 +23,310 @@ from google.api_core.exceptions import GoogleAPIError
 from .output_schemas import Expense, ExpenseType, Date, RecurringExpense, PendingExpense, FrequencyType, Category, generate_category_id
 from .category_defaults import DEFAULT_CATEGORIES, MAX_CATEGORIES
 from .exceptions import DocumentNotFoundError
+from .period_calculator import BudgetPeriod, get_period_containing_date
+from .expense_search import (
+    SEARCH_CANDIDATE_LIMIT,
+    SEARCH_MAX_CANDIDATES,
+    SEARCH_RESULT_LIMIT,
+    match_quality,
+    query_term,
+    rank_matches,
+    search_terms,
+)
+from .recurring_manager import RecurringManager
+from .ttl_cache import TTLCache
 
 # Load .env from project root (parent of backend/)
 env_path = Path(__file__).parent.parent / ".env"
 load_dotenv(env_path, override=True)
 
+# Process-local cache of per-user data that is read on nearly every request but
+# rarely changes: the users/{uid} doc (period settings, total budget, selected
+# model) and the category list. Keys are (uid, kind). Writes through this
+# process invalidate; the TTL bounds staleness from other instances.
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "4096"))
+_user_cache = TTLCache(maxsize=USER_CACHE_MAX_ENTRIES, ttl=USER_CACHE_TTL_SECONDS)
+_CACHE_MISS = object()
+
+# Conversation messages subcollection (see Conversation History Operations)
+CONVERSATION_MESSAGES_COLLECTION = "messages"
+CONVERSATION_SUMMARY_FIELDS = ["created_at", "last_activity", "summary", "message_count", "first_message"]
+
+# Max writes in one Firestore batch / transaction
+FIRESTORE_BATCH_LIMIT = 500
+
+# Server-side sum()/count() queries (see Spending Aggregation Operations) run
+# on their own small pool: the calling thread may already be a worker of the
+# async client's pool, so borrowing that one could deadlock when it's full.
+AGGREGATION_MAX_WORKERS = int(os.getenv("AGGREGATION_MAX_WORKERS", "8"))
+_aggregation_executor: Optional[ThreadPoolExecutor] = None
+_aggregation_executor_lock = threading.Lock()
+
+# Conversation retention sweep (see cleanup_all_users_conversations). Deletes
+# are throttled by a BulkWriter, ramping up from the initial rate (Firestore's
+# "500/50/5" guidance); progress is checkpointed in maintenance/{job}.
+MAINTENANCE_COLLECTION = "maintenance"
+CONVERSATION_CLEANUP_CHECKPOINT = "conversation_cleanup"
+CLEANUP_PAGE_SIZE = int(os.getenv("CLEANUP_PAGE_SIZE", "500"))
+CLEANUP_INITIAL_OPS_PER_SECOND = int(os.getenv("CLEANUP_INITIAL_OPS_PER_SECOND", "500"))
+CLEANUP_MAX_OPS_PER_SECOND = int(os.getenv("CLEANUP_MAX_OPS_PER_SECOND", "1000"))
+CLEANUP_MAX_ATTEMPTS = int(os.getenv("CLEANUP_MAX_ATTEMPTS", "5"))
+# Concurrent message listings per cleanup page
+CLEANUP_LIST_WORKERS = int(os.getenv("CLEANUP_LIST_WORKERS", "16"))
+
+# Pre-aggregated usage analytics (see Usage Analytics Operations). Kept up to
+# date as usage is logged, so the admin dashboard reads one document per
+# (user, day, model, endpoint) instead of every token_usage record.
+USAGE_DAILY_COLLECTION = "usage_daily"
+# Append-only tool execution log, written in batches by backend.tool_events
+TOOL_EVENTS_COLLECTION = "tool_events"
+TOOL_EVENT_FIELDS = ["uid", "tool", "day", "latency_ms", "success"]
+USAGE_TOKEN_FIELDS = ["input_tokens", "output_tokens", "cache_read_tokens", "cache_write_tokens"]
+# Upper bounds (ms) of the time-to-first-token histogram buckets
+TTFT_BUCKETS_MS = [100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000, 30000]
+
+
+def _message_doc_id(seq: int) -> str:
+    """Zero-padded so document IDs sort in message order."""
+    return f"{seq:08d}"
+
+
+def _message_timestamp() -> str:
+    """ISO timestamp in the user's timezone, as stored on each message."""
+    import pytz
+    tz = pytz.timezone(os.getenv("USER_TIMEZONE", "America/Chicago"))
+    return datetime.now(tz).isoformat()
+
+
+def _date_key(year: int, month: int, day: int) -> int:
+    """YYYYMMDD as an int (stored on expenses as date_key) so date ranges are one range filter."""
+    return year * 10000 + month * 100 + day
+
+
+def expense_cursor(expense: Dict) -> str:
+    """Page cursor ("<date_key>:<id>") for the expense a page ended on."""
+    return f"{expense['date_key']}:{expense['id']}"
+
+
+def _parse_expense_cursor(cursor: str) -> Dict[str, Any]:
+    """start_after() values for an expense_cursor; raises ValueError if malformed."""
+    key, _, expense_id = cursor.partition(":")
+    if not expense_id or "/" in expense_id:
+        raise ValueError(f"Invalid expense cursor: {cursor!r}")
+    return {"date_key": int(key), "__name__": expense_id}
+
+
+def _next_trigger_date(recurring: RecurringExpense) -> Optional[str]:
+    """YYYY-MM-DD the template is next due (stored as next_trigger_date), or None if inactive."""
+    due = RecurringManager.calculate_due_date(recurring)
+    return due.isoformat() if due else None
+
+
+def _pending_expense_data(pending: PendingExpense) -> Dict:
+    """Firestore document for a pending expense."""
+    return {
+        "template_id": pending.template_id,
+        "expense_name": pending.expense_name,
+        "amount": pending.amount,
+        "date": {
+            "day": pending.date.day,
+            "month": pending.date.month,
+            "year": pending.date.year
+        },
+        "category": pending.category.name,
+        "sms_sent": pending.sms_sent,
+        "awaiting_confirmation": pending.awaiting_confirmation,
+        "created_at": firestore.SERVER_TIMESTAMP
+    }
+
+
+def _usage_day(moment: Optional[datetime] = None) -> str:
+    """YYYY-MM-DD in the user's timezone — the day key of usage aggregates."""
+    import pytz
+    tz = pytz.timezone(os.getenv("USER_TIMEZONE", "America/Chicago"))
+    if moment is None:
+        return datetime.now(tz).strftime("%Y-%m-%d")
+    if moment.tzinfo is None:
+        moment = pytz.utc.localize(moment)
+    return moment.astimezone(tz).strftime("%Y-%m-%d")
+
+
+def _usage_daily_doc_id(day: str, model: str, endpoint: str) -> str:
+    return f"{day}_{model}_{endpoint}".replace("/", "-")
+
+
+def _ttft_bucket(ttft_ms: float) -> str:
+    """Histogram bucket key: the first upper bound that *ttft_ms* fits under."""
+    for bound in TTFT_BUCKETS_MS:
+        if ttft_ms <= bound:
+            return str(bound)
+    return "inf"
+
+
+def ttft_percentile(buckets: Dict[str, int], fraction: float) -> Optional[int]:
+    """
+    Approximate a TTFT percentile from histogram bucket counts.
+
+    Returns the upper bound (ms) of the bucket holding the percentile, the
+    largest finite bound for the overflow bucket, or None when empty.
+    """
+    total = sum(buckets.values())
+    if not total:
+        return None
+    rank = max(1, int(total * fraction + 0.999999))
+    seen = 0
+    for bound in TTFT_BUCKETS_MS:
+        seen += buckets.get(str(bound), 0)
+        if seen >= rank:
+            return bound
+    return TTFT_BUCKETS_MS[-1]
+
+
+def _message_preview(message: dict) -> Optional[str]:
+    content = message.get("content")
+    return content[:50] if isinstance(content, str) else None
+
+
+def _is_user_turn(message: dict) -> bool:
+    """True for a user's own message (not a stored tool_result turn)."""
+    if message.get("role") != "user":
+        return False
+    content = message.get("content", "")
+    if isinstance(content, str) and content.startswith("["):
+        try:
+            blocks = json.loads(content)
+        except (json.JSONDecodeError, TypeError):
+            return True
+        return not (isinstance(blocks, list) and blocks and isinstance(blocks[0], dict)
+                    and blocks[0].get("type") == "tool_result")
+    return True
+
+
+class ChunkedWriteBatch:
+    """
+    Write batch without the per-batch operation limit.
+
+    Queues set/update/delete operations and commits them in Firestore batches
+    of up to FIRESTORE_BATCH_LIMIT, so each chunk costs one round trip. Each
+    chunk is atomic, but the whole batch is only atomic when it fits in one
+    chunk. Used as a context manager, it commits whatever is left on a clean
+    exit and discards it if the block raised.
+
+    Usage:
+        with client.write_batch() as batch:
+            for ref in refs:
+                batch.update(ref, {"category": "OTHER"})
+        batch.commits  # round trips used
+    """
+
+    def __init__(self, db, limit: int = FIRESTORE_BATCH_LIMIT):
+        self._db = db
+        self._limit = limit
+        self._batch = None
+        self._pending = 0
+        self.operations = 0
+        self.commits = 0
+
+    def _current(self):
+        if self._batch is None:
+            self._batch = self._db.batch()
+        return self._batch
+
+    def _added(self) -> None:
+        self._pending += 1
+        self.operations += 1
+        if self._pending >= self._limit:
+            self.commit()
+
+    def set(self, reference, data: Dict, merge: bool = False) -> None:
+        self._current().set(reference, data, merge=merge)
+        self._added()
+
+    def update(self, reference, data: Dict) -> None:
+        self._current().update(reference, data)
+        self._added()
+
+    def delete(self, reference) -> None:
+        self._current().delete(reference)
+        self._added()
+
+    def commit(self) -> None:
+        """Commit the queued operations, if any."""
+        if not self._pending:
+            return
+        batch, self._batch, self._pending = self._batch, None, 0
+        batch.commit()
+        self.commits += 1
+
+    def __enter__(self) -> "ChunkedWriteBatch":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self._batch, self._pending = None, 0
+
+
+class ExpenseRow:
+    """
+    Projected expense returned by the query helpers when called with ``fields``.
+
+    Aggregate reads (totals by category, largest expenses, rollup scans)
+    only need a few fields. Reading them with a Firestore select() and into
+    a slotted record skips transferring and building a dict for everything
+    else (notes, timestamp, input_type, ...). Fields that weren't selected,
+    or are missing from the document, are None.
+    """
+
+    __slots__ = ("amount", "category", "date", "date_key", "expense_name")
+
+    def __init__(self, data: Dict):
+        self.amount = data.get("amount")
+        self.category = data.get("category")
+        self.date = data.get("date")
+        self.date_key = data.get("date_key")
+        self.expense_name = data.get("expense_name")
+
+    def __repr__(self) -> str:
+        return f"ExpenseRow({', '.join(f'{f}={getattr(self, f)!r}' for f in self.__slots__)})"
+
+
+def _check_row_fields(fields: List[str]) -> List[str]:
+    unknown = set(fields) - set(ExpenseRow.__slots__)
+    if unknown:
+        raise ValueError(f"Fields not available on ExpenseRow: {', '.join(sorted(unknown))}")
+    return list(fields)
+
+
+def _get_aggregation_executor() -> ThreadPoolExecutor:
+    """Return the thread pool used to run per-category aggregation queries in parallel."""
+    global _aggregation_executor
+    if _aggregation_executor is None:
+        with _aggregation_executor_lock:
+            if _aggregation_executor is None:
+                _aggregation_executor = ThreadPoolExecutor(
+                    max_workers=AGGREGATION_MAX_WORKERS,
+                    thread_name_prefix="firestore-aggregation",
+                )
+    return _aggregation_executor
+
+
+def _category_name(category) -> Optional[str]:
+    """Category filter value: ExpenseType members by name, string IDs as-is."""
+    return getattr(category, "name", category)
+
+
+def get_user_cache_stats() -> dict:
+    """Return hit/miss counters for the process-local user cache."""
+    return _user_cache.stats()
+
+
+def clear_user_cache() -> None:
+    """Drop every cached user entry and reset the counters."""
+    _user_cache.clear()
+
 
 class FirebaseClient:
     """Handles all Firebase operations for expense tracking."""
@@ -38,6 +340,7 @@ class FirebaseClient:
         "pending_expenses",
         "conversations",
         "categories",  # Now user-scoped for custom categories
+        "spending_rollups",  # Per-period category totals (see Spending Rollup Operations)
     }
 
     def __init__(self, user_id: Optional[str] = None):
@@ -100,6 +403,70 @@ class FirebaseClient:
         # Legacy mode: return global collection path
         return collection
 
+    # ==================== User Cache ====================
+
+    def _get_user_doc(self, uid: str) -> Optional[Dict]:
+        """
+        Get the users/{uid} document data through the process-local cache.
+
+        Returns:
+            A private copy of the document dict, or None if it doesn't exist
+        """
+        key = (uid, "user_doc")
+        data = _user_cache.get(key, _CACHE_MISS)
+        if data is _CACHE_MISS:
+            doc = self.db.collection("users").document(uid).get()
+            data = (doc.to_dict() or {}) if doc.exists else None
+            _user_cache.set(key, data)
+        return copy.deepcopy(data)
+
+    def _invalidate_user_doc(self, uid: str) -> None:
+        _user_cache.invalidate((uid, "user_doc"))
+
+    def _invalidate_categories(self) -> None:
+        _user_cache.invalidate((self.user_id, "categories"))
+
+    def invalidate_user_cache(self) -> None:
+        """
+        Drop this user's cached settings and categories.
+
+        Writes made through this process invalidate automatically; call this when
+        a cached value may have been changed elsewhere (e.g. by another process).
+        """
+        if self.user_id:
+            self._invalidate_user_doc(self.user_id)
+            self._invalidate_categories()
+
+    # ==================== Batch Operations ====================
+
+    def write_batch(self) -> ChunkedWriteBatch:
+        """
+        Start a write batch that commits every FIRESTORE_BATCH_LIMIT operations.
+
+        Returns:
+            ChunkedWriteBatch (use as a context manager, or call commit())
+        """
+        return ChunkedWriteBatch(self.db)
+
+    def get_all(self, references: List, field_paths: Optional[List[str]] = None) -> List:
+        """
+        Read many documents in one round trip per FIRESTORE_BATCH_LIMIT references.
+
+        Args:
+            references: Document references to read
+            field_paths: Optional projection (e.g. [] to only check existence)
+
+        Returns:
+            Snapshots in the same order as references; missing documents have
+            exists == False
+        """
+        by_path = {}
+        for start in range(0, len(references), FIRESTORE_BATCH_LIMIT):
+            chunk = references[start:start + FIRESTORE_BATCH_LIMIT]
+            for snapshot in self.db.get_all(chunk, field_paths=field_paths):
+                by_path[snapshot.reference.path] = snapshot
+        return [by_path[ref.path] for ref in references]
+
     # ==================== Expense Operations ====================
 
     def save_expense(
@@ -130,6 +497,8 @@ class FirebaseClient:
                 "month": expense.date.month,
                 "year": expense.date.year
             },
+            "date_key": _date_key(expense.date.year, expense.date.month, expense.date.day),
+            "search_terms": search_terms(expense.expense_name),
             "category": category_str if category_str else expense.category.name,
             "timestamp": firestore.SERVER_TIMESTAMP,
             "input_type": input_type
@@ -139,8 +508,24 @@ class FirebaseClient:
 
         # Add to Firestore
         try:
-            doc_ref = self.db.collection(self._get_collection_path("expenses")).add(expense_data)
-            return doc_ref[1].id
+            expenses_ref = self.db.collection(self._get_collection_path("expenses"))
+            if not self.user_id:
+                doc_ref = expenses_ref.add(expense_data)
+                return doc_ref[1].id
+
+            # Write the expense and bump its period rollup atomically
+            doc_ref = expenses_ref.document()
+
+            @firestore.transactional
+            def _save(transaction):
+                month_start_day = self._read_month_start_day(transaction)
+                delta = self._rollup_delta(expense_data, month_start_day, sign=1)
+                rollups = self._read_rollups(transaction, [delta[0]])
+                transaction.set(doc_ref, expense_data)
+                self._stage_rollup_deltas(transaction, rollups, [delta])
+
+            _save(self.db.transaction())
+            return doc_ref.id
         except GoogleAPIError as e:
             logger.error("Firestore write failed in save_expense: %s", e)
             raise RuntimeError(f"Failed to save expense: {e}") from e
@@ -191,7 +576,8 @@ class FirebaseClient:
         year: int,
         month: int,
         category: Optional[str] = None,
-    ) -> List[Dict]:
+        fields: Optional[List[str]] = None,
+    ) -> List:
         """
         Get all expenses for a specific month.
 
@@ -199,18 +585,18 @@ class FirebaseClient:
             year: Year (e.g., 2025)
             month: Month (1-12)
             category: Optional category filter
+            fields: Optional projection (ExpenseRow field names); when given,
+                    only these fields are read and ExpenseRows are returned
 
         Returns:
-            List of expense dictionaries for the month
+            List of expense dictionaries for the month (most recent first),
+            or unordered ExpenseRows if fields was given
         """
-        query = self.db.collection(self._get_collection_path("expenses"))
-
-        # Filter by date fields (day, month, year)
-        query = query.where(filter=FieldFilter("date.year", "==", year))
-        query = query.where(filter=FieldFilter("date.month", "==", month))
-
-        if category:
-            query = query.where(filter=FieldFilter("category", "==", category))
+        query = self._date_range_query(
+            Date(day=1, month=month, year=year), Date(day=31, month=month, year=year), _category_name(category)
+        )
+        if fields is not None:
+            return self._expense_rows(query, fields)
 
         docs = query.stream()
 
@@ -225,20 +611,22 @@ class FirebaseClient:
 
         return expenses
 
-    def calculate_monthly_total(self, year: int, month: int, category: Optional[ExpenseType] = None) -> float:
+    def calculate_monthly_total(self, year: int, month: int, category=None) -> float:
         """
-        Calculate total spending for a month.
+        Calculate total spending for a month with a sum() aggregation query.
 
         Args:
             year: Year (e.g., 2025)
             month: Month (1-12)
-            category: Optional category filter
+            category: Optional category filter (ExpenseType or category ID string)
 
         Returns:
             Total amount spent
         """
-        expenses = self.get_monthly_expenses(year, month, category)
-        return sum(exp.get("amount", 0) for exp in expenses)
+        query = self._date_range_query(
+            Date(day=1, month=month, year=year), Date(day=31, month=month, year=year), _category_name(category)
+        )
+        return self._spending_summary(query)["total"]
 
     def get_expense_by_id(self, expense_id: str) -> Optional[Dict]:
         """
@@ -289,14 +677,11 @@ class FirebaseClient:
         """
         doc_ref = self.db.collection(self._get_collection_path("expenses")).document(expense_id)
 
-        # Check if expense exists
-        if not doc_ref.get().exists:
-            raise DocumentNotFoundError("expenses", expense_id)
-
         # Build update dict (only include provided fields)
         updates = {}
         if expense_name is not None:
             updates["expense_name"] = expense_name
+            updates["search_terms"] = search_terms(expense_name)
         if amount is not None:
             updates["amount"] = amount
         if date is not None:
@@ -305,6 +690,7 @@ class FirebaseClient:
                 "month": date.month,
                 "year": date.year
             }
+            updates["date_key"] = _date_key(date.year, date.month, date.day)
         # Prefer category_str if provided (custom categories), otherwise use ExpenseType
         if category_str is not None:
             updates["category"] = category_str
@@ -315,13 +701,44 @@ class FirebaseClient:
         if notes is not None:
             updates["notes"] = firestore.DELETE_FIELD if notes == "" else notes
 
-        # Perform update
-        if updates:
-            try:
-                doc_ref.update(updates)
-            except GoogleAPIError as e:
-                logger.error("Firestore write failed in update_expense: %s", e)
-                raise RuntimeError(f"Failed to update expense: {e}") from e
+        if not self.user_id:
+            # Legacy mode: no rollups to maintain
+            if not doc_ref.get().exists:
+                raise DocumentNotFoundError("expenses", expense_id)
+            if updates:
+                try:
+                    doc_ref.update(updates)
+                except GoogleAPIError as e:
+                    logger.error("Firestore write failed in update_expense: %s", e)
+                    raise RuntimeError(f"Failed to update expense: {e}") from e
+            return True
+
+        # Perform update, moving the expense between rollups if its amount,
+        # date or category changed
+        @firestore.transactional
+        def _update(transaction):
+            snapshot = doc_ref.get(transaction=transaction)
+            if not snapshot.exists:
+                raise DocumentNotFoundError("expenses", expense_id)
+            if not updates:
+                return
+
+            month_start_day = self._read_month_start_day(transaction)
+            old_data = snapshot.to_dict()
+            new_data = {**old_data, **updates}
+            deltas = [
+                self._rollup_delta(old_data, month_start_day, sign=-1),
+                self._rollup_delta(new_data, month_start_day, sign=1),
+            ]
+            rollups = self._read_rollups(transaction, [d[0] for d in deltas])
+            transaction.update(doc_ref, updates)
+            self._stage_rollup_deltas(transaction, rollups, deltas)
+
+        try:
+            _update(self.db.transaction())
+        except GoogleAPIError as e:
+            logger.error("Firestore write failed in update_expense: %s", e)
+            raise RuntimeError(f"Failed to update expense: {e}") from e
 
         return True
 
@@ -337,11 +754,29 @@ class FirebaseClient:
         """
         doc_ref = self.db.collection(self._get_collection_path("expenses")).document(expense_id)
 
-        # Check if expense exists
-        if not doc_ref.get().exists:
-            raise DocumentNotFoundError("expenses", expense_id)
+        if not self.user_id:
+            # Check if expense exists
+            if not doc_ref.get().exists:
+                raise DocumentNotFoundError("expenses", expense_id)
+            doc_ref.delete()
+            return True
+
+        @firestore.transactional
+        def _delete(transaction):
+            snapshot = doc_ref.get(transaction=transaction)
+            if not snapshot.exists:
+                raise DocumentNotFoundError("expenses", expense_id)
+            month_start_day = self._read_month_start_day(transaction)
+            delta = self._rollup_delta(snapshot.to_dict(), month_start_day, sign=-1)
+            rollups = self._read_rollups(transaction, [delta[0]])
+            transaction.delete(doc_ref)
+            self._stage_rollup_deltas(transaction, rollups, [delta])
 
-        doc_ref.delete()
+        try:
+            _delete(self.db.transaction())
+        except GoogleAPIError as e:
+            logger.error("Firestore write failed in delete_expense: %s", e)
+            raise RuntimeError(f"Failed to delete expense: {e}") from e
         return True
 
     def get_recent_expenses_from_db(
@@ -397,55 +832,77 @@ class FirebaseClient:
         text_query: str,
         category: Optional[ExpenseType] = None,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
-    ) -> List[Dict]:
+        end_date: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> Dict:
         """
-        Search expenses by name (substring match).
+        Search expenses by name across the user's whole history.
 
-        Note: Firestore doesn't support full-text search natively,
-        so we fetch all expenses in the date range and filter in Python.
+        Pages through one indexed query: expenses whose search_terms contain
+        the query's most selective term (see backend.expense_search), newest
+        first, SEARCH_CANDIDATE_LIMIT per page. Paging stops when the term's
+        expenses run out, or when *limit* exact-name matches are found (no
+        older expense can outrank those). Candidates are checked against the
+        full query and ranked by match quality, then recency.
 
         Args:
-            text_query: Search string (case-insensitive substring match)
-            category: Optional category filter
-            start_date: Optional start date (defaults to first day of current month)
-            end_date: Optional end date (defaults to today)
+            text_query: Search string (case-insensitive; accents and punctuation ignored)
+            category: Optional category filter (ExpenseType or category ID string)
+            start_date: Optional start of the expense date range (inclusive)
+            end_date: Optional end of the expense date range (inclusive)
+            limit: Max results (default SEARCH_RESULT_LIMIT)
 
         Returns:
-            List of matching expense dicts
+            {
+                "expenses": [...],   # matching expense dicts (with "id"), best match first
+                "truncated": bool,   # SEARCH_MAX_CANDIDATES were read before paging could
+                                     # stop, so older matches may be missing
+            }
         """
-        from datetime import datetime
-        import pytz
+        limit = limit or SEARCH_RESULT_LIMIT
+        term = query_term(text_query)
+        if term is None:
+            return {"expenses": [], "truncated": False}
 
-        # Default to current month if no date range specified
-        if not start_date or not end_date:
-            user_timezone = os.getenv("USER_TIMEZONE", "America/Chicago")
-            tz = pytz.timezone(user_timezone)
-            now = datetime.now(tz)
-
-            if not start_date:
-                start_date = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            if not end_date:
-                end_date = now
-
-        # Get expenses in date range
-        expenses = self.get_expenses(start_date, end_date, category)
-
-        # Filter by text query (case-insensitive substring match)
-        query_lower = text_query.lower()
-        results = [
-            exp for exp in expenses
-            if query_lower in exp.get("expense_name", "").lower()
-        ]
+        query = self.db.collection(self._get_collection_path("expenses"))
+        query = query.where(filter=FieldFilter("search_terms", "array_contains", term))
+        if category:
+            query = query.where(filter=FieldFilter("category", "==", _category_name(category)))
+        if start_date:
+            query = query.where(filter=FieldFilter("date_key", ">=", _date_key(start_date.year, start_date.month, start_date.day)))
+        if end_date:
+            query = query.where(filter=FieldFilter("date_key", "<=", _date_key(end_date.year, end_date.month, end_date.day)))
+        query = (
+            query.order_by("date_key", direction=firestore.Query.DESCENDING)
+            .order_by("__name__", direction=firestore.Query.DESCENDING)
+            .select(["expense_name", "amount", "category", "date", "date_key"])
+            .limit(SEARCH_CANDIDATE_LIMIT)
+        )
 
-        return results
+        candidates: List[Dict] = []
+        exact_matches = 0
+        truncated = False
+        page_query = query
+        while True:
+            page = list(self._stream_expense_dicts(page_query))
+            candidates += page
+            exact_matches += sum(1 for e in page if match_quality(e.get("expense_name", ""), text_query) == 0)
+            if len(page) < SEARCH_CANDIDATE_LIMIT or exact_matches >= limit:
+                break
+            if len(candidates) >= SEARCH_MAX_CANDIDATES:
+                truncated = True
+                break
+            page_query = query.start_after(_parse_expense_cursor(expense_cursor(page[-1])))
+
+        return {"expenses": rank_matches(candidates, text_query, limit), "truncated": truncated}
 
     def get_expenses_in_date_range(
         self,
         start_date: Date,
         end_date: Date,
-        category: Optional[str] = None
-    ) -> List[Dict]:
+        category: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+    ) -> List:
         """
         Get expenses within a date range using Date objects.
 
@@ -453,54 +910,149 @@ class FirebaseClient:
             start_date: Start date (inclusive)
             end_date: End date (inclusive)
             category: Optional category filter
+            fields: Optional projection (ExpenseRow field names); when given,
+                    only these fields are read and ExpenseRows are returned
 
         Returns:
-            List of expense dicts
+            List of expense dicts (most recent first), or unordered
+            ExpenseRows if fields was given
         """
-        query = self.db.collection(self._get_collection_path("expenses"))
+        query = self._date_range_query(start_date, end_date, _category_name(category))
+        if fields is not None:
+            return self._expense_rows(query, fields)
 
-        # Filter by year and month range
-        # Note: This is a simplified approach - for precise filtering we'd need composite queries
-        # For now, we'll fetch a wider range and filter in Python
-        query = query.where(filter=FieldFilter("date.year", ">=", start_date.year))
-        query = query.where(filter=FieldFilter("date.year", "<=", end_date.year))
+        expenses = []
+        for doc in query.stream():
+            expense_data = doc.to_dict()
+            expense_data["id"] = doc.id
+            expenses.append(expense_data)
 
+        expenses.sort(key=lambda x: x.get("timestamp") or datetime.min, reverse=True)
+
+        return expenses
+
+    def _date_range_query(self, start_date: Date, end_date: Date, category: Optional[str] = None):
+        """Expenses query for a date range (inclusive), optionally for one category."""
+        query = self.db.collection(self._get_collection_path("expenses"))
+        query = query.where(filter=FieldFilter("date_key", ">=", _date_key(start_date.year, start_date.month, start_date.day)))
+        query = query.where(filter=FieldFilter("date_key", "<=", _date_key(end_date.year, end_date.month, end_date.day)))
         if category:
             query = query.where(filter=FieldFilter("category", "==", category))
+        return query
 
-        docs = query.stream()
+    @staticmethod
+    def _expense_rows(query, fields: List[str]) -> List[ExpenseRow]:
+        """Stream a query with a select() of *fields* into ExpenseRows."""
+        return [ExpenseRow(doc.to_dict() or {}) for doc in query.select(_check_row_fields(fields)).stream()]
 
-        # Filter in Python for precise date matching
-        expenses = []
-        for doc in docs:
+    def iter_expenses(
+        self,
+        start_date: Date,
+        end_date: Date,
+        category: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[Dict]:
+        """
+        Expenses in a date range in page order, yielded as query.stream() delivers them.
+
+        Page order is date_key then document ID, both descending, so it is
+        stable and a page can resume after any expense with expense_cursor().
+        The query is built (and the cursor validated) on the call; documents
+        are only read as the returned iterator is consumed.
+
+        Args:
+            start_date: Start date (inclusive)
+            end_date: End date (inclusive)
+            category: Optional category filter
+            cursor: expense_cursor() of the last expense already seen
+            limit: Optional max expenses
+
+        Returns:
+            Iterator of expense dicts (with "id")
+
+        Raises:
+            ValueError: If cursor is malformed
+        """
+        query = self._date_range_query(start_date, end_date, _category_name(category))
+        query = (
+            query.order_by("date_key", direction=firestore.Query.DESCENDING)
+            .order_by("__name__", direction=firestore.Query.DESCENDING)
+        )
+        if cursor:
+            query = query.start_after(_parse_expense_cursor(cursor))
+        if limit is not None:
+            query = query.limit(limit)
+        return self._stream_expense_dicts(query)
+
+    @staticmethod
+    def _stream_expense_dicts(query) -> Iterator[Dict]:
+        for doc in query.stream():
             expense_data = doc.to_dict()
             expense_data["id"] = doc.id
+            yield expense_data
 
-            # Parse expense date
-            exp_date = expense_data.get("date", {})
-            exp_year = exp_date.get("year")
-            exp_month = exp_date.get("month")
-            exp_day = exp_date.get("day")
+    def get_expense_page(
+        self,
+        start_date: Date,
+        end_date: Date,
+        category: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> dict:
+        """
+        One page of expenses in a date range, in iter_expenses() page order.
 
-            if not all([exp_year, exp_month, exp_day]):
-                continue
+        Args:
+            start_date: Start date (inclusive)
+            end_date: End date (inclusive)
+            category: Optional category filter
+            limit: Page size
+            cursor: next_cursor from the previous page
 
-            # Check if expense is within range
-            from datetime import date as date_type
-            try:
-                expense_date_obj = date_type(exp_year, exp_month, exp_day)
-                start_date_obj = date_type(start_date.year, start_date.month, start_date.day)
-                end_date_obj = date_type(end_date.year, end_date.month, end_date.day)
-
-                if start_date_obj <= expense_date_obj <= end_date_obj:
-                    expenses.append(expense_data)
-            except ValueError:
-                # Invalid date, skip
-                continue
+        Returns:
+            {"expenses": [...], "next_cursor": str | None}
 
-        expenses.sort(key=lambda x: x.get("timestamp") or datetime.min, reverse=True)
+        Raises:
+            ValueError: If cursor is malformed
+        """
+        expenses = list(self.iter_expenses(start_date, end_date, category, cursor=cursor, limit=limit + 1))
+        next_cursor = None
+        if len(expenses) > limit:
+            expenses = expenses[:limit]
+            next_cursor = expense_cursor(expenses[-1])
+        return {"expenses": expenses, "next_cursor": next_cursor}
 
-        return expenses
+    # ==================== Spending Aggregation Operations ====================
+    #
+    # Totals and counts come from server-side sum("amount") / count()
+    # aggregation queries, which return one result row instead of every
+    # matching expense. Where aggregation isn't available (e.g. an older
+    # emulator), each falls back to streaming the amounts.
+
+    def _aggregate_spending(self, query) -> Optional[Dict[str, Any]]:
+        """
+        Run sum(amount) and count() over a query on the server.
+
+        Returns:
+            Dict with 'total' and 'count', or None if the aggregation query failed
+        """
+        try:
+            rows = query.count(alias="count").sum("amount", alias="total").get()
+        except (GoogleAPIError, AttributeError, NotImplementedError) as e:
+            logger.warning("Aggregation query failed, streaming instead: %s", e)
+            return None
+        values = {result.alias: result.value for result in rows[0]}
+        return {"total": values.get("total") or 0, "count": int(values.get("count") or 0)}
+
+    def _spending_summary(self, query) -> Dict[str, Any]:
+        """Total and count for a query: aggregated on the server, else streamed."""
+        summary = self._aggregate_spending(query)
+        if summary is not None:
+            return summary
+
+        rows = self._expense_rows(query, ["amount"])
+        return {"total": sum(row.amount or 0 for row in rows), "count": len(rows)}
 
     def get_spending_by_category(
         self,
@@ -510,6 +1062,11 @@ class FirebaseClient:
         """
         Get spending totals grouped by category for a date range.
 
+        Runs one sum()/count() aggregation per known category, in parallel,
+        plus one for the whole range. If the per-category counts don't add
+        up (an expense in a category no longer listed) or aggregation isn't
+        available, streams the range's categories and amounts instead.
+
         Args:
             start_date: Start date (inclusive)
             end_date: End date (inclusive)
@@ -518,46 +1075,336 @@ class FirebaseClient:
             Dictionary mapping category names to total spending
             Example: {"FOOD_OUT": 127.50, "COFFEE": 45.00, "GROCERIES": 89.25}
         """
-        expenses = self.get_expenses_in_date_range(start_date, end_date)
+        if self.user_id:
+            category_ids = [c["category_id"] for c in self.get_user_categories()]
+        else:
+            category_ids = [expense_type.name for expense_type in ExpenseType]
 
-        # Group by category
-        category_totals = {}
-        for expense in expenses:
-            category = expense.get("category", "OTHER")
-            amount = expense.get("amount", 0)
+        keys = [None] + category_ids
+        queries = [self._date_range_query(start_date, end_date, key) for key in keys]
+        summaries = dict(zip(keys, _get_aggregation_executor().map(self._aggregate_spending, queries)))
 
-            if category not in category_totals:
-                category_totals[category] = 0
-            category_totals[category] += amount
+        overall = summaries.pop(None)
+        if overall is not None and None not in summaries.values():
+            by_category = {key: s for key, s in summaries.items() if s["count"]}
+            if sum(s["count"] for s in by_category.values()) == overall["count"]:
+                return {key: s["total"] for key, s in by_category.items()}
 
+        category_totals = {}
+        for row in self._expense_rows(queries[0], ["category", "amount"]):
+            category = row.category or "OTHER"
+            category_totals[category] = category_totals.get(category, 0) + (row.amount or 0)
         return category_totals
 
     def get_total_spending_for_range(
         self,
         start_date: Date,
-        end_date: Date
-    ) -> Dict[str, any]:
+        end_date: Date,
+        category: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Get total spending and transaction count for a date range.
 
+        Uses a sum()/count() aggregation query, so no expense documents are read.
+
         Args:
             start_date: Start date (inclusive)
             end_date: End date (inclusive)
+            category: Optional category filter (ExpenseType or category ID string)
 
         Returns:
             Dictionary with 'total' and 'count' keys
             Example: {"total": 456.75, "count": 23}
         """
-        expenses = self.get_expenses_in_date_range(start_date, end_date)
+        return self._spending_summary(self._date_range_query(start_date, end_date, _category_name(category)))
+
+    # ==================== Spending Rollup Operations ====================
+    #
+    # users/{uid}/spending_rollups/{period_id} holds per-category totals for one
+    # budget period (keyed by BudgetPeriod.period_id for the user's configured
+    # month start day):
+    #   {"period_id", "start_date", "end_date", "month_start_day",
+    #    "categories": {category_id: {"total": float, "count": int}},
+    #    "total": float, "count": int, "updated_at"}
+    #
+    # Expense writes update an existing rollup in the same transaction. A
+    # missing rollup is never created by a write (it would only hold part of
+    # the period); it is built from a full scan on first read instead.
+
+    def _get_month_start_day(self):
+        """Return the user's budget_month_start_day (defaults to 1)."""
+        if not self.user_id:
+            return 1
+        return self.get_budget_period_settings(self.user_id).get("budget_month_start_day", 1)
+
+    def _read_month_start_day(self, transaction) -> Any:
+        """
+        Read budget_month_start_day from the user doc inside a transaction.
+
+        Rollup writes must use this rather than the cached settings: another
+        process (the API server vs an MCP server) may have just changed the
+        start day and rebuilt the rollups under the new period IDs, and the
+        transactional read also retries the write if the setting changes
+        before it commits.
+        """
+        snapshot = self.db.collection("users").document(self.user_id).get(transaction=transaction)
+        data = (snapshot.to_dict() or {}) if snapshot.exists else {}
+        return data.get("budget_month_start_day", 1)
+
+    def _rollups_ref(self, uid: Optional[str] = None):
+        return self.db.collection("users").document(uid or self.user_id).collection("spending_rollups")
+
+    @staticmethod
+    def _rollup_delta(expense_data: Dict, month_start_day, sign: int) -> tuple:
+        """
+        Build a (period, category, amount, count) delta for one expense.
+
+        Args:
+            expense_data: Expense document dict (needs date, category, amount)
+            month_start_day: User's budget month start day
+            sign: +1 when the expense is added, -1 when it is removed
+
+        Returns:
+            Tuple of (BudgetPeriod, category_id, amount_delta, count_delta)
+        """
+        from datetime import date as date_type
 
-        total = sum(exp.get("amount", 0) for exp in expenses)
-        count = len(expenses)
+        exp_date = expense_data.get("date") or {}
+        period = get_period_containing_date(
+            date_type(exp_date["year"], exp_date["month"], exp_date["day"]),
+            month_start_day=month_start_day,
+        )
+        amount = float(expense_data.get("amount", 0) or 0)
+        return period, expense_data.get("category", "OTHER"), sign * amount, sign
+
+    def _read_rollups(self, transaction, periods: List[BudgetPeriod]) -> Dict[str, Optional[Dict]]:
+        """Read the rollup docs for the given periods inside a transaction."""
+        rollups: Dict[str, Optional[Dict]] = {}
+        for period in periods:
+            if period.period_id in rollups:
+                continue
+            snapshot = self._rollups_ref().document(period.period_id).get(transaction=transaction)
+            rollups[period.period_id] = snapshot.to_dict() if snapshot.exists else None
+        return rollups
+
+    @staticmethod
+    def _apply_rollup_delta(rollup: Dict, category: str, amount: float, count: int) -> None:
+        """Apply a delta to a rollup dict in-place, rounding to cents."""
+        categories = rollup.setdefault("categories", {})
+        entry = categories.setdefault(category, {"total": 0.0, "count": 0})
+        entry["total"] = round(entry["total"] + amount, 2)
+        entry["count"] += count
+        if entry["count"] <= 0:
+            del categories[category]
+        rollup["total"] = round(sum(c["total"] for c in categories.values()), 2)
+        rollup["count"] = sum(c["count"] for c in categories.values())
+
+    def _stage_rollup_deltas(self, transaction, rollups: Dict[str, Optional[Dict]], deltas: List[tuple]) -> None:
+        """Apply deltas to the rollups read earlier and stage the writes."""
+        touched = set()
+        for period, category, amount, count in deltas:
+            rollup = rollups.get(period.period_id)
+            if rollup is None:
+                continue  # Not built yet; the first read will scan the full period
+            self._apply_rollup_delta(rollup, category, amount, count)
+            touched.add(period.period_id)
+
+        for period_id in touched:
+            rollup = rollups[period_id]
+            rollup["updated_at"] = firestore.SERVER_TIMESTAMP
+            transaction.set(self._rollups_ref().document(period_id), rollup)
+
+    def _scan_period_rollup(self, period: BudgetPeriod, month_start_day, transaction=None) -> Dict:
+        """Compute a rollup for a period by scanning its expenses."""
+        from datetime import date as date_type
+
+        query = self.db.collection(self._get_collection_path("expenses"))
+        query = query.where(filter=FieldFilter("date_key", ">=", _date_key(
+            period.start_date.year, period.start_date.month, period.start_date.day)))
+        query = query.where(filter=FieldFilter("date_key", "<=", _date_key(
+            period.end_date.year, period.end_date.month, period.end_date.day)))
+        query = query.select(["date", "category", "amount"])
+
+        rollup = {
+            "period_id": period.period_id,
+            "start_date": period.start_date.isoformat(),
+            "end_date": period.end_date.isoformat(),
+            "month_start_day": month_start_day,
+            "categories": {},
+            "total": 0.0,
+            "count": 0,
+        }
+        for doc in query.stream(transaction=transaction):
+            data = doc.to_dict()
+            exp_date = data.get("date") or {}
+            try:
+                expense_date = date_type(exp_date["year"], exp_date["month"], exp_date["day"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if period.start_date <= expense_date <= period.end_date:
+                self._apply_rollup_delta(
+                    rollup, data.get("category", "OTHER"), float(data.get("amount", 0) or 0), 1
+                )
+        return rollup
+
+    def _is_rollup_period(self, period: BudgetPeriod, month_start_day) -> bool:
+        """True if the period lines up with the user's configured budget periods."""
+        expected = get_period_containing_date(period.start_date, month_start_day=month_start_day)
+        return (
+            expected.period_id == period.period_id
+            and expected.start_date == period.start_date
+            and expected.end_date == period.end_date
+        )
+
+    def get_period_spending_rollup(self, period: BudgetPeriod) -> Optional[Dict]:
+        """
+        Get the spending rollup for a budget period, building it on first use.
+
+        Args:
+            period: The BudgetPeriod to read
+
+        Returns:
+            Rollup dict (see section comment), or None if rollups do not apply
+            (legacy global mode, or a period that does not match the user's
+            configured month start day). Callers fall back to scanning.
+        """
+        if not self.user_id:
+            return None
+
+        month_start_day = self._get_month_start_day()
+        if not self._is_rollup_period(period, month_start_day):
+            return None
+
+        snapshot = self._rollups_ref().document(period.period_id).get()
+        if snapshot.exists:
+            return snapshot.to_dict()
+
+        return self.rebuild_spending_rollup(period)
+
+    def rebuild_spending_rollup(self, period: BudgetPeriod) -> Dict:
+        """
+        Recompute a period's rollup from a full scan and overwrite the stored doc.
+
+        The scan and write run in one transaction so a concurrent expense write
+        cannot slip between them.
+
+        Args:
+            period: The BudgetPeriod to rebuild
+
+        Returns:
+            The rebuilt rollup dict
+        """
+        if not self.user_id:
+            raise ValueError("User ID required for spending rollups")
+
+        rollup_ref = self._rollups_ref().document(period.period_id)
+
+        @firestore.transactional
+        def _rebuild(transaction):
+            month_start_day = self._read_month_start_day(transaction)
+            rollup = self._scan_period_rollup(period, month_start_day, transaction=transaction)
+            # A caller with a stale start day asked for a period the user no
+            # longer budgets by; expense writes would never update it, so
+            # don't store it
+            if self._is_rollup_period(period, month_start_day):
+                transaction.set(rollup_ref, {**rollup, "updated_at": firestore.SERVER_TIMESTAMP})
+            return rollup
+
+        try:
+            return _rebuild(self.db.transaction())
+        except GoogleAPIError as e:
+            logger.error("Firestore write failed in rebuild_spending_rollup: %s", e)
+            raise RuntimeError(f"Failed to rebuild spending rollup: {e}") from e
+
+    def check_spending_rollup(self, period: BudgetPeriod) -> Dict:
+        """
+        Compare a stored rollup against a full rescan of the period's expenses.
+
+        Args:
+            period: The BudgetPeriod to check
+
+        Returns:
+            {
+                "period_id": str,
+                "missing": bool,       # no rollup stored for this period
+                "consistent": bool,    # stored rollup matches the rescan
+                "differences": {category_id: {"rollup": {...}, "scan": {...}}},
+            }
+        """
+        if not self.user_id:
+            raise ValueError("User ID required for spending rollups")
+
+        month_start_day = self._get_month_start_day()
+        snapshot = self._rollups_ref().document(period.period_id).get()
+        scanned = self._scan_period_rollup(period, month_start_day)
+
+        if not snapshot.exists:
+            return {"period_id": period.period_id, "missing": True, "consistent": False, "differences": {}}
+
+        stored = snapshot.to_dict().get("categories", {})
+        expected = scanned["categories"]
+        empty = {"total": 0.0, "count": 0}
+        differences = {}
+        for category in set(stored) | set(expected):
+            have = stored.get(category, empty)
+            want = expected.get(category, empty)
+            if abs(have.get("total", 0) - want["total"]) > 0.005 or have.get("count", 0) != want["count"]:
+                differences[category] = {"rollup": have, "scan": want}
 
         return {
-            "total": total,
-            "count": count
+            "period_id": period.period_id,
+            "missing": False,
+            "consistent": not differences,
+            "differences": differences,
         }
 
+    def list_expense_periods(self) -> List[BudgetPeriod]:
+        """
+        List every budget period that contains at least one of the user's expenses.
+
+        Used by the rollup backfill/repair script.
+
+        Returns:
+            BudgetPeriods sorted by start date
+        """
+        from datetime import date as date_type
+
+        month_start_day = self._get_month_start_day()
+        periods: Dict[str, BudgetPeriod] = {}
+        docs = self.db.collection(self._get_collection_path("expenses")).select(["date"]).stream()
+        for doc in docs:
+            exp_date = doc.to_dict().get("date") or {}
+            try:
+                expense_date = date_type(exp_date["year"], exp_date["month"], exp_date["day"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            period = get_period_containing_date(expense_date, month_start_day=month_start_day)
+            periods.setdefault(period.period_id, period)
+        return sorted(periods.values(), key=lambda p: p.start_date)
+
+    def _rollup_periods_with_category(self, category_id: str) -> List[BudgetPeriod]:
+        """The periods of every stored rollup that has totals for a category."""
+        from datetime import date as date_type
+
+        snapshots = self._rollups_ref().where(
+            filter=FieldFilter(f"categories.{category_id}.count", ">", 0)
+        ).select(["start_date", "month_start_day"]).stream()
+        return [
+            get_period_containing_date(
+                date_type.fromisoformat(data["start_date"]), month_start_day=data.get("month_start_day", 1)
+            )
+            for data in (snapshot.to_dict() for snapshot in snapshots)
+        ]
+
+    def _clear_spending_rollups(self, uid: str) -> int:
+        """Delete every stored rollup for a user. Returns the number deleted."""
+        # Only references are needed, so fetch keys only
+        refs = [doc.reference for doc in self._rollups_ref(uid).select([]).stream()]
+        with self.write_batch() as batch:
+            for ref in refs:
+                batch.delete(ref)
+        return len(refs)
+
     # ==================== Budget Cap Operations ====================
 
     def get_budget_cap(self, category: str) -> Optional[float]:
@@ -596,6 +1443,26 @@ class FirebaseClient:
             logger.error("Firestore write failed in set_budget_cap: %s", e)
             raise RuntimeError(f"Failed to set budget cap: {e}") from e
 
+    def set_budget_caps(self, caps: Dict[str, float]) -> None:
+        """
+        Set budget caps for several categories in one batched write.
+
+        Args:
+            caps: Category name (or "TOTAL") -> monthly budget cap amount
+        """
+        caps_ref = self.db.collection(self._get_collection_path("budget_caps"))
+        try:
+            with self.write_batch() as batch:
+                for category, amount in caps.items():
+                    batch.set(caps_ref.document(category), {
+                        "category": category,
+                        "monthly_cap": amount,
+                        "last_updated": firestore.SERVER_TIMESTAMP
+                    })
+        except GoogleAPIError as e:
+            logger.error("Firestore write failed in set_budget_caps: %s", e)
+            raise RuntimeError(f"Failed to set budget caps: {e}") from e
+
     def get_all_budget_caps(self) -> Dict[str, float]:
         """
         Get all budget caps.
@@ -668,10 +1535,9 @@ class FirebaseClient:
         Returns:
             Dict with key: budget_month_start_day (int 1..28 or "last")
         """
-        doc = self.db.collection("users").document(uid).get()
-        if not doc.exists:
+        data = self._get_user_doc(uid)
+        if data is None:
             return {}
-        data = doc.to_dict() or {}
         return {
             "budget_month_start_day": data.get("budget_month_start_day", 1),
         }
@@ -690,6 +1556,12 @@ class FirebaseClient:
         for retired in ("budget_period_type", "budget_week_start_day", "budget_biweekly_anchor"):
             payload[retired] = firestore.DELETE_FIELD
         self.db.collection("users").document(uid).set(payload, merge=True)
+        self._invalidate_user_doc(uid)
+
+        # Rollups are keyed by period boundaries, which move with the start day.
+        # Drop them; they are rebuilt lazily on the next budget read.
+        if "budget_month_start_day" in settings:
+            self._clear_spending_rollups(uid)
 
     # ==================== Category Operations ====================
 
@@ -705,6 +1577,11 @@ class FirebaseClient:
         if not self.user_id:
             raise ValueError("User ID required for user-scoped categories")
 
+        cache_key = (self.user_id, "categories")
+        cached = _user_cache.get(cache_key, _CACHE_MISS)
+        if cached is not _CACHE_MISS:
+            return copy.deepcopy(cached)
+
         docs = self.db.collection(self._get_collection_path("categories")).stream()
 
         categories = []
@@ -730,7 +1607,8 @@ class FirebaseClient:
 
         # Sort by sort_order
         categories.sort(key=lambda x: x.get("sort_order", 0))
-        return categories
+        _user_cache.set(cache_key, categories)
+        return copy.deepcopy(categories)
 
     def get_category(self, category_id: str) -> Optional[Dict]:
         """
@@ -745,11 +1623,19 @@ class FirebaseClient:
         if not self.user_id:
             raise ValueError("User ID required for user-scoped categories")
 
+        # Served from the cached category list when possible
+        for category in self.get_user_categories():
+            if category["category_id"] == category_id:
+                return category
+
+        # Not cached: it may have been created by another process since the
+        # list was loaded, so confirm with a direct read before reporting missing
         doc = self.db.collection(self._get_collection_path("categories")).document(category_id).get()
 
         if not doc.exists:
             return None
 
+        self._invalidate_categories()
         category_data = doc.to_dict()
         category_data["category_id"] = doc.id
         return category_data
@@ -801,6 +1687,7 @@ class FirebaseClient:
 
         # Save to Firestore
         self.db.collection(self._get_collection_path("categories")).document(category_id).set(doc_data)
+        self._invalidate_categories()
 
         return category_id
 
@@ -828,6 +1715,7 @@ class FirebaseClient:
 
         if filtered_updates:
             doc_ref.update(filtered_updates)
+            self._invalidate_categories()
 
         return True
 
@@ -860,28 +1748,35 @@ class FirebaseClient:
         if category.get("is_system"):
             raise ValueError("Cannot delete system categories")
 
-        # Reassign all expenses with this category to the target category
-        expenses_ref = self.db.collection(self._get_collection_path("expenses"))
-        expenses_to_update = expenses_ref.where(
-            filter=FieldFilter("category", "==", category_id)
-        ).stream()
-
-        reassigned_count = 0
-        for expense_doc in expenses_to_update:
-            expense_doc.reference.update({"category": reassign_to})
-            reassigned_count += 1
+        # Periods whose stored rollups count this category; they are rebuilt
+        # from the expenses once those have been reassigned
+        stale_periods = self._rollup_periods_with_category(category_id)
 
-        # Also update recurring expenses
-        recurring_ref = self.db.collection(self._get_collection_path("recurring_expenses"))
-        recurring_to_update = recurring_ref.where(
+        # Only references are needed, so fetch keys only
+        expenses_to_update = self.db.collection(self._get_collection_path("expenses")).where(
             filter=FieldFilter("category", "==", category_id)
-        ).stream()
-
-        for recurring_doc in recurring_to_update:
-            recurring_doc.reference.update({"category": reassign_to})
+        ).select([]).stream()
+        recurring_to_update = self.db.collection(self._get_collection_path("recurring_expenses")).where(
+            filter=FieldFilter("category", "==", category_id)
+        ).select([]).stream()
 
-        # Delete the category
-        self.db.collection(self._get_collection_path("categories")).document(category_id).delete()
+        # Reassign expenses and recurring templates, then delete the category,
+        # in as few commits as the batch limit allows
+        reassigned_count = 0
+        try:
+            with self.write_batch() as batch:
+                for expense_doc in expenses_to_update:
+                    batch.update(expense_doc.reference, {"category": reassign_to})
+                    reassigned_count += 1
+                for recurring_doc in recurring_to_update:
+                    batch.update(recurring_doc.reference, {"category": reassign_to})
+                batch.delete(self.db.collection(self._get_collection_path("categories")).document(category_id))
+        finally:
+            # The batch isn't atomic past one chunk: rebuild even if it failed
+            # partway, so the rollups match whichever expenses were moved
+            for period in stale_periods:
+                self.rebuild_spending_rollup(period)
+        self._invalidate_categories()
 
         return reassigned_count
 
@@ -898,11 +1793,15 @@ class FirebaseClient:
         if not self.user_id:
             raise ValueError("User ID required for user-scoped categories")
 
-        # Update each category's sort_order
-        for index, category_id in enumerate(category_ids):
-            doc_ref = self.db.collection(self._get_collection_path("categories")).document(category_id)
-            if doc_ref.get().exists:
-                doc_ref.update({"sort_order": index})
+        # One read to skip unknown IDs (an update to a missing doc fails the batch)
+        categories_ref = self.db.collection(self._get_collection_path("categories"))
+        snapshots = self.get_all([categories_ref.document(category_id) for category_id in category_ids], field_paths=[])
+
+        with self.write_batch() as batch:
+            for index, snapshot in enumerate(snapshots):
+                if snapshot.exists:
+                    batch.update(snapshot.reference, {"sort_order": index})
+        self._invalidate_categories()
 
         return True
 
@@ -919,10 +1818,8 @@ class FirebaseClient:
             # Fallback to old TOTAL cap
             return self.get_budget_cap("TOTAL") or 0
 
-        user_doc = self.db.collection("users").document(self.user_id).get()
-
-        if user_doc.exists:
-            data = user_doc.to_dict()
+        data = self._get_user_doc(self.user_id)
+        if data is not None:
             return data.get("total_monthly_budget", 0)
 
         return 0
@@ -943,6 +1840,7 @@ class FirebaseClient:
         self.db.collection("users").document(self.user_id).set({
             "total_monthly_budget": amount
         }, merge=True)
+        self._invalidate_user_doc(self.user_id)
 
         return True
 
@@ -978,6 +1876,29 @@ class FirebaseClient:
 
     # ==================== Category Migration Operations ====================
 
+    def category_exists(self, category_id: str) -> bool:
+        """
+        Check that a category exists with a direct read, bypassing the cache.
+
+        The cached category list can be stale in a process that didn't make
+        the change (e.g. a category deleted through the API server is still
+        listed in an MCP server), so writes confirm the category here. A
+        missing category also drops the cached list.
+
+        Args:
+            category_id: The category ID (e.g., "FOOD_OUT")
+
+        Returns:
+            True if the category document exists
+        """
+        if not self.user_id:
+            raise ValueError("User ID required for user-scoped categories")
+
+        doc = self.db.collection(self._get_collection_path("categories")).document(category_id).get(field_paths=[])
+        if not doc.exists:
+            self._invalidate_categories()
+        return doc.exists
+
     def has_categories_setup(self) -> bool:
         """
         Check if the user has custom categories set up.
@@ -988,11 +1909,8 @@ class FirebaseClient:
         if not self.user_id:
             return False
 
-        # Check if categories collection has documents
-        categories_ref = self.db.collection(self._get_collection_path("categories"))
-        docs = categories_ref.limit(1).stream()
-
-        return any(True for _ in docs)
+        # Loads (and caches) the full list: callers almost always need it next
+        return bool(self.get_user_categories())
 
     def migrate_from_budget_caps(self) -> bool:
         """
@@ -1057,6 +1975,7 @@ class FirebaseClient:
                 "exclude_from_total": False
             }
             self.db.collection(self._get_collection_path("categories")).document("OTHER").set(other_data)
+        self._invalidate_categories()
 
         # Set total budget
         self.set_total_monthly_budget(total_budget)
@@ -1066,10 +1985,28 @@ class FirebaseClient:
 
         return True
 
+    def _default_category_doc(self, category_id: str, sort_order: int) -> Optional[Dict]:
+        """Category document for a default category (cap 0), or None if it isn't a default."""
+        defaults = DEFAULT_CATEGORIES.get(category_id, {})
+        if not defaults:
+            return None
+        return {
+            "display_name": defaults.get("display_name", category_id.replace("_", " ").title()),
+            "icon": defaults.get("icon", "circle"),
+            "color": defaults.get("color", "#6B7280"),
+            "monthly_cap": 0,  # Start with 0, user will allocate
+            "is_system": defaults.get("is_system", False),
+            "sort_order": sort_order,
+            "created_at": firestore.SERVER_TIMESTAMP,
+            "exclude_from_total": False
+        }
+
     def initialize_default_categories(self, total_budget: float, selected_ids: List[str]) -> bool:
         """
         Initialize categories for a new user with selected defaults.
 
+        Writes every category and the total budget in one batch.
+
         Args:
             total_budget: The total monthly budget
             selected_ids: List of default category IDs to create
@@ -1084,32 +2021,134 @@ class FirebaseClient:
         if "OTHER" not in selected_ids:
             selected_ids.append("OTHER")
 
-        # Create selected categories
+        categories_ref = self.db.collection(self._get_collection_path("categories"))
         sort_order = 0
-        for category_id in selected_ids:
-            defaults = DEFAULT_CATEGORIES.get(category_id, {})
+        with self.write_batch() as batch:
+            for category_id in selected_ids:
+                category_data = self._default_category_doc(category_id, sort_order)
+                if category_data is None:
+                    continue
+                batch.set(categories_ref.document(category_id), category_data)
+                sort_order += 1
+            batch.set(self.db.collection("users").document(self.user_id), {
+                "total_monthly_budget": total_budget
+            }, merge=True)
+        self._invalidate_categories()
+        self._invalidate_user_doc(self.user_id)
+
+        return True
+
+    def complete_onboarding(
+        self,
+        total_budget: float,
+        selected_ids: List[str],
+        category_caps: Optional[Dict[str, float]] = None,
+        custom_categories: Optional[List[Dict]] = None,
+        excluded_ids: Optional[List[str]] = None,
+    ) -> Dict:
+        """
+        Set up a user's categories and budget from the onboarding wizard.
+
+        Equivalent to initialize_default_categories, then update_category for
+        each cap, create_category for each custom category, update_category
+        for each excluded category and recalculate_other_cap, but computed
+        against one read of the existing categories and written in one batch.
+
+        Args:
+            total_budget: The total monthly budget
+            selected_ids: Default category IDs to create (OTHER is always added)
+            category_caps: category_id -> monthly cap for default categories
+                           (CUSTOM_ IDs are ignored; custom caps come with the category)
+            custom_categories: Dicts with display_name, icon, color, monthly_cap
+            excluded_ids: Category IDs to exclude from the total
+
+        Returns:
+            Dict with categories_created and other_cap
+
+        Raises:
+            ValueError: If max categories reached or a custom name already exists
+        """
+        if not self.user_id:
+            raise ValueError("User ID required for initialization")
 
-            if not defaults:
+        selected_ids = list(selected_ids)
+        if "OTHER" not in selected_ids:
+            selected_ids.append("OTHER")
+
+        categories = {c["category_id"]: c for c in self.get_user_categories()}
+        writes: Dict[str, Dict] = {}
+        full_docs = set()
+
+        def put(category_id: str, fields: Dict) -> None:
+            categories.setdefault(category_id, {}).update(fields)
+            writes.setdefault(category_id, {}).update(fields)
+
+        sort_order = 0
+        for category_id in selected_ids:
+            category_data = self._default_category_doc(category_id, sort_order)
+            if category_data is None:
                 continue
+            categories[category_id] = dict(category_data)
+            writes[category_id] = category_data
+            full_docs.add(category_id)
+            sort_order += 1
 
-            category_data = {
-                "display_name": defaults.get("display_name", category_id.replace("_", " ").title()),
-                "icon": defaults.get("icon", "circle"),
-                "color": defaults.get("color", "#6B7280"),
-                "monthly_cap": 0,  # Start with 0, user will allocate
-                "is_system": defaults.get("is_system", False),
-                "sort_order": sort_order,
-                "created_at": firestore.SERVER_TIMESTAMP,
-                "exclude_from_total": False
+        for category_id, cap in (category_caps or {}).items():
+            # Custom category IDs (CUSTOM_...) get their cap when created
+            if category_id.startswith("CUSTOM_"):
+                continue
+            if category_id not in categories:
+                logger.warning("Category %s not found during onboarding cap update", category_id)
+                continue
+            put(category_id, {"monthly_cap": cap})
+
+        for custom in custom_categories or []:
+            if len(categories) >= MAX_CATEGORIES:
+                raise ValueError(f"Maximum of {MAX_CATEGORIES} categories allowed")
+            display_name_lower = custom["display_name"].lower()
+            if any(c.get("display_name", "").lower() == display_name_lower for c in categories.values()):
+                raise ValueError(f"Category '{custom['display_name']}' already exists")
+            category_id = generate_category_id(custom["display_name"])
+            max_sort = max([c.get("sort_order", 0) for c in categories.values()], default=-1)
+            categories[category_id] = {
+                "display_name": custom["display_name"],
+                "icon": custom["icon"],
+                "color": custom["color"],
+                "monthly_cap": custom["monthly_cap"],
+                "is_system": False,
+                "sort_order": max_sort + 1,
+                "exclude_from_total": False,
             }
+            writes[category_id] = {**categories[category_id], "created_at": firestore.SERVER_TIMESTAMP}
+            full_docs.add(category_id)
 
-            self.db.collection(self._get_collection_path("categories")).document(category_id).set(category_data)
-            sort_order += 1
+        for category_id in excluded_ids or []:
+            if category_id not in categories:
+                logger.warning("Could not set exclude_from_total for %s: not found", category_id)
+                continue
+            put(category_id, {"exclude_from_total": True})
 
-        # Set total budget
-        self.set_total_monthly_budget(total_budget)
+        # OTHER gets the unallocated budget (see recalculate_other_cap)
+        allocated = sum(
+            c.get("monthly_cap", 0) for category_id, c in categories.items() if category_id != "OTHER"
+        )
+        other_cap = max(0, total_budget - allocated)
+        put("OTHER", {"monthly_cap": other_cap})
 
-        return True
+        categories_ref = self.db.collection(self._get_collection_path("categories"))
+        with self.write_batch() as batch:
+            for category_id, fields in writes.items():
+                batch.set(categories_ref.document(category_id), fields, merge=category_id not in full_docs)
+            batch.set(self.db.collection("users").document(self.user_id), {
+                "total_monthly_budget": total_budget
+            }, merge=True)
+        self._invalidate_categories()
+        self._invalidate_user_doc(self.user_id)
+
+        return {
+            "categories_created": len(selected_ids) + len(custom_categories or []),
+            "other_cap": other_cap,
+        }
 
     def get_category_cap(self, category_id: str) -> Optional[float]:
         """
@@ -1200,6 +2239,7 @@ class FirebaseClient:
                 "year": recurring.last_user_action.year
             } if recurring.last_user_action else None,
             "active": recurring.active,
+            "next_trigger_date": _next_trigger_date(recurring),
             "created_at": firestore.SERVER_TIMESTAMP
         }
 
@@ -1264,6 +2304,69 @@ class FirebaseClient:
         """
         self.db.collection(self._get_collection_path("recurring_expenses")).document(template_id).update(updates)
 
+    def get_due_recurring_templates(self, today: str) -> List[Dict]:
+        """
+        Active recurring templates due on or before *today*, across all users.
+
+        A collection group range query on next_trigger_date, so only due
+        templates are read no matter how many users or templates exist.
+
+        Args:
+            today: YYYY-MM-DD in the user's timezone
+
+        Returns:
+            Dicts with uid (None for legacy top-level templates) and recurring
+            (RecurringExpense), ordered by due date
+        """
+        docs = (
+            self.db.collection_group("recurring_expenses")
+            .where(filter=FieldFilter("active", "==", True))
+            .where(filter=FieldFilter("next_trigger_date", "<=", today))
+            .order_by("next_trigger_date")
+            .stream()
+        )
+        due = []
+        for doc in docs:
+            owner = doc.reference.parent.parent
+            due.append({
+                "uid": owner.id if owner is not None else None,
+                "recurring": self._dict_to_recurring_expense(doc.to_dict(), doc.id),
+            })
+        return due
+
+    def apply_recurring_triggers(self, triggers: List[Dict]) -> int:
+        """
+        Write one recurring sweep's results for this user in batches.
+
+        Each trigger advances its template and, if given, creates the pending
+        expense in the same batch. Pending expenses get deterministic IDs
+        ({template_id}_{YYYYMMDD}), so re-applying a trigger after an
+        interrupted run overwrites instead of duplicating.
+
+        Args:
+            triggers: Dicts with template_id, updates (template fields to
+                      set) and optionally pending (PendingExpense)
+
+        Returns:
+            Number of batch commits
+        """
+        templates = self.db.collection(self._get_collection_path("recurring_expenses"))
+        pending_expenses = self.db.collection(self._get_collection_path("pending_expenses"))
+        # Up to two writes per trigger
+        per_batch = FIRESTORE_BATCH_LIMIT // 2
+        commits = 0
+        for start in range(0, len(triggers), per_batch):
+            batch = self.db.batch()
+            for trigger in triggers[start:start + per_batch]:
+                batch.update(templates.document(trigger["template_id"]), trigger["updates"])
+                pending = trigger.get("pending")
+                if pending is not None:
+                    pending_id = f"{pending.template_id}_{pending.date.year:04d}{pending.date.month:02d}{pending.date.day:02d}"
+                    batch.set(pending_expenses.document(pending_id), _pending_expense_data(pending))
+            batch.commit()
+            commits += 1
+        return commits
+
     def delete_recurring_expense(self, template_id: str) -> None:
         """
         Delete a recurring expense template (or mark as inactive).
@@ -1328,23 +2431,10 @@ class FirebaseClient:
         Returns:
             Document ID of the saved pending expense
         """
-        pending_data = {
-            "template_id": pending.template_id,
-            "expense_name": pending.expense_name,
-            "amount": pending.amount,
-            "date": {
-                "day": pending.date.day,
-                "month": pending.date.month,
-                "year": pending.date.year
-            },
-            "category": pending.category.name,
-            "sms_sent": pending.sms_sent,
-            "awaiting_confirmation": pending.awaiting_confirmation,
-            "created_at": firestore.SERVER_TIMESTAMP
-        }
-
         # Add to Firestore
-        doc_ref = self.db.collection(self._get_collection_path("pending_expenses")).add(pending_data)
+        doc_ref = self.db.collection(self._get_collection_path("pending_expenses")).add(
+            _pending_expense_data(pending)
+        )
         return doc_ref[1].id
 
     def get_pending_expense(self, pending_id: str) -> Optional[PendingExpense]:
@@ -1463,6 +2553,25 @@ class FirebaseClient:
         )
 
     # ==================== Conversation History Operations ====================
+    #
+    # Messages live in conversations/{id}/messages/{seq}, one document per
+    # message numbered 0, 1, 2, ... by a "seq" field. The conversation
+    # document itself only carries summary metadata (message_count,
+    # first_message, summary, recent_expenses, ...), so listing conversations
+    # or checking staleness never transfers message bodies, and reading
+    # history is a limited query on the tail of the subcollection.
+    #
+    # Conversations written before the subcollection existed keep their
+    # messages in a "messages" array on the conversation document. They are
+    # read from that array until the first new message is appended (which
+    # moves them into the subcollection), or until
+    # scripts/migrate_conversation_messages.py has been run.
+
+    def _conversation_ref(self, conversation_id: str):
+        return self.db.collection(self._get_collection_path("conversations")).document(conversation_id)
+
+    def _conversation_messages_ref(self, conversation_id: str):
+        return self._conversation_ref(conversation_id).collection(CONVERSATION_MESSAGES_COLLECTION)
 
     def create_conversation(self) -> str:
         """
@@ -1474,7 +2583,8 @@ class FirebaseClient:
         conversation_data = {
             "created_at": firestore.SERVER_TIMESTAMP,
             "last_activity": firestore.SERVER_TIMESTAMP,
-            "messages": [],
+            "message_count": 0,
+            "first_message": None,
             "summary": None,
             "recent_expenses": []  # Track recent expenses for context
         }
@@ -1484,7 +2594,9 @@ class FirebaseClient:
 
     def get_conversation(self, conversation_id: str) -> Optional[Dict]:
         """
-        Get a specific conversation by ID.
+        Get a conversation's metadata by ID.
+
+        Messages are not included; read them with get_conversation_messages().
 
         Args:
             conversation_id: Firestore document ID
@@ -1492,12 +2604,15 @@ class FirebaseClient:
         Returns:
             Conversation dict or None if not found
         """
-        doc = self.db.collection(self._get_collection_path("conversations")).document(conversation_id).get()
+        doc = self._conversation_ref(conversation_id).get()
 
         if not doc.exists:
             return None
 
         data = doc.to_dict()
+        legacy_messages = data.pop("messages", None)
+        if legacy_messages is not None:
+            data.setdefault("message_count", len(legacy_messages))
         data["conversation_id"] = doc.id
         return data
 
@@ -1505,6 +2620,8 @@ class FirebaseClient:
         """
         List recent conversations, ordered by last activity.
 
+        Only summary fields are fetched — never message bodies.
+
         Args:
             limit: Maximum number of conversations to return
 
@@ -1512,6 +2629,7 @@ class FirebaseClient:
             List of conversation dicts with conversation_id
         """
         query = self.db.collection(self._get_collection_path("conversations"))
+        query = query.select(CONVERSATION_SUMMARY_FIELDS)
         query = query.order_by("last_activity", direction=firestore.Query.DESCENDING)
         query = query.limit(limit)
 
@@ -1525,6 +2643,68 @@ class FirebaseClient:
 
         return conversations
 
+    def get_conversation_messages(
+        self,
+        conversation_id: str,
+        limit: int = 50,
+        before_seq: Optional[int] = None,
+    ) -> Dict:
+        """
+        Read a page of messages from the end of a conversation.
+
+        Pages are read newest-first with a limited query and returned in
+        chronological order. When older messages remain, the page is trimmed
+        to start on a user turn so a tool_use / tool_result exchange is never
+        split across pages (or cut in half at the start of model context).
+
+        Args:
+            conversation_id: Firestore document ID
+            limit: Maximum number of messages to return
+            before_seq: Cursor — only return messages with seq < before_seq
+                        (pass the previous page's next_cursor)
+
+        Returns:
+            Dict with:
+                messages:    list of message dicts (oldest first), each with "seq"
+                next_cursor: seq to pass as before_seq for the previous page,
+                             or None when this page reaches the first message
+        """
+        query = self._conversation_messages_ref(conversation_id)
+        if before_seq is not None:
+            query = query.where(filter=FieldFilter("seq", "<", before_seq))
+        query = query.order_by("seq", direction=firestore.Query.DESCENDING).limit(limit + 1)
+        newest_first = [doc.to_dict() for doc in query.stream()]
+
+        if not newest_first:
+            newest_first = self._legacy_conversation_messages(conversation_id, limit, before_seq)
+
+        has_more = len(newest_first) > limit
+        page = newest_first[:limit][::-1]
+
+        if has_more:
+            turn_start = next((i for i, m in enumerate(page) if _is_user_turn(m)), 0)
+            page = page[turn_start:]
+
+        return {
+            "messages": page,
+            "next_cursor": page[0]["seq"] if has_more and page else None,
+        }
+
+    def _legacy_conversation_messages(
+        self,
+        conversation_id: str,
+        limit: int,
+        before_seq: Optional[int],
+    ) -> List[Dict]:
+        """Newest-first page from a not-yet-migrated "messages" array."""
+        doc = self._conversation_ref(conversation_id).get()
+        if not doc.exists:
+            return []
+        legacy = doc.to_dict().get("messages") or []
+        end = len(legacy) if before_seq is None else max(0, min(before_seq, len(legacy)))
+        start = max(0, end - limit - 1)
+        return [{**legacy[seq], "seq": seq} for seq in range(end - 1, start - 1, -1)]
+
     def add_message_to_conversation(
         self,
         conversation_id: str,
@@ -1544,24 +2724,15 @@ class FirebaseClient:
             **extra_fields: Additional fields to store on the message (e.g. content_blocks)
 
         Returns:
-            True if successful, False if conversation not found
-        """
-        doc_ref = self.db.collection(self._get_collection_path("conversations")).document(conversation_id)
-
-        # Check if conversation exists
-        if not doc_ref.get().exists:
-            raise DocumentNotFoundError("conversations", conversation_id)
-
-        # Get current time for message timestamp
-        import pytz
-        user_timezone = os.getenv("USER_TIMEZONE", "America/Chicago")
-        tz = pytz.timezone(user_timezone)
-        now = datetime.now(tz)
+            True if successful
 
+        Raises:
+            DocumentNotFoundError: If the conversation doesn't exist
+        """
         message = {
             "role": role,
             "content": content,
-            "timestamp": now.isoformat()
+            "timestamp": _message_timestamp(),
         }
 
         if tool_calls:
@@ -1570,14 +2741,127 @@ class FirebaseClient:
         # Add any extra fields (e.g. content_blocks for interleaved display)
         message.update(extra_fields)
 
-        # Use array union to add message
-        doc_ref.update({
-            "messages": firestore.ArrayUnion([message]),
-            "last_activity": firestore.SERVER_TIMESTAMP
-        })
-
+        self.append_conversation_messages(conversation_id, [message])
         return True
 
+    def append_conversation_messages(
+        self,
+        conversation_id: str,
+        messages: List[Dict],
+        summary: Optional[str] = None,
+        context_summary: Optional[Dict] = None,
+    ) -> List[int]:
+        """
+        Append messages to a conversation in a single transaction.
+
+        One existence check and one commit, however many messages: each
+        message becomes its own document with the next sequence numbers, and
+        the conversation's message_count, first_message, last_activity (and
+        summary, if given) are updated in the same commit. A conversation
+        still holding a legacy "messages" array has it moved into the
+        subcollection first.
+
+        Args:
+            conversation_id: Firestore document ID
+            messages: Message dicts (role, content, optional tool_calls /
+                      content_blocks, ...) in order; "timestamp" defaults to now
+            summary: Optional conversation summary to set in the same commit
+            context_summary: Optional rolling model-context summary (see
+                             backend.context_builder) to set in the same commit
+
+        Returns:
+            The sequence numbers assigned to *messages*
+
+        Raises:
+            DocumentNotFoundError: If the conversation doesn't exist
+        """
+        conv_ref = self._conversation_ref(conversation_id)
+        messages_ref = self._conversation_messages_ref(conversation_id)
+        timestamp = _message_timestamp()
+        messages = [{"timestamp": timestamp, **message} for message in messages]
+
+        @firestore.transactional
+        def _append(transaction):
+            snapshot = conv_ref.get(transaction=transaction)
+            if not snapshot.exists:
+                raise DocumentNotFoundError("conversations", conversation_id)
+
+            data = snapshot.to_dict()
+            legacy = data.get("messages") or []
+            pending = list(legacy) + list(messages)
+            first_seq = data.get("message_count", 0)
+            if legacy and len(pending) >= FIRESTORE_BATCH_LIMIT:
+                return None  # too big for one commit; migrate in batches first
+
+            for offset, message in enumerate(pending):
+                seq = first_seq + offset
+                transaction.set(messages_ref.document(_message_doc_id(seq)), {**message, "seq": seq})
+
+            updates = {
+                "message_count": first_seq + len(pending),
+                "last_activity": firestore.SERVER_TIMESTAMP,
+            }
+            if "messages" in data:
+                updates["messages"] = firestore.DELETE_FIELD
+            if not data.get("first_message") and pending:
+                updates["first_message"] = _message_preview(pending[0])
+            if summary is not None:
+                updates["summary"] = summary
+            if context_summary is not None:
+                updates["context_summary"] = context_summary
+            transaction.update(conv_ref, updates)
+
+            start = first_seq + len(legacy)
+            return list(range(start, start + len(messages)))
+
+        seqs = _append(self.db.transaction())
+        if seqs is None:
+            self.migrate_conversation_messages(conversation_id)
+            seqs = _append(self.db.transaction())
+        return seqs
+
+    def migrate_conversation_messages(self, conversation_id: str) -> int:
+        """
+        Move a legacy "messages" array into the messages subcollection.
+
+        Writes in batches of FIRESTORE_BATCH_LIMIT with deterministic document
+        IDs, then updates the conversation document last, so an interrupted
+        run can simply be repeated.
+
+        Args:
+            conversation_id: Firestore document ID
+
+        Returns:
+            Number of messages moved (0 if already migrated or not found)
+        """
+        conv_ref = self._conversation_ref(conversation_id)
+        messages_ref = self._conversation_messages_ref(conversation_id)
+
+        snapshot = conv_ref.get()
+        if not snapshot.exists:
+            return 0
+        data = snapshot.to_dict()
+        if "messages" not in data:
+            return 0
+
+        legacy = data.get("messages") or []
+        first_seq = data.get("message_count", 0)
+        for start in range(0, len(legacy), FIRESTORE_BATCH_LIMIT):
+            batch = self.db.batch()
+            for offset, message in enumerate(legacy[start:start + FIRESTORE_BATCH_LIMIT], start):
+                seq = first_seq + offset
+                batch.set(messages_ref.document(_message_doc_id(seq)), {**message, "seq": seq})
+            batch.commit()
+
+        updates = {
+            "messages": firestore.DELETE_FIELD,
+            "message_count": first_seq + len(legacy),
+        }
+        if not data.get("first_message") and legacy:
+            updates["first_message"] = _message_preview(legacy[0])
+        conv_ref.update(updates)
+        return len(legacy)
+
     def update_conversation_summary(self, conversation_id: str, summary: str) -> bool:
         """
         Update the summary of a conversation.
@@ -1589,7 +2873,7 @@ class FirebaseClient:
         Returns:
             True if successful, False if conversation not found
         """
-        doc_ref = self.db.collection(self._get_collection_path("conversations")).document(conversation_id)
+        doc_ref = self._conversation_ref(conversation_id)
 
         if not doc_ref.get().exists:
             raise DocumentNotFoundError("conversations", conversation_id)
@@ -1622,7 +2906,7 @@ class FirebaseClient:
         Returns:
             True if successful, False if conversation not found
         """
-        doc_ref = self.db.collection(self._get_collection_path("conversations")).document(conversation_id)
+        doc_ref = self._conversation_ref(conversation_id)
 
         doc = doc_ref.get()
         if not doc.exists:
@@ -1661,7 +2945,7 @@ class FirebaseClient:
         Returns:
             List of recent expense dicts
         """
-        doc = self.db.collection(self._get_collection_path("conversations")).document(conversation_id).get()
+        doc = self._conversation_ref(conversation_id).get()
 
         if not doc.exists:
             return []
@@ -1684,7 +2968,7 @@ class FirebaseClient:
         Returns:
             True if successful, False if conversation not found
         """
-        doc_ref = self.db.collection(self._get_collection_path("conversations")).document(conversation_id)
+        doc_ref = self._conversation_ref(conversation_id)
 
         if not doc_ref.get().exists:
             raise DocumentNotFoundError("conversations", conversation_id)
@@ -1707,17 +2991,13 @@ class FirebaseClient:
         if not expense_ids:
             return []
 
-        existing = []
-        expenses_col = self._get_collection_path("expenses")
-        for eid in expense_ids:
-            doc = self.db.collection(expenses_col).document(eid).get()
-            if doc.exists:
-                existing.append(eid)
-        return existing
+        expenses_ref = self.db.collection(self._get_collection_path("expenses"))
+        snapshots = self.get_all([expenses_ref.document(eid) for eid in expense_ids], field_paths=[])
+        return [snapshot.id for snapshot in snapshots if snapshot.exists]
 
     def delete_conversation(self, conversation_id: str) -> bool:
         """
-        Delete a conversation.
+        Delete a conversation and its messages.
 
         Args:
             conversation_id: Firestore document ID
@@ -1725,14 +3005,29 @@ class FirebaseClient:
         Returns:
             True if deleted, False if not found
         """
-        doc_ref = self.db.collection(self._get_collection_path("conversations")).document(conversation_id)
+        doc_ref = self._conversation_ref(conversation_id)
 
         if not doc_ref.get().exists:
             raise DocumentNotFoundError("conversations", conversation_id)
 
-        doc_ref.delete()
+        self._delete_conversation_tree(doc_ref)
         return True
 
+    def _delete_conversation_tree(self, doc_ref) -> None:
+        """Delete a conversation's messages (in batches), then the conversation."""
+        messages_ref = doc_ref.collection(CONVERSATION_MESSAGES_COLLECTION)
+        while True:
+            docs = list(messages_ref.select([]).limit(FIRESTORE_BATCH_LIMIT).stream())
+            if not docs:
+                break
+            batch = self.db.batch()
+            for doc in docs:
+                batch.delete(doc.reference)
+            batch.commit()
+            if len(docs) < FIRESTORE_BATCH_LIMIT:
+                break
+        doc_ref.delete()
+
     def cleanup_old_conversations(self, ttl_hours: int = 24) -> int:
         """
         Delete conversations older than TTL.
@@ -1751,13 +3046,13 @@ class FirebaseClient:
         cutoff = datetime.now(tz) - timedelta(hours=ttl_hours)
 
         query = self.db.collection(self._get_collection_path("conversations"))
-        query = query.where(filter=FieldFilter("last_activity", "<", cutoff))
+        query = query.where(filter=FieldFilter("last_activity", "<", cutoff)).select([])
 
         docs = query.stream()
 
         deleted_count = 0
         for doc in docs:
-            doc.reference.delete()
+            self._delete_conversation_tree(doc.reference)
             deleted_count += 1
 
         return deleted_count
@@ -1779,9 +3074,8 @@ class FirebaseClient:
         """
         from .model_client import DEFAULT_MODEL
 
-        doc = self.db.collection("users").document(user_id).get()
-        if doc.exists:
-            data = doc.to_dict() or {}
+        data = self._get_user_doc(user_id)
+        if data is not None:
             if "selected_model" not in data:
                 data["selected_model"] = DEFAULT_MODEL
             return data
@@ -1796,6 +3090,7 @@ class FirebaseClient:
             settings: Dict of settings fields to update (e.g. {"selected_model": "gpt-5-mini"})
         """
         self.db.collection("users").document(user_id).set(settings, merge=True)
+        self._invalidate_user_doc(user_id)
 
     def log_token_usage(
         self,
@@ -1805,114 +3100,370 @@ class FirebaseClient:
         input_tokens: int,
         output_tokens: int,
         endpoint: str,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0,
+        ttft_ms: Optional[float] = None,
     ) -> None:
         """
         Write a token usage record to users/{uid}/token_usage/ subcollection.
 
+        Also adds it to the day's users/{uid}/usage_daily aggregate (calls,
+        token totals and a TTFT histogram), in the same commit.
+
         Args:
-            user_id:       Firebase Auth UID
-            model:         Model identifier (e.g. "claude-sonnet-4-6")
-            provider:      Provider name ("anthropic" | "openai" | "google")
-            input_tokens:  Number of input/prompt tokens consumed
-            output_tokens: Number of output/completion tokens consumed
-            endpoint:      API endpoint that triggered the call ("chat" | "process_expense")
+            user_id:            Firebase Auth UID
+            model:              Model identifier (e.g. "claude-sonnet-4-6")
+            provider:           Provider name ("anthropic" | "openai" | "google")
+            input_tokens:       Number of uncached input/prompt tokens consumed
+            output_tokens:      Number of output/completion tokens consumed
+            endpoint:           API endpoint that triggered the call ("chat" | "process_expense")
+            cache_read_tokens:  Prompt tokens served from the provider's prompt cache
+            cache_write_tokens: Prompt tokens written to the provider's prompt cache
+            ttft_ms:            Time to first streamed token, for streamed calls
         """
         record = {
             "model": model,
             "provider": provider,
             "input_tokens": input_tokens,
             "output_tokens": output_tokens,
+            "cache_read_tokens": cache_read_tokens,
+            "cache_write_tokens": cache_write_tokens,
             "endpoint": endpoint,
             "timestamp": firestore.SERVER_TIMESTAMP,
         }
+        if ttft_ms is not None:
+            record["ttft_ms"] = round(ttft_ms, 1)
+
+        # The day's aggregate for this (model, endpoint) is updated in the
+        # same commit, so it never drifts from the raw records
+        day = _usage_day()
+        aggregate = {
+            "uid": user_id,
+            "day": day,
+            "model": model,
+            "provider": provider,
+            "endpoint": endpoint,
+            "calls": firestore.Increment(1),
+            "last_activity": firestore.SERVER_TIMESTAMP,
+            **{name: firestore.Increment(record[name]) for name in USAGE_TOKEN_FIELDS},
+        }
+        if ttft_ms is not None:
+            aggregate["ttft_buckets"] = {_ttft_bucket(ttft_ms): firestore.Increment(1)}
+
+        user_ref = self.db.collection("users").document(user_id)
         try:
-            self.db.collection("users").document(user_id).collection("token_usage").add(record)
+            batch = self.db.batch()
+            batch.set(user_ref.collection("token_usage").document(), record)
+            batch.set(
+                user_ref.collection(USAGE_DAILY_COLLECTION).document(_usage_daily_doc_id(day, model, endpoint)),
+                aggregate,
+                merge=True,
+            )
+            batch.commit()
         except Exception as exc:
             # Token logging is non-critical — log and continue
             logger.warning("Failed to log token usage for user %s: %s", user_id, exc)
 
     @classmethod
-    def cleanup_all_users_conversations(cls, ttl_hours: int = 24) -> Dict[str, int]:
+    def cleanup_all_users_conversations(
+        cls,
+        ttl_hours: int = 24,
+        page_size: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+        resume: bool = True,
+    ) -> Dict:
         """
         Delete old conversations for ALL users. Used by admin cleanup endpoint.
 
+        Pages through conversations whose last_activity is older than the TTL
+        with one collection group query (oldest first, then by path), lists
+        each page's messages concurrently, and deletes the messages and then
+        the conversations through a single throttled BulkWriter. A
+        conversation whose messages couldn't all be deleted is kept (and
+        counted in failed_deletes) so no messages are orphaned; a later run
+        retries it. After every page a checkpoint (cutoff, cursor, totals) is
+        saved to maintenance/conversation_cleanup. A run that is
+        interrupted, or stops at *max_seconds*, resumes from the checkpoint
+        with the same cutoff on the next call.
+
         Args:
             ttl_hours: Time-to-live in hours (default 24)
+            page_size: Conversations per page (default CLEANUP_PAGE_SIZE)
+            max_seconds: Stop after the page that crosses this much time
+            resume: Continue an unfinished run with the same TTL, if any
 
         Returns:
-            Dict with user_id -> deleted_count
+            Dict with deleted_count and deleted_messages (whole run),
+            per_user (this call), pages, failed_deletes (conversations not
+            deleted), failed_message_deletes, complete, resumed and cutoff (ISO)
         """
-        # Get a global client to iterate users
-        global_client = cls()
-        users_ref = global_client.db.collection("users")
-        user_docs = users_ref.stream()
+        import time
+        from datetime import timedelta
+        import pytz
+        from google.cloud.firestore_v1.bulk_writer import BulkWriterOptions
+
+        started = time.monotonic()
+        db = cls().db
+        page_size = page_size or CLEANUP_PAGE_SIZE
+        checkpoint_ref = db.collection(MAINTENANCE_COLLECTION).document(CONVERSATION_CLEANUP_CHECKPOINT)
+
+        state = checkpoint_ref.get().to_dict() if resume else None
+        resumed = bool(state and state.get("status") == "running" and state.get("ttl_hours") == ttl_hours)
+        if not resumed:
+            state = {
+                "status": "running",
+                "ttl_hours": ttl_hours,
+                "cutoff": datetime.now(pytz.utc) - timedelta(hours=ttl_hours),
+                "cursor": None,
+                "cursor_path": None,
+                "deleted_count": 0,
+                "deleted_messages": 0,
+                "failed_deletes": 0,
+                "failed_message_deletes": 0,
+                "pages": 0,
+            }
+        state.setdefault("failed_message_deletes", 0)
+
+        failed_paths: set = set()
 
-        results = {}
-        total_deleted = 0
+        def on_write_error(failure, writer) -> bool:
+            if failure.attempts < CLEANUP_MAX_ATTEMPTS:
+                return True
+            failed_paths.add(failure.operation.reference.path)
+            return False
 
-        for user_doc in user_docs:
-            user_id = user_doc.id
-            user_client = cls.for_user(user_id)
-            deleted = user_client.cleanup_old_conversations(ttl_hours)
+        writer = db.bulk_writer(options=BulkWriterOptions(
+            initial_ops_per_second=min(CLEANUP_INITIAL_OPS_PER_SECOND, CLEANUP_MAX_OPS_PER_SECOND),
+            max_ops_per_second=CLEANUP_MAX_OPS_PER_SECOND,
+        ))
+        writer.on_write_error(on_write_error)
+
+        expired = (
+            db.collection_group("conversations")
+            .where(filter=FieldFilter("last_activity", "<", state["cutoff"]))
+            .order_by("last_activity")
+            .order_by("__name__")
+            .select(["last_activity"])
+            .limit(page_size)
+        )
 
-            if deleted > 0:
-                results[user_id] = deleted
-                total_deleted += deleted
+        def list_messages(doc) -> list:
+            messages = doc.reference.collection(CONVERSATION_MESSAGES_COLLECTION).select([]).stream()
+            return [message.reference for message in messages]
+
+        per_user: Dict[str, int] = {}
+        complete = False
+        list_pool = ThreadPoolExecutor(max_workers=CLEANUP_LIST_WORKERS, thread_name_prefix="conversation-cleanup")
+        try:
+            while True:
+                query = expired
+                if state.get("cursor_path"):
+                    # last_activity isn't unique; the path resumes between ties
+                    query = query.start_after({
+                        "last_activity": state["cursor"], "__name__": db.document(state["cursor_path"]),
+                    })
+                elif state["cursor"] is not None:
+                    query = query.start_after({"last_activity": state["cursor"]})
+                docs = list(query.stream())
+
+                # Messages first: a conversation is only deleted once all of
+                # its messages are gone, so failures never leave orphans
+                page = list(zip(docs, list_pool.map(list_messages, docs)))
+                for _, message_refs in page:
+                    for message_ref in message_refs:
+                        writer.delete(message_ref)
+                writer.flush()
+
+                deletable = []
+                for doc, message_refs in page:
+                    failed_messages = sum(1 for ref in message_refs if ref.path in failed_paths)
+                    state["deleted_messages"] += len(message_refs) - failed_messages
+                    state["failed_message_deletes"] += failed_messages
+                    if failed_messages:
+                        state["failed_deletes"] += 1
+                    else:
+                        writer.delete(doc.reference)
+                        deletable.append(doc.reference.path)
+                failed_paths.clear()
+                writer.flush()
+
+                for path in deletable:
+                    if path in failed_paths:
+                        state["failed_deletes"] += 1
+                        continue
+                    state["deleted_count"] += 1
+                    parts = path.split("/")
+                    uid = parts[1] if len(parts) > 2 else "_legacy"
+                    per_user[uid] = per_user.get(uid, 0) + 1
+                failed_paths.clear()
+
+                if docs:
+                    state["cursor"] = docs[-1].get("last_activity")
+                    state["cursor_path"] = docs[-1].reference.path
+                    state["pages"] += 1
+                complete = len(docs) < page_size
+                state["status"] = "complete" if complete else "running"
+                checkpoint_ref.set({**state, "updated_at": firestore.SERVER_TIMESTAMP})
+
+                if complete or (max_seconds is not None and time.monotonic() - started >= max_seconds):
+                    break
+        finally:
+            list_pool.shutdown()
+            writer.close()
+
+        logger.info(
+            "Conversation cleanup %s: %d conversations, %d messages deleted over %d pages",
+            "complete" if complete else "paused", state["deleted_count"], state["deleted_messages"], state["pages"],
+        )
+        return {
+            "deleted_count": state["deleted_count"],
+            "deleted_messages": state["deleted_messages"],
+            "per_user": per_user,
+            "pages": state["pages"],
+            "failed_deletes": state["failed_deletes"],
+            "failed_message_deletes": state["failed_message_deletes"],
+            "complete": complete,
+            "resumed": resumed,
+            "cutoff": state["cutoff"].isoformat(),
+        }
 
-        results["_total"] = total_deleted
-        return results
+    # ==================== Usage Analytics Operations ====================
 
-    def get_all_token_usage(self, days: int = 30) -> list[dict]:
-        """Collection group query across all users/{uid}/token_usage/"""
+    @staticmethod
+    def _usage_cutoff(days: int) -> datetime:
         from datetime import timedelta
         import pytz
-        cutoff = datetime.now(pytz.utc) - timedelta(days=days)
-        # No where() filter to avoid requiring a composite index — filter in Python
-        docs = self.db.collection_group('token_usage').stream()
-        results = []
-        for doc in docs:
-            data = doc.to_dict()
-            # Skip docs outside the date range
-            ts = data.get('timestamp')
-            if ts is not None:
-                ts_aware = ts.replace(tzinfo=pytz.utc) if ts.tzinfo is None else ts
-                if ts_aware < cutoff:
-                    continue
-            # Extract uid from path: users/{uid}/token_usage/{doc_id}
-            uid = doc.reference.path.split('/')[1]
-            data['uid'] = uid
-            # Convert Firestore timestamps to ISO strings in user timezone
-            if hasattr(data.get('timestamp'), 'isoformat'):
-                user_tz = pytz.timezone(os.getenv("USER_TIMEZONE", "America/Chicago"))
-                ts_val = data['timestamp']
-                if ts_val.tzinfo is None:
-                    ts_val = pytz.utc.localize(ts_val)
-                data['timestamp'] = ts_val.astimezone(user_tz).isoformat()
-            results.append(data)
-        return results
-
-    def get_all_conversations(self, days: int = 30) -> list[dict]:
-        """Collection group query across all users/{uid}/conversations/"""
-        from datetime import timedelta
+        return datetime.now(pytz.utc) - timedelta(days=days)
+
+    @staticmethod
+    def _token_usage_record(doc) -> dict:
+        """A token_usage document as returned to the admin dashboard."""
         import pytz
-        cutoff = datetime.now(pytz.utc) - timedelta(days=days)
-        # No where() filter to avoid requiring a composite index — filter in Python
-        docs = self.db.collection_group('conversations').stream()
-        results = []
+        data = doc.to_dict()
+        # Extract uid from path: users/{uid}/token_usage/{doc_id}
+        data['uid'] = doc.reference.path.split('/')[1]
+        # Convert Firestore timestamps to ISO strings in user timezone
+        if hasattr(data.get('timestamp'), 'isoformat'):
+            user_tz = pytz.timezone(os.getenv("USER_TIMEZONE", "America/Chicago"))
+            ts_val = data['timestamp']
+            if ts_val.tzinfo is None:
+                ts_val = pytz.utc.localize(ts_val)
+            data['timestamp'] = ts_val.astimezone(user_tz).isoformat()
+        return data
+
+    def get_usage_daily(self, days: int = 30) -> list[dict]:
+        """
+        Daily usage aggregates across all users, for the last *days* days.
+
+        One row per (user, day, model, endpoint) from a range query on the
+        usage_daily collection group — the cost depends on the window, not on
+        how much history has built up.
+
+        Returns:
+            Dicts with uid, day, model, provider, endpoint, calls, token
+            totals, ttft_buckets and last_activity (ISO string, user timezone)
+        """
+        start_day = _usage_day(self._usage_cutoff(days))
+        docs = (
+            self.db.collection_group(USAGE_DAILY_COLLECTION)
+            .where(filter=FieldFilter("day", ">=", start_day))
+            .stream()
+        )
+        import pytz
+        user_tz = pytz.timezone(os.getenv("USER_TIMEZONE", "America/Chicago"))
+        rows = []
         for doc in docs:
             data = doc.to_dict()
-            # Skip docs outside the date range
-            la = data.get('last_activity')
-            if la is not None:
-                la_aware = la.replace(tzinfo=pytz.utc) if la.tzinfo is None else la
-                if la_aware < cutoff:
-                    continue
-            uid = doc.reference.path.split('/')[1]
-            data['uid'] = uid
-            data['conversation_id'] = doc.id
-            # Convert timestamps
-            for key in ('created_at', 'last_activity'):
-                if hasattr(data.get(key), 'isoformat'):
-                    data[key] = data[key].isoformat()
-            results.append(data)
-        return results
+            last_activity = data.get('last_activity')
+            if hasattr(last_activity, 'isoformat'):
+                if last_activity.tzinfo is None:
+                    last_activity = pytz.utc.localize(last_activity)
+                data['last_activity'] = last_activity.astimezone(user_tz).isoformat()
+            rows.append(data)
+        return rows
+
+    def write_tool_events(self, events: List[Dict]) -> None:
+        """
+        Append tool execution events to the tool_events log.
+
+        Args:
+            events: Event dicts (see backend.tool_events), written with
+                    auto IDs in batches of FIRESTORE_BATCH_LIMIT
+        """
+        collection = self.db.collection(TOOL_EVENTS_COLLECTION)
+        for start in range(0, len(events), FIRESTORE_BATCH_LIMIT):
+            batch = self.db.batch()
+            for event in events[start:start + FIRESTORE_BATCH_LIMIT]:
+                batch.set(collection.document(), event)
+            batch.commit()
+
+    def get_tool_events(self, days: int = 30) -> list[dict]:
+        """
+        Tool execution events across all users, for the last *days* days.
+
+        A range query on the log's day field, projected to the fields
+        analytics needs.
+
+        Returns:
+            Dicts with uid, tool, day, latency_ms and success
+        """
+        start_day = _usage_day(self._usage_cutoff(days))
+        docs = (
+            self.db.collection(TOOL_EVENTS_COLLECTION)
+            .where(filter=FieldFilter("day", ">=", start_day))
+            .select(TOOL_EVENT_FIELDS)
+            .stream()
+        )
+        return [doc.to_dict() for doc in docs]
+
+    def get_token_usage_page(
+        self,
+        days: int = 30,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        uid: Optional[str] = None,
+    ) -> dict:
+        """
+        One page of raw token_usage records, newest first.
+
+        Args:
+            days: Only records from the last *days* days
+            limit: Page size
+            cursor: next_cursor from the previous page
+            uid: Only this user's records (reads their subcollection directly)
+
+        Returns:
+            {"records": [...], "next_cursor": str | None}
+
+        Raises:
+            ValueError: If cursor is malformed
+        """
+        if uid:
+            query = self.db.collection("users").document(uid).collection("token_usage")
+        else:
+            query = self.db.collection_group('token_usage')
+        # Timestamps aren't unique across users; the document path breaks ties
+        query = (
+            query.where(filter=FieldFilter("timestamp", ">=", self._usage_cutoff(days)))
+            .order_by("timestamp", direction=firestore.Query.DESCENDING)
+            .order_by("__name__", direction=firestore.Query.DESCENDING)
+        )
+        if cursor:
+            timestamp, _, path = cursor.partition("|")
+            if not path.startswith("users/"):
+                raise ValueError(f"Invalid token usage cursor: {cursor!r}")
+            query = query.start_after({
+                "timestamp": datetime.fromisoformat(timestamp),
+                "__name__": self.db.document(path),
+            })
+
+        docs = list(query.limit(limit + 1).stream())
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            last = docs[-1]
+            next_cursor = f"{last.to_dict()['timestamp'].isoformat()}|{last.reference.path}"
+        return {
+            "records": [self._token_usage_record(doc) for doc in docs],
+            "next_cursor": next_cursor,
+        }
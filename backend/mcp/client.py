@@ -13,6 +13,7 @@ import json
 import logging
 import base64
 import asyncio
+import time
 from pathlib import Path
 from typing import Optional, Dict, Any
 from datetime import date
@@ -25,6 +26,9 @@ from mcp.client.stdio import stdio_client
 
 from backend.system_prompts import get_expense_parsing_system_prompt
 from backend.model_client import UnifiedModelClient, SUPPORTED_MODELS, DEFAULT_MODEL
+from backend.mcp.tool_catalog import get_tool_definitions
+from backend.mcp.tool_dispatch import run_tool_calls
+from backend.tool_events import record_tool_event
 
 
 class MCPClient:
@@ -89,58 +93,39 @@ class ExpenseMCPClient:
 
     def __init__(self):
         """Initialize the expense MCP client."""
-        self.client: Optional[MCPClient] = None
+        # MCPSessionPool once started; exposes .session like an MCPClient
+        self.client = None
         self.server_path = os.path.join(
             os.path.dirname(__file__),
             'expense_server.py'
         )
 
-    def _patch_category_enum(self, input_schema: dict, category_ids: list) -> dict:
-        """
-        Recursively patch category enum values in a tool's input schema.
-
-        This allows dynamic categories to be used in MCP tools instead of
-        the hardcoded ExpenseType enum.
-
-        Args:
-            input_schema: The tool's input schema (JSON Schema format)
-            category_ids: List of user's category IDs
-
-        Returns:
-            Patched schema with updated category enum
-        """
-        import copy
-
-        schema = copy.deepcopy(input_schema)
-
-        def patch_properties(properties: dict):
-            for prop_name, prop_schema in properties.items():
-                # Check if this property is a category field with enum
-                if prop_name == "category" and "enum" in prop_schema:
-                    prop_schema["enum"] = category_ids
-
-        # Patch top-level properties
-        if "properties" in schema:
-            patch_properties(schema["properties"])
-
-        return schema
-
     async def startup(self):
         """
         Start the MCP client and connect to expense server.
 
-        This spawns the expense_server.py as a subprocess and establishes
-        stdio connection for tool calls.
+        This spawns a pool of expense_server.py subprocesses (MCP_POOL_SIZE)
+        and establishes stdio connections for tool calls. With
+        USE_INPROCESS_TOOLS=true the tool handlers run in this process instead.
 
         Raises:
-            Exception: If connection fails
+            Exception: If no server in the pool could be started
         """
-        logger.info("Starting MCP client...")
-        self.client = MCPClient()
+        from .inprocess_tools import USE_INPROCESS_TOOLS, InProcessToolClient
+        from .session_pool import MCPSessionPool
 
-        # Connect to expense server
-        await self.client.connect_to_server(self.server_path)
-        logger.info("MCP client connected to expense server")
+        if USE_INPROCESS_TOOLS:
+            logger.info("Starting in-process MCP tools...")
+            tools = InProcessToolClient()
+            await tools.start()
+            self.client = tools
+            return
+
+        logger.info("Starting MCP client...")
+        pool = MCPSessionPool(self.server_path)
+        await pool.start()
+        self.client = pool
+        logger.info("MCP client connected to expense server pool (%d servers)", pool.size)
 
     async def process_expense_message(
         self,
@@ -188,18 +173,19 @@ class ExpenseMCPClient:
             raise RuntimeError("MCP client not initialized. Call startup() first.")
 
         # Get or create conversation in Firestore
-        from backend.firebase_client import FirebaseClient
+        from backend.async_firebase_client import AsyncFirebaseClient
+        from backend.chat_helpers import MAX_CONVERSATION_MESSAGES
         from datetime import datetime, timedelta
         import pytz
 
         user_firebase = None
         conversation_messages = []
         if user_id:
-            user_firebase = FirebaseClient.for_user(user_id)
+            user_firebase = AsyncFirebaseClient.for_user(user_id)
 
             # Check if existing conversation is stale (>1 hour idle)
             if conversation_id:
-                existing_conv = user_firebase.get_conversation(conversation_id)
+                existing_conv = await user_firebase.get_conversation(conversation_id)
                 if existing_conv:
                     last_activity = existing_conv.get("last_activity")
                     if last_activity:
@@ -220,27 +206,30 @@ class ExpenseMCPClient:
                             logger.info("Conversation %s is stale (>1 hour), creating new one", conversation_id)
                             conversation_id = None  # Will create new one below
                         else:
-                            # Get existing messages for context
-                            conversation_messages = existing_conv.get("messages", [])
+                            # Get existing messages for context (tail only)
+                            page = await user_firebase.get_conversation_messages(
+                                conversation_id, limit=MAX_CONVERSATION_MESSAGES
+                            )
+                            conversation_messages = page["messages"]
                 else:
                     conversation_id = None  # Conversation not found, create new
 
             # Create new conversation if none provided or stale
             if not conversation_id:
-                conversation_id = user_firebase.create_conversation()
+                conversation_id = await user_firebase.create_conversation()
 
         # Get recent expenses for context from Firestore conversation
         recent_expenses = []
         if user_firebase and conversation_id:
-            recent_expenses = user_firebase.get_conversation_recent_expenses(conversation_id, limit=5)
+            recent_expenses = await user_firebase.get_conversation_recent_expenses(conversation_id, limit=5)
 
         # Get user's custom categories for dynamic prompts and tool schemas
         user_categories = None
         if user_firebase:
             # Ensure categories are set up (silent migration)
-            if not user_firebase.has_categories_setup():
-                user_firebase.migrate_from_budget_caps()
-            user_categories = user_firebase.get_user_categories()
+            if not await user_firebase.has_categories_setup():
+                await user_firebase.migrate_from_budget_caps()
+            user_categories = await user_firebase.get_user_categories()
 
         # Build message content
         message_content = []
@@ -287,29 +276,10 @@ class ExpenseMCPClient:
         # Get system prompt with user's categories
         system_prompt = get_expense_parsing_system_prompt(user_categories)
 
-        # Get available tools from MCP server
-        response = await self.client.session.list_tools()
-        available_tools = []
-
-        # Build category enum from user's categories (or fallback to ExpenseType)
-        if user_categories:
-            category_enum = [cat.get("category_id") for cat in user_categories]
-        else:
-            from backend.output_schemas import ExpenseType
-            category_enum = [e.name for e in ExpenseType]
-
-        # Patch tool schemas: use user's dynamic categories and strip auth_token
-        # (auth_token is injected server-side before execution, models should never see it)
-        for tool in response.tools:
-            patched_schema = self._patch_category_enum(tool.inputSchema, category_enum)
-            props = {k: v for k, v in patched_schema.get("properties", {}).items() if k != "auth_token"}
-            required = [r for r in patched_schema.get("required", []) if r != "auth_token"]
-            tool_schema = {
-                "name": tool.name,
-                "description": tool.description,
-                "input_schema": {**patched_schema, "properties": props, "required": required},
-            }
-            available_tools.append(tool_schema)
+        # Tool schemas patched with the user's dynamic categories and with
+        # auth_token stripped (it's injected server-side before execution,
+        # models should never see it). Memoized per category set; don't mutate.
+        available_tools = await get_tool_definitions(self.client.session, "anthropic", user_categories)
 
         # Build messages with conversation history
         messages = []
@@ -329,7 +299,7 @@ class ExpenseMCPClient:
         model_client = UnifiedModelClient(model)
         provider = SUPPORTED_MODELS[model]["provider"]
 
-        response = model_client.create(
+        response = await model_client.acreate(
             system=system_prompt,
             messages=messages,
             tools=available_tools,
@@ -337,9 +307,11 @@ class ExpenseMCPClient:
 
         # Log token usage for initial call
         if user_firebase and user_id:
-            user_firebase.log_token_usage(
+            await user_firebase.log_token_usage(
                 user_id, model, provider,
-                response.input_tokens, response.output_tokens, "process_expense"
+                response.input_tokens, response.output_tokens, "process_expense",
+                cache_read_tokens=response.cache_read_tokens,
+                cache_write_tokens=response.cache_write_tokens,
             )
 
         # Track expense data from tool results
@@ -365,21 +337,30 @@ class ExpenseMCPClient:
                 final_text.append(response.content)
                 assistant_content.append({"type": "text", "text": response.content})
 
+            pending_calls = []
             for tc in response.tool_calls:
-                tool_name = tc.name
                 tool_args = tc.arguments
-                tool_use_id = tc.id
-
-                logger.info("Calling tool: %s", tool_name)
 
                 # Inject auth_token into tool arguments for multi-user support
                 # The model doesn't know the auth token, so we inject it here.
                 # MCP server will verify the token with Firebase Auth.
                 if auth_token:
                     tool_args = {**tool_args, "auth_token": auth_token}
+                pending_calls.append((tc.name, tool_args))
+
+            async def call_tool(tool_name: str, tool_args: dict) -> str:
+                logger.info("Calling tool: %s", tool_name)
 
                 # Execute tool call via MCP
-                result = await self.client.session.call_tool(tool_name, tool_args)
+                started = time.perf_counter()
+                try:
+                    result = await self.client.session.call_tool(tool_name, tool_args)
+                except Exception as exc:
+                    record_tool_event(
+                        tool_name, user_id, (time.perf_counter() - started) * 1000,
+                        json.dumps({"error": str(exc)}), source="process_expense",
+                    )
+                    raise
 
                 # Parse tool result
                 if hasattr(result, 'content') and result.content:
@@ -393,6 +374,17 @@ class ExpenseMCPClient:
                 else:
                     result_text = str(result)
 
+                record_tool_event(
+                    tool_name, user_id, (time.perf_counter() - started) * 1000,
+                    result_text, source="process_expense",
+                )
+                return result_text
+
+            # Read-only calls overlap, writes run alone; results arrive in call order
+            async for index, result_text in run_tool_calls(pending_calls, call_tool):
+                tool_name, tool_args = pending_calls[index]
+                tool_use_id = response.tool_calls[index].id
+
                 # Extract data from tool results
                 try:
                     result_data = json.loads(result_text)
@@ -406,7 +398,7 @@ class ExpenseMCPClient:
 
                         # Update Firestore conversation with new expense
                         if user_firebase and conversation_id and expense_data["expense_id"]:
-                            user_firebase.update_conversation_recent_expenses(
+                            await user_firebase.update_conversation_recent_expenses(
                                 conversation_id=conversation_id,
                                 expense_id=expense_data["expense_id"],
                                 expense_name=expense_data["expense_name"],
@@ -423,7 +415,7 @@ class ExpenseMCPClient:
 
                         # Update Firestore conversation with updated expense details
                         if user_firebase and conversation_id and expense_data["expense_id"]:
-                            user_firebase.update_conversation_recent_expenses(
+                            await user_firebase.update_conversation_recent_expenses(
                                 conversation_id=conversation_id,
                                 expense_id=expense_data["expense_id"],
                                 expense_name=expense_data["expense_name"],
@@ -469,7 +461,7 @@ class ExpenseMCPClient:
             })
 
             # Get next response from model - WITH TOOLS so it can call more!
-            response = model_client.create(
+            response = await model_client.acreate(
                 system=system_prompt,
                 messages=messages,
                 tools=available_tools,
@@ -477,9 +469,11 @@ class ExpenseMCPClient:
 
             # Log token usage for each subsequent call
             if user_firebase and user_id:
-                user_firebase.log_token_usage(
+                await user_firebase.log_token_usage(
                     user_id, model, provider,
-                    response.input_tokens, response.output_tokens, "process_expense"
+                    response.input_tokens, response.output_tokens, "process_expense",
+                    cache_read_tokens=response.cache_read_tokens,
+                    cache_write_tokens=response.cache_write_tokens,
                 )
 
         # Process final response (no more tool calls)
@@ -493,11 +487,11 @@ class ExpenseMCPClient:
         if user_firebase and conversation_id:
             # Store user message
             user_message = text or "[Image/Audio input]"
-            user_firebase.add_message_to_conversation(conversation_id, "user", user_message)
+            turn = [{"role": "user", "content": user_message}]
 
             # Store assistant response
             if expense_data["message"]:
-                user_firebase.add_message_to_conversation(conversation_id, "assistant", expense_data["message"])
+                turn.append({"role": "assistant", "content": expense_data["message"]})
 
             # Generate summary from the interaction
             summary_parts = []
@@ -506,7 +500,11 @@ class ExpenseMCPClient:
                 summary_parts.append(f"{action} ${expense_data.get('amount', 0):.2f} {expense_data['expense_name']}")
             if not summary_parts:
                 summary_parts.append(text[:50] if text else "Expense interaction")
-            user_firebase.update_conversation_summary(conversation_id, ", ".join(summary_parts))
+
+            # Messages and summary in one commit
+            await user_firebase.append_conversation_messages(
+                conversation_id, turn, summary=", ".join(summary_parts)
+            )
 
         # Include conversation_id in response
         expense_data["conversation_id"] = conversation_id
@@ -517,7 +515,7 @@ class ExpenseMCPClient:
         """
         Clean up MCP client resources.
 
-        This closes the stdio connection and terminates the server subprocess.
+        This closes the stdio connections and terminates the server subprocesses.
         """
         if self.client:
             logger.info("Shutting down MCP client...")
@@ -18,6 +18,7 @@ Usage:
 """
 
 import asyncio
+import heapq
 import sys
 import os
 from datetime import datetime
@@ -33,9 +34,11 @@ from mcp.types import Tool, TextContent
 
 # Import backend modules
 from backend.firebase_client import FirebaseClient
+from backend.async_firebase_client import AsyncFirebaseClient, run_blocking
 from backend.budget_manager import BudgetManager
 from backend.output_schemas import Expense, ExpenseType, Date, RecurringExpense, FrequencyType
 from backend.exceptions import DocumentNotFoundError, InvalidCategoryError
+from backend.token_cache import verify_id_token_cached
 
 
 # Initialize global Firebase client for categories (read-only, shared)
@@ -81,6 +84,8 @@ def verify_token_and_get_uid(auth_token: str) -> str:
     Verify Firebase Auth token and extract user ID.
 
     Firebase Auth does the cryptographic verification - we just read the result.
+    Successful verifications are cached until the token expires, so the several
+    tool calls in one chat turn verify the token once.
 
     Args:
         auth_token: Firebase ID token from client
@@ -95,7 +100,7 @@ def verify_token_and_get_uid(auth_token: str) -> str:
 
     try:
         # Firebase verifies: signature, expiry, issuer, audience
-        decoded_token = firebase_auth.verify_id_token(auth_token)
+        decoded_token = verify_id_token_cached(auth_token)
         return decoded_token["uid"]
     except firebase_auth.InvalidIdTokenError:
         raise ValueError("Invalid authentication token")
@@ -105,9 +110,9 @@ def verify_token_and_get_uid(auth_token: str) -> str:
         raise ValueError(f"Token verification failed: {str(e)}")
 
 
-def get_user_firebase(arguments: dict) -> FirebaseClient:
+def get_user_firebase(arguments: dict) -> AsyncFirebaseClient:
     """
-    Get a user-scoped FirebaseClient from tool arguments.
+    Get a user-scoped AsyncFirebaseClient from tool arguments.
 
     Verifies the auth token with Firebase Auth before creating the client.
 
@@ -115,7 +120,7 @@ def get_user_firebase(arguments: dict) -> FirebaseClient:
         arguments: Tool arguments dict containing 'auth_token'
 
     Returns:
-        FirebaseClient scoped to the verified user
+        AsyncFirebaseClient scoped to the verified user
 
     Raises:
         ValueError: If auth_token is missing or invalid
@@ -126,7 +131,7 @@ def get_user_firebase(arguments: dict) -> FirebaseClient:
 
     # Firebase Auth verifies the token and gives us the uid
     user_id = verify_token_and_get_uid(auth_token)
-    return FirebaseClient.for_user(user_id)
+    return AsyncFirebaseClient.for_user(user_id)
 
 
 def get_user_budget_manager(arguments: dict) -> BudgetManager:
@@ -142,10 +147,10 @@ def get_user_budget_manager(arguments: dict) -> BudgetManager:
         BudgetManager scoped to the verified user
     """
     firebase = get_user_firebase(arguments)
-    return BudgetManager(firebase)
+    return BudgetManager(firebase.sync)
 
 
-def validate_category(category_str: str, firebase: FirebaseClient) -> str:
+async def validate_category(category_str: str, firebase: AsyncFirebaseClient) -> str:
     """
     Validate that a category exists for the user and return the canonical category ID.
 
@@ -154,7 +159,7 @@ def validate_category(category_str: str, firebase: FirebaseClient) -> str:
 
     Args:
         category_str: Category ID or display name to validate
-        firebase: User-scoped FirebaseClient
+        firebase: User-scoped AsyncFirebaseClient
 
     Returns:
         The canonical category_id as stored in Firestore
@@ -163,14 +168,20 @@ def validate_category(category_str: str, firebase: FirebaseClient) -> str:
         InvalidCategoryError: If category does not exist
     """
     # Check if user has custom categories set up
-    if firebase.has_categories_setup():
-        categories = firebase.get_user_categories()
+    if await firebase.has_categories_setup():
         needle = category_str.lower()
-        for cat in categories:
-            if cat.get("category_id", "").lower() == needle:
-                return cat["category_id"]
-            if cat.get("display_name", "").lower() == needle:
-                return cat["category_id"]
+        # The category list is cached per process; if the category isn't found,
+        # reload once in case it was just created through the API server. A
+        # match is confirmed with an uncached read, since it may just have been
+        # deleted through the API server.
+        for attempt in range(2):
+            if attempt:
+                await firebase.invalidate_user_cache()
+            for cat in await firebase.get_user_categories():
+                if needle in (cat.get("category_id", "").lower(), cat.get("display_name", "").lower()):
+                    if await firebase.category_exists(cat["category_id"]):
+                        return cat["category_id"]
+                    break
         raise InvalidCategoryError(category_str)
     else:
         # Fallback to ExpenseType enum for backward compatibility
@@ -345,8 +356,9 @@ async def handle_list_tools() -> list[Tool]:
         Tool(
             name="search_expenses",
             description=(
-                "Search for expenses by name using substring matching. "
-                "Searches current month by default, or specify a date range. "
+                "Search for expenses by name across the user's whole history. "
+                "Matches whole or partial words (case-insensitive); results are ranked "
+                "by how well the name matches, then most recent first. "
                 "Also supports filtering by category."
             ),
             inputSchema={
@@ -686,7 +698,7 @@ async def _save_expense(arguments: dict) -> list[TextContent]:
 
     # Validate category against user's categories and resolve to canonical ID
     try:
-        category_str = validate_category(category_str, firebase)
+        category_str = await validate_category(category_str, firebase)
     except InvalidCategoryError:
         return [TextContent(
             type="text",
@@ -712,11 +724,11 @@ async def _save_expense(arguments: dict) -> list[TextContent]:
     )
 
     # Save expense - override category in save to use string
-    expense_id = firebase.save_expense(expense, input_type="mcp", category_str=category_str)
+    expense_id = await firebase.save_expense(expense, input_type="mcp", category_str=category_str)
 
     # Get friendly display name for category
-    if firebase.has_categories_setup():
-        user_cats = firebase.get_user_categories()
+    if await firebase.has_categories_setup():
+        user_cats = await firebase.get_user_categories()
         category_display_name = next(
             (c.get("display_name", category_str) for c in user_cats if c.get("category_id") == category_str),
             category_str
@@ -727,7 +739,7 @@ async def _save_expense(arguments: dict) -> list[TextContent]:
     # Load user period settings and compute the budget period for this expense's date
     from backend.period_calculator import get_period_containing_date
     from datetime import date as _date
-    period_settings = firebase.get_budget_period_settings(firebase.user_id)
+    period_settings = await firebase.get_budget_period_settings(firebase.user_id)
     expense_period = get_period_containing_date(
         target_date=_date(expense_date.year, expense_date.month, expense_date.day),
         month_start_day=period_settings.get("budget_month_start_day", 1),
@@ -735,7 +747,8 @@ async def _save_expense(arguments: dict) -> list[TextContent]:
 
     # Get budget status (warning + remaining amounts) in the same call
     user_budget_manager = get_user_budget_manager(arguments)
-    budget_data = user_budget_manager.get_budget_status_data(
+    budget_data = await run_blocking(
+        user_budget_manager.get_budget_status_data,
         category_id=category_str,
         amount=amount,
         year=expense_date.year,
@@ -790,7 +803,7 @@ async def _get_budget_status(arguments: dict) -> list[TextContent]:
 
     # Validate category
     try:
-        validate_category(category_str, firebase)
+        await validate_category(category_str, firebase)
     except InvalidCategoryError:
         return [TextContent(
             type="text",
@@ -801,7 +814,7 @@ async def _get_budget_status(arguments: dict) -> list[TextContent]:
     from backend.period_calculator import get_period_containing_date
     from datetime import date as _date
     firebase = get_user_firebase(arguments)
-    period_settings = firebase.get_budget_period_settings(firebase.user_id)
+    period_settings = await firebase.get_budget_period_settings(firebase.user_id)
     today = _date.today()
     if year == today.year and month == today.month:
         target_date = today
@@ -815,7 +828,8 @@ async def _get_budget_status(arguments: dict) -> list[TextContent]:
 
     # Get user-scoped budget manager and get structured budget status
     user_budget_manager = get_user_budget_manager(arguments)
-    budget_data = user_budget_manager.get_budget_status_data(
+    budget_data = await run_blocking(
+        user_budget_manager.get_budget_status_data,
         category_id=category_str,
         amount=amount,
         year=year,
@@ -848,8 +862,8 @@ async def _get_categories(arguments: dict) -> list[TextContent]:
     firebase = get_user_firebase(arguments)
 
     # Check if user has custom categories
-    if firebase.has_categories_setup():
-        user_categories = firebase.get_user_categories()
+    if await firebase.has_categories_setup():
+        user_categories = await firebase.get_user_categories()
         categories = []
         for cat in user_categories:
             categories.append({
@@ -908,7 +922,7 @@ async def _update_expense(arguments: dict) -> list[TextContent]:
     # Validate category if provided and resolve to canonical ID
     if category_str:
         try:
-            category_str = validate_category(category_str, firebase)
+            category_str = await validate_category(category_str, firebase)
         except InvalidCategoryError:
             return [TextContent(
                 type="text",
@@ -926,7 +940,7 @@ async def _update_expense(arguments: dict) -> list[TextContent]:
 
     # Update expense
     try:
-        firebase.update_expense(
+        await firebase.update_expense(
             expense_id=expense_id,
             expense_name=expense_name,
             amount=amount,
@@ -941,7 +955,7 @@ async def _update_expense(arguments: dict) -> list[TextContent]:
         )]
 
     # Get updated expense to return details
-    updated_expense = firebase.get_expense_by_id(expense_id)
+    updated_expense = await firebase.get_expense_by_id(expense_id)
 
     result = {
         "success": True,
@@ -975,7 +989,7 @@ async def _delete_expense(arguments: dict) -> list[TextContent]:
     firebase = get_user_firebase(arguments)
 
     # Get expense details before deleting (for confirmation message)
-    expense = firebase.get_expense_by_id(expense_id)
+    expense = await firebase.get_expense_by_id(expense_id)
 
     if not expense:
         return [TextContent(
@@ -985,7 +999,7 @@ async def _delete_expense(arguments: dict) -> list[TextContent]:
 
     # Delete expense
     try:
-        firebase.delete_expense(expense_id)
+        await firebase.delete_expense(expense_id)
     except DocumentNotFoundError:
         return [TextContent(
             type="text",
@@ -1037,7 +1051,7 @@ async def _get_recent_expenses(arguments: dict) -> list[TextContent]:
             )]
 
     # Get recent expenses
-    expenses = firebase.get_recent_expenses_from_db(
+    expenses = await firebase.get_recent_expenses_from_db(
         limit=limit,
         category=category_obj
     )
@@ -1092,15 +1106,15 @@ async def _search_expenses(arguments: dict) -> list[TextContent]:
                 text=f"Error: Invalid category '{category_str}'"
             )]
 
-    # Search expenses (defaults to current month)
-    expenses = firebase.search_expenses_in_db(
+    # Indexed search over the whole history, best matches first
+    search = await firebase.search_expenses_in_db(
         text_query=query,
         category=category_obj
     )
 
     # Format expenses for response
     formatted_expenses = []
-    for exp in expenses:
+    for exp in search["expenses"]:
         formatted_expenses.append({
             "id": exp.get("id"),
             "name": exp.get("expense_name"),
@@ -1112,8 +1126,12 @@ async def _search_expenses(arguments: dict) -> list[TextContent]:
     result = {
         "query": query,
         "count": len(formatted_expenses),
-        "expenses": formatted_expenses
+        "expenses": formatted_expenses,
+        "truncated": search["truncated"],
     }
+    if search["truncated"]:
+        # Too many candidates to read them all; older matches may be missing
+        result["note"] = "Only the most recent matches were searched. Narrow the query or add a category to search further back."
 
     import json
     return [TextContent(type="text", text=json.dumps(result))]
@@ -1155,7 +1173,7 @@ async def _create_recurring_expense(arguments: dict) -> list[TextContent]:
 
     # Validate category against user's categories
     try:
-        validate_category(category_str, firebase)
+        await validate_category(category_str, firebase)
     except InvalidCategoryError:
         return [TextContent(type="text", text=json.dumps({
             "success": False,
@@ -1225,7 +1243,7 @@ async def _create_recurring_expense(arguments: dict) -> list[TextContent]:
     )
 
     # Save recurring expense with custom category string
-    template_id = firebase.save_recurring_expense(recurring, category_str=category_str)
+    template_id = await firebase.save_recurring_expense(recurring, category_str=category_str)
 
     result = {
         "success": True,
@@ -1248,10 +1266,11 @@ async def _create_recurring_expense(arguments: dict) -> list[TextContent]:
             date=Date(day=expense_date.day, month=expense_date.month, year=expense_date.year),
             category=category
         )
-        expense_id = firebase.save_expense(expense, input_type="recurring", category_str=category_str)
+        expense_id = await firebase.save_expense(expense, input_type="recurring", category_str=category_str)
 
         # Update recurring template to prevent duplicate pending creation
-        firebase.update_recurring_expense(template_id, {
+        recurring.last_reminded = today_date
+        await firebase.update_recurring_expense(template_id, {
             "last_reminded": {
                 "day": today.day,
                 "month": today.month,
@@ -1261,7 +1280,8 @@ async def _create_recurring_expense(arguments: dict) -> list[TextContent]:
                 "day": today.day,
                 "month": today.month,
                 "year": today.year
-            }
+            },
+            "next_trigger_date": RecurringManager.calculate_due_date(recurring).isoformat(),
         })
 
         result["initial_expense_logged"] = True
@@ -1292,7 +1312,7 @@ async def _list_recurring_expenses(arguments: dict) -> list[TextContent]:
     firebase = get_user_firebase(arguments)
 
     # Get recurring expenses from Firebase
-    recurring_list = firebase.get_all_recurring_expenses(active_only=active_only)
+    recurring_list = await firebase.get_all_recurring_expenses(active_only=active_only)
 
     # Format for response
     formatted_expenses = []
@@ -1346,7 +1366,7 @@ async def _delete_recurring_expense(arguments: dict) -> list[TextContent]:
     firebase = get_user_firebase(arguments)
 
     # Get the expense first to return details
-    recurring = firebase.get_recurring_expense(template_id)
+    recurring = await firebase.get_recurring_expense(template_id)
 
     if not recurring:
         return [TextContent(type="text", text=json.dumps({
@@ -1355,7 +1375,7 @@ async def _delete_recurring_expense(arguments: dict) -> list[TextContent]:
         }))]
 
     # Delete the recurring expense
-    firebase.delete_recurring_expense(template_id)
+    await firebase.delete_recurring_expense(template_id)
 
     result = {
         "success": True,
@@ -1423,7 +1443,7 @@ async def _query_expenses(arguments: dict) -> list[TextContent]:
         category = ExpenseType[arguments["category"]]
 
     # Get expenses
-    expenses = firebase.get_expenses_in_date_range(start_date, end_date, category)
+    expenses = await firebase.get_expenses_in_date_range(start_date, end_date, category)
 
     # Filter by min_amount if provided
     min_amount = arguments.get("min_amount")
@@ -1481,34 +1501,31 @@ async def _get_spending_by_category(arguments: dict) -> list[TextContent]:
     # Get user-scoped Firebase client
     firebase = get_user_firebase(arguments)
 
-    # Get category totals
-    category_totals = firebase.get_spending_by_category(start_date, end_date)
-
-    # Get detailed expenses for transaction counts
-    expenses = firebase.get_expenses_in_date_range(start_date, end_date)
+    # The breakdown lists every transaction, so read them once (only the
+    # fields shown) and total in memory
+    rows = await firebase.get_expenses_in_date_range(
+        start_date, end_date, fields=["expense_name", "amount", "date", "date_key", "category"]
+    )
 
-    # Count transactions per category
-    category_counts = {}
-    for exp in expenses:
-        cat = exp.get("category", "OTHER")
-        category_counts[cat] = category_counts.get(cat, 0) + 1
+    # Group transactions by category, most recent first
+    by_category = {}
+    for row in sorted(rows, key=lambda row: row.date_key or 0, reverse=True):
+        by_category.setdefault(row.category or "OTHER", []).append(row)
 
     # Build detailed breakdown with transaction names
     breakdown = []
-    for category, total in category_totals.items():
-        cat_expenses = [e for e in expenses if e.get("category") == category]
-
+    for category, cat_rows in by_category.items():
         breakdown.append({
             "category": category,
-            "total": total,
-            "count": category_counts.get(category, 0),
+            "total": sum(row.amount or 0 for row in cat_rows),
+            "count": len(cat_rows),
             "transactions": [
                 {
-                    "name": e.get("expense_name"),
-                    "amount": e.get("amount"),
-                    "date": e.get("date")
+                    "name": row.expense_name,
+                    "amount": row.amount,
+                    "date": row.date
                 }
-                for e in cat_expenses
+                for row in cat_rows
             ]
         })
 
@@ -1516,7 +1533,7 @@ async def _get_spending_by_category(arguments: dict) -> list[TextContent]:
     breakdown.sort(key=lambda x: x["total"], reverse=True)
 
     # Overall total
-    overall_total = sum(category_totals.values())
+    overall_total = sum(entry["total"] for entry in breakdown)
 
     result = {
         "breakdown": breakdown,
@@ -1560,8 +1577,8 @@ async def _get_spending_summary(arguments: dict) -> list[TextContent]:
     # Get user-scoped Firebase client
     firebase = get_user_firebase(arguments)
 
-    # Get spending data
-    summary = firebase.get_total_spending_for_range(start_date, end_date)
+    # Server-side sum()/count(); no expense documents are read
+    summary = await firebase.get_total_spending_for_range(start_date, end_date)
 
     # Calculate average per transaction
     average = summary["total"] / summary["count"] if summary["count"] > 0 else 0
@@ -1606,35 +1623,35 @@ async def _get_budget_remaining(arguments: dict) -> list[TextContent]:
     user_budget_manager = get_user_budget_manager(arguments)
 
     # Load user period settings and compute current period
-    period_settings = firebase.get_budget_period_settings(firebase.user_id)
+    period_settings = await firebase.get_budget_period_settings(firebase.user_id)
     current_period = get_current_period(
         month_start_day=period_settings.get("budget_month_start_day", 1),
         as_of=_date(now.year, now.month, now.day),
     )
 
     # Get spending by category for the current period
-    category_spending = user_budget_manager.get_period_spending_by_category(current_period)
+    category_spending = await run_blocking(user_budget_manager.get_period_spending_by_category, current_period)
 
     # Get all budget caps (prefer user custom categories, fall back to legacy caps)
     specific_category = arguments.get("category")
 
-    if firebase.has_categories_setup():
-        user_cats = firebase.get_user_categories()
+    if await firebase.has_categories_setup():
+        user_cats = await firebase.get_user_categories()
         # Build prorated cap map
         all_caps = {
             cat["category_id"]: prorate_cap(cat.get("monthly_cap", 0), current_period)
             for cat in user_cats
             if cat.get("monthly_cap", 0) > 0
         }
-        total_monthly_cap = firebase.get_total_monthly_budget() or 0
+        total_monthly_cap = await firebase.get_total_monthly_budget() or 0
         total_cap = prorate_cap(total_monthly_cap, current_period) if total_monthly_cap > 0 else 0
     else:
         all_caps = {}
         for expense_type in ExpenseType:
-            cap = firebase.get_budget_cap(expense_type.name)
+            cap = await firebase.get_budget_cap(expense_type.name)
             if cap:
                 all_caps[expense_type.name] = prorate_cap(cap, current_period)
-        total_cap_raw = firebase.get_budget_cap("TOTAL") or 0
+        total_cap_raw = await firebase.get_budget_cap("TOTAL") or 0
         total_cap = prorate_cap(total_cap_raw, current_period) if total_cap_raw > 0 else 0
 
     if specific_category:
@@ -1739,13 +1756,13 @@ async def _compare_periods(arguments: dict) -> list[TextContent]:
     if "category" in arguments and arguments["category"]:
         category = ExpenseType[arguments["category"]]
 
-    # Get expenses for both periods
-    p1_expenses = firebase.get_expenses_in_date_range(p1_start, p1_end, category)
-    p2_expenses = firebase.get_expenses_in_date_range(p2_start, p2_end, category)
-
-    # Calculate totals
-    p1_total = sum(exp.get("amount", 0) for exp in p1_expenses)
-    p2_total = sum(exp.get("amount", 0) for exp in p2_expenses)
+    # Server-side sum()/count() for both periods, in parallel
+    p1_summary, p2_summary = await asyncio.gather(
+        firebase.get_total_spending_for_range(p1_start, p1_end, category),
+        firebase.get_total_spending_for_range(p2_start, p2_end, category),
+    )
+    p1_total = p1_summary["total"]
+    p2_total = p2_summary["total"]
 
     # Calculate difference
     difference = p2_total - p1_total
@@ -1756,13 +1773,13 @@ async def _compare_periods(arguments: dict) -> list[TextContent]:
             "start": arguments["period1_start"],
             "end": arguments["period1_end"],
             "total": p1_total,
-            "count": len(p1_expenses)
+            "count": p1_summary["count"]
         },
         "period2": {
             "start": arguments["period2_start"],
             "end": arguments["period2_end"],
             "total": p2_total,
-            "count": len(p2_expenses)
+            "count": p2_summary["count"]
         },
         "comparison": {
             "difference": difference,
@@ -1814,22 +1831,23 @@ async def _get_largest_expenses(arguments: dict) -> list[TextContent]:
     if "category" in arguments and arguments["category"]:
         category = ExpenseType[arguments["category"]]
 
-    # Get all expenses
-    expenses = firebase.get_expenses_in_date_range(start_date, end_date, category)
+    # Read only the fields the result needs
+    rows = await firebase.get_expenses_in_date_range(
+        start_date, end_date, category, fields=["expense_name", "amount", "date", "category"]
+    )
 
-    # Sort by amount (highest first) and take top 3
-    expenses.sort(key=lambda x: x.get("amount", 0), reverse=True)
-    top_3 = expenses[:3]
+    # Top 3 by amount (highest first)
+    top_3 = heapq.nlargest(3, rows, key=lambda row: row.amount or 0)
 
     result = {
         "largest_expenses": [
             {
-                "name": exp.get("expense_name"),
-                "amount": exp.get("amount"),
-                "date": exp.get("date"),
-                "category": exp.get("category")
+                "name": row.expense_name,
+                "amount": row.amount,
+                "date": row.date,
+                "category": row.category
             }
-            for exp in top_3
+            for row in top_3
         ],
         "start_date": start_date_dict,
         "end_date": end_date_dict
@@ -0,0 +1,71 @@
+"""
+In-Process Tool Client - Calls expense_server.py's tool handlers directly.
+
+By default every tool call is serialized to JSON-RPC, written to an
+expense_server.py subprocess over stdio and parsed back. With
+USE_INPROCESS_TOOLS=true the API process imports expense_server and awaits
+``handle_call_tool`` itself, skipping the hop. Tool schemas, input validation
+and result shapes (ListToolsResult / CallToolResult) match the subprocess, so
+callers can't tell the modes apart. The subprocess pool remains the default
+for isolation.
+
+Running in-process also means tool writes go through the API process's own
+FirebaseClient caches, so they invalidate immediately instead of after a TTL.
+"""
+
+import logging
+import os
+from typing import Optional
+
+import jsonschema
+from mcp.types import CallToolResult, ListToolsResult, TextContent
+
+logger = logging.getLogger(__name__)
+
+USE_INPROCESS_TOOLS = os.getenv("USE_INPROCESS_TOOLS", "").lower() == "true"
+
+
+class InProcessToolClient:
+    """Drop-in for MCPSessionPool that runs tool handlers in this process."""
+
+    def __init__(self):
+        self._server = None
+        self._tools: dict = {}
+
+    async def start(self) -> None:
+        """Import the tool handlers and load their schemas."""
+        from . import expense_server
+
+        self._server = expense_server
+        tools = await expense_server.handle_list_tools()
+        self._tools = {tool.name: tool for tool in tools}
+        logger.info("In-process MCP tools ready: %s", list(self._tools))
+
+    async def cleanup(self) -> None:
+        """Nothing to release; kept for interface parity with MCPSessionPool."""
+
+    # ==================== ClientSession facade ====================
+
+    @property
+    def session(self) -> "InProcessToolClient":
+        return self
+
+    async def list_tools(self) -> ListToolsResult:
+        return ListToolsResult(tools=list(self._tools.values()))
+
+    async def call_tool(self, name: str, arguments: Optional[dict] = None) -> CallToolResult:
+        arguments = arguments or {}
+
+        # Same input validation the MCP server applies before dispatching
+        tool = self._tools.get(name)
+        if tool:
+            try:
+                jsonschema.validate(instance=arguments, schema=tool.inputSchema)
+            except jsonschema.ValidationError as e:
+                return CallToolResult(
+                    content=[TextContent(type="text", text=f"Input validation error: {e.message}")],
+                    isError=True,
+                )
+
+        content = await self._server.handle_call_tool(name, arguments)
+        return CallToolResult(content=list(content), isError=False)
@@ -0,0 +1,258 @@
+"""
+MCP Session Pool - Several expense_server.py subprocesses behind one session facade.
+
+A single stdio ClientSession funnels every tool call in the API process
+through one pipe and one server process. MCPSessionPool runs MCP_POOL_SIZE
+server subprocesses and dispatches each request to the least-busy healthy one.
+
+Each pooled server is owned by a supervisor task that connects, waits until
+the server needs restarting (failed health check, failed call, or shutdown),
+and cleans up in the same task — the stdio transport's task groups must be
+exited by the task that entered them. Crashed servers are respawned with
+exponential backoff.
+
+The pool exposes ``session`` (itself) with ``list_tools``/``call_tool`` so it
+can be passed anywhere an MCPClient with a ClientSession is expected.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+from typing import Any, Callable, Optional
+
+try:
+    from mcp.shared.exceptions import McpError
+except ImportError:  # mcp 2.x renamed it
+    from mcp.shared.exceptions import MCPError as McpError
+
+from .client import MCPClient
+
+logger = logging.getLogger(__name__)
+
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+MCP_HEALTH_CHECK_INTERVAL = float(os.getenv("MCP_HEALTH_CHECK_INTERVAL", "30"))
+MCP_HEALTH_CHECK_TIMEOUT = float(os.getenv("MCP_HEALTH_CHECK_TIMEOUT", "5"))
+MCP_ACQUIRE_TIMEOUT = float(os.getenv("MCP_ACQUIRE_TIMEOUT", "15"))
+
+
+class _PooledServer:
+    """Bookkeeping for one server subprocess in the pool."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.client: Optional[MCPClient] = None
+        self.healthy = False
+        self.in_flight = 0
+        self.calls = 0
+        self.failures = 0
+        self.restarts = 0
+        self.last_used = 0
+        self.restart = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def stats(self) -> dict:
+        return {
+            "index": self.index,
+            "healthy": self.healthy,
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "failures": self.failures,
+            "restarts": self.restarts,
+        }
+
+
+class MCPSessionPool:
+    """Pool of MCP server subprocesses with least-busy dispatch."""
+
+    def __init__(
+        self,
+        server_path: str,
+        size: int = MCP_POOL_SIZE,
+        client_factory: Callable[[], MCPClient] = MCPClient,
+        health_check_interval: float = MCP_HEALTH_CHECK_INTERVAL,
+    ):
+        """
+        Args:
+            server_path: Path to the MCP server script (.py)
+            size: Number of server subprocesses
+            client_factory: Builds an unconnected MCPClient (overridable in tests)
+            health_check_interval: Seconds between ping sweeps (0 disables)
+        """
+        self.server_path = server_path
+        self.size = max(1, size)
+        self._client_factory = client_factory
+        self._health_check_interval = health_check_interval
+        self._servers = [_PooledServer(i) for i in range(self.size)]
+        self._available = asyncio.Condition()
+        self._closing = False
+        self._health_task: Optional[asyncio.Task] = None
+        self._ticket = itertools.count(1)
+
+    # ==================== Lifecycle ====================
+
+    async def start(self, timeout: float = 60.0) -> None:
+        """
+        Spawn every server and wait until at least one is ready.
+
+        Raises:
+            RuntimeError: If no server came up within *timeout* seconds
+        """
+        for server in self._servers:
+            server.task = asyncio.create_task(self._supervise(server))
+
+        try:
+            await asyncio.wait_for(self._wait_for_healthy(), timeout)
+        except asyncio.TimeoutError:
+            await self.close()
+            raise RuntimeError("No MCP server in the pool started successfully")
+
+        if self._health_check_interval > 0:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+        logger.info("MCP session pool started (%d/%d servers healthy)", self.healthy_count, self.size)
+
+    async def close(self) -> None:
+        """Stop health checks and shut every server down."""
+        self._closing = True
+        if self._health_task:
+            self._health_task.cancel()
+        for server in self._servers:
+            server.restart.set()
+        tasks = [s.task for s in self._servers if s.task]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info("MCP session pool closed")
+
+    async def cleanup(self) -> None:
+        """Alias for close() so the pool can stand in for an MCPClient."""
+        await self.close()
+
+    async def _supervise(self, server: _PooledServer) -> None:
+        """Own one server subprocess: connect, wait for a restart signal, clean up, repeat."""
+        backoff = 1.0
+        while not self._closing:
+            client = self._client_factory()
+            try:
+                await client.connect_to_server(self.server_path)
+            except Exception as e:
+                logger.error("MCP pool server %d failed to start: %s", server.index, e)
+                try:
+                    await client.cleanup()
+                except Exception:
+                    pass
+                try:
+                    await asyncio.wait_for(server.restart.wait(), backoff)
+                except asyncio.TimeoutError:
+                    pass
+                server.restart.clear()
+                backoff = min(backoff * 2, 30.0)
+                continue
+
+            backoff = 1.0
+            server.client = client
+            server.healthy = True
+            async with self._available:
+                self._available.notify_all()
+
+            await server.restart.wait()
+            server.restart.clear()
+            server.healthy = False
+            server.client = None
+            try:
+                await client.cleanup()
+            except Exception as e:
+                logger.debug("MCP pool server %d cleanup error: %s", server.index, e)
+
+            if not self._closing:
+                server.restarts += 1
+                logger.warning("Respawning MCP pool server %d (restart #%d)", server.index, server.restarts)
+
+    # ==================== Health Checks ====================
+
+    async def _health_loop(self) -> None:
+        while not self._closing:
+            await asyncio.sleep(self._health_check_interval)
+            await asyncio.gather(*(self._check(server) for server in self._servers if server.healthy))
+
+    async def _check(self, server: _PooledServer) -> bool:
+        """Ping one server; schedule a respawn if it doesn't answer."""
+        client = server.client
+        if not client or not client.session:
+            return False
+        try:
+            await asyncio.wait_for(client.session.send_ping(), MCP_HEALTH_CHECK_TIMEOUT)
+            return True
+        except Exception as e:
+            logger.warning("MCP pool server %d failed health check: %s", server.index, e)
+            if server.client is client:
+                server.healthy = False
+                server.restart.set()
+            return False
+
+    async def check_health(self) -> list[bool]:
+        """Ping every server now. Returns per-server health."""
+        return list(await asyncio.gather(*(self._check(server) for server in self._servers)))
+
+    # ==================== Dispatch ====================
+
+    @property
+    def healthy_count(self) -> int:
+        return sum(1 for server in self._servers if server.healthy)
+
+    async def _wait_for_healthy(self) -> None:
+        async with self._available:
+            await self._available.wait_for(lambda: self.healthy_count > 0 or self._closing)
+
+    async def _acquire(self) -> _PooledServer:
+        """Pick the healthy server with the fewest in-flight requests."""
+        if self.healthy_count == 0:
+            try:
+                await asyncio.wait_for(self._wait_for_healthy(), MCP_ACQUIRE_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
+        candidates = [server for server in self._servers if server.healthy]
+        if not candidates or self._closing:
+            raise RuntimeError("No healthy MCP server available")
+
+        # Ties go to the server used longest ago so idle load spreads evenly
+        server = min(candidates, key=lambda s: (s.in_flight, s.last_used))
+        server.in_flight += 1
+        server.calls += 1
+        server.last_used = next(self._ticket)
+        return server
+
+    async def _dispatch(self, method: str, *args, **kwargs) -> Any:
+        server = await self._acquire()
+        client = server.client
+        try:
+            return await getattr(client.session, method)(*args, **kwargs)
+        except McpError:
+            # Protocol-level error reply: the server is alive
+            raise
+        except Exception:
+            server.failures += 1
+            asyncio.create_task(self._check(server))
+            raise
+        finally:
+            server.in_flight -= 1
+
+    # ==================== ClientSession facade ====================
+
+    @property
+    def session(self) -> "MCPSessionPool":
+        return self
+
+    async def list_tools(self):
+        return await self._dispatch("list_tools")
+
+    async def call_tool(self, name: str, arguments: Optional[dict] = None):
+        return await self._dispatch("call_tool", name, arguments)
+
+    def stats(self) -> dict:
+        """Per-server dispatch and health counters."""
+        return {
+            "size": self.size,
+            "healthy": self.healthy_count,
+            "servers": [server.stats() for server in self._servers],
+        }
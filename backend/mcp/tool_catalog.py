@@ -0,0 +1,190 @@
+"""
+Tool Catalog - MCP tool list fetched once per connection, provider tool definitions memoized.
+
+Every chat/voice request used to call ``session.list_tools()`` and then
+deep-copy every tool's inputSchema to patch the ``category`` enum with the
+user's category IDs and strip ``auth_token``. The tool list only changes when
+the server does, and the patched definitions only depend on the provider's
+tool format and the user's category IDs, so:
+
+- The ListToolsResult is cached per MCP session object (an MCPSessionPool,
+  InProcessToolClient, or a ConnectionManager ClientSession). A reconnect
+  produces a new session and therefore a fresh fetch.
+- Built tool definitions are memoized per (catalog, provider, category-id
+  tuple) in a bounded LRU, so users with the same categories share one list.
+
+Memoized lists are shared between requests: callers must treat them as
+read-only and copy before modifying.
+"""
+
+import copy
+import itertools
+import logging
+import os
+import weakref
+from typing import Any, Dict, List, Optional, Sequence
+
+from backend.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+TOOL_CATALOG_CACHE_SIZE = int(os.getenv("TOOL_CATALOG_CACHE_SIZE", "256"))
+
+# Definitions never go stale for a given catalog; the TTL only bounds how long
+# an unused entry can linger between LRU evictions.
+_DEFINITION_TTL_SECONDS = 24 * 3600
+
+# Tool formats: Anthropic input_schema (canonical, also fed to UnifiedModelClient)
+# and OpenAI function format (Responses API and the Realtime API share it)
+TOOL_FORMATS = ("anthropic", "openai", "realtime")
+
+
+def patch_category_enum(input_schema: dict, category_ids: Sequence[str]) -> dict:
+    """
+    Return a copy of a tool's input schema with the ``category`` enum replaced.
+
+    This allows dynamic categories to be used in MCP tools instead of the
+    hardcoded ExpenseType enum.
+
+    Args:
+        input_schema: The tool's input schema (JSON Schema format)
+        category_ids: The user's category IDs
+
+    Returns:
+        Patched schema with updated category enum
+    """
+    schema = copy.deepcopy(input_schema)
+    for prop_name, prop_schema in schema.get("properties", {}).items():
+        if prop_name == "category" and "enum" in prop_schema:
+            prop_schema["enum"] = list(category_ids)
+    return schema
+
+
+def category_ids_for(user_categories: Optional[List[Dict]]) -> List[str]:
+    """Category enum for a user: their category IDs, or the ExpenseType names as a fallback."""
+    if user_categories:
+        return [cat.get("category_id") for cat in user_categories]
+    from backend.output_schemas import ExpenseType
+    return [e.name for e in ExpenseType]
+
+
+def _build_definition(tool: Any, provider: str, category_ids: Sequence[str]) -> dict:
+    """Patch one MCP tool and convert it to *provider*'s tool format."""
+    # auth_token is injected server-side before execution; models never see it
+    schema = patch_category_enum(tool.inputSchema, category_ids)
+    props = {k: v for k, v in schema.get("properties", {}).items() if k != "auth_token"}
+    required = [r for r in schema.get("required", []) if r != "auth_token"]
+    parameters = {**schema, "properties": props, "required": required}
+
+    if provider == "anthropic":
+        return {
+            "name": tool.name,
+            "description": tool.description,
+            "input_schema": parameters,
+        }
+    return {
+        "type": "function",
+        "name": tool.name,
+        "description": tool.description or "",
+        "parameters": parameters,
+    }
+
+
+class ToolCatalog:
+    """The tools advertised by one MCP connection."""
+
+    _versions = itertools.count(1)
+
+    def __init__(self, list_tools_result: Any):
+        self.list_tools_result = list_tools_result
+        self.tools = list(list_tools_result.tools)
+        self.version = next(self._versions)
+
+    def tool_definitions(self, provider: str, category_ids: Sequence[str]) -> List[dict]:
+        """
+        Tool definitions in *provider*'s format with the category enum patched.
+
+        Args:
+            provider: One of TOOL_FORMATS
+            category_ids: The user's category IDs (order matters for the enum)
+
+        Returns:
+            Shared, memoized list of tool dicts — do not mutate
+        """
+        if provider not in TOOL_FORMATS:
+            raise ValueError(f"Unknown tool format: {provider}")
+
+        key = (self.version, provider, tuple(category_ids))
+        definitions = _definition_cache.get(key)
+        if definitions is None:
+            definitions = [_build_definition(tool, provider, category_ids) for tool in self.tools]
+            _definition_cache.set(key, definitions)
+        return definitions
+
+
+_definition_cache = TTLCache(maxsize=TOOL_CATALOG_CACHE_SIZE, ttl=_DEFINITION_TTL_SECONDS)
+_catalogs: "weakref.WeakKeyDictionary[Any, ToolCatalog]" = weakref.WeakKeyDictionary()
+_catalog_stats = {"fetches": 0, "hits": 0}
+
+
+async def get_tool_catalog(session: Any) -> ToolCatalog:
+    """
+    Return the tool catalog for an MCP session, fetching it on first use.
+
+    Args:
+        session: Anything with an async ``list_tools()`` (``client.session``)
+
+    Returns:
+        ToolCatalog cached for the lifetime of *session*
+    """
+    catalog = _catalogs.get(session)
+    if catalog is not None:
+        _catalog_stats["hits"] += 1
+        return catalog
+
+    catalog = ToolCatalog(await session.list_tools())
+    _catalog_stats["fetches"] += 1
+    logger.info("Cached MCP tool catalog v%d (%d tools)", catalog.version, len(catalog.tools))
+    return _catalogs.setdefault(session, catalog)
+
+
+async def get_tool_definitions(
+    session: Any,
+    provider: str,
+    user_categories: Optional[List[Dict]] = None,
+) -> List[dict]:
+    """
+    Provider-formatted tool definitions for a user, from the cached catalog.
+
+    Args:
+        session: MCP session (``client.session``)
+        provider: One of TOOL_FORMATS
+        user_categories: User's custom categories for patching tool enums
+
+    Returns:
+        Shared, memoized list of tool dicts — do not mutate
+    """
+    catalog = await get_tool_catalog(session)
+    return catalog.tool_definitions(provider, category_ids_for(user_categories))
+
+
+def invalidate_tool_catalog(session: Any) -> None:
+    """Forget the catalog for *session* so the next request re-lists tools."""
+    _catalogs.pop(session, None)
+
+
+def get_tool_catalog_stats() -> dict:
+    """Catalog fetch counts and the tool-definition LRU's hit/miss counters."""
+    return {
+        "catalogs": len(_catalogs),
+        "catalog_fetches": _catalog_stats["fetches"],
+        "catalog_hits": _catalog_stats["hits"],
+        "definitions": _definition_cache.stats(),
+    }
+
+
+def clear_tool_catalog() -> None:
+    """Drop every cached catalog and tool definition (used by tests)."""
+    _catalogs.clear()
+    _definition_cache.clear()
+    _catalog_stats["fetches"] = _catalog_stats["hits"] = 0
@@ -0,0 +1,100 @@
+"""
+Tool Dispatch - Runs the tool calls from one model turn, overlapping read-only ones.
+
+A model turn can request several tools at once ("compare this month to last
+month and show my top categories"). Read-only tools don't depend on each
+other, so consecutive read-only calls are dispatched concurrently (up to
+MAX_PARALLEL_TOOLS at a time). Any tool that writes acts as a barrier: it runs
+alone, after every earlier call has finished and before any later call starts,
+so writes keep the order the model asked for.
+
+Results are always yielded in the original call order, so SSE events and
+content_blocks stay deterministic regardless of which call finishes first.
+"""
+
+import asyncio
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Sequence, TypeVar
+
+# Tools that only read Firestore. Anything not listed is treated as a write.
+READ_ONLY_TOOLS = frozenset({
+    "get_budget_status",
+    "get_categories",
+    "get_recent_expenses",
+    "search_expenses",
+    "list_recurring_expenses",
+    "query_expenses",
+    "get_spending_by_category",
+    "get_spending_summary",
+    "get_budget_remaining",
+    "compare_periods",
+    "get_largest_expenses",
+})
+
+# Max read-only tool calls in flight at once within a single model turn
+MAX_PARALLEL_TOOLS = int(os.getenv("MAX_PARALLEL_TOOLS", "4"))
+
+T = TypeVar("T")
+
+
+def plan_tool_batches(tool_names: Sequence[str]) -> list[list[int]]:
+    """
+    Group call indices into batches that may run concurrently.
+
+    Consecutive read-only calls share a batch; every other call gets a batch
+    of its own.
+
+    Args:
+        tool_names: Tool names in the order the model requested them
+
+    Returns:
+        List of batches, each a list of indices into tool_names
+    """
+    batches: list[list[int]] = []
+    for index, name in enumerate(tool_names):
+        if name in READ_ONLY_TOOLS and batches and tool_names[batches[-1][0]] in READ_ONLY_TOOLS:
+            batches[-1].append(index)
+        else:
+            batches.append([index])
+    return batches
+
+
+async def run_tool_calls(
+    calls: Sequence[tuple[str, dict]],
+    execute: Callable[[str, dict], Awaitable[T]],
+    max_parallel: int = MAX_PARALLEL_TOOLS,
+) -> AsyncIterator[tuple[int, T]]:
+    """
+    Execute tool calls, yielding (index, result) pairs in call order.
+
+    Each result is yielded as soon as it and every earlier call are done.
+    Exceptions from `execute` propagate when their call's turn comes; any
+    calls still in flight are cancelled if the caller stops iterating.
+
+    Args:
+        calls: (tool_name, tool_args) pairs in the order the model requested them
+        execute: Coroutine function that runs one tool call
+        max_parallel: Concurrency cap for read-only calls within this turn
+
+    Yields:
+        (index, result) tuples, index ascending
+    """
+    semaphore = asyncio.Semaphore(max(1, max_parallel))
+
+    async def bounded(name: str, args: dict) -> Any:
+        async with semaphore:
+            return await execute(name, args)
+
+    for batch in plan_tool_batches([name for name, _ in calls]):
+        if len(batch) == 1:
+            index = batch[0]
+            yield index, await execute(*calls[index])
+            continue
+
+        tasks = [asyncio.ensure_future(bounded(*calls[index])) for index in batch]
+        try:
+            for index, task in zip(batch, tasks):
+                yield index, await task
+        finally:
+            for task in tasks:
+                task.cancel()
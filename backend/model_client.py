@@ -12,14 +12,29 @@ Supported models:
 Tool format convention:
     Anthropic-style input_schema is the canonical format.
     The client converts to provider-specific formats internally.
+
+Async code should call acreate(), which uses the providers' async SDK clients
+and a per-call timeout; create() blocks the calling thread. astream() streams
+any provider as normalised StreamEvents (text deltas, tool calls, final
+response) and reports time-to-first-token on the final response.
 """
 
 from __future__ import annotations
 
 import os
+import time
+import asyncio
 import logging
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, AsyncIterator
+
+from .provider_clients import (
+    get_anthropic_client,
+    get_async_anthropic_client,
+    get_async_openai_client,
+    get_genai_client,
+    get_openai_client,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +49,21 @@ SUPPORTED_MODELS: dict[str, dict] = {
 
 DEFAULT_MODEL = "claude-haiku-4-5"
 
+# Per-call timeout for acreate() (and per-event stall timeout for astream());
+# the SDKs' own timeouts are much longer
+MODEL_CALL_TIMEOUT = float(os.getenv("MODEL_CALL_TIMEOUT", "120"))
+
+# Anthropic prompt caching: mark the tool block, the system prompt and the
+# conversation prefix with cache_control so repeated prefixes are billed as
+# cache reads. Prefixes under the model's minimum cacheable length are simply
+# not cached by the API.
+ANTHROPIC_PROMPT_CACHING = os.getenv("ANTHROPIC_PROMPT_CACHING", "true").lower() == "true"
+_EPHEMERAL = {"type": "ephemeral"}
+
+
+class ModelTimeoutError(TimeoutError):
+    """A model call didn't complete within its timeout."""
+
 
 @dataclass
 class ToolCall:
@@ -50,6 +80,19 @@ class ModelResponse:
     input_tokens: int
     output_tokens: int
     model: str
+    # Anthropic prompt-cache usage (input_tokens excludes both)
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    # Time to first streamed token/tool call (astream() only)
+    ttft_ms: float | None = None
+
+
+@dataclass
+class StreamEvent:
+    type: str                          # "text" | "tool_call" | "done"
+    text: str = ""
+    tool_call: ToolCall | None = None
+    response: ModelResponse | None = None  # set on "done"
 
 
 class UnifiedModelClient:
@@ -92,6 +135,9 @@ class UnifiedModelClient:
         """
         Call the appropriate provider and return a normalised ModelResponse.
 
+        Blocks the calling thread for the whole model call; async code should
+        use acreate() instead.
+
         Args:
             system:     System prompt string.
             messages:   Message list in Anthropic format
@@ -101,37 +147,257 @@ class UnifiedModelClient:
             max_tokens: Maximum tokens to generate.
         """
         if self.provider == "anthropic":
-            return self._call_anthropic(system, messages, tools, max_tokens)
+            request = self._anthropic_request(system, messages, tools, max_tokens)
+            return self._parse_anthropic(get_anthropic_client().messages.create(**request))
         elif self.provider == "openai":
-            return self._call_openai(system, messages, tools, max_tokens)
+            request = self._openai_request(system, messages, tools, max_tokens)
+            return self._parse_openai(get_openai_client().responses.create(**request))
         elif self.provider == "google":
-            return self._call_google(system, messages, tools, max_tokens)
+            request = self._google_request(system, messages, tools, max_tokens)
+            client = get_genai_client(request.pop("api_key"))
+            return self._parse_google(client.models.generate_content(**request), request["contents"])
         else:
             raise ValueError(f"Unknown provider: {self.provider}")
 
-    # ------------------------------------------------------------------
-    # Provider implementations
-    # ------------------------------------------------------------------
+    async def acreate(
+        self,
+        system: str,
+        messages: list[dict],
+        tools: list[dict],
+        max_tokens: int = 2000,
+        timeout: float | None = None,
+    ) -> ModelResponse:
+        """
+        Async version of create() using the providers' async SDK clients.
+
+        The event loop keeps serving other requests while the model call is in
+        flight. Cancelling the awaiting task aborts the HTTP request; for Gemini
+        the stored native history is only updated once a response arrives, so a
+        cancelled or timed-out call leaves the client reusable.
 
-    def _call_anthropic(
+        Args:
+            system:     System prompt string.
+            messages:   Message list in Anthropic format.
+            tools:      Tool definitions in Anthropic format.
+            max_tokens: Maximum tokens to generate.
+            timeout:    Seconds before the call is abandoned
+                        (defaults to MODEL_CALL_TIMEOUT; 0 disables).
+
+        Raises:
+            ModelTimeoutError: If the provider didn't answer within *timeout*.
+        """
+        timeout = MODEL_CALL_TIMEOUT if timeout is None else timeout
+        call = self._acall(system, messages, tools, max_tokens)
+        if not timeout:
+            return await call
+        try:
+            return await asyncio.wait_for(call, timeout)
+        except asyncio.TimeoutError:
+            raise ModelTimeoutError(f"{self.model} did not respond within {timeout:g}s") from None
+
+    async def _acall(
         self,
         system: str,
         messages: list[dict],
         tools: list[dict],
         max_tokens: int,
     ) -> ModelResponse:
-        from anthropic import Anthropic
+        if self.provider == "anthropic":
+            request = self._anthropic_request(system, messages, tools, max_tokens)
+            return self._parse_anthropic(await get_async_anthropic_client().messages.create(**request))
+        elif self.provider == "openai":
+            request = self._openai_request(system, messages, tools, max_tokens)
+            return self._parse_openai(await get_async_openai_client().responses.create(**request))
+        elif self.provider == "google":
+            request = self._google_request(system, messages, tools, max_tokens)
+            client = get_genai_client(request.pop("api_key"))
+            return self._parse_google(await client.aio.models.generate_content(**request), request["contents"])
+        else:
+            raise ValueError(f"Unknown provider: {self.provider}")
+
+    async def astream(
+        self,
+        system: str,
+        messages: list[dict],
+        tools: list[dict],
+        max_tokens: int = 2000,
+        timeout: float | None = None,
+    ) -> AsyncIterator[StreamEvent]:
+        """
+        Stream a model call as normalised events, whatever the provider.
 
-        client = Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+        Yields, in order:
+            StreamEvent("text", text=...)          for each text delta
+            StreamEvent("tool_call", tool_call=...) when a tool call begins
+                                                    (arguments may still be empty)
+            StreamEvent("done", response=...)       once, with the complete
+                                                    ModelResponse (full tool-call
+                                                    arguments, usage, ttft_ms)
 
-        response = client.messages.create(
+        Args:
+            system:     System prompt string.
+            messages:   Message list in Anthropic format.
+            tools:      Tool definitions in Anthropic format.
+            max_tokens: Maximum tokens to generate.
+            timeout:    Max seconds to wait for the next event
+                        (defaults to MODEL_CALL_TIMEOUT; 0 disables).
+
+        Raises:
+            ModelTimeoutError: If the stream stalls for longer than *timeout*.
+        """
+        timeout = MODEL_CALL_TIMEOUT if timeout is None else timeout
+        if self.provider == "anthropic":
+            events = self._stream_anthropic(system, messages, tools, max_tokens)
+        elif self.provider == "openai":
+            events = self._stream_openai(system, messages, tools, max_tokens)
+        elif self.provider == "google":
+            events = self._stream_google(system, messages, tools, max_tokens)
+        else:
+            raise ValueError(f"Unknown provider: {self.provider}")
+
+        start = time.perf_counter()
+        ttft_ms: float | None = None
+        try:
+            while True:
+                try:
+                    async with asyncio.timeout(timeout or None):
+                        event = await events.__anext__()
+                except StopAsyncIteration:
+                    return
+                except TimeoutError:
+                    raise ModelTimeoutError(f"{self.model} stream stalled for {timeout:g}s") from None
+
+                if event.type == "done":
+                    event.response.ttft_ms = ttft_ms
+                elif ttft_ms is None:
+                    ttft_ms = (time.perf_counter() - start) * 1000
+                yield event
+        finally:
+            await events.aclose()
+
+    async def _stream_anthropic(
+        self,
+        system: str,
+        messages: list[dict],
+        tools: list[dict],
+        max_tokens: int,
+    ) -> AsyncIterator[StreamEvent]:
+        request = self._anthropic_request(system, messages, tools, max_tokens)
+        async with get_async_anthropic_client().messages.stream(**request) as stream:
+            async for event in stream:
+                if event.type == "content_block_start" and event.content_block.type == "tool_use":
+                    block = event.content_block
+                    yield StreamEvent("tool_call", tool_call=ToolCall(id=block.id, name=block.name, arguments={}))
+                elif event.type == "content_block_delta" and getattr(event.delta, "type", None) == "text_delta":
+                    yield StreamEvent("text", text=event.delta.text)
+            final_message = await stream.get_final_message()
+        yield StreamEvent("done", response=self._parse_anthropic(final_message))
+
+    async def _stream_openai(
+        self,
+        system: str,
+        messages: list[dict],
+        tools: list[dict],
+        max_tokens: int,
+    ) -> AsyncIterator[StreamEvent]:
+        """Responses API streaming (responses.create(stream=True))."""
+        request = self._openai_request(system, messages, tools, max_tokens)
+        stream = await get_async_openai_client().responses.create(**request, stream=True)
+        final_response = None
+        async with stream:
+            async for event in stream:
+                event_type = getattr(event, "type", None)
+                if event_type == "response.output_text.delta":
+                    yield StreamEvent("text", text=event.delta)
+                elif event_type == "response.output_item.added" and getattr(event.item, "type", None) == "function_call":
+                    item = event.item
+                    yield StreamEvent("tool_call", tool_call=ToolCall(
+                        id=getattr(item, "call_id", None) or getattr(item, "id", ""),
+                        name=getattr(item, "name", ""),
+                        arguments={},
+                    ))
+                elif event_type in ("response.completed", "response.incomplete"):
+                    final_response = event.response
+                elif event_type in ("response.failed", "error"):
+                    error = getattr(getattr(event, "response", None), "error", None) or getattr(event, "message", None)
+                    raise RuntimeError(f"OpenAI stream failed: {error}")
+
+        if final_response is None:
+            raise RuntimeError("OpenAI stream ended without a final response")
+        yield StreamEvent("done", response=self._parse_openai(final_response))
+
+    async def _stream_google(
+        self,
+        system: str,
+        messages: list[dict],
+        tools: list[dict],
+        max_tokens: int,
+    ) -> AsyncIterator[StreamEvent]:
+        """Gemini streaming (generate_content_stream); function calls arrive whole."""
+        from google.genai import types
+
+        request = self._google_request(system, messages, tools, max_tokens)
+        client = get_genai_client(request.pop("api_key"))
+        all_contents = request["contents"]
+
+        parts: list = []
+        tool_calls: list[ToolCall] = []
+        text_parts: list[str] = []
+        usage = None
+        async for chunk in await client.aio.models.generate_content_stream(**request):
+            usage = chunk.usage_metadata or usage
+            candidate = chunk.candidates[0] if chunk.candidates else None
+            if not (candidate and candidate.content and candidate.content.parts):
+                continue
+            for part in candidate.content.parts:
+                parts.append(part)
+                if getattr(part, "text", None):
+                    text_parts.append(part.text)
+                    yield StreamEvent("text", text=part.text)
+                elif getattr(part, "function_call", None):
+                    fc = part.function_call
+                    tool_call = ToolCall(id=fc.name, name=fc.name, arguments=dict(fc.args or {}))
+                    tool_calls.append(tool_call)
+                    yield StreamEvent("tool_call", tool_call=tool_call)
+
+        # Replay the streamed parts verbatim next call (keeps thought_signatures)
+        self._gemini_native_contents = list(all_contents)
+        if parts:
+            self._gemini_native_contents.append(types.Content(role="model", parts=parts))
+
+        yield StreamEvent("done", response=ModelResponse(
+            content="".join(text_parts) or None,
+            tool_calls=tool_calls,
+            stop_reason="tool_use" if tool_calls else "end_turn",
+            input_tokens=usage.prompt_token_count if usage else 0,
+            output_tokens=usage.candidates_token_count if usage else 0,
             model=self.model,
-            system=system,
-            max_tokens=max_tokens,
-            messages=messages,
-            tools=tools,
-        )
+        ))
 
+    # ------------------------------------------------------------------
+    # Provider implementations
+    #
+    # Each provider has a request builder (kwargs for the SDK call) and a
+    # response parser, shared by the sync and async paths.
+    # ------------------------------------------------------------------
+
+    def _anthropic_request(
+        self,
+        system: str,
+        messages: list[dict],
+        tools: list[dict],
+        max_tokens: int,
+    ) -> dict:
+        system, messages, tools = apply_anthropic_prompt_cache(system, messages, tools)
+        return {
+            "model": self.model,
+            "system": system,
+            "max_tokens": max_tokens,
+            "messages": messages,
+            "tools": tools,
+        }
+
+    def _parse_anthropic(self, response: Any) -> ModelResponse:
         content_text: str | None = None
         tool_calls: list[ToolCall] = []
 
@@ -148,6 +414,7 @@ class UnifiedModelClient:
                 )
 
         stop_reason = "tool_use" if response.stop_reason == "tool_use" else "end_turn"
+        cache_read, cache_write = anthropic_cache_usage(response.usage)
 
         return ModelResponse(
             content=content_text,
@@ -156,35 +423,34 @@ class UnifiedModelClient:
             input_tokens=response.usage.input_tokens,
             output_tokens=response.usage.output_tokens,
             model=self.model,
+            cache_read_tokens=cache_read,
+            cache_write_tokens=cache_write,
         )
 
-    def _call_openai(
+    def _openai_request(
         self,
         system: str,
         messages: list[dict],
         tools: list[dict],
         max_tokens: int,
-    ) -> ModelResponse:
+    ) -> dict:
         """
-        Call OpenAI via the Responses API (client.responses.create).
+        Build a Responses API request (client.responses.create).
         """
-        from openai import OpenAI
-
-        client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-
         # Convert Anthropic-style tools to OpenAI function-calling format
         openai_tools = self._anthropic_tools_to_openai(tools)
 
         # Convert messages: Anthropic content lists → OpenAI strings
         openai_messages = self._anthropic_messages_to_openai(system, messages)
 
-        response = client.responses.create(
-            model=self.model,
-            input=openai_messages,
-            tools=openai_tools if openai_tools else [],
-            max_output_tokens=max_tokens,
-        )
+        return {
+            "model": self.model,
+            "input": openai_messages,
+            "tools": openai_tools if openai_tools else [],
+            "max_output_tokens": max_tokens,
+        }
 
+    def _parse_openai(self, response: Any) -> ModelResponse:
         content_text: str | None = None
         tool_calls: list[ToolCall] = []
 
@@ -222,24 +488,26 @@ class UnifiedModelClient:
             model=self.model,
         )
 
-    def _call_google(
+    def _google_request(
         self,
         system: str,
         messages: list[dict],
         tools: list[dict],
         max_tokens: int,
-    ) -> ModelResponse:
+    ) -> dict:
         """
-        Call Google Gemini via the google-genai SDK (google.genai).
+        Build a Gemini generate_content request (google.genai SDK).
 
         On the first call contents are built by converting the Anthropic-format
         messages.  The raw candidate.content returned by the API is then stored
-        in self._gemini_native_contents.  On subsequent calls only the latest
-        user message (tool result) is converted and appended — the stored native
-        content is replayed verbatim so that thought_signatures embedded in
-        function call parts are preserved.
+        in self._gemini_native_contents (by _parse_google).  On subsequent calls
+        only the latest user message (tool result) is converted and appended —
+        the stored native content is replayed verbatim so that
+        thought_signatures embedded in function call parts are preserved.
+
+        The returned dict also carries "api_key" for picking the client; pop it
+        before passing the rest to generate_content.
         """
-        from google import genai
         from google.genai import types
 
         api_key = os.environ.get("GOOGLE_API_KEY")
@@ -249,8 +517,6 @@ class UnifiedModelClient:
                 "Add it to your .env file to use Gemini models."
             )
 
-        client = genai.Client(api_key=api_key)
-
         # Convert Anthropic-style tools to Gemini format
         gemini_tools = self._anthropic_tools_to_gemini(tools)
 
@@ -288,12 +554,14 @@ class UnifiedModelClient:
             max_output_tokens=max_tokens,
         )
 
-        response = client.models.generate_content(
-            model=self.model,
-            contents=all_contents,
-            config=config,
-        )
+        return {
+            "api_key": api_key,
+            "model": self.model,
+            "contents": all_contents,
+            "config": config,
+        }
 
+    def _parse_google(self, response: Any, all_contents: list) -> ModelResponse:
         content_text: str | None = None
         tool_calls: list[ToolCall] = []
 
@@ -484,6 +752,75 @@ class UnifiedModelClient:
         return history, current_parts
 
 
+def _with_cache_breakpoint(message: dict) -> dict:
+    """Copy of *message* whose last content block carries cache_control."""
+    content = message.get("content")
+    if isinstance(content, str):
+        if not content:
+            return message
+        blocks = [{"type": "text", "text": content, "cache_control": _EPHEMERAL}]
+    elif isinstance(content, list) and content and isinstance(content[-1], dict):
+        blocks = content[:-1] + [{**content[-1], "cache_control": _EPHEMERAL}]
+    else:
+        return message
+    return {**message, "content": blocks}
+
+
+def apply_anthropic_prompt_cache(
+    system: str,
+    messages: list[dict],
+    tools: list[dict],
+) -> tuple[Any, list[dict], list[dict]]:
+    """
+    Place cache_control breakpoints on an Anthropic request.
+
+    The cached prefix is tools → system → messages, and Anthropic allows four
+    breakpoints per request:
+      1. the last tool definition (caches every tool schema)
+      2. the system prompt
+      3. the last message (written now, read by the next loop iteration)
+      4. the previous user message (the breakpoint the prior call wrote)
+
+    Inputs are never mutated: the tool list may be a shared memoized list and
+    the message list is reused across loop iterations.
+
+    Args:
+        system:   System prompt string.
+        messages: Message list in Anthropic format.
+        tools:    Tool definitions in Anthropic format.
+
+    Returns:
+        (system, messages, tools) to send. Unchanged when
+        ANTHROPIC_PROMPT_CACHING is off.
+    """
+    if not ANTHROPIC_PROMPT_CACHING:
+        return system, messages, tools
+
+    if tools:
+        tools = tools[:-1] + [{**tools[-1], "cache_control": _EPHEMERAL}]
+    if system:
+        system = [{"type": "text", "text": system, "cache_control": _EPHEMERAL}]
+
+    if messages:
+        messages = list(messages)
+        last = len(messages) - 1
+        messages[last] = _with_cache_breakpoint(messages[last])
+        for i in range(last - 1, -1, -1):
+            if messages[i].get("role") == "user":
+                messages[i] = _with_cache_breakpoint(messages[i])
+                break
+
+    return system, messages, tools
+
+
+def anthropic_cache_usage(usage: Any) -> tuple[int, int]:
+    """(cache_read_tokens, cache_write_tokens) from an Anthropic usage object."""
+    return (
+        getattr(usage, "cache_read_input_tokens", None) or 0,
+        getattr(usage, "cache_creation_input_tokens", None) or 0,
+    )
+
+
 def _json_type_to_gemini_type(json_type: str):
     """Map JSON Schema type strings to google.genai types.Type values."""
     from google.genai import types
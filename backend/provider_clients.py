@@ -0,0 +1,185 @@
+"""
+Provider Clients - Process-wide registry of LLM provider SDK clients.
+
+Constructing an SDK client (Anthropic, OpenAI, google-genai) also constructs
+a new httpx connection pool, so building one per model call pays a fresh
+TCP + TLS handshake on every call of every tool-loop iteration. The registry
+builds each client once, on an httpx pool with keep-alive (and HTTP/2 when
+the ``h2`` package is installed), and hands the same instance to every caller.
+
+Clients are keyed by API key so rotating a key in the environment takes
+effect on the next call. Async clients are additionally keyed by event loop,
+since an httpx.AsyncClient's connections belong to the loop that opened them.
+
+Call ``close_provider_clients()`` on app shutdown to drain the pools.
+
+Tuning (env):
+    PROVIDER_MAX_CONNECTIONS     max open connections per client (default 100)
+    PROVIDER_MAX_KEEPALIVE       idle connections kept per client (default 20)
+    PROVIDER_KEEPALIVE_EXPIRY    seconds an idle connection is kept (default 60)
+    PROVIDER_HTTP2               "false" to force HTTP/1.1 (default on if h2 is installed)
+    PROVIDER_TIMEOUT             request timeout in seconds (default 600)
+"""
+
+import asyncio
+import importlib.util
+import logging
+import os
+import threading
+import weakref
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+PROVIDER_MAX_CONNECTIONS = int(os.getenv("PROVIDER_MAX_CONNECTIONS", "100"))
+PROVIDER_MAX_KEEPALIVE = int(os.getenv("PROVIDER_MAX_KEEPALIVE", "20"))
+PROVIDER_KEEPALIVE_EXPIRY = float(os.getenv("PROVIDER_KEEPALIVE_EXPIRY", "60"))
+PROVIDER_TIMEOUT = float(os.getenv("PROVIDER_TIMEOUT", "600"))
+PROVIDER_HTTP2 = (
+    os.getenv("PROVIDER_HTTP2", "true").lower() == "true"
+    and importlib.util.find_spec("h2") is not None
+)
+
+_lock = threading.Lock()
+_sync_clients: Dict[Hashable, Any] = {}
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+_stats = {"created": 0, "reused": 0}
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=PROVIDER_MAX_CONNECTIONS,
+        max_keepalive_connections=PROVIDER_MAX_KEEPALIVE,
+        keepalive_expiry=PROVIDER_KEEPALIVE_EXPIRY,
+    )
+
+
+def _get_or_create(registry: Dict[Hashable, Any], key: Hashable, factory: Callable[[], Any]) -> Any:
+    with _lock:
+        client = registry.get(key)
+        if client is None:
+            client = factory()
+            registry[key] = client
+            _stats["created"] += 1
+            logger.info("Created %s client (http2=%s)", key[0], PROVIDER_HTTP2)
+        else:
+            _stats["reused"] += 1
+        return client
+
+
+def _get_async(key: Hashable, factory: Callable[[], Any]) -> Any:
+    loop = asyncio.get_running_loop()
+    with _lock:
+        registry = _async_clients.setdefault(loop, {})
+    return _get_or_create(registry, key, factory)
+
+
+# ==================== Anthropic ====================
+
+def get_anthropic_client(api_key: Optional[str] = None):
+    """Shared synchronous Anthropic client."""
+    import anthropic
+
+    api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
+    return _get_or_create(_sync_clients, ("anthropic", api_key), lambda: anthropic.Anthropic(
+        api_key=api_key,
+        timeout=PROVIDER_TIMEOUT,
+        http_client=anthropic.DefaultHttpxClient(http2=PROVIDER_HTTP2, limits=_limits()),
+    ))
+
+
+def get_async_anthropic_client(api_key: Optional[str] = None):
+    """Shared AsyncAnthropic client for the running event loop."""
+    import anthropic
+
+    api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
+    return _get_async(("async_anthropic", api_key), lambda: anthropic.AsyncAnthropic(
+        api_key=api_key,
+        timeout=PROVIDER_TIMEOUT,
+        http_client=anthropic.DefaultAsyncHttpxClient(http2=PROVIDER_HTTP2, limits=_limits()),
+    ))
+
+
+# ==================== OpenAI ====================
+
+def get_openai_client(api_key: Optional[str] = None):
+    """Shared synchronous OpenAI client."""
+    import openai
+
+    api_key = api_key or os.environ.get("OPENAI_API_KEY")
+    return _get_or_create(_sync_clients, ("openai", api_key), lambda: openai.OpenAI(
+        api_key=api_key,
+        timeout=PROVIDER_TIMEOUT,
+        http_client=openai.DefaultHttpxClient(http2=PROVIDER_HTTP2, limits=_limits()),
+    ))
+
+
+def get_async_openai_client(api_key: Optional[str] = None):
+    """Shared AsyncOpenAI client for the running event loop."""
+    import openai
+
+    api_key = api_key or os.environ.get("OPENAI_API_KEY")
+    return _get_async(("async_openai", api_key), lambda: openai.AsyncOpenAI(
+        api_key=api_key,
+        timeout=PROVIDER_TIMEOUT,
+        http_client=openai.DefaultAsyncHttpxClient(http2=PROVIDER_HTTP2, limits=_limits()),
+    ))
+
+
+# ==================== Google ====================
+
+def get_genai_client(api_key: Optional[str] = None):
+    """Shared google-genai client (keeps its own pooled HTTP session)."""
+    from google import genai
+
+    api_key = api_key or os.environ.get("GOOGLE_API_KEY")
+    return _get_or_create(_sync_clients, ("google", api_key), lambda: genai.Client(api_key=api_key))
+
+
+# ==================== Lifecycle ====================
+
+async def close_provider_clients() -> None:
+    """
+    Close every registered client's connection pool.
+
+    Async clients can only be closed on the loop that owns them, so clients
+    registered on other (already finished) loops are just dropped.
+    """
+    with _lock:
+        sync_clients = list(_sync_clients.values())
+        _sync_clients.clear()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        async_clients = list(_async_clients.pop(loop, {}).values()) if loop else []
+        _async_clients.clear()
+
+    for client in sync_clients:
+        try:
+            client.close()
+        except Exception as e:
+            logger.debug("Error closing provider client: %s", e)
+    for client in async_clients:
+        try:
+            await client.close()
+        except Exception as e:
+            logger.debug("Error closing async provider client: %s", e)
+
+    if sync_clients or async_clients:
+        logger.info("Closed %d provider clients", len(sync_clients) + len(async_clients))
+
+
+def get_provider_client_stats() -> dict:
+    """How many clients were built vs handed out again."""
+    with _lock:
+        return {
+            "http2": PROVIDER_HTTP2,
+            "sync_clients": len(_sync_clients),
+            "async_clients": sum(len(clients) for clients in _async_clients.values()),
+            **_stats,
+        }
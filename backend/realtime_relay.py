@@ -21,13 +21,15 @@ import os
 import json
 import asyncio
 import logging
-import copy
+import time
 from typing import Optional
 
 import websockets
 from websockets.exceptions import ConnectionClosed
 
+from backend.mcp.tool_catalog import get_tool_definitions
 from backend.system_prompts import get_expense_parsing_system_prompt
+from backend.tool_events import record_tool_event
 
 logger = logging.getLogger(__name__)
 
@@ -42,46 +44,16 @@ VOICE_PREAMBLE = (
 # Tool Schema Helpers
 # ---------------------------------------------------------------------------
 
-def _patch_category_enum(input_schema: dict, category_ids: list) -> dict:
-    schema = copy.deepcopy(input_schema)
-    props = schema.get("properties", {})
-    for prop_name, prop_schema in props.items():
-        if prop_name == "category" and "enum" in prop_schema:
-            prop_schema["enum"] = category_ids
-    return schema
-
-
 async def _build_realtime_tools(mcp_client, user_categories: Optional[list]) -> list:
     """
-    Fetch MCP tools and convert to OpenAI Realtime function format.
+    MCP tools in OpenAI Realtime function format, from the cached tool catalog.
 
     Key differences from Anthropic format:
     - Top-level key: 'parameters' (not 'input_schema')
     - auth_token stripped from properties/required
     - Category enum patched with user's categories
     """
-    from backend.output_schemas import ExpenseType
-
-    response = await mcp_client.client.session.list_tools()
-
-    if user_categories:
-        category_enum = [cat.get("category_id") for cat in user_categories]
-    else:
-        category_enum = [e.name for e in ExpenseType]
-
-    tools = []
-    for tool in response.tools:
-        patched = _patch_category_enum(tool.inputSchema, category_enum)
-        props = {k: v for k, v in patched.get("properties", {}).items() if k != "auth_token"}
-        required = [r for r in patched.get("required", []) if r != "auth_token"]
-        tools.append({
-            "type": "function",
-            "name": tool.name,
-            "description": tool.description or "",
-            "parameters": {**patched, "properties": props, "required": required},
-        })
-
-    return tools
+    return await get_tool_definitions(mcp_client.client.session, "realtime", user_categories)
 
 
 # ---------------------------------------------------------------------------
@@ -260,7 +232,12 @@ async def _oai_to_watch(watch_ws, oai_ws, user, mcp_client):
                         tool_args = {**tool_args, "auth_token": user.token}
 
                     # Execute via MCP
+                    started = time.perf_counter()
                     result_text = await _execute_tool(mcp_client, tool_name, tool_args)
+                    record_tool_event(
+                        tool_name, user.uid, (time.perf_counter() - started) * 1000,
+                        result_text, source="realtime",
+                    )
 
                     # Track save_expense result
                     if tool_name == "save_expense":
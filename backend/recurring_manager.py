@@ -381,6 +381,36 @@ class RecurringManager:
 
         return False, None
 
+    @staticmethod
+    def calculate_due_date(recurring: RecurringExpense, as_of_date: Optional[date] = None) -> Optional[date]:
+        """
+        Calculate the date on which a pending expense is next due for this template.
+
+        Stored on the template as next_trigger_date so the daily sweep can
+        query just the due templates. Matches should_create_pending: a
+        template is due once a trigger date has passed since last_reminded.
+
+        Args:
+            recurring: RecurringExpense object
+            as_of_date: Reference date for never-reminded templates (defaults to today)
+
+        Returns:
+            The due date (today or earlier means due now), or None if inactive
+        """
+        if not recurring.active:
+            return None
+
+        if recurring.last_reminded is None:
+            # Never reminded: the most recent trigger date is already due
+            return RecurringManager.calculate_most_recent_trigger_date(recurring, as_of_date)
+
+        last_reminded = date(
+            recurring.last_reminded.year,
+            recurring.last_reminded.month,
+            recurring.last_reminded.day
+        )
+        return RecurringManager.calculate_next_trigger_date(recurring, last_reminded)
+
     @staticmethod
     def should_log_initial_expense(recurring: RecurringExpense, today: Optional[date] = None) -> Tuple[bool, Optional[date]]:
         """
@@ -0,0 +1,157 @@
+"""
+Recurring Sweep - Creates pending expenses for every due recurring template.
+
+Run daily by Cloud Scheduler through /admin/check-recurring (and on startup
+in local dev). Each template stores next_trigger_date, the day its next
+pending expense is due (see RecurringManager.calculate_due_date). The sweep:
+
+  1. Runs one collection group query for active templates whose
+     next_trigger_date is today or earlier, so its cost depends on how many
+     templates are due rather than on how many users or templates exist.
+  2. Processes the due templates grouped by user, up to
+     RECURRING_SWEEP_CONCURRENCY users at a time. Each user costs one read
+     (their awaiting pending expenses) and one batched write.
+  3. Writes each pending expense in the same batch that advances its
+     template's last_reminded and next_trigger_date.
+
+The sweep is resumable. A finished user's templates are no longer due, so
+rerunning an interrupted or partly failed sweep only picks up what is left.
+Pending expense IDs are deterministic, so a batch that is re-applied
+overwrites rather than duplicates.
+
+Usage:
+    result = await run_recurring_sweep()
+    # {"created_count": 3, "templates_due": 4, "users_checked": 2, "timing": {...}, ...}
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import List, Optional
+
+from .async_firebase_client import AsyncFirebaseClient
+from .output_schemas import Date, RecurringExpense
+from .recurring_manager import RecurringManager, get_today_in_user_timezone
+
+logger = logging.getLogger(__name__)
+
+# Users processed concurrently (each is one read and one batched write)
+RECURRING_SWEEP_CONCURRENCY = int(os.getenv("RECURRING_SWEEP_CONCURRENCY", "8"))
+
+
+async def _sweep_user(uid: Optional[str], due: List[RecurringExpense]) -> dict:
+    """Create pending expenses for one user's due templates in one batched write."""
+    user_firebase = AsyncFirebaseClient.for_user(uid) if uid else AsyncFirebaseClient()
+    awaiting = await user_firebase.get_all_pending_expenses(awaiting_only=True)
+    awaiting_templates = {pending.get("template_id") for pending in awaiting}
+
+    today = get_today_in_user_timezone()
+    today_date = Date(day=today.day, month=today.month, year=today.year)
+
+    triggers = []
+    details = []
+    created = 0
+    repaired = 0
+    for recurring in due:
+        should_create, trigger_date = RecurringManager.should_create_pending(recurring)
+
+        if should_create and trigger_date:
+            if recurring.template_id in awaiting_templates:
+                # Stays due; re-checked daily until the user handles the pending one
+                details.append(f"Skipped {recurring.expense_name} - pending already exists")
+                continue
+
+            pending = RecurringManager.create_pending_expense_from_recurring(recurring, trigger_date)
+            recurring.last_reminded = today_date
+            triggers.append({
+                "template_id": recurring.template_id,
+                "updates": {
+                    "last_reminded": {"day": today.day, "month": today.month, "year": today.year},
+                    "next_trigger_date": RecurringManager.calculate_due_date(recurring).isoformat(),
+                },
+                "pending": pending,
+            })
+            created += 1
+            details.append(f"Created pending for {recurring.expense_name} (due {trigger_date.month}/{trigger_date.day})")
+        else:
+            # Stored due date was stale (e.g. last_reminded changed elsewhere)
+            due_date = RecurringManager.calculate_due_date(recurring)
+            triggers.append({
+                "template_id": recurring.template_id,
+                "updates": {"next_trigger_date": due_date.isoformat() if due_date else None},
+            })
+            repaired += 1
+
+    if triggers:
+        await user_firebase.apply_recurring_triggers(triggers)
+    return {"created": created, "repaired": repaired, "details": details}
+
+
+async def run_recurring_sweep(concurrency: Optional[int] = None) -> dict:
+    """
+    Create pending expenses for all due recurring templates, across all users.
+
+    A user whose batch fails is logged and listed in failed_users; their
+    templates stay due, so the next run retries them.
+
+    Args:
+        concurrency: Max users processed at once (default RECURRING_SWEEP_CONCURRENCY)
+
+    Returns:
+        dict with created_count, templates_due, users_checked, repaired_count,
+        failed_users, message, details and timing (query_ms, process_ms, total_ms)
+    """
+    started = time.perf_counter()
+    today = get_today_in_user_timezone()
+
+    due = await AsyncFirebaseClient().get_due_recurring_templates(today.isoformat())
+    queried = time.perf_counter()
+
+    by_user: dict = {}
+    for item in due:
+        by_user.setdefault(item["uid"], []).append(item["recurring"])
+
+    semaphore = asyncio.Semaphore(concurrency or RECURRING_SWEEP_CONCURRENCY)
+
+    async def sweep(uid: Optional[str], templates: List[RecurringExpense]):
+        async with semaphore:
+            try:
+                return uid, await _sweep_user(uid, templates)
+            except Exception:
+                logger.exception("Recurring sweep failed for user %s", uid)
+                return uid, None
+
+    results = await asyncio.gather(*(sweep(uid, templates) for uid, templates in by_user.items()))
+    finished = time.perf_counter()
+
+    created_count = 0
+    repaired_count = 0
+    failed_users = []
+    details = []
+    for uid, result in results:
+        if result is None:
+            failed_users.append(uid)
+            continue
+        created_count += result["created"]
+        repaired_count += result["repaired"]
+        details.extend(f"[{uid}] {detail}" if uid else detail for detail in result["details"])
+
+    message = f"Checked {len(by_user)} user(s), created {created_count} pending expense(s)"
+    if failed_users:
+        message += f", {len(failed_users)} user(s) failed (rerun to retry)"
+
+    return {
+        "created_count": created_count,
+        "templates_due": len(due),
+        "users_checked": len(by_user),
+        "repaired_count": repaired_count,
+        "failed_users": failed_users,
+        "message": message,
+        "details": details,
+        "timing": {
+            "query_ms": round((queried - started) * 1000, 1),
+            "process_ms": round((finished - queried) * 1000, 1),
+            "total_ms": round((finished - started) * 1000, 1),
+        },
+    }
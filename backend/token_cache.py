@@ -0,0 +1,69 @@
+"""
+Verified-token cache - Avoids re-verifying the same Firebase ID token.
+
+A chat turn verifies the caller's token once in the API (get_current_user) and
+again for every MCP tool call. Decoded tokens are cached keyed by a SHA-256 of
+the raw token and expire at the token's own `exp` claim, so a cached entry is
+never honoured past the point where verify_id_token would reject it.
+
+Only successful verifications are cached; failures always propagate. Each
+process (API server, MCP server subprocess) keeps its own bounded cache.
+"""
+
+import hashlib
+import os
+import time
+from typing import Callable, Optional
+
+import firebase_admin.auth as firebase_auth
+
+from .ttl_cache import TTLCache
+
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "1024"))
+
+# Firebase ID tokens live for one hour; per-entry TTLs come from `exp`
+_token_cache = TTLCache(maxsize=TOKEN_CACHE_MAX_ENTRIES, ttl=3600)
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def verify_id_token_cached(token: str, verifier: Optional[Callable[[str], dict]] = None) -> dict:
+    """
+    Verify a Firebase ID token, reusing a previous successful verification.
+
+    Args:
+        token: Raw Firebase ID token
+        verifier: Verification function (defaults to firebase_admin.auth.verify_id_token)
+
+    Returns:
+        Decoded token claims (a copy; safe to mutate)
+
+    Raises:
+        Whatever the verifier raises (InvalidIdTokenError, ExpiredIdTokenError, ...)
+    """
+    key = _token_key(token)
+    decoded = _token_cache.get(key)
+    if decoded is not None:
+        if decoded.get("exp", 0) > time.time():
+            return dict(decoded)
+        _token_cache.invalidate(key)
+
+    verify = verifier or firebase_auth.verify_id_token
+    decoded = verify(token)
+
+    remaining = decoded.get("exp", 0) - time.time()
+    if remaining > 0:
+        _token_cache.set(key, dict(decoded), ttl=remaining)
+    return dict(decoded)
+
+
+def get_token_cache_stats() -> dict:
+    """Return hit/miss counters for the verified-token cache."""
+    return _token_cache.stats()
+
+
+def clear_token_cache() -> None:
+    """Drop every cached token and reset the counters."""
+    _token_cache.clear()
@@ -0,0 +1,202 @@
+"""
+Tool Events - Append-only log of tool executions for analytics.
+
+Every tool call made for a chat turn, an expense parse or a realtime voice
+session is recorded as one compact event:
+
+    {uid, tool, source, latency_ms, result_bytes, success, day, timestamp}
+
+Events are buffered in memory and written to the top-level tool_events
+collection in batches — every TOOL_EVENT_FLUSH_SIZE events, or
+TOOL_EVENT_FLUSH_SECONDS after the first unwritten one — so recording never
+adds a Firestore round trip to the request. Failed writes stay buffered
+(up to TOOL_EVENT_MAX_BUFFER) for the next flush, and the buffer is flushed
+on shutdown.
+
+/admin/analytics reads tool usage and per-tool latency percentiles straight
+from this log instead of walking conversation messages.
+
+Usage:
+    started = time.perf_counter()
+    result_text = await session.call_tool(name, args)
+    record_tool_event(name, uid, (time.perf_counter() - started) * 1000, result_text, source="chat")
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from .async_firebase_client import AsyncFirebaseClient
+from .firebase_client import FIRESTORE_BATCH_LIMIT, _usage_day
+
+logger = logging.getLogger(__name__)
+
+# Flush once this many events are buffered...
+TOOL_EVENT_FLUSH_SIZE = int(os.getenv("TOOL_EVENT_FLUSH_SIZE", "50"))
+# ...or this long after the first unflushed event
+TOOL_EVENT_FLUSH_SECONDS = float(os.getenv("TOOL_EVENT_FLUSH_SECONDS", "10"))
+# Events kept while Firestore is unreachable; the oldest are dropped beyond this
+TOOL_EVENT_MAX_BUFFER = int(os.getenv("TOOL_EVENT_MAX_BUFFER", "5000"))
+
+_buffer: list[dict] = []
+_timer: Optional[asyncio.TimerHandle] = None
+_timer_loop: Optional[asyncio.AbstractEventLoop] = None
+_flushing: Optional[asyncio.Task] = None
+_stats = {"recorded": 0, "flushed": 0, "flushes": 0, "dropped": 0, "failed_flushes": 0}
+
+
+def tool_succeeded(result: Any) -> bool:
+    """False for error results: {"error": ...} or {"success": false}."""
+    if isinstance(result, str):
+        try:
+            result = json.loads(result)
+        except (json.JSONDecodeError, TypeError):
+            return True
+    if isinstance(result, dict):
+        return "error" not in result and result.get("success") is not False
+    return True
+
+
+def record_tool_event(
+    tool: str,
+    uid: Optional[str],
+    latency_ms: float,
+    result_text: str,
+    parsed_result: Any = None,
+    source: str = "chat",
+) -> None:
+    """
+    Buffer one tool execution event. Never blocks and never raises.
+
+    Args:
+        tool: Tool name
+        uid: Firebase Auth UID of the user the tool ran for
+        latency_ms: Wall time of the tool call
+        result_text: Raw result as returned to the model (its size is recorded)
+        parsed_result: Parsed result, if already decoded (saves re-parsing)
+        source: "chat" | "process_expense" | "realtime"
+    """
+    now = datetime.now(timezone.utc)
+    _buffer.append({
+        "uid": uid,
+        "tool": tool,
+        "source": source,
+        "latency_ms": round(latency_ms, 1),
+        "result_bytes": len(result_text.encode("utf-8")) if isinstance(result_text, str) else 0,
+        "success": tool_succeeded(parsed_result if parsed_result is not None else result_text),
+        "day": _usage_day(now),
+        "timestamp": now,
+    })
+    _stats["recorded"] += 1
+
+    overflow = len(_buffer) - TOOL_EVENT_MAX_BUFFER
+    if overflow > 0:
+        del _buffer[:overflow]
+        _stats["dropped"] += overflow
+
+    _schedule_flush(immediate=len(_buffer) % TOOL_EVENT_FLUSH_SIZE == 0)
+
+
+def _schedule_flush(immediate: bool) -> None:
+    global _timer, _timer_loop
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # no loop (e.g. a script): written by the next flush_tool_events()
+    if immediate:
+        _start_flush(loop)
+    elif _timer is None or _timer_loop is not loop:
+        _timer = loop.call_later(TOOL_EVENT_FLUSH_SECONDS, _start_flush, loop)
+        _timer_loop = loop
+
+
+def _start_flush(loop: asyncio.AbstractEventLoop) -> None:
+    global _timer, _flushing
+    if _timer is not None:
+        _timer.cancel()
+        _timer = None
+    # A running flush keeps going until the buffer is empty
+    if _flushing is None or _flushing.done() or _flushing.get_loop() is not loop:
+        _flushing = loop.create_task(flush_tool_events())
+
+
+async def flush_tool_events() -> int:
+    """
+    Write all buffered events now, in batches of FIRESTORE_BATCH_LIMIT.
+
+    Events from a failed write go back into the buffer for the next flush.
+
+    Returns:
+        Number of events written
+    """
+    written = 0
+    while _buffer:
+        events = _buffer[:FIRESTORE_BATCH_LIMIT]
+        del _buffer[:len(events)]
+        try:
+            await AsyncFirebaseClient().write_tool_events(events)
+        except Exception as exc:
+            _buffer[:0] = events
+            _stats["failed_flushes"] += 1
+            logger.warning("Failed to write %d tool events: %s", len(events), exc)
+            break
+        written += len(events)
+        _stats["flushes"] += 1
+    _stats["flushed"] += written
+    return written
+
+
+async def shutdown_tool_events() -> None:
+    """Write whatever is buffered (called on app shutdown)."""
+    global _timer
+    if _timer is not None:
+        _timer.cancel()
+        _timer = None
+    if _flushing is not None and not _flushing.done() and _flushing.get_loop() is asyncio.get_running_loop():
+        await _flushing
+    await flush_tool_events()
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending, non-empty list."""
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize_tool_latency(events: list[dict]) -> dict:
+    """
+    Per-tool call counts, error counts and latency percentiles.
+
+    Args:
+        events: tool_events records (tool, latency_ms, success)
+
+    Returns:
+        {tool: {"calls", "errors", "p50_ms", "p95_ms"}}
+    """
+    latencies: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    for event in events:
+        tool = event.get("tool") or "unknown"
+        latencies.setdefault(tool, []).append(event.get("latency_ms") or 0.0)
+        if event.get("success") is False:
+            errors[tool] = errors.get(tool, 0) + 1
+
+    summary = {}
+    for tool, values in sorted(latencies.items()):
+        values.sort()
+        summary[tool] = {
+            "calls": len(values),
+            "errors": errors.get(tool, 0),
+            "p50_ms": _percentile(values, 0.5),
+            "p95_ms": _percentile(values, 0.95),
+        }
+    return summary
+
+
+def get_tool_event_stats() -> dict:
+    """Counters for /admin/cache-stats, plus the current buffer size."""
+    return {**_stats, "buffered": len(_buffer)}
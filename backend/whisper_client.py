@@ -4,7 +4,7 @@ import logging
 
 import openai
 
-from backend.endpoints import Endpoints
+from backend.provider_clients import get_async_openai_client
 
 logger = logging.getLogger(__name__)
 
@@ -23,11 +23,10 @@ async def transcribe_audio(audio_bytes: bytes, filename: str = "recording.wav")
         return ""
 
     try:
-        endpoints = Endpoints()
         audio_file = io.BytesIO(audio_bytes)
         audio_file.name = filename  # OpenAI requires filename with extension
 
-        response = await endpoints.openai_async_client.audio.transcriptions.create(
+        response = await get_async_openai_client().audio.transcriptions.create(
             model="whisper-1",
             file=audio_file
         )
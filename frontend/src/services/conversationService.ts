@@ -15,14 +15,14 @@ export async function listConversations(token: string, limit = 20): Promise<Conv
   const data = await response.json()
   const conversations = data.conversations || []
 
-  // Transform to include message count and first message preview
+  // The list endpoint returns summary fields only (no message bodies)
   return conversations.map((conv: Conversation) => ({
     conversation_id: conv.conversation_id,
     created_at: conv.created_at,
     last_activity: conv.last_activity,
     summary: conv.summary,
-    message_count: conv.messages?.length || 0,
-    first_message: conv.messages?.[0]?.content?.slice(0, 50) || undefined,
+    message_count: conv.message_count || 0,
+    first_message: conv.first_message || undefined,
   }))
 }
 
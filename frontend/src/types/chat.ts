@@ -39,6 +39,10 @@ export interface Conversation {
   created_at: string
   last_activity: string
   messages: StoredMessage[]
+  message_count?: number
+  first_message?: string | null
+  // Pass as ?before= to load older messages; null once the first message is loaded
+  next_cursor?: number | null
   summary: string | null
   recent_expenses: Array<{
     expense_id: string
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Backfill script: set date_key on expenses.
+
+Date-range reads (get_expenses_in_date_range, get_monthly_expenses and the
+spending rollup scan) filter on date_key, the expense date as a YYYYMMDD int.
+Expenses saved before that field existed don't have it, so those queries
+don't return them until this script has run.
+
+Recomputes date_key from each expense's date and writes it in batches.
+Expenses with a missing or malformed date are reported and skipped.
+
+Idempotent: safe to re-run, and also repairs drift.
+
+Usage:
+    python scripts/backfill_date_key.py              # all users
+    python scripts/backfill_date_key.py --dry-run    # count only, no writes
+"""
+
+import argparse
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dotenv import load_dotenv
+load_dotenv(override=True)
+
+from backend.firebase_client import FirebaseClient, _date_key
+
+
+def run(apply: bool) -> None:
+    client = FirebaseClient()
+    updates = []
+    unchanged = 0
+    skipped = 0
+    for doc in client.db.collection_group("expenses").select(["date", "date_key"]).stream():
+        data = doc.to_dict()
+        exp_date = data.get("date") or {}
+        try:
+            date_key = _date_key(int(exp_date["year"]), int(exp_date["month"]), int(exp_date["day"]))
+        except (KeyError, TypeError, ValueError):
+            print(f"{doc.reference.path}: skipped, bad date {exp_date!r}")
+            skipped += 1
+            continue
+        if data.get("date_key") == date_key:
+            unchanged += 1
+            continue
+        updates.append((doc.reference, date_key))
+
+    if apply:
+        with client.write_batch() as batch:
+            for ref, date_key in updates:
+                batch.update(ref, {"date_key": date_key})
+
+    mode = "(applied)" if apply else "(dry run)"
+    print(f"\nDone {mode}. updated={len(updates)} unchanged={unchanged} skipped={skipped}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Count expenses without writing.")
+    args = parser.parse_args()
+    run(apply=not args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
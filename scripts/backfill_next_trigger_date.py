@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Backfill script: set next_trigger_date on recurring expense templates.
+
+The daily recurring sweep (/admin/check-recurring) only reads templates whose
+next_trigger_date has arrived. Templates saved before that field existed
+don't have it, so the sweep never sees them until this script has run.
+
+Recomputes next_trigger_date for every template (active and inactive) from
+its schedule and last_reminded, and writes it in batches. Inactive
+templates get None.
+
+Idempotent: safe to re-run, and also repairs drift.
+
+Usage:
+    python scripts/backfill_next_trigger_date.py              # all users
+    python scripts/backfill_next_trigger_date.py --dry-run    # count only, no writes
+"""
+
+import argparse
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dotenv import load_dotenv
+load_dotenv(override=True)
+
+from backend.firebase_client import FIRESTORE_BATCH_LIMIT, FirebaseClient, _next_trigger_date
+
+
+def run(apply: bool) -> None:
+    client = FirebaseClient()
+    updates = []
+    unchanged = 0
+    for doc in client.db.collection_group("recurring_expenses").stream():
+        data = doc.to_dict()
+        next_trigger_date = _next_trigger_date(client._dict_to_recurring_expense(data, doc.id))
+        if "next_trigger_date" in data and data["next_trigger_date"] == next_trigger_date:
+            unchanged += 1
+            continue
+        print(f"{doc.reference.path}: {data.get('next_trigger_date')} -> {next_trigger_date}")
+        updates.append((doc.reference, next_trigger_date))
+
+    if apply:
+        for start in range(0, len(updates), FIRESTORE_BATCH_LIMIT):
+            batch = client.db.batch()
+            for ref, next_trigger_date in updates[start:start + FIRESTORE_BATCH_LIMIT]:
+                batch.update(ref, {"next_trigger_date": next_trigger_date})
+            batch.commit()
+
+    mode = "(applied)" if apply else "(dry run)"
+    print(f"\nDone {mode}. updated={len(updates)} unchanged={unchanged}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Count templates without writing.")
+    args = parser.parse_args()
+    run(apply=not args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Backfill script: set search_terms on expenses.
+
+search_expenses looks expenses up by the trigram terms stored in each
+expense's search_terms (see backend/expense_search.py). Expenses saved
+before that field existed don't have it, so searches don't find them until
+this script has run.
+
+Recomputes search_terms from each expense's name and writes it in batches.
+
+Idempotent: safe to re-run, and also repairs drift (e.g. after the term
+rules change).
+
+Usage:
+    python scripts/backfill_search_terms.py              # all users
+    python scripts/backfill_search_terms.py --dry-run    # count only, no writes
+"""
+
+import argparse
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dotenv import load_dotenv
+load_dotenv(override=True)
+
+from backend.expense_search import search_terms
+from backend.firebase_client import FirebaseClient
+
+
+def run(apply: bool) -> None:
+    client = FirebaseClient()
+    updates = []
+    unchanged = 0
+    for doc in client.db.collection_group("expenses").select(["expense_name", "search_terms"]).stream():
+        data = doc.to_dict()
+        terms = search_terms(data.get("expense_name") or "")
+        if data.get("search_terms") == terms:
+            unchanged += 1
+            continue
+        updates.append((doc.reference, terms))
+
+    if apply:
+        with client.write_batch() as batch:
+            for ref, terms in updates:
+                batch.update(ref, {"search_terms": terms})
+
+    mode = "(applied)" if apply else "(dry run)"
+    print(f"\nDone {mode}. updated={len(updates)} unchanged={unchanged}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Count expenses without writing.")
+    args = parser.parse_args()
+    run(apply=not args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Backfill / repair script: per-period spending rollups.
+
+For every budget period that contains at least one expense, compares
+users/{uid}/spending_rollups/{period_id} against a full rescan of the period's
+expenses and rebuilds the rollup when it is missing or has drifted.
+
+Rollups are also built lazily on first read, so this script is only needed to
+warm them after deploying, or to repair drift found by --check.
+
+Idempotent: safe to re-run. A consistent rollup is left untouched.
+
+Usage:
+    python scripts/backfill_spending_rollups.py                   # all users, rebuild missing/drifted
+    python scripts/backfill_spending_rollups.py --uid <uid>       # a single user
+    python scripts/backfill_spending_rollups.py --check           # consistency report only
+    python scripts/backfill_spending_rollups.py --dry-run         # same as --check
+"""
+
+import argparse
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dotenv import load_dotenv
+load_dotenv(override=True)
+
+from backend.firebase_client import FirebaseClient
+
+
+def process_user(uid: str, repair: bool) -> dict:
+    """Check (and optionally rebuild) every rollup for one user."""
+    client = FirebaseClient.for_user(uid)
+    counts = {"periods": 0, "consistent": 0, "missing": 0, "drifted": 0, "rebuilt": 0}
+
+    for period in client.list_expense_periods():
+        counts["periods"] += 1
+        report = client.check_spending_rollup(period)
+
+        if report["consistent"]:
+            counts["consistent"] += 1
+            continue
+
+        if report["missing"]:
+            counts["missing"] += 1
+            print(f"[uid={uid}] {period.period_id}: missing")
+        else:
+            counts["drifted"] += 1
+            for category_id, diff in sorted(report["differences"].items()):
+                print(
+                    f"[uid={uid}] {period.period_id}: {category_id} "
+                    f"rollup={diff['rollup']} scan={diff['scan']}"
+                )
+
+        if repair:
+            client.rebuild_spending_rollup(period)
+            counts["rebuilt"] += 1
+
+    return counts
+
+
+def run(uid: str | None, repair: bool) -> None:
+    if uid:
+        uids = [uid]
+    else:
+        db = FirebaseClient().db
+        uids = [doc.id for doc in db.collection("users").stream()]
+
+    totals = {"periods": 0, "consistent": 0, "missing": 0, "drifted": 0, "rebuilt": 0}
+    for user_id in uids:
+        counts = process_user(user_id, repair)
+        for key, value in counts.items():
+            totals[key] += value
+
+    mode = "(applied)" if repair else "(check only)"
+    print(
+        f"\nDone {mode}. users={len(uids)} periods={totals['periods']} "
+        f"consistent={totals['consistent']} missing={totals['missing']} "
+        f"drifted={totals['drifted']} rebuilt={totals['rebuilt']}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uid", help="Only process this user.")
+    parser.add_argument("--check", action="store_true", help="Report inconsistencies without writing.")
+    parser.add_argument("--dry-run", action="store_true", help="Alias for --check.")
+    args = parser.parse_args()
+    run(uid=args.uid, repair=not (args.check or args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
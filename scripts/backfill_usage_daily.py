@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Backfill script: rebuild the daily usage aggregates from raw records.
+
+/admin/analytics reads pre-aggregated documents that are updated as usage is
+logged:
+
+    users/{uid}/usage_daily/{day}_{model}_{endpoint}   (from token_usage)
+
+Usage logged before the aggregates existed isn't in them. This script
+recomputes every aggregate in the window from the raw token_usage records
+and overwrites it (batched), so it is idempotent and also repairs drift.
+
+Run it right after deploying: a day it rewrites while usage is still being
+logged is only as current as the raw records it read.
+
+Usage:
+    python scripts/backfill_usage_daily.py                 # last 90 days
+    python scripts/backfill_usage_daily.py --days 365
+    python scripts/backfill_usage_daily.py --dry-run       # count only, no writes
+"""
+
+import argparse
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dotenv import load_dotenv
+load_dotenv(override=True)
+
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+from backend.firebase_client import (
+    FIRESTORE_BATCH_LIMIT,
+    USAGE_DAILY_COLLECTION,
+    USAGE_TOKEN_FIELDS,
+    FirebaseClient,
+    _ttft_bucket,
+    _usage_daily_doc_id,
+    _usage_day,
+)
+
+
+def build_usage_aggregates(client: FirebaseClient, days: int) -> dict:
+    """Document path -> aggregate, from the raw token_usage records."""
+    cutoff = client._usage_cutoff(days)
+    aggregates: dict = {}
+    docs = (
+        client.db.collection_group("token_usage")
+        .where(filter=FieldFilter("timestamp", ">=", cutoff))
+        .stream()
+    )
+    for doc in docs:
+        record = doc.to_dict()
+        uid = doc.reference.path.split("/")[1]
+        day = _usage_day(record["timestamp"])
+        model = record.get("model", "unknown")
+        endpoint = record.get("endpoint", "unknown")
+        path = f"users/{uid}/{USAGE_DAILY_COLLECTION}/{_usage_daily_doc_id(day, model, endpoint)}"
+
+        row = aggregates.setdefault(path, {
+            "uid": uid, "day": day, "model": model, "provider": record.get("provider"),
+            "endpoint": endpoint, "calls": 0, "last_activity": record["timestamp"],
+            **{name: 0 for name in USAGE_TOKEN_FIELDS},
+        })
+        row["calls"] += 1
+        row["last_activity"] = max(row["last_activity"], record["timestamp"])
+        for name in USAGE_TOKEN_FIELDS:
+            row[name] += record.get(name, 0)
+        if record.get("ttft_ms") is not None:
+            buckets = row.setdefault("ttft_buckets", {})
+            bucket = _ttft_bucket(record["ttft_ms"])
+            buckets[bucket] = buckets.get(bucket, 0) + 1
+    return aggregates
+
+
+def write_aggregates(client: FirebaseClient, aggregates: dict) -> None:
+    items = list(aggregates.items())
+    for start in range(0, len(items), FIRESTORE_BATCH_LIMIT):
+        batch = client.db.batch()
+        for path, data in items[start:start + FIRESTORE_BATCH_LIMIT]:
+            batch.set(client.db.document(path), data)
+        batch.commit()
+
+
+def run(days: int, apply: bool) -> None:
+    client = FirebaseClient()
+    usage = build_usage_aggregates(client, days)
+    print(f"usage_daily documents: {len(usage)} ({sum(r['calls'] for r in usage.values())} calls)")
+
+    if apply:
+        write_aggregates(client, usage)
+
+    mode = "(applied)" if apply else "(dry run)"
+    print(f"\nDone {mode}. days={days} documents={len(usage)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=90, help="Days of history to rebuild (default: 90).")
+    parser.add_argument("--dry-run", action="store_true", help="Count aggregates without writing.")
+    args = parser.parse_args()
+    run(days=args.days, apply=not args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
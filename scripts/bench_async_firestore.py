@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: blocking FirebaseClient vs AsyncFirebaseClient under concurrent load.
+
+Simulates N concurrent users hitting a typical read-heavy endpoint (the work
+done by GET /categories + GET /budget/total) on a single event loop, first
+calling FirebaseClient directly (blocking the loop, as the routes used to) and
+then awaiting AsyncFirebaseClient. Firestore is replaced by the in-memory
+fake from tests/fake_firestore.py with a fixed per-RPC latency, so the numbers
+isolate event-loop blocking from real network variance.
+
+Usage:
+    python scripts/bench_async_firestore.py
+    python scripts/bench_async_firestore.py --users 50 --requests 20 --latency-ms 15 --interval-ms 500
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.async_firebase_client import AsyncFirebaseClient
+from tests.fake_firestore import FakeFirestore, fake_firebase_client
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def seed_users(db: FakeFirestore, users: int) -> None:
+    for i in range(users):
+        client = fake_firebase_client(db, f"user{i}")
+        client.initialize_default_categories(2000, ["FOOD_OUT", "GROCERIES", "COFFEE", "RENT"])
+
+
+async def blocking_request(client) -> None:
+    """Route body as it was: sync Firestore calls on the event loop."""
+    if not client.has_categories_setup():
+        client.migrate_from_budget_caps()
+    client.get_user_categories()
+    client.get_total_monthly_budget()
+
+
+async def async_request(client: AsyncFirebaseClient) -> None:
+    """Route body after the change: awaited Firestore calls."""
+    if not await client.has_categories_setup():
+        await client.migrate_from_budget_caps()
+    await client.get_user_categories()
+    await client.get_total_monthly_budget()
+
+
+async def run_load(make_client, handler, users: int, requests: int, interval: float) -> list[float]:
+    """
+    Open-loop load: each user fires a request every `interval` seconds.
+
+    Latency is measured from the scheduled arrival time, so time spent waiting
+    for a blocked event loop counts against the request, as it would for a
+    real client.
+    """
+    latencies: list[float] = []
+    t0 = time.perf_counter()
+
+    async def user_session(index: int) -> None:
+        client = make_client(f"user{index}")
+        # Stagger users evenly across the interval
+        offset = interval * index / users
+        for k in range(requests):
+            arrival = t0 + offset + k * interval
+            delay = arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await handler(client)
+            latencies.append(time.perf_counter() - arrival)
+
+    await asyncio.gather(*(user_session(i) for i in range(users)))
+    return latencies
+
+
+def report(label: str, latencies: list[float], wall: float) -> None:
+    ms = [x * 1000 for x in latencies]
+    print(
+        f"{label:<22} p50={statistics.median(ms):8.1f}ms  p99={percentile(ms, 99):8.1f}ms  "
+        f"max={max(ms):8.1f}ms  throughput={len(ms) / wall:7.1f} req/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark async Firestore data layer")
+    parser.add_argument("--users", type=int, default=50, help="Concurrent users")
+    parser.add_argument("--requests", type=int, default=10, help="Requests per user")
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="Simulated Firestore RPC latency")
+    parser.add_argument("--interval-ms", type=float, default=1000.0, help="Time between requests per user")
+    args = parser.parse_args()
+
+    db = FakeFirestore()
+    seed_users(db, args.users)
+    db.latency = args.latency_ms / 1000
+
+    interval = args.interval_ms / 1000
+    print(
+        f"{args.users} users x {args.requests} requests every {args.interval_ms:.0f}ms, "
+        f"{args.latency_ms:.0f}ms per Firestore RPC\n"
+    )
+
+    start = time.perf_counter()
+    before = asyncio.run(run_load(
+        lambda uid: fake_firebase_client(db, uid), blocking_request, args.users, args.requests, interval,
+    ))
+    report("before (blocking)", before, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    after = asyncio.run(run_load(
+        lambda uid: AsyncFirebaseClient(client=fake_firebase_client(db, uid)),
+        async_request, args.users, args.requests, interval,
+    ))
+    report("after (thread pool)", after, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-user conversation cleanup loop vs the collection group sweep.
+
+Seeds N users in the Firestore emulator, each with some expired and some
+recent conversations (plus messages), then times:
+
+  before  list every user, then query and delete their expired
+          conversations one user at a time (one query per user, one
+          batch per conversation)
+  after   FirebaseClient.cleanup_all_users_conversations: one indexed
+          collection group query per page, deletes through a BulkWriter
+
+The data is reseeded before each run. Runs only against the emulator, since
+it deletes data: set FIRESTORE_EMULATOR_HOST (e.g. localhost:8080) and start
+it with `firebase emulators:start --only firestore`. FIREBASE_KEY must still
+point at a service account key so the Admin SDK can initialize.
+
+--fake runs both against the in-memory fake from tests/fake_firestore.py
+instead, with a fixed simulated latency per round trip. That counts round
+trips rather than measuring the emulator (no index scans, no BulkWriter
+throttling), so treat it as a lower bound on the difference.
+
+Usage:
+    FIRESTORE_EMULATOR_HOST=localhost:8080 python scripts/bench_conversation_cleanup.py
+    FIRESTORE_EMULATOR_HOST=localhost:8080 python scripts/bench_conversation_cleanup.py --users 10000 --page-size 500
+    python scripts/bench_conversation_cleanup.py --fake --users 10000 --latency-ms 2
+"""
+
+import os
+import sys
+import time
+import argparse
+from datetime import datetime, timedelta, timezone
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dotenv import load_dotenv
+load_dotenv(override=True)
+
+from backend.firebase_client import FirebaseClient
+
+
+def seed(db, users: int, expired: int, recent: int, messages: int) -> int:
+    """Write the test data with a BulkWriter; returns the number of documents written."""
+    now = datetime.now(timezone.utc)
+    writer = db.bulk_writer()
+    written = 0
+    for u in range(users):
+        user_ref = db.collection("users").document(f"bench{u:05d}")
+        writer.set(user_ref, {"email": f"bench{u}@example.com"})
+        written += 1
+        for c in range(expired + recent):
+            age = timedelta(days=30, minutes=c) if c < expired else timedelta(minutes=c)
+            conv_ref = user_ref.collection("conversations").document(f"c{c}")
+            writer.set(conv_ref, {"last_activity": now - age, "message_count": messages})
+            written += 1
+            for m in range(messages):
+                writer.set(conv_ref.collection("messages").document(f"{m:08d}"), {"role": "user", "content": "hi"})
+                written += 1
+    writer.close()
+    return written
+
+
+def clear(db) -> None:
+    for user_doc in db.collection("users").select([]).stream():
+        db.recursive_delete(user_doc.reference)
+    db.collection("maintenance").document("conversation_cleanup").delete()
+
+
+def per_user_cleanup(ttl_hours: int) -> int:
+    """The sweep as it was before the collection group query."""
+    global_client = FirebaseClient()
+    deleted = 0
+    for user_doc in global_client.db.collection("users").stream():
+        deleted += FirebaseClient.for_user(user_doc.id).cleanup_old_conversations(ttl_hours)
+    return deleted
+
+
+def use_fake_firestore(latency: float):
+    """Point every FirebaseClient at one in-memory fake; returns (db, clear)."""
+    from tests.fake_firestore import FakeFirestore
+
+    db = FakeFirestore(latency=latency)
+
+    def fake_init(self, user_id=None):
+        self.db = db
+        self.bucket = None
+        self.user_id = user_id
+
+    FirebaseClient.__init__ = fake_init
+    return db, lambda _db: db._docs.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark conversation cleanup against the Firestore emulator")
+    parser.add_argument("--users", type=int, default=10000, help="Users to seed")
+    parser.add_argument("--expired", type=int, default=1, help="Expired conversations per user")
+    parser.add_argument("--recent", type=int, default=1, help="Recent conversations per user")
+    parser.add_argument("--messages", type=int, default=2, help="Messages per conversation")
+    parser.add_argument("--page-size", type=int, default=None, help="Sweep page size (default CLEANUP_PAGE_SIZE)")
+    parser.add_argument("--ttl-hours", type=int, default=24)
+    parser.add_argument("--fake", action="store_true", help="Use the in-memory fake instead of the emulator")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Simulated round trip latency with --fake")
+    args = parser.parse_args()
+
+    clear_data = clear
+    if args.fake:
+        db, clear_data = use_fake_firestore(args.latency_ms / 1000)
+        print(f"in-memory fake, {args.latency_ms:g}ms per round trip")
+    elif not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("FIRESTORE_EMULATOR_HOST is not set; this benchmark deletes data and only runs against the emulator")
+    else:
+        db = FirebaseClient().db
+    expected = args.users * args.expired
+    print(
+        f"{args.users} users x {args.expired} expired + {args.recent} recent conversations, "
+        f"{args.messages} messages each\n"
+    )
+
+    clear_data(db)
+    start = time.perf_counter()
+    written = seed(db, args.users, args.expired, args.recent, args.messages)
+    print(f"seeded {written} docs in {time.perf_counter() - start:.1f}s\n")
+
+    start = time.perf_counter()
+    deleted = per_user_cleanup(args.ttl_hours)
+    before = time.perf_counter() - start
+    print(f"{'before (per user)':<22} {before:8.1f}s  deleted={deleted}/{expected}")
+
+    clear_data(db)
+    seed(db, args.users, args.expired, args.recent, args.messages)
+
+    start = time.perf_counter()
+    result = FirebaseClient.cleanup_all_users_conversations(ttl_hours=args.ttl_hours, page_size=args.page_size)
+    after = time.perf_counter() - start
+    print(
+        f"{'after (collection group)':<22} {after:8.1f}s  deleted={result['deleted_count']}/{expected}  "
+        f"pages={result['pages']}  failed={result['failed_deletes']}"
+    )
+    print(f"\nspeedup: {before / after:.1f}x")
+
+    clear_data(db)
+
+
+if __name__ == "__main__":
+    main()
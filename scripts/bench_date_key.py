@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark: documents read by date-range expense queries, year filter vs date_key.
+
+Seeds one user with several years of expenses in the in-memory fake from
+tests/fake_firestore.py, then runs typical reads two ways:
+
+  before  filter on date.year (and date.month for a single month), then
+          drop out-of-range days in Python, as the queries used to
+  after   FirebaseClient.get_expenses_in_date_range / get_monthly_expenses,
+          a single range filter on date_key
+
+Firestore bills (and transfers) every document a query returns, so the
+docs/bytes read columns are the cost that changed.
+
+Usage:
+    python scripts/bench_date_key.py
+    python scripts/bench_date_key.py --years 3 --per-day 10
+"""
+
+import os
+import sys
+import time
+import argparse
+from datetime import date, timedelta
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+from backend.output_schemas import Date
+from tests.fake_firestore import FakeFirestore, fake_firebase_client
+
+CATEGORIES = ["FOOD_OUT", "GROCERIES", "COFFEE", "TRANSPORT", "SHOPPING"]
+
+
+def as_date(d: date) -> Date:
+    return Date(day=d.day, month=d.month, year=d.year)
+
+
+def seed(db: FakeFirestore, uid: str, first: date, last: date, per_day: int) -> int:
+    count = 0
+    day = first
+    while day <= last:
+        for i in range(per_day):
+            db.seed(f"users/{uid}/expenses/{day.isoformat()}-{i}", {
+                "expense_name": f"Expense {i}",
+                "amount": 5.0 + i,
+                "date": {"day": day.day, "month": day.month, "year": day.year},
+                "date_key": day.year * 10000 + day.month * 100 + day.day,
+                "category": CATEGORIES[i % len(CATEGORIES)],
+                "input_type": "text",
+            })
+            count += 1
+        day += timedelta(days=1)
+    return count
+
+
+def year_filtered(client, start: date, end: date, month: bool = False, category: str = None) -> list:
+    """The queries as they were: year (or year + month) filter, exact days in Python."""
+    query = client.db.collection(client._get_collection_path("expenses"))
+    if month:
+        query = query.where(filter=FieldFilter("date.year", "==", start.year))
+        query = query.where(filter=FieldFilter("date.month", "==", start.month))
+    else:
+        query = query.where(filter=FieldFilter("date.year", ">=", start.year))
+        query = query.where(filter=FieldFilter("date.year", "<=", end.year))
+    if category:
+        query = query.where(filter=FieldFilter("category", "==", category))
+    results = []
+    for doc in query.stream():
+        d = doc.to_dict()["date"]
+        if start <= date(d["year"], d["month"], d["day"]) <= end:
+            results.append(doc.id)
+    return results
+
+
+def measure(db: FakeFirestore, func) -> tuple:
+    db.reset_stats()
+    start = time.perf_counter()
+    rows = func()
+    return len(rows), db.stats["docs_read"], db.stats["bytes_read"], (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark date_key range queries")
+    parser.add_argument("--years", type=int, default=2, help="Years of history to seed")
+    parser.add_argument("--per-day", type=int, default=5, help="Expenses per day")
+    args = parser.parse_args()
+
+    db = FakeFirestore()
+    uid = "bench"
+    today = date(2026, 12, 31)
+    total = seed(db, uid, date(today.year - args.years + 1, 1, 1), today, args.per_day)
+    client = fake_firebase_client(db, uid)
+    print(f"{total} expenses over {args.years} year(s), {args.per_day} per day\n")
+
+    week_start = today - timedelta(days=6)
+    cases = [
+        ("last 7 days (Dec)", lambda: year_filtered(client, week_start, today),
+         lambda: client.get_expenses_in_date_range(as_date(week_start), as_date(today))),
+        ("Dec 28 - Jan 3", lambda: year_filtered(client, date(2025, 12, 28), date(2026, 1, 3)),
+         lambda: client.get_expenses_in_date_range(Date(day=28, month=12, year=2025), Date(day=3, month=1, year=2026))),
+        ("month (Mar)", lambda: year_filtered(client, date(2026, 3, 1), date(2026, 3, 31), month=True),
+         lambda: client.get_monthly_expenses(2026, 3)),
+        ("7 days, one category", lambda: year_filtered(client, week_start, today, category="COFFEE"),
+         lambda: client.get_expenses_in_date_range(as_date(week_start), as_date(today), "COFFEE")),
+    ]
+
+    print(f"{'query':<22} {'rows':>6} {'before docs':>12} {'after docs':>11} {'before KB':>10} {'after KB':>9}")
+    for label, before, after in cases:
+        rows_b, docs_b, bytes_b, _ = measure(db, before)
+        rows_a, docs_a, bytes_a, _ = measure(db, after)
+        assert rows_a == rows_b, (label, rows_a, rows_b)
+        print(f"{label:<22} {rows_a:>6} {docs_b:>12} {docs_a:>11} {bytes_b / 1024:>10.1f} {bytes_a / 1024:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
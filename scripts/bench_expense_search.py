@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark: scan-and-filter expense search vs the trigram search_terms index.
+
+Seeds one user with N expenses spread over several years (merchant names
+drawn from a realistic mix of common and rare ones) in the in-memory fake
+from tests/fake_firestore.py, then runs a set of searches two ways:
+
+  before  read every expense in the range and substring-match in Python,
+          as search_expenses_in_db used to (over the whole history here,
+          which the old tool avoided by only searching the current month)
+  after   FirebaseClient.search_expenses_in_db: an array-contains query on
+          the query's most selective term, newest first, paged until the
+          results are settled, ranked
+
+Reports documents read and wall time per search (with a fixed simulated
+per-RPC latency). "before" matches are raw substring hits, so accented
+names (Café) are missed and common names count every occurrence; "after"
+returns at most SEARCH_RESULT_LIMIT ranked results.
+
+Usage:
+    python scripts/bench_expense_search.py
+    python scripts/bench_expense_search.py --expenses 100000 --latency-ms 20
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import date, timedelta
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+from backend.expense_search import search_terms
+from tests.fake_firestore import FakeFirestore, fake_firebase_client
+
+MERCHANTS = [
+    ("Starbucks", 300), ("Chipotle", 120), ("Whole Foods Market", 150), ("Uber", 200), ("Shell Gas", 80),
+    ("Trader Joe's", 100), ("Amazon", 250), ("Netflix", 10), ("Spotify", 10), ("Target", 90),
+    ("Blue Bottle Coffee", 40), ("Sweetgreen", 60), ("Home Depot", 20), ("CVS Pharmacy", 30),
+    ("Café Zoë", 5), ("Zuni Café", 3), ("Pet Food Express", 8), ("Rent", 12), ("PG&E", 12), ("Equinox", 12),
+]
+QUERIES = ["starbucks", "coffee", "whole foods", "cafe", "zuni", "pet food", "uber", "bottle"]
+
+
+def seed(db: FakeFirestore, uid: str, expenses: int) -> None:
+    rng = random.Random(7)
+    names = [name for name, weight in MERCHANTS for _ in range(weight)]
+    first = date(2021, 1, 1)
+    for i in range(expenses):
+        day = first + timedelta(days=i * 1800 // expenses)
+        name = rng.choice(names)
+        db.seed(f"users/{uid}/expenses/e{i:06d}", {
+            "expense_name": name,
+            "amount": round(rng.uniform(2, 120), 2),
+            "date": {"day": day.day, "month": day.month, "year": day.year},
+            "date_key": day.year * 10000 + day.month * 100 + day.day,
+            "search_terms": search_terms(name),
+            "category": "OTHER",
+            "input_type": "text",
+            "notes": "",
+        })
+
+
+def scan_search(client, text_query: str) -> list:
+    """The search as it was: every expense in the range, substring match in Python."""
+    query = client.db.collection(client._get_collection_path("expenses"))
+    query = query.where(filter=FieldFilter("date_key", ">=", 0))
+    needle = text_query.lower()
+    return [doc.id for doc in query.stream() if needle in doc.to_dict().get("expense_name", "").lower()]
+
+
+def measure(db: FakeFirestore, func, *args) -> tuple:
+    db.reset_stats()
+    start = time.perf_counter()
+    result = func(*args)
+    return result, db.stats["docs_read"], (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark indexed expense name search")
+    parser.add_argument("--expenses", type=int, default=100000, help="Expenses to seed")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated Firestore RPC latency")
+    args = parser.parse_args()
+
+    db = FakeFirestore()
+    seed(db, "bench", args.expenses)
+    db.latency = args.latency_ms / 1000
+    client = fake_firebase_client(db, "bench")
+    print(f"{args.expenses} expenses over 5 years, {args.latency_ms:.0f}ms per Firestore RPC\n")
+
+    print(f"{'query':<14} {'matches':>8} {'before docs':>12} {'after docs':>11} {'before ms':>10} {'after ms':>9}  top result")
+    for text_query in QUERIES:
+        before, docs_b, ms_b = measure(db, scan_search, client, text_query)
+        search, docs_a, ms_a = measure(db, client.search_expenses_in_db, text_query)
+        after = search["expenses"]
+        top = after[0]["expense_name"] if after else "-"
+        if search["truncated"]:
+            top += " (truncated)"
+        print(f"{text_query:<14} {len(before):>8} {docs_b:>12} {docs_a:>11} {ms_b:>10.0f} {ms_a:>9.0f}  {top}")
+
+
+if __name__ == "__main__":
+    main()
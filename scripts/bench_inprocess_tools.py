@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-tool-call overhead, stdio subprocess vs in-process handlers.
+
+Issues sequential tool calls (one at a time, so the numbers are per-call
+overhead rather than throughput) through:
+  - MCPSessionPool with one expense_server.py subprocess (the default mode)
+  - InProcessToolClient (USE_INPROCESS_TOOLS=true)
+
+Both run against the in-memory fake Firestore from tests/fake_firestore.py
+with a stubbed token verifier. Firestore latency defaults to 0 so the
+difference is the JSON-RPC/stdio hop itself.
+
+Usage:
+    python scripts/bench_inprocess_tools.py
+    python scripts/bench_inprocess_tools.py --calls 500 --tool get_recent_expenses
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.bench_mcp_pool import install_fake_backend
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_mcp_pool.py")
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def time_calls(client, tool: str, calls: int, users: int) -> list[float]:
+    # Warm caches for every user first
+    for i in range(users):
+        await client.session.call_tool(tool, {"auth_token": f"user{i}"})
+
+    latencies = []
+    for i in range(calls):
+        start = time.perf_counter()
+        result = await client.session.call_tool(tool, {"auth_token": f"user{i % users}"})
+        latencies.append(time.perf_counter() - start)
+        assert not result.isError, result
+    return latencies
+
+
+async def run_subprocess(tool: str, calls: int, users: int) -> list[float]:
+    from backend.mcp.session_pool import MCPSessionPool
+
+    pool = MCPSessionPool(SERVER_SCRIPT, size=1, health_check_interval=0)
+    await pool.start()
+    try:
+        return await time_calls(pool, tool, calls, users)
+    finally:
+        await pool.close()
+
+
+async def run_inprocess(tool: str, calls: int, users: int) -> list[float]:
+    from backend.mcp.inprocess_tools import InProcessToolClient
+
+    client = InProcessToolClient()
+    await client.start()
+    return await time_calls(client, tool, calls, users)
+
+
+def report(label: str, latencies: list[float]) -> None:
+    us = [x * 1_000_000 for x in latencies]
+    print(
+        f"{label:<14} mean={statistics.mean(us):8.0f}us  p50={statistics.median(us):8.0f}us  "
+        f"p99={percentile(us, 99):8.0f}us"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark in-process vs subprocess MCP tool calls")
+    parser.add_argument("--calls", type=int, default=300, help="Sequential tool calls per mode")
+    parser.add_argument("--tool", default="get_categories", help="Read-only tool to call")
+    parser.add_argument("--users", type=int, default=5, help="Distinct users (auth tokens)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated Firestore RPC latency")
+    args = parser.parse_args()
+
+    os.environ["BENCH_MCP_SERVE"] = "1"
+    os.environ["BENCH_USERS"] = str(args.users)
+    os.environ["BENCH_LATENCY_MS"] = str(args.latency_ms)
+
+    print(f"{args.calls} sequential {args.tool} calls, {args.latency_ms:.0f}ms per Firestore RPC\n")
+
+    subprocess_latencies = asyncio.run(run_subprocess(args.tool, args.calls, args.users))
+    report("subprocess", subprocess_latencies)
+
+    install_fake_backend(args.users, args.latency_ms)
+    inprocess_latencies = asyncio.run(run_inprocess(args.tool, args.calls, args.users))
+    report("in-process", inprocess_latencies)
+
+    saved = statistics.mean(subprocess_latencies) - statistics.mean(inprocess_latencies)
+    print(f"\nstdio hop overhead: {saved * 1_000_000:.0f}us per call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: MCP tool-call throughput vs MCPSessionPool size.
+
+Fires N concurrent call_tool("get_categories") requests through pools of
+different sizes. Each pooled server is a real expense_server.py subprocess
+speaking MCP over stdio, but backed by the in-memory fake from
+tests/fake_firestore.py (with a fixed per-RPC latency) and a stubbed token
+verifier, so no Firebase project is needed.
+
+This script re-launches itself as the MCP server (BENCH_MCP_SERVE=1); the
+fake backend setup is shared with scripts/bench_inprocess_tools.py.
+
+Usage:
+    python scripts/bench_mcp_pool.py
+    python scripts/bench_mcp_pool.py --calls 2000 --sizes 1,2,4,8 --latency-ms 5
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def install_fake_backend(users: int, latency_ms: float):
+    """
+    Point every FirebaseClient in this process at a seeded in-memory Firestore
+    and stub out token verification (tokens are the uid).
+    """
+    import backend.token_cache as token_cache
+    from backend.firebase_client import FirebaseClient
+    from tests.fake_firestore import FakeFirestore, fake_firebase_client
+
+    db = FakeFirestore()
+    for i in range(users):
+        fake_firebase_client(db, f"user{i}").initialize_default_categories(
+            2000, ["FOOD_OUT", "GROCERIES", "COFFEE", "RENT"]
+        )
+    db.latency = latency_ms / 1000
+
+    def fake_init(self, user_id=None):
+        self.db = db
+        self.bucket = None
+        self.user_id = user_id
+
+    FirebaseClient.__init__ = fake_init
+    token_cache.firebase_auth.verify_id_token = lambda token: {"uid": token, "exp": time.time() + 3600}
+    return db
+
+
+def serve_fake() -> None:
+    """Run expense_server.py against a fake Firestore and a stub verifier."""
+    install_fake_backend(int(os.environ["BENCH_USERS"]), float(os.environ["BENCH_LATENCY_MS"]))
+
+    from backend.mcp import expense_server
+    asyncio.run(expense_server.main())
+
+
+async def run_pool(size: int, calls: int, users: int) -> tuple[float, dict]:
+    from backend.mcp.session_pool import MCPSessionPool
+
+    pool = MCPSessionPool(os.path.abspath(__file__), size=size, health_check_interval=0)
+    await pool.start()
+    try:
+        # Wait for every server, then warm caches on each
+        for _ in range(200):
+            if pool.healthy_count == size:
+                break
+            await asyncio.sleep(0.05)
+        await asyncio.gather(*(
+            pool.call_tool("get_categories", {"auth_token": f"user{i % users}"}) for i in range(size * users)
+        ))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            pool.call_tool("get_categories", {"auth_token": f"user{i % users}"}) for i in range(calls)
+        ))
+        return time.perf_counter() - start, pool.stats()
+    finally:
+        await pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MCP session pool throughput")
+    parser.add_argument("--calls", type=int, default=1000, help="Concurrent get_categories calls")
+    parser.add_argument("--sizes", default="1,2,4", help="Comma-separated pool sizes")
+    parser.add_argument("--users", type=int, default=20, help="Distinct users (auth tokens)")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Simulated Firestore RPC latency")
+    args = parser.parse_args()
+
+    os.environ["BENCH_MCP_SERVE"] = "1"
+    os.environ["BENCH_USERS"] = str(args.users)
+    os.environ["BENCH_LATENCY_MS"] = str(args.latency_ms)
+
+    print(f"{args.calls} concurrent get_categories calls, {os.cpu_count()} CPUs\n")
+    baseline = None
+    for size in [int(s) for s in args.sizes.split(",")]:
+        elapsed, stats = asyncio.run(run_pool(size, args.calls, args.users))
+        throughput = args.calls / elapsed
+        baseline = baseline or throughput
+        spread = "/".join(str(s["calls"]) for s in stats["servers"])
+        print(
+            f"pool size {size:<3} {elapsed * 1000:8.0f}ms  {throughput:8.0f} calls/s  "
+            f"x{throughput / baseline:4.2f}  calls per server={spread}"
+        )
+
+
+if __name__ == "__main__":
+    if os.getenv("BENCH_MCP_SERVE"):
+        serve_fake()
+    else:
+        main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: full expense documents vs select() projections into ExpenseRow.
+
+Seeds one synthetic user with N expenses in the in-memory fake from
+tests/fake_firestore.py (realistic documents: name, notes, timestamp,
+input_type, ...) and totals spending by category over the whole range two
+ways:
+
+  before  get_expenses_in_date_range(): every field, one dict per expense
+          plus an "id", sorted by timestamp
+  after   get_expenses_in_date_range(fields=["category", "amount"]):
+          a select() projection read into slotted ExpenseRow records
+
+Reports bytes transferred (as counted by the fake), peak Python memory
+while the result list is alive (tracemalloc) and wall time.
+
+Usage:
+    python scripts/bench_projection.py
+    python scripts/bench_projection.py --expenses 50000
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+from datetime import date, datetime, timedelta, timezone
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.output_schemas import Date
+from tests.fake_firestore import FakeFirestore, fake_firebase_client
+
+CATEGORIES = ["FOOD_OUT", "GROCERIES", "COFFEE", "TRANSPORT", "SHOPPING", "RENT", "UTILITIES", "OTHER"]
+
+
+def seed(db: FakeFirestore, uid: str, expenses: int, first: date) -> date:
+    day = first
+    for i in range(expenses):
+        if i and i % 40 == 0:
+            day += timedelta(days=1)
+        db.seed(f"users/{uid}/expenses/e{i:06d}", {
+            "expense_name": f"Chipotle burrito bowl #{i}",
+            "amount": round(3.0 + (i % 97) * 1.37, 2),
+            "date": {"day": day.day, "month": day.month, "year": day.year},
+            "date_key": day.year * 10000 + day.month * 100 + day.day,
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "timestamp": datetime(day.year, day.month, day.day, 12, tzinfo=timezone.utc),
+            "input_type": "voice",
+            "notes": "Lunch with the team, split three ways; reimbursable if the client call runs long",
+        })
+    return day
+
+
+def totals_from_dicts(client, start: Date, end: Date) -> dict:
+    totals: dict = {}
+    for expense in client.get_expenses_in_date_range(start, end):
+        totals[expense["category"]] = totals.get(expense["category"], 0) + expense["amount"]
+    return totals
+
+
+def totals_from_rows(client, start: Date, end: Date) -> dict:
+    totals: dict = {}
+    for row in client.get_expenses_in_date_range(start, end, fields=["category", "amount"]):
+        totals[row.category] = totals.get(row.category, 0) + row.amount
+    return totals
+
+
+def measure(db: FakeFirestore, func, *args) -> tuple:
+    db.reset_stats()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, db.stats["bytes_read"], peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark projected expense reads")
+    parser.add_argument("--expenses", type=int, default=50000, help="Expenses to seed")
+    args = parser.parse_args()
+
+    db = FakeFirestore()
+    first = date(2024, 1, 1)
+    last = seed(db, "bench", args.expenses, first)
+    client = fake_firebase_client(db, "bench")
+    start = Date(day=first.day, month=first.month, year=first.year)
+    end = Date(day=last.day, month=last.month, year=last.year)
+    print(f"{args.expenses} expenses, {first} to {last}\n")
+
+    before, before_bytes, before_peak, before_time = measure(db, totals_from_dicts, client, start, end)
+    after, after_bytes, after_peak, after_time = measure(db, totals_from_rows, client, start, end)
+    assert before.keys() == after.keys()
+    assert all(abs(before[k] - after[k]) < 0.01 for k in before)
+
+    print(f"{'':<22} {'bytes read':>12} {'peak memory':>12} {'time':>9}")
+    print(f"{'before (full dicts)':<22} {before_bytes / 1e6:>10.1f}MB {before_peak / 1e6:>10.1f}MB {before_time * 1000:>7.0f}ms")
+    print(f"{'after (ExpenseRow)':<22} {after_bytes / 1e6:>10.1f}MB {after_peak / 1e6:>10.1f}MB {after_time * 1000:>7.0f}ms")
+    print(f"\nbytes: {before_bytes / after_bytes:.1f}x less, peak memory: {before_peak / after_peak:.1f}x less")
+
+
+if __name__ == "__main__":
+    main()
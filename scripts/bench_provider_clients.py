@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-turn cost of building provider SDK clients vs the shared registry.
+
+Starts a local HTTPS server (self-signed cert) that answers the Anthropic
+Messages API with a canned reply, then runs simulated chat turns of
+--calls-per-turn model calls each (a tool loop) in two modes:
+
+  per-call   a new anthropic.Anthropic() for every call — the previous
+             behaviour; every call opens a fresh TCP connection + TLS handshake
+  registry   backend.provider_clients.get_anthropic_client(); the pooled
+             connection is reused across calls and turns
+
+--rtt-ms adds a simulated network round trip: 2 RTTs when a connection is
+accepted (TCP + TLS 1.3 handshake) and 1 RTT per request. With --rtt-ms 0
+the numbers are pure loopback CPU cost.
+
+Usage:
+    python scripts/bench_provider_clients.py
+    python scripts/bench_provider_clients.py --turns 50 --calls-per-turn 3 --rtt-ms 30
+"""
+
+import os
+import sys
+import ssl
+import json
+import time
+import argparse
+import datetime
+import tempfile
+import threading
+import statistics
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+CANNED_MESSAGE = json.dumps({
+    "id": "msg_bench",
+    "type": "message",
+    "role": "assistant",
+    "model": "claude-haiku-4-5",
+    "content": [{"type": "text", "text": "ok"}],
+    "stop_reason": "end_turn",
+    "stop_sequence": None,
+    "usage": {"input_tokens": 10, "output_tokens": 1},
+}).encode()
+
+
+def write_self_signed_cert(directory: str) -> tuple[str, str]:
+    """Create a localhost certificate/key pair. Returns (cert_path, key_path)."""
+    import ipaddress
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(hours=1))
+        .add_extension(x509.SubjectAlternativeName([
+            x509.DNSName("localhost"), x509.IPAddress(ipaddress.ip_address("127.0.0.1")),
+        ]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption(),
+        ))
+    return cert_path, key_path
+
+
+class MockAnthropicServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, cert_path: str, key_path: str, rtt: float):
+        super().__init__(("127.0.0.1", 0), MockHandler)
+        self.rtt = rtt
+        self.connections = 0
+        self.requests = 0
+        self._tls = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self._tls.load_cert_chain(cert_path, key_path)
+
+    def get_request(self):
+        sock, addr = self.socket.accept()
+        self.connections += 1
+        # TCP handshake + TLS 1.3 handshake
+        time.sleep(2 * self.rtt)
+        return self._tls.wrap_socket(sock, server_side=True), addr
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; don't let Nagle + delayed
+    # ACK add 40ms to every response
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.requests += 1
+        time.sleep(self.server.rtt)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(CANNED_MESSAGE)))
+        self.end_headers()
+        self.wfile.write(CANNED_MESSAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+def run_turns(get_client, turns: int, calls_per_turn: int) -> list[float]:
+    durations = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        for _ in range(calls_per_turn):
+            get_client().messages.create(
+                model="claude-haiku-4-5",
+                max_tokens=16,
+                messages=[{"role": "user", "content": "hi"}],
+            )
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark provider client reuse")
+    parser.add_argument("--turns", type=int, default=30, help="Simulated chat turns per mode")
+    parser.add_argument("--calls-per-turn", type=int, default=3, help="Model calls per turn (tool loop iterations)")
+    parser.add_argument("--rtt-ms", type=float, default=20.0, help="Simulated network round-trip time")
+    args = parser.parse_args()
+
+    import anthropic
+    from backend import provider_clients
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cert_path, key_path = write_self_signed_cert(tmp)
+        server = MockAnthropicServer(cert_path, key_path, args.rtt_ms / 1000)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        # Both modes pick these up from the environment (httpx honours SSL_CERT_FILE)
+        os.environ["ANTHROPIC_BASE_URL"] = f"https://127.0.0.1:{server.server_address[1]}"
+        os.environ["ANTHROPIC_API_KEY"] = "sk-ant-bench"
+        os.environ["SSL_CERT_FILE"] = cert_path
+
+        print(
+            f"{args.turns} turns x {args.calls_per_turn} calls, simulated RTT {args.rtt_ms:.0f}ms, "
+            f"http2={provider_clients.PROVIDER_HTTP2}\n"
+        )
+
+        results = {}
+        modes = [
+            ("per-call", lambda: anthropic.Anthropic(api_key=os.environ["ANTHROPIC_API_KEY"])),
+            ("registry", provider_clients.get_anthropic_client),
+        ]
+        for label, get_client in modes:
+            server.connections = server.requests = 0
+            durations = run_turns(get_client, args.turns, args.calls_per_turn)
+            results[label] = statistics.mean(durations)
+            print(
+                f"{label:<10} {statistics.mean(durations) * 1000:8.1f}ms/turn  "
+                f"p50={statistics.median(durations) * 1000:7.1f}ms  "
+                f"connections={server.connections:<4} requests={server.requests}"
+            )
+
+        saved = results["per-call"] - results["registry"]
+        print(f"\nconnection setup saved: {saved * 1000:.1f}ms per turn ({saved / results['per-call']:.0%})")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
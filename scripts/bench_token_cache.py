@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: MCP tool-call auth overhead with and without the verified-token cache.
+
+A chat turn verifies the caller's token once in get_current_user, then each MCP
+tool call verifies it again (twice for save_expense: get_user_firebase and
+get_user_budget_manager). Firebase's verify_id_token is replaced by a stub
+that sleeps for a fixed time, standing in for RS256 signature checking plus
+the occasional public-key fetch, so the numbers isolate verification cost.
+
+Usage:
+    python scripts/bench_token_cache.py
+    python scripts/bench_token_cache.py --turns 200 --tools-per-turn 4 --verify-ms 3
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.token_cache import verify_id_token_cached, clear_token_cache, get_token_cache_stats
+
+
+def make_stub_verifier(delay: float):
+    """Stub for firebase_auth.verify_id_token: fixed cost, valid for one hour."""
+    calls = {"count": 0}
+
+    def verify(token: str) -> dict:
+        calls["count"] += 1
+        time.sleep(delay)
+        return {"uid": token.split(":", 1)[0], "exp": time.time() + 3600}
+
+    return verify, calls
+
+
+def run_turns(verify, turns: int, tools_per_turn: int) -> list[float]:
+    """
+    Simulate chat turns. Each turn uses a fresh token (as a client refreshing
+    its ID token would at worst) and returns per-tool-call auth latencies.
+    """
+    latencies = []
+    for turn in range(turns):
+        token = f"user{turn % 20}:token-{turn}"
+        verify(token)  # get_current_user
+        for _ in range(tools_per_turn):
+            start = time.perf_counter()
+            verify(token)  # get_user_firebase
+            verify(token)  # get_user_budget_manager
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def report(label: str, latencies: list[float], verifier_calls: int) -> None:
+    us = [x * 1_000_000 for x in latencies]
+    print(
+        f"{label:<14} mean={statistics.mean(us):9.1f}us  p50={statistics.median(us):9.1f}us  "
+        f"max={max(us):9.1f}us  verify_id_token calls={verifier_calls}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the verified-token cache")
+    parser.add_argument("--turns", type=int, default=100, help="Chat turns to simulate")
+    parser.add_argument("--tools-per-turn", type=int, default=3, help="MCP tool calls per turn")
+    parser.add_argument("--verify-ms", type=float, default=2.0, help="Simulated verify_id_token cost")
+    args = parser.parse_args()
+
+    delay = args.verify_ms / 1000
+    print(
+        f"{args.turns} turns x {args.tools_per_turn} tool calls, "
+        f"{args.verify_ms:.1f}ms per verify_id_token\n"
+    )
+
+    verify, calls = make_stub_verifier(delay)
+    before = run_turns(verify, args.turns, args.tools_per_turn)
+    report("uncached", before, calls["count"])
+
+    clear_token_cache()
+    verify, calls = make_stub_verifier(delay)
+    after = run_turns(lambda t: verify_id_token_cached(t, verifier=verify), args.turns, args.tools_per_turn)
+    report("cached", after, calls["count"])
+
+    stats = get_token_cache_stats()
+    print(f"\ncache: hits={stats['hits']} misses={stats['misses']} hit_rate={stats['hit_rate']:.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Migration script: conversation messages array -> messages subcollection.
+
+Conversations used to store every message in a "messages" array on the
+conversation document. They now live in
+users/{uid}/conversations/{id}/messages/{seq}, with only summary metadata
+(message_count, first_message, ...) on the conversation document.
+
+Unmigrated conversations keep working — they are read from the array and
+moved on their next new message — but until then they are still fully
+transferred by the admin analytics query. This script moves them all.
+
+For each conversation with a "messages" array, writes one document per
+message (batched, deterministic IDs), then sets message_count/first_message
+and deletes the array.
+
+Idempotent: safe to re-run. Migrated conversations are skipped, and an
+interrupted conversation is redone from scratch on the next run.
+
+Usage:
+    python scripts/migrate_conversation_messages.py                # all users
+    python scripts/migrate_conversation_messages.py --uid <uid>    # a single user
+    python scripts/migrate_conversation_messages.py --dry-run      # count only, no writes
+"""
+
+import argparse
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dotenv import load_dotenv
+load_dotenv(override=True)
+
+from backend.firebase_client import FirebaseClient
+
+
+def process_user(uid: str, apply: bool) -> dict:
+    """Migrate (or count) every legacy conversation for one user."""
+    client = FirebaseClient.for_user(uid)
+    counts = {"conversations": 0, "legacy": 0, "messages": 0, "migrated": 0}
+
+    conversations = client.db.collection(client._get_collection_path("conversations"))
+    for doc in conversations.stream():
+        counts["conversations"] += 1
+        legacy = doc.to_dict().get("messages")
+        if legacy is None:
+            continue
+
+        counts["legacy"] += 1
+        counts["messages"] += len(legacy)
+        print(f"[uid={uid}] {doc.id}: {len(legacy)} messages")
+
+        if apply:
+            client.migrate_conversation_messages(doc.id)
+            counts["migrated"] += 1
+
+    return counts
+
+
+def run(uid: str | None, apply: bool) -> None:
+    if uid:
+        uids = [uid]
+    else:
+        db = FirebaseClient().db
+        uids = [doc.id for doc in db.collection("users").stream()]
+
+    totals = {"conversations": 0, "legacy": 0, "messages": 0, "migrated": 0}
+    for user_id in uids:
+        counts = process_user(user_id, apply)
+        for key, value in counts.items():
+            totals[key] += value
+
+    mode = "(applied)" if apply else "(dry run)"
+    print(
+        f"\nDone {mode}. users={len(uids)} conversations={totals['conversations']} "
+        f"legacy={totals['legacy']} messages={totals['messages']} migrated={totals['migrated']}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uid", help="Only process this user.")
+    parser.add_argument("--dry-run", action="store_true", help="Count legacy conversations without writing.")
+    args = parser.parse_args()
+    run(uid=args.uid, apply=not args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,724 @@
+"""
+In-memory stand-in for the Firestore client used by tests and benchmarks.
+
+Implements the slice of the google-cloud-firestore API that FirebaseClient
+relies on (collections, documents, queries, batches, bulk writers,
+transactions) and counts every round trip and document transferred, so tests
+can assert on I/O rather than on timing. An optional per-RPC latency makes
+it usable as a load target for the scripts/bench_*.py benchmarks.
+
+Usage:
+    db = FakeFirestore(latency=0.02)
+    client = fake_firebase_client(db, user_id="u1")
+    client.save_expense(...)
+    assert db.stats["rpcs"] == 1
+"""
+
+import copy
+import itertools
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from google.cloud.firestore_v1 import transforms
+from google.cloud.firestore_v1.base_aggregation import AggregationResult
+
+_ID_COUNTER = itertools.count()
+
+
+def _new_id() -> str:
+    return f"{next(_ID_COUNTER):06d}{uuid.uuid4().hex[:14]}"
+
+
+def _get_field(data: dict, field_path: str) -> Any:
+    value: Any = data
+    for part in field_path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def _has_field(data: dict, field_path: str) -> bool:
+    value: Any = data
+    for part in field_path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return False
+        value = value[part]
+    return True
+
+
+def _set_field(data: dict, field_path: str, value: Any) -> None:
+    parts = field_path.split(".")
+    target = data
+    for part in parts[:-1]:
+        if not isinstance(target.get(part), dict):
+            target[part] = {}
+        target = target[part]
+    current = target.get(parts[-1])
+
+    if value is transforms.DELETE_FIELD:
+        target.pop(parts[-1], None)
+    elif value is transforms.SERVER_TIMESTAMP:
+        target[parts[-1]] = datetime.now(timezone.utc)
+    elif isinstance(value, transforms.ArrayUnion):
+        existing = list(current) if isinstance(current, list) else []
+        for item in value.values:
+            if item not in existing:
+                existing.append(item)
+        target[parts[-1]] = existing
+    elif isinstance(value, transforms.ArrayRemove):
+        existing = list(current) if isinstance(current, list) else []
+        target[parts[-1]] = [item for item in existing if item not in value.values]
+    elif isinstance(value, transforms.Increment):
+        target[parts[-1]] = (current or 0) + value.value
+    elif isinstance(value, dict):
+        target[parts[-1]] = {}
+        for key, sub in value.items():
+            _set_field(target[parts[-1]], key, sub)
+    else:
+        target[parts[-1]] = copy.deepcopy(value)
+
+
+def _merge(data: dict, updates: dict) -> None:
+    for key, value in updates.items():
+        if isinstance(value, dict) and isinstance(data.get(key), dict):
+            _merge(data[key], value)
+        else:
+            _set_field(data, key, value)
+
+
+def _sort_key(value: Any):
+    # Firestore orders null < numbers < strings < maps; mirror that loosely.
+    if value is None:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (1, int(value))
+    if isinstance(value, (int, float)):
+        return (2, value)
+    if isinstance(value, datetime):
+        return (3, value.timestamp())
+    if isinstance(value, str):
+        return (4, value)
+    return (5, str(value))
+
+
+class FakeSnapshot:
+    """Mimics DocumentSnapshot."""
+
+    def __init__(self, reference: "FakeDocumentReference", data: Optional[dict]):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self) -> Optional[dict]:
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field_path: str) -> Any:
+        return copy.deepcopy(_get_field(self._data or {}, field_path))
+
+
+class FakeDocumentReference:
+    """Mimics DocumentReference."""
+
+    def __init__(self, db: "FakeFirestore", path: str):
+        self._db = db
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    @property
+    def parent(self) -> "FakeCollectionReference":
+        return FakeCollectionReference(self._db, self.path.rsplit("/", 1)[0])
+
+    def collection(self, name: str) -> "FakeCollectionReference":
+        return FakeCollectionReference(self._db, f"{self.path}/{name}")
+
+    def collections(self) -> List["FakeCollectionReference"]:
+        self._db._rpc()
+        prefix = self.path + "/"
+        names = set()
+        for path in self._db._docs:
+            if path.startswith(prefix):
+                names.add(path[len(prefix):].split("/", 1)[0])
+        return [self.collection(name) for name in sorted(names)]
+
+    def get(self, field_paths=None, transaction=None) -> FakeSnapshot:
+        self._db._rpc()
+        return self._db._snapshot(self)
+
+    def set(self, data: dict, merge: bool = False) -> None:
+        self._db._rpc(writes=1)
+        self._db._apply_set(self.path, data, merge)
+
+    def create(self, data: dict) -> None:
+        self._db._rpc(writes=1)
+        if self.path in self._db._docs:
+            raise FakeConflict(f"Document already exists: {self.path}")
+        self._db._apply_set(self.path, data, False)
+
+    def update(self, data: dict) -> None:
+        self._db._rpc(writes=1)
+        self._db._apply_update(self.path, data)
+
+    def delete(self) -> None:
+        self._db._rpc(writes=1)
+        self._db._docs.pop(self.path, None)
+
+    def __eq__(self, other):
+        return isinstance(other, FakeDocumentReference) and other.path == self.path
+
+    def __hash__(self):
+        return hash(self.path)
+
+
+class FakeNotFound(Exception):
+    """Raised when updating a missing document (google.api_core NotFound)."""
+
+
+class FakeConflict(Exception):
+    """Raised when creating an existing document (google.api_core Conflict)."""
+
+
+class FakeQuery:
+    """Mimics Query / CollectionGroup with in-memory filtering."""
+
+    def __init__(self, db: "FakeFirestore", collection_path: Optional[str] = None,
+                 group_id: Optional[str] = None):
+        self._db = db
+        self._collection_path = collection_path
+        self._group_id = group_id
+        self._filters: List[tuple] = []
+        self._orders: List[tuple] = []
+        self._limit: Optional[int] = None
+        self._start_after: Optional[Any] = None
+        self._projection: Optional[List[str]] = None
+
+    def _copy(self) -> "FakeQuery":
+        clone = FakeQuery(self._db, self._collection_path, self._group_id)
+        clone._filters = list(self._filters)
+        clone._orders = list(self._orders)
+        clone._limit = self._limit
+        clone._start_after = self._start_after
+        clone._projection = self._projection
+        return clone
+
+    def where(self, field_path=None, op_string=None, value=None, filter=None) -> "FakeQuery":
+        clone = self._copy()
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        clone._filters.append((field_path, op_string, value))
+        return clone
+
+    def order_by(self, field_path: str, direction: str = "ASCENDING") -> "FakeQuery":
+        clone = self._copy()
+        clone._orders.append((field_path, direction))
+        return clone
+
+    def limit(self, count: int) -> "FakeQuery":
+        clone = self._copy()
+        clone._limit = count
+        return clone
+
+    def start_after(self, document_fields_or_snapshot) -> "FakeQuery":
+        clone = self._copy()
+        clone._start_after = document_fields_or_snapshot
+        return clone
+
+    def select(self, field_paths: Iterable[str]) -> "FakeQuery":
+        clone = self._copy()
+        clone._projection = list(field_paths)
+        return clone
+
+    # ---- aggregation ----
+
+    def count(self, alias: Optional[str] = None) -> "FakeAggregationQuery":
+        return FakeAggregationQuery(self).count(alias=alias)
+
+    def sum(self, field_ref: str, alias: Optional[str] = None) -> "FakeAggregationQuery":
+        return FakeAggregationQuery(self).sum(field_ref, alias=alias)
+
+    def avg(self, field_ref: str, alias: Optional[str] = None) -> "FakeAggregationQuery":
+        return FakeAggregationQuery(self).avg(field_ref, alias=alias)
+
+    # ---- execution ----
+
+    def _matches_path(self, path: str) -> bool:
+        parent, _doc_id = path.rsplit("/", 1)
+        if self._collection_path is not None:
+            return parent == self._collection_path
+        return parent.rsplit("/", 1)[-1] == self._group_id
+
+    def _matches_filters(self, data: dict) -> bool:
+        for field_path, op, value in self._filters:
+            if op in ("==", "!=", "<", "<=", ">", ">=", "in", "not-in") and not _has_field(data, field_path):
+                return False
+            current = _get_field(data, field_path)
+            if op == "==" and not current == value:
+                return False
+            if op == "!=" and not current != value:
+                return False
+            if op in ("<", "<=", ">", ">="):
+                if current is None or _sort_key(current)[0] != _sort_key(value)[0]:
+                    return False
+                if op == "<" and not current < value:
+                    return False
+                if op == "<=" and not current <= value:
+                    return False
+                if op == ">" and not current > value:
+                    return False
+                if op == ">=" and not current >= value:
+                    return False
+            if op == "in" and current not in value:
+                return False
+            if op == "not-in" and current in value:
+                return False
+            if op == "array_contains" and (not isinstance(current, list) or value not in current):
+                return False
+            if op == "array_contains_any" and (
+                not isinstance(current, list) or not any(v in current for v in value)
+            ):
+                return False
+        return True
+
+    def _ordering(self) -> List[tuple]:
+        orders = list(self._orders)
+        # Firestore implicitly orders by the inequality field first
+        for field_path, op, _value in self._filters:
+            if op in ("<", "<=", ">", ">=", "!=", "not-in") and not any(o[0] == field_path for o in orders):
+                orders.insert(0, (field_path, "ASCENDING"))
+        return orders
+
+    def _run(self) -> List[tuple]:
+        # Copied under the lock: other threads may be writing concurrently
+        with self._db._lock:
+            items = list(self._db._docs.items())
+        rows = [
+            (path, data) for path, data in items
+            if self._matches_path(path) and self._matches_filters(data)
+        ]
+        orders = self._ordering()
+        rows.sort(key=lambda row: row[0])
+        for field_path, direction in reversed(orders):
+            if field_path == "__name__":
+                rows.sort(key=lambda row: row[0], reverse=direction == "DESCENDING")
+            else:
+                rows = [r for r in rows if _has_field(r[1], field_path)]
+                rows.sort(
+                    key=lambda row: _sort_key(_get_field(row[1], field_path)),
+                    reverse=direction == "DESCENDING",
+                )
+        if self._start_after is not None:
+            rows = self._apply_cursor(rows, orders)
+        if self._limit is not None:
+            rows = rows[: self._limit]
+        return rows
+
+    def _apply_cursor(self, rows: List[tuple], orders: List[tuple]) -> List[tuple]:
+        cursor = self._start_after
+        if isinstance(cursor, FakeSnapshot):
+            for index, (path, _data) in enumerate(rows):
+                if path == cursor.reference.path:
+                    return rows[index + 1:]
+            cursor = cursor.to_dict() or {}
+        # Field-value cursor: skip rows up to and including the cursor position.
+        # __name__ is a document reference (compared by path) or ID.
+        keys = [o for o in orders if o[0] != "__name__" or "__name__" in cursor]
+        for index, (path, data) in enumerate(rows):
+            beyond = False
+            for field_path, direction in keys:
+                if field_path == "__name__":
+                    name = cursor["__name__"]
+                    if hasattr(name, "path"):
+                        current, bound = path, name.path
+                    else:
+                        current, bound = path.rsplit("/", 1)[-1], name
+                else:
+                    current = _sort_key(_get_field(data, field_path))
+                    bound = _sort_key(cursor.get(field_path))
+                if current == bound:
+                    continue
+                beyond = current < bound if direction == "DESCENDING" else current > bound
+                break
+            if beyond:
+                return rows[index:]
+        return []
+
+    def stream(self, transaction=None):
+        self._db._rpc()
+        rows = self._run()
+        self._db.stats["docs_read"] += len(rows)
+        for path, data in rows:
+            if self._projection is not None:
+                projected: dict = {}
+                for field_path in self._projection:
+                    if _has_field(data, field_path):
+                        _set_field(projected, field_path, _get_field(data, field_path))
+                data = projected
+            self._db.stats["bytes_read"] += len(repr(data))
+            yield FakeSnapshot(FakeDocumentReference(self._db, path), copy.deepcopy(data))
+
+    def get(self, transaction=None) -> List[FakeSnapshot]:
+        return list(self.stream(transaction=transaction))
+
+
+class FakeAggregationQuery:
+    """Mimics AggregationQuery (count/sum/avg) — transfers no documents."""
+
+    def __init__(self, query: FakeQuery):
+        self._query = query
+        self._aggregations: List[tuple] = []
+
+    def count(self, alias: Optional[str] = None) -> "FakeAggregationQuery":
+        self._aggregations.append(("count", None, alias or "count"))
+        return self
+
+    def sum(self, field_ref: str, alias: Optional[str] = None) -> "FakeAggregationQuery":
+        self._aggregations.append(("sum", field_ref, alias or "sum"))
+        return self
+
+    def avg(self, field_ref: str, alias: Optional[str] = None) -> "FakeAggregationQuery":
+        self._aggregations.append(("avg", field_ref, alias or "avg"))
+        return self
+
+    def get(self, transaction=None) -> List[List[AggregationResult]]:
+        db = self._query._db
+        db._rpc()
+        db.stats["aggregations"] += 1
+        rows = self._query._run()
+        results = []
+        for kind, field_ref, alias in self._aggregations:
+            if kind == "count":
+                value: Any = len(rows)
+            else:
+                numbers = [
+                    _get_field(data, field_ref) for _path, data in rows
+                    if isinstance(_get_field(data, field_ref), (int, float))
+                ]
+                if kind == "sum":
+                    value = sum(numbers)
+                else:
+                    value = sum(numbers) / len(numbers) if numbers else None
+            results.append(AggregationResult(alias=alias, value=value))
+        return [results]
+
+
+class FakeCollectionReference(FakeQuery):
+    """Mimics CollectionReference."""
+
+    def __init__(self, db: "FakeFirestore", path: str):
+        super().__init__(db, collection_path=path)
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    @property
+    def parent(self) -> Optional[FakeDocumentReference]:
+        if "/" not in self.path:
+            return None
+        return FakeDocumentReference(self._db, self.path.rsplit("/", 1)[0])
+
+    def document(self, document_id: Optional[str] = None) -> FakeDocumentReference:
+        return FakeDocumentReference(self._db, f"{self.path}/{document_id or _new_id()}")
+
+    def add(self, data: dict):
+        ref = self.document()
+        ref.set(data)
+        return datetime.now(timezone.utc), ref
+
+    def list_documents(self) -> List[FakeDocumentReference]:
+        self._db._rpc()
+        prefix = self.path + "/"
+        ids = sorted({p[len(prefix):].split("/", 1)[0] for p in self._db._docs if p.startswith(prefix)})
+        return [self.document(doc_id) for doc_id in ids]
+
+
+class FakeWriteBatch:
+    """Mimics WriteBatch: buffered writes applied in a single round trip."""
+
+    MAX_OPS = 500
+
+    def __init__(self, db: "FakeFirestore"):
+        self._db = db
+        self._ops: List[tuple] = []
+
+    def set(self, reference, document_data, merge=False):
+        self._ops.append(("set", reference, document_data, merge))
+
+    def create(self, reference, document_data):
+        self._ops.append(("create", reference, document_data, False))
+
+    def update(self, reference, field_updates):
+        self._ops.append(("update", reference, field_updates, False))
+
+    def delete(self, reference):
+        self._ops.append(("delete", reference, None, False))
+
+    def __len__(self):
+        return len(self._ops)
+
+    def commit(self):
+        if len(self._ops) > self.MAX_OPS:
+            raise ValueError(f"Batch exceeds {self.MAX_OPS} operations")
+        self._db._rpc(writes=len(self._ops))
+        self._db.stats["commits"] += 1
+        for op, reference, data, merge in self._ops:
+            if op == "set":
+                self._db._apply_set(reference.path, data, merge)
+            elif op == "create":
+                if reference.path in self._db._docs:
+                    raise FakeConflict(f"Document already exists: {reference.path}")
+                self._db._apply_set(reference.path, data, False)
+            elif op == "update":
+                self._db._apply_update(reference.path, data)
+            else:
+                self._db._docs.pop(reference.path, None)
+        self._ops = []
+        return []
+
+
+class FakeBulkWriter:
+    """
+    Mimics BulkWriter: writes are sent in non-atomic batches of BATCH_SIZE,
+    one round trip each, as batches fill and on flush() / close().
+
+    Throttling options are recorded but not enforced. Set fail_paths on the
+    store to make deletes of those paths fail (reported via on_write_error).
+    """
+
+    BATCH_SIZE = 20
+
+    def __init__(self, db: "FakeFirestore", options=None):
+        self._db = db
+        self.options = options
+        self._ops: List[tuple] = []
+        self._error_callback = lambda failure, writer: False
+        self._is_open = True
+
+    def on_write_error(self, callback) -> None:
+        self._error_callback = callback
+
+    def set(self, reference, document_data, merge=False):
+        self._add(("set", reference, document_data, merge))
+
+    def update(self, reference, field_updates):
+        self._add(("update", reference, field_updates, False))
+
+    def delete(self, reference):
+        self._add(("delete", reference, None, False))
+
+    def _add(self, op: tuple) -> None:
+        if not self._is_open:
+            raise Exception("BulkWriter is closed and cannot accept new operations")
+        self._ops.append(op)
+        if len(self._ops) >= self.BATCH_SIZE:
+            self._send()
+
+    def _send(self) -> None:
+        ops, self._ops = self._ops, []
+        if not ops:
+            return
+        self._db._rpc(writes=len(ops))
+        for op, reference, data, merge in ops:
+            attempts = 0
+            while reference.path in self._db.fail_paths:
+                attempts += 1
+                failure = _FakeBulkWriteFailure(reference, attempts)
+                if not self._error_callback(failure, self):
+                    break
+            else:
+                if op == "set":
+                    self._db._apply_set(reference.path, data, merge)
+                elif op == "update":
+                    self._db._apply_update(reference.path, data)
+                else:
+                    self._db._docs.pop(reference.path, None)
+
+    def flush(self) -> None:
+        self._send()
+
+    def close(self) -> None:
+        self._is_open = False
+        self._send()
+
+
+class _FakeBulkWriteOperation:
+    def __init__(self, reference):
+        self.reference = reference
+
+
+class _FakeBulkWriteFailure:
+    """Mimics BulkWriteFailure for an UNAVAILABLE error."""
+
+    def __init__(self, reference, attempts: int):
+        self.operation = _FakeBulkWriteOperation(reference)
+        self.attempts = attempts
+        self.code = 14
+        self.message = "unavailable"
+
+
+class FakeTransaction(FakeWriteBatch):
+    """
+    Mimics Transaction closely enough for firestore.transactional().
+
+    Reads go straight to the store; writes are buffered and applied at commit.
+    Concurrency is serialized with the store lock rather than optimistic retries.
+    """
+
+    def __init__(self, db: "FakeFirestore"):
+        super().__init__(db)
+        self._id = None
+        self._read_only = False
+        self._max_attempts = 5
+        self.in_progress = False
+
+    def get(self, ref_or_query):
+        if isinstance(ref_or_query, FakeDocumentReference):
+            return iter([ref_or_query.get()])
+        return ref_or_query.stream()
+
+    def get_all(self, references):
+        return self._db.get_all(references)
+
+    # Hooks used by google.cloud.firestore_v1.transaction._Transactional
+    def _clean_up(self):
+        self._ops = []
+        self._id = None
+        self.in_progress = False
+
+    def _begin(self, retry_id=None):
+        self._db._lock.acquire()
+        self._id = _new_id().encode()
+        self.in_progress = True
+
+    def _commit(self):
+        try:
+            if self._ops:
+                self.commit()
+            else:
+                self._db._rpc()
+        finally:
+            self._clean_up()
+            self._db._lock.release()
+        return []
+
+    def _rollback(self):
+        if self.in_progress:
+            self._clean_up()
+            self._db._lock.release()
+
+
+class FakeFirestore:
+    """
+    In-memory Firestore client.
+
+    Attributes:
+        stats: Counters for round trips ("rpcs"), documents returned by
+               queries/gets ("docs_read"), approximate bytes returned
+               ("bytes_read"), documents written ("writes"), batch/transaction
+               commits ("commits") and aggregation queries ("aggregations").
+        latency: Seconds to sleep per round trip (simulated network time).
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self._docs: Dict[str, dict] = {}
+        self._lock = threading.RLock()
+        # Writes to these paths fail in FakeBulkWriter
+        self.fail_paths: set = set()
+        self.stats: Dict[str, int] = {}
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.stats = {
+            "rpcs": 0, "docs_read": 0, "bytes_read": 0,
+            "writes": 0, "commits": 0, "aggregations": 0,
+        }
+
+    def _rpc(self, writes: int = 0) -> None:
+        self.stats["rpcs"] += 1
+        self.stats["writes"] += writes
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _snapshot(self, ref: FakeDocumentReference) -> FakeSnapshot:
+        data = self._docs.get(ref.path)
+        if data is not None:
+            self.stats["docs_read"] += 1
+            self.stats["bytes_read"] += len(repr(data))
+        return FakeSnapshot(ref, copy.deepcopy(data) if data is not None else None)
+
+    def _apply_set(self, path: str, data: dict, merge: bool) -> None:
+        with self._lock:
+            if merge and path in self._docs:
+                _merge(self._docs[path], data)
+            else:
+                fresh: dict = {}
+                _merge(fresh, data)
+                self._docs[path] = fresh
+
+    def _apply_update(self, path: str, data: dict) -> None:
+        with self._lock:
+            if path not in self._docs:
+                raise FakeNotFound(f"No document to update: {path}")
+            for key, value in data.items():
+                _set_field(self._docs[path], key, value)
+
+    # ---- client API ----
+
+    def collection(self, path: str) -> FakeCollectionReference:
+        return FakeCollectionReference(self, path)
+
+    def document(self, path: str) -> FakeDocumentReference:
+        return FakeDocumentReference(self, path)
+
+    def collection_group(self, collection_id: str) -> FakeQuery:
+        return FakeQuery(self, group_id=collection_id)
+
+    def batch(self) -> FakeWriteBatch:
+        return FakeWriteBatch(self)
+
+    def transaction(self, **kwargs) -> FakeTransaction:
+        return FakeTransaction(self)
+
+    def bulk_writer(self, options=None) -> FakeBulkWriter:
+        return FakeBulkWriter(self, options)
+
+    def get_all(self, references, field_paths=None, transaction=None):
+        self._rpc()
+        for ref in references:
+            yield self._snapshot(ref)
+
+    # ---- test helpers ----
+
+    def seed(self, path: str, data: dict) -> None:
+        """Write a document directly, without counting it as a round trip."""
+        self._apply_set(path, data, False)
+
+    def dump(self, prefix: str = "") -> Dict[str, dict]:
+        """Return a copy of every stored document whose path starts with prefix."""
+        return {p: copy.deepcopy(d) for p, d in self._docs.items() if p.startswith(prefix)}
+
+
+def fake_firebase_client(db: FakeFirestore, user_id: Optional[str] = None):
+    """
+    Build a FirebaseClient backed by a FakeFirestore without touching credentials.
+
+    Args:
+        db: The in-memory store to use
+        user_id: Optional user ID for user-scoped operations
+
+    Returns:
+        FirebaseClient instance
+    """
+    from backend.firebase_client import FirebaseClient, clear_user_cache
+
+    # The user cache is process-wide; don't let entries leak between fake stores
+    clear_user_cache()
+
+    client = FirebaseClient.__new__(FirebaseClient)
+    client.db = db
+    client.bucket = None
+    client.user_id = user_id
+    return client
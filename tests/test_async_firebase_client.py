@@ -0,0 +1,75 @@
+"""
+Tests for AsyncFirebaseClient — the non-blocking facade over FirebaseClient.
+
+Covers:
+- every public FirebaseClient method is mirrored as a coroutine
+- calls run off the event loop (concurrent calls overlap)
+- results and exceptions pass through unchanged
+"""
+
+import asyncio
+import inspect
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.firebase_client import FirebaseClient
+from backend.async_firebase_client import AsyncFirebaseClient
+from backend.exceptions import DocumentNotFoundError
+from tests.fake_firestore import FakeFirestore, fake_firebase_client
+
+
+def make_client(latency: float = 0.0) -> AsyncFirebaseClient:
+    db = FakeFirestore(latency=latency)
+    return AsyncFirebaseClient(client=fake_firebase_client(db, "test_user_123"))
+
+
+def test_public_api_is_mirrored():
+    for name, member in inspect.getmembers(FirebaseClient, inspect.isfunction):
+        if name.startswith("_"):
+            continue
+        mirrored = getattr(AsyncFirebaseClient, name, None)
+        assert mirrored is not None, f"{name} missing from AsyncFirebaseClient"
+        assert inspect.iscoroutinefunction(mirrored), f"{name} is not async"
+
+
+def test_results_pass_through():
+    client = make_client()
+
+    async def scenario():
+        conversation_id = await client.create_conversation()
+        conversation = await client.get_conversation(conversation_id)
+        return conversation_id, conversation
+
+    conversation_id, conversation = asyncio.run(scenario())
+    assert conversation["conversation_id"] == conversation_id
+    assert client.user_id == "test_user_123"
+
+
+def test_exceptions_propagate():
+    client = make_client()
+    try:
+        asyncio.run(client.delete_expense("missing"))
+        assert False, "Should have raised DocumentNotFoundError"
+    except DocumentNotFoundError:
+        pass
+
+
+def test_calls_do_not_block_event_loop():
+    """Ten 50ms Firestore reads awaited together finish in ~1 RPC of wall time."""
+    client = make_client(latency=0.05)
+
+    async def scenario():
+        start = time.perf_counter()
+        await asyncio.gather(*(client.get_user_categories() for _ in range(10)))
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(scenario())
+    assert elapsed < 0.3, f"calls appear serialized ({elapsed:.2f}s)"
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v"])
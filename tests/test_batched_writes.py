@@ -0,0 +1,184 @@
+"""
+Tests for batched multi-document reads and writes.
+
+Covers:
+- write_batch commits in chunks of FIRESTORE_BATCH_LIMIT; get_all reads in one round trip per chunk
+- category deletion, reordering and initialization use one commit per chunk
+- verify_expenses_exist reads every ID in one round trip
+- /budget-caps/bulk-update and /onboarding/complete write in one batch
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from backend.firebase_client import FIRESTORE_BATCH_LIMIT, FirebaseClient, clear_user_cache
+from tests.fake_firestore import FakeFirestore, fake_firebase_client
+
+UID = "u1"
+
+
+@pytest.fixture
+def db():
+    return FakeFirestore()
+
+
+@pytest.fixture
+def client(db):
+    client = fake_firebase_client(db, UID)
+    client.initialize_default_categories(1000, ["FOOD_OUT", "GROCERIES", "COFFEE"])
+    client.get_user_categories()
+    db.reset_stats()
+    return client
+
+
+# ==================== Batch API ====================
+
+def test_write_batch_commits_in_chunks(db):
+    client = fake_firebase_client(db, UID)
+    with client.write_batch() as batch:
+        for i in range(2 * FIRESTORE_BATCH_LIMIT + 1):
+            batch.set(db.document(f"items/{i}"), {"i": i})
+
+    assert batch.operations == 1001 and batch.commits == 3
+    assert db.stats["commits"] == 3 and db.stats["rpcs"] == 3
+    assert len(db.dump("items/")) == 1001
+
+
+def test_write_batch_discards_remainder_on_error(db):
+    client = fake_firebase_client(db, UID)
+    with pytest.raises(RuntimeError):
+        with client.write_batch() as batch:
+            batch.set(db.document("items/a"), {})
+            raise RuntimeError("boom")
+
+    assert db.stats["commits"] == 0 and db.dump("items/") == {}
+
+
+def test_get_all_preserves_order_in_one_round_trip_per_chunk(db):
+    client = fake_firebase_client(db, UID)
+    for i in range(600):
+        db.seed(f"items/{i}", {"i": i})
+
+    snapshots = client.get_all([db.document("items/5"), db.document("items/missing"), db.document("items/1")])
+    assert [(s.id, s.exists) for s in snapshots] == [("5", True), ("missing", False), ("1", True)]
+    assert db.stats["rpcs"] == 1
+
+    db.reset_stats()
+    snapshots = client.get_all([db.document(f"items/{i}") for i in range(600)])
+    assert [s.to_dict()["i"] for s in snapshots] == list(range(600))
+    assert db.stats["rpcs"] == 2
+
+
+# ==================== Call sites ====================
+
+def test_delete_category_reassigns_in_batches(db, client):
+    for i in range(600):
+        db.seed(f"users/{UID}/expenses/e{i}", {"category": "COFFEE", "amount": 1.0})
+    db.seed(f"users/{UID}/expenses/keep", {"category": "FOOD_OUT", "amount": 1.0})
+    db.seed(f"users/{UID}/recurring_expenses/r1", {"category": "COFFEE"})
+
+    assert client.delete_category("COFFEE", reassign_to="OTHER") == 600
+
+    # 600 expenses + 1 template + the category delete
+    assert db.stats["writes"] == 602 and db.stats["commits"] == 2
+    # Rollups-with-category query, two keys-only queries, two commits
+    assert db.stats["rpcs"] == 5
+    expenses = db.dump(f"users/{UID}/expenses/")
+    assert sum(e["category"] == "OTHER" for e in expenses.values()) == 600
+    assert db.dump(f"users/{UID}/recurring_expenses/r1")[f"users/{UID}/recurring_expenses/r1"]["category"] == "OTHER"
+    assert f"users/{UID}/categories/COFFEE" not in db.dump(f"users/{UID}/categories/")
+
+
+def test_reorder_categories_reads_and_writes_once(db, client):
+    client.reorder_categories(["OTHER", "MISSING", "COFFEE", "FOOD_OUT", "GROCERIES"])
+
+    assert db.stats["rpcs"] == 2 and db.stats["commits"] == 1
+    order = [c["category_id"] for c in client.get_user_categories()]
+    assert order == ["OTHER", "COFFEE", "FOOD_OUT", "GROCERIES"]
+
+
+def test_initialize_default_categories_is_one_commit(db):
+    client = fake_firebase_client(db, UID)
+    client.initialize_default_categories(1500, ["FOOD_OUT", "GROCERIES", "NOT_A_DEFAULT"])
+
+    assert db.stats["rpcs"] == 1 and db.stats["writes"] == 4
+    assert len(db.dump(f"users/{UID}/categories/")) == 3
+    assert client.get_total_monthly_budget() == 1500
+
+
+def test_verify_expenses_exist_is_one_read(db, client):
+    for i in range(3):
+        db.seed(f"users/{UID}/expenses/e{i}", {"amount": 1.0})
+
+    assert client.verify_expenses_exist(["e0", "gone", "e2"]) == ["e0", "e2"]
+    assert db.stats["rpcs"] == 1
+
+
+# ==================== Endpoints ====================
+
+@pytest.fixture
+def api_client(db, monkeypatch):
+    from fastapi.testclient import TestClient
+    from backend import api
+    from backend.auth import AuthenticatedUser, get_current_user
+
+    def fake_init(self, user_id=None):
+        self.db = db
+        self.bucket = None
+        self.user_id = user_id
+
+    clear_user_cache()
+    monkeypatch.setattr(FirebaseClient, "__init__", fake_init)
+    api.app.dependency_overrides[get_current_user] = lambda: AuthenticatedUser(
+        uid=UID, email="test@example.com", email_verified=True,
+    )
+    yield TestClient(api.app)
+    api.app.dependency_overrides.pop(get_current_user, None)
+
+
+def test_bulk_update_budget_caps_is_one_commit(db, api_client):
+    response = api_client.put("/budget-caps/bulk-update", json={
+        "total_budget": 2000.0,
+        "category_budgets": {"FOOD_OUT": 500.0, "RENT": 1200.0, "GROCERIES": 150.0},
+    })
+
+    assert response.status_code == 200, response.text
+    assert response.json()["updated_caps"] == {"TOTAL": 2000.0, "FOOD_OUT": 500.0, "RENT": 1200.0, "GROCERIES": 150.0}
+    # One commit, then the caps are read back
+    assert db.stats["commits"] == 1 and db.stats["rpcs"] == 2
+
+
+def test_onboarding_is_one_commit(db, api_client):
+    response = api_client.post("/onboarding/complete", json={
+        "total_budget": 2000.0,
+        "selected_category_ids": ["FOOD_OUT", "GROCERIES"],
+        "category_caps": {"FOOD_OUT": 400.0, "GROCERIES": 300.0, "CUSTOM_123": 100.0, "RENT": 50.0},
+        "custom_categories": [{"display_name": "Pet Care", "icon": "dog", "color": "#123456", "monthly_cap": 100.0}],
+        "excluded_category_ids": ["GROCERIES"],
+        "budget_month_start_day": 1,
+    })
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["categories_created"] == 4
+    assert data["other_cap"] == 1200.0
+
+    categories = {p.rsplit("/", 1)[1]: d for p, d in db.dump(f"users/{UID}/categories/").items()}
+    assert set(categories) == {"FOOD_OUT", "GROCERIES", "OTHER", "PET_CARE"}
+    assert categories["FOOD_OUT"]["monthly_cap"] == 400.0
+    assert categories["GROCERIES"]["exclude_from_total"] is True
+    assert categories["PET_CARE"]["sort_order"] == 3
+    assert categories["OTHER"]["monthly_cap"] == 1200.0
+    assert db.dump(f"users/{UID}")[f"users/{UID}"]["total_monthly_budget"] == 2000.0
+
+    # Category list read, one batch, then the period settings write and rollup cleanup
+    assert db.stats["commits"] == 1
+    assert db.stats["rpcs"] == 4
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
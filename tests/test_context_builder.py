@@ -0,0 +1,239 @@
+"""
+Tests for the token-budgeted conversation context builder.
+
+Covers:
+- short histories are replayed verbatim (structured blocks decoded)
+- oversized stored tool results become digests, the latest turn's included
+- over budget, the oldest turns fold into the rolling summary down to half
+  the budget, and the message prefix then stays stable until the next fold,
+  tool result digests included
+- the summary is extended incrementally and persisted with the turn
+- tool_use / tool_result pairs are never split
+"""
+
+import asyncio
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytz
+
+from backend import chat_helpers, context_builder
+from backend.async_firebase_client import AsyncFirebaseClient
+from backend.context_builder import (
+    SUMMARY_HEADER,
+    build_context,
+    count_tokens,
+    digest_tool_result,
+    split_turns,
+)
+from tests.fake_firestore import FakeFirestore, fake_firebase_client
+
+UID = "test_user_123"
+
+BIG_RESULT = json.dumps({
+    "count": 200,
+    "total": 4321.5,
+    "expenses": [
+        {"id": f"e{i}", "name": f"Coffee shop number {i}", "amount": 4.5, "date": "2026-01-01"}
+        for i in range(200)
+    ],
+})
+
+
+def turn(seq, text, result=None):
+    """One stored chat turn (user, [tool_use, tool_result,] reply) starting at *seq*."""
+    messages = [{"role": "user", "content": text}]
+    if result is not None:
+        messages.append({"role": "assistant", "content": json.dumps([
+            {"type": "tool_use", "id": f"t{seq}", "name": "query_expenses", "input": {"category": "FOOD"}},
+        ])})
+        messages.append({"role": "user", "content": json.dumps([
+            {"type": "tool_result", "tool_use_id": f"t{seq}", "content": result},
+        ])})
+    messages.append({"role": "assistant", "content": f"re: {text}"})
+    return [{**m, "seq": seq + i} for i, m in enumerate(messages)]
+
+
+def history(count, result=None, words=1):
+    messages = []
+    for i in range(count):
+        messages += turn(len(messages), f"q{i} " + "lorem ipsum " * words, result)
+    return messages
+
+
+# ==================== Verbatim replay ====================
+
+def test_short_history_is_verbatim():
+    stored = turn(0, "coffee 5", result='{"success": true}')
+    context = build_context(stored, "and lunch 12")
+
+    assert [m["role"] for m in context.messages] == ["user", "assistant", "user", "assistant", "user"]
+    assert context.messages[1]["content"][0]["type"] == "tool_use"
+    assert context.messages[2]["content"][0]["content"] == '{"success": true}'
+    assert context.messages[-1] == {"role": "user", "content": "and lunch 12"}
+    assert not context.summary_changed
+    assert context.stats.saved_tokens == 0
+
+
+def test_split_turns_keeps_tool_pairs_together():
+    decoded = [
+        {"role": m["role"], "content": json.loads(m["content"]) if m["content"].startswith("[") else m["content"]}
+        for m in turn(0, "a", result="{}") + turn(4, "b")
+    ]
+    assert [len(t) for t in split_turns(decoded)] == [4, 2]
+
+
+# ==================== Tool result digests ====================
+
+def test_digest_keeps_scalars_and_list_head():
+    digest = digest_tool_result(BIG_RESULT, max_tokens=300)
+
+    assert count_tokens(digest) < 340
+    assert digest.startswith(f"[digest of {count_tokens(BIG_RESULT)}-token result]")
+    body = json.loads(digest.split("] ", 1)[1])
+    assert body["count"] == 200 and body["total"] == 4321.5
+    assert [e["id"] for e in body["expenses"][:3]] == ["e0", "e1", "e2"]
+    assert body["expenses"][3] == "... 197 more"
+
+    assert digest_tool_result('{"success": true}') == '{"success": true}'
+    assert digest_tool_result("x" * 5000, max_tokens=10).endswith("x" * 40 + "...")
+
+
+def test_stored_tool_results_are_digested():
+    stored = turn(0, "food this year?", result=BIG_RESULT) + turn(4, "and last year?", result=BIG_RESULT)
+    context = build_context(stored, "thanks", token_budget=100_000)
+
+    older_result = context.messages[2]["content"][0]["content"]
+    latest_result = context.messages[6]["content"][0]["content"]
+    assert older_result == latest_result == digest_tool_result(BIG_RESULT)
+    assert context.stats.elided_results == 2
+    assert context.stats.saved_tokens > count_tokens(BIG_RESULT) * 1.6
+
+
+# ==================== Rolling summary ====================
+
+def test_over_budget_folds_oldest_turns_to_half_budget(monkeypatch):
+    monkeypatch.setattr(context_builder, "CONTEXT_SUMMARY_MAX_TOKENS", 100_000)
+    stored = history(30, words=40)
+    context = build_context(stored, "now", token_budget=2000, max_turns=100)
+
+    assert context.summary_changed
+    summary = context.context_summary
+    assert summary["turns"] == context.stats.summarized_turns
+    verbatim = context.messages[2:-1]
+    assert sum(count_tokens(m["content"]) + 4 for m in verbatim) <= 1000
+    # The summary covers exactly the turns no longer replayed
+    assert summary["through_seq"] == 2 * summary["turns"] - 1
+    assert verbatim[0]["content"].startswith(f"q{summary['turns']} ")
+    assert context.messages[0]["content"].startswith(SUMMARY_HEADER)
+    assert '- User: "q0 lorem' in summary["text"]
+    assert context.stats.context_tokens < context.stats.raw_tokens / 2
+
+
+def test_prefix_is_stable_between_folds():
+    stored = history(30, words=40)
+    first = build_context(stored, "now", token_budget=2000, max_turns=100)
+
+    # Next turn: the stored summary is reused and nothing new is folded
+    stored += turn(len(stored), "one more " + "lorem ipsum " * 40)
+    second = build_context(stored, "again", first.context_summary, token_budget=2000, max_turns=100)
+
+    assert not second.summary_changed
+    assert second.messages[:-3] == first.messages[:-1]
+
+
+def test_prefix_with_oversized_tool_results_is_stable():
+    result = json.dumps([{"id": f"e{i}", "name": f"Coffee shop number {i}", "amount": 4.5} for i in range(30)])
+    stored = history(3, result=result)
+    first = build_context(stored, "now")
+
+    stored += turn(len(stored), "one more", result=result)
+    second = build_context(stored, "again", first.context_summary)
+
+    assert not first.summary_changed and not second.summary_changed
+    assert second.messages[:len(first.messages) - 1] == first.messages[:-1]
+    assert second.messages[-3]["content"][0]["content"].startswith("[digest of")
+
+
+def test_summary_extends_incrementally(monkeypatch):
+    monkeypatch.setattr(context_builder, "CONTEXT_SUMMARY_MAX_TOKENS", 100_000)
+    stored = history(30, words=40)
+    first = build_context(stored, "now", token_budget=2000, max_turns=100)
+    for _ in range(15):
+        stored += turn(len(stored), "more " + "lorem ipsum " * 40)
+
+    second = build_context(stored, "again", first.context_summary, token_budget=2000, max_turns=100)
+
+    assert second.summary_changed
+    assert second.context_summary["text"].startswith(first.context_summary["text"])
+    assert second.context_summary["turns"] == first.context_summary["turns"] + second.stats.summarized_turns
+    # Already-summarized messages are skipped even if they're still in the tail read
+    assert all(not m["content"].startswith("q0 ") for m in second.messages[2:] if isinstance(m["content"], str))
+
+
+def test_summary_drops_oldest_lines_past_cap():
+    context = build_context(history(60, words=40), "now", token_budget=2000, max_turns=100)
+    text = context.context_summary["text"]
+
+    assert count_tokens(text) <= context_builder.CONTEXT_SUMMARY_MAX_TOKENS
+    assert text.startswith("- (earlier turns omitted)\n")
+    assert '- User: "q0 ' not in text
+    assert context.context_summary["turns"] == context.stats.summarized_turns
+
+
+def test_turn_cap_folds_small_turns():
+    context = build_context(history(12), "now", max_turns=8)
+
+    assert context.stats.summarized_turns == 8
+    assert context.stats.verbatim_turns == 4
+
+
+def test_newest_turn_always_kept():
+    stored = turn(0, "huge " + "lorem " * 5000)
+    context = build_context(stored, "now", token_budget=100)
+
+    assert not context.summary_changed
+    assert context.messages[0]["content"].startswith("huge ")
+
+
+# ==================== Persistence ====================
+
+def test_summary_saved_with_turn_and_read_back():
+    db = FakeFirestore()
+    client = fake_firebase_client(db, UID)
+    user_firebase = AsyncFirebaseClient(client=client)
+    conversation_id = client.create_conversation()
+    client.append_conversation_messages(conversation_id, history(30, words=40))
+
+    async def scenario():
+        _, messages, summary = await chat_helpers.get_or_create_conversation(
+            user_firebase, conversation_id, pytz.timezone("America/Chicago"),
+        )
+        assert summary is None
+        context = chat_helpers.build_message_context(messages, "now")
+        assert context.summary_changed
+
+        db.reset_stats()
+        await chat_helpers.save_conversation_history(
+            user_firebase, conversation_id, "now", "ok", [], messages,
+            context_summary=context.context_summary,
+        )
+        assert db.stats["commits"] == 1
+
+        _, _, stored = await chat_helpers.get_or_create_conversation(
+            user_firebase, conversation_id, pytz.timezone("America/Chicago"),
+        )
+        return context.context_summary, stored
+
+    built, stored = asyncio.run(scenario())
+    assert stored == built
+    # Not part of the sidebar listing
+    assert "context_summary" not in client.list_conversations()[0]
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,165 @@
+"""
+Tests for the conversation retention sweep.
+
+Covers:
+- one collection group query per page finds expired conversations for every
+  user; they and their messages are deleted through the BulkWriter
+- a run stopped by its time budget checkpoints and the next call resumes it,
+  including between conversations with the same last_activity
+- deletes that keep failing are counted and skipped; a conversation whose
+  messages failed is kept rather than orphaning them
+- /admin/cleanup-conversations reports progress
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from backend.firebase_client import CONVERSATION_CLEANUP_CHECKPOINT, MAINTENANCE_COLLECTION, FirebaseClient
+from tests.fake_firestore import FakeFirestore
+
+CHECKPOINT = f"{MAINTENANCE_COLLECTION}/{CONVERSATION_CLEANUP_CHECKPOINT}"
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeFirestore()
+
+    def fake_init(self, user_id=None):
+        self.db = db
+        self.bucket = None
+        self.user_id = user_id
+
+    monkeypatch.setattr(FirebaseClient, "__init__", fake_init)
+    return db
+
+
+def seed(db, users, expired, recent, messages=3):
+    """*expired* old and *recent* fresh conversations per user, each with *messages* messages."""
+    now = datetime.now(timezone.utc)
+    for u in range(users):
+        for c in range(expired + recent):
+            age = timedelta(days=90, minutes=u * 100 + c) if c < expired else timedelta(hours=1)
+            path = f"users/u{u}/conversations/c{c}"
+            db.seed(path, {"last_activity": now - age, "message_count": messages})
+            for m in range(messages):
+                db.seed(f"{path}/messages/{m:08d}", {"role": "user", "content": "hi", "seq": m})
+
+
+def conversations(db):
+    return [p for p in db.dump("users/") if p.count("/") == 3]
+
+
+def test_sweep_deletes_expired_conversations_and_messages(db):
+    seed(db, users=10, expired=2, recent=1)
+
+    db.reset_stats()
+    result = FirebaseClient.cleanup_all_users_conversations(ttl_hours=24 * 60, page_size=50)
+
+    assert result["deleted_count"] == 20 and result["deleted_messages"] == 60
+    assert result["complete"] and not result["resumed"]
+    assert result["per_user"] == {f"u{u}": 2 for u in range(10)}
+    assert len(conversations(db)) == 10
+    assert len(db.dump("users/")) == 10 * 4
+
+    # Checkpoint read + one page query + one message listing per conversation,
+    # message then conversation deletes in BulkWriter batches of 20, one
+    # checkpoint write
+    assert db.stats["rpcs"] == 1 + 1 + 20 + 60 // 20 + 20 // 20 + 1
+    assert db.stats["writes"] == 80 + 1
+    assert db.dump(CHECKPOINT)[CHECKPOINT]["status"] == "complete"
+
+
+def test_time_budget_checkpoints_and_resumes(db):
+    seed(db, users=5, expired=4, recent=0, messages=1)
+
+    first = FirebaseClient.cleanup_all_users_conversations(ttl_hours=24, page_size=6, max_seconds=0)
+
+    assert first["deleted_count"] == 6 and not first["complete"]
+    checkpoint = db.dump(CHECKPOINT)[CHECKPOINT]
+    assert checkpoint["status"] == "running" and checkpoint["pages"] == 1
+
+    second = FirebaseClient.cleanup_all_users_conversations(ttl_hours=24, page_size=6)
+
+    assert second["resumed"] and second["complete"]
+    assert second["cutoff"] == first["cutoff"]
+    assert second["deleted_count"] == 20
+    assert sum(second["per_user"].values()) == 14
+    assert conversations(db) == []
+
+    # A finished run isn't resumed
+    third = FirebaseClient.cleanup_all_users_conversations(ttl_hours=24)
+    assert not third["resumed"] and third["deleted_count"] == 0
+
+
+def test_pages_resume_between_equal_timestamps(db):
+    last_activity = datetime.now(timezone.utc) - timedelta(days=90)
+    for u in range(7):
+        db.seed(f"users/u{u}/conversations/c0", {"last_activity": last_activity, "message_count": 0})
+
+    first = FirebaseClient.cleanup_all_users_conversations(ttl_hours=24, page_size=3, max_seconds=0)
+    assert db.dump(CHECKPOINT)[CHECKPOINT]["cursor_path"] == "users/u2/conversations/c0"
+
+    result = FirebaseClient.cleanup_all_users_conversations(ttl_hours=24, page_size=3)
+
+    assert first["deleted_count"] == 3
+    assert result["deleted_count"] == 7 and result["complete"]
+    assert conversations(db) == []
+
+
+def test_failed_deletes_are_counted_and_skipped(db):
+    seed(db, users=2, expired=1, recent=0, messages=0)
+    db.fail_paths = {"users/u1/conversations/c0"}
+
+    result = FirebaseClient.cleanup_all_users_conversations(ttl_hours=24)
+
+    assert result["deleted_count"] == 1 and result["failed_deletes"] == 1
+    assert result["per_user"] == {"u0": 1}
+    assert result["complete"]
+    assert conversations(db) == ["users/u1/conversations/c0"]
+
+
+def test_failed_message_deletes_keep_the_conversation(db):
+    seed(db, users=2, expired=1, recent=0, messages=2)
+    db.fail_paths = {"users/u1/conversations/c0/messages/00000001"}
+
+    result = FirebaseClient.cleanup_all_users_conversations(ttl_hours=24)
+
+    assert result["deleted_count"] == 1 and result["per_user"] == {"u0": 1}
+    assert result["deleted_messages"] == 3
+    assert result["failed_deletes"] == 1 and result["failed_message_deletes"] == 1
+    # The conversation stays so a later run can finish it
+    assert conversations(db) == ["users/u1/conversations/c0"]
+    assert "users/u1/conversations/c0/messages/00000001" in db.dump("users/")
+
+    db.fail_paths = set()
+    retry = FirebaseClient.cleanup_all_users_conversations(ttl_hours=24)
+    assert retry["deleted_count"] == 1 and retry["deleted_messages"] == 1
+    assert db.dump("users/") == {}
+
+
+def test_cleanup_endpoint(db, monkeypatch):
+    from fastapi.testclient import TestClient
+    from backend import api
+
+    seed(db, users=3, expired=1, recent=1, messages=2)
+    monkeypatch.setattr(api, "ADMIN_API_KEY", "secret")
+
+    response = TestClient(api.app).post(
+        "/admin/cleanup-conversations?ttl_hours=24&page_size=2", headers={"X-API-Key": "secret"},
+    )
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["deleted_count"] == 3 and data["complete"]
+    assert data["message"] == "Deleted 3 old conversation(s)"
+    assert data["ttl_hours"] == 24
+    assert len(conversations(db)) == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,337 @@
+"""
+Tests for conversation messages stored in users/{uid}/conversations/{id}/messages/{seq}.
+
+Covers:
+- appends assign consecutive sequence numbers and update the summary metadata
+- the conversation document and list never carry message bodies
+- history reads are limited tail queries; cursor paging walks back to the
+  first message without splitting tool_use / tool_result turns
+- legacy "messages" arrays are still readable, move on the next append, and
+  migrate in batches (idempotently) via migrate_conversation_messages()
+- deleting a conversation deletes its messages
+- get_or_create_conversation reads only the tail for model context
+- save_conversation_history writes a whole turn (and summary) in one commit,
+  and can be scheduled to run after the response; scheduled saves for a
+  conversation run in order and a follow-up request waits for them
+"""
+
+import asyncio
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytz
+
+from backend import chat_helpers
+from backend.async_firebase_client import AsyncFirebaseClient
+from tests.fake_firestore import FakeFirestore, fake_firebase_client
+
+UID = "test_user_123"
+
+
+def make_client():
+    db = FakeFirestore()
+    return db, fake_firebase_client(db, UID)
+
+
+def add_turn(client, conversation_id, text, with_tool=False):
+    """One chat turn as save_conversation_history stores it."""
+    client.add_message_to_conversation(conversation_id, "user", text)
+    if with_tool:
+        client.add_message_to_conversation(conversation_id, "assistant", json.dumps(
+            [{"type": "tool_use", "id": "t1", "name": "get_categories", "input": {}}]
+        ))
+        client.add_message_to_conversation(conversation_id, "user", json.dumps(
+            [{"type": "tool_result", "tool_use_id": "t1", "content": "{}"}]
+        ))
+    client.add_message_to_conversation(conversation_id, "assistant", f"re: {text}")
+
+
+def message_docs(db, conversation_id):
+    prefix = f"users/{UID}/conversations/{conversation_id}/messages/"
+    return db.dump(prefix)
+
+
+def seed_legacy(db, conversation_id, count):
+    messages = [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"m{i}", "timestamp": "t"}
+        for i in range(count)
+    ]
+    db.seed(f"users/{UID}/conversations/{conversation_id}", {"messages": messages, "summary": None})
+
+
+# ==================== Appends ====================
+
+def test_append_assigns_sequence_numbers():
+    db, client = make_client()
+    conversation_id = client.create_conversation()
+
+    add_turn(client, conversation_id, "coffee 5")
+    seqs = client.append_conversation_messages(conversation_id, [
+        {"role": "user", "content": "a"}, {"role": "assistant", "content": "b"},
+    ])
+
+    assert seqs == [2, 3]
+    docs = message_docs(db, conversation_id)
+    assert sorted(d["seq"] for d in docs.values()) == [0, 1, 2, 3]
+    assert docs[f"users/{UID}/conversations/{conversation_id}/messages/00000000"]["content"] == "coffee 5"
+
+    conversation = client.get_conversation(conversation_id)
+    assert conversation["message_count"] == 4
+    assert conversation["first_message"] == "coffee 5"
+    assert "messages" not in conversation
+
+
+def test_append_to_missing_conversation_raises():
+    from backend.exceptions import DocumentNotFoundError
+
+    _db, client = make_client()
+    try:
+        client.add_message_to_conversation("nope", "user", "hi")
+        assert False, "Should have raised"
+    except DocumentNotFoundError:
+        pass
+
+
+def test_list_conversations_transfers_no_message_bodies():
+    db, client = make_client()
+    conversation_id = client.create_conversation()
+    for i in range(20):
+        add_turn(client, conversation_id, "x" * 500 + str(i))
+
+    db.reset_stats()
+    conversations = client.list_conversations()
+
+    assert conversations[0]["message_count"] == 40
+    assert conversations[0]["first_message"] == "x" * 50
+    assert db.stats["docs_read"] == 1
+    assert db.stats["bytes_read"] < 500
+
+
+# ==================== Tail reads and paging ====================
+
+def test_tail_read_is_limited():
+    db, client = make_client()
+    conversation_id = client.create_conversation()
+    for i in range(30):
+        add_turn(client, conversation_id, f"q{i}")
+
+    db.reset_stats()
+    page = client.get_conversation_messages(conversation_id, limit=10)
+
+    assert db.stats["rpcs"] == 1
+    assert db.stats["docs_read"] == 11
+    assert [m["seq"] for m in page["messages"]] == list(range(50, 60))
+    assert page["next_cursor"] == 50
+
+
+def test_cursor_paging_walks_whole_conversation():
+    _db, client = make_client()
+    conversation_id = client.create_conversation()
+    for i in range(12):
+        add_turn(client, conversation_id, f"q{i}", with_tool=i % 3 == 0)
+
+    seen = []
+    cursor = None
+    while True:
+        page = client.get_conversation_messages(conversation_id, limit=7, before_seq=cursor)
+        # Every page starts on a real user turn, never a tool_result
+        assert page["messages"][0]["content"].startswith("q")
+        seen = page["messages"] + seen
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert [m["seq"] for m in seen] == list(range(32))
+
+
+# ==================== Legacy arrays ====================
+
+def test_legacy_array_is_readable():
+    db, client = make_client()
+    seed_legacy(db, "old", 9)
+
+    assert client.get_conversation("old")["message_count"] == 9
+    page = client.get_conversation_messages("old", limit=4)
+    assert [m["content"] for m in page["messages"]] == ["m6", "m7", "m8"]
+    assert page["next_cursor"] == 6
+
+    older = client.get_conversation_messages("old", limit=4, before_seq=6)
+    assert [m["seq"] for m in older["messages"]] == [2, 3, 4, 5]
+
+
+def test_append_moves_legacy_array():
+    db, client = make_client()
+    seed_legacy(db, "old", 3)
+
+    assert client.append_conversation_messages("old", [{"role": "user", "content": "new"}]) == [3]
+
+    stored = db.dump(f"users/{UID}/conversations/old")[f"users/{UID}/conversations/old"]
+    assert "messages" not in stored
+    assert stored["message_count"] == 4
+    assert stored["first_message"] == "m0"
+    page = client.get_conversation_messages("old")
+    assert [m["content"] for m in page["messages"]] == ["m0", "m1", "m2", "new"]
+
+
+def test_large_legacy_array_migrates_in_batches():
+    db, client = make_client()
+    seed_legacy(db, "big", 1200)
+
+    db.reset_stats()
+    assert client.migrate_conversation_messages("big") == 1200
+    assert db.stats["commits"] == 3
+    assert len(message_docs(db, "big")) == 1200
+
+    # Already migrated: nothing to do
+    assert client.migrate_conversation_messages("big") == 0
+
+    # Oversized arrays are migrated before appending
+    seed_legacy(db, "big2", 600)
+    assert client.append_conversation_messages("big2", [{"role": "user", "content": "new"}]) == [600]
+    assert len(message_docs(db, "big2")) == 601
+
+
+# ==================== Delete ====================
+
+def test_delete_conversation_deletes_messages():
+    db, client = make_client()
+    conversation_id = client.create_conversation()
+    for i in range(5):
+        add_turn(client, conversation_id, f"q{i}")
+
+    client.delete_conversation(conversation_id)
+
+    assert db.dump(f"users/{UID}/conversations/{conversation_id}") == {}
+
+
+# ==================== Chat context ====================
+
+def test_get_or_create_conversation_reads_tail(monkeypatch):
+    monkeypatch.setattr(chat_helpers, "MAX_CONVERSATION_MESSAGES", 6)
+    db, client = make_client()
+    conversation_id = client.create_conversation()
+    for i in range(10):
+        add_turn(client, conversation_id, f"q{i}", with_tool=True)
+
+    db.reset_stats()
+    resolved_id, messages, context_summary = asyncio.run(chat_helpers.get_or_create_conversation(
+        AsyncFirebaseClient(client=client), conversation_id, pytz.timezone("America/Chicago"),
+    ))
+
+    assert resolved_id == conversation_id
+    assert context_summary is None
+    # Tail of 6 trimmed to the last whole turn (user, tool_use, tool_result, reply)
+    assert [m["content"] for m in messages][::3] == ["q9", "re: q9"]
+    assert len(messages) == 4
+    assert db.stats["docs_read"] == 1 + 7
+
+
+# ==================== Saving a turn ====================
+
+TOOL_CALLS = [
+    {"id": "t1", "name": "get_categories", "args": {}, "result": {"categories": ["FOOD"]}},
+    {"id": "t2", "name": "save_expense", "args": {"amount": 5}, "result": {"success": True}},
+]
+
+
+def test_save_history_is_one_commit():
+    db, client = make_client()
+    conversation_id = client.create_conversation()
+
+    db.reset_stats()
+    asyncio.run(chat_helpers.save_conversation_history(
+        AsyncFirebaseClient(client=client), conversation_id,
+        "coffee 5", "Saved!", TOOL_CALLS, [],
+        content_blocks=[{"type": "text", "text": "Saved!"}],
+    ))
+
+    # One precondition read + one commit, for four messages and the summary
+    assert db.stats["rpcs"] == 2
+    assert db.stats["commits"] == 1
+
+    conversation = client.get_conversation(conversation_id)
+    assert conversation["summary"] == "coffee 5"
+    assert conversation["message_count"] == 4
+
+    messages = client.get_conversation_messages(conversation_id)["messages"]
+    assert [m["role"] for m in messages] == ["user", "assistant", "user", "assistant"]
+    assert json.loads(messages[1]["content"])[1]["input"] == {"amount": 5}
+    assert json.loads(messages[2]["content"])[0]["content"] == '{"categories": ["FOOD"]}'
+    assert messages[3]["tool_calls"][1] == {"id": "t2", "name": "save_expense", "result": {"success": True}}
+    assert messages[3]["content_blocks"] == [{"type": "text", "text": "Saved!"}]
+    assert all(m["timestamp"] for m in messages)
+
+
+def test_save_history_without_tools_keeps_summary():
+    db, client = make_client()
+    conversation_id = client.create_conversation()
+    client.update_conversation_summary(conversation_id, "first question")
+
+    asyncio.run(chat_helpers.save_conversation_history(
+        AsyncFirebaseClient(client=client), conversation_id,
+        "and again", "Sure.", [], [{"role": "user", "content": "first question"}],
+    ))
+
+    assert client.get_conversation(conversation_id)["summary"] == "first question"
+    messages = client.get_conversation_messages(conversation_id)["messages"]
+    assert [(m["role"], m["content"]) for m in messages] == [("user", "and again"), ("assistant", "Sure.")]
+
+
+def test_scheduled_save_runs_after_caller_returns():
+    db = FakeFirestore(latency=0.05)
+    client = fake_firebase_client(db, UID)
+    conversation_id = client.create_conversation()
+
+    async def scenario():
+        task = chat_helpers.schedule_conversation_history_save(
+            AsyncFirebaseClient(client=client), conversation_id, "coffee 5", "Saved!", [], [],
+        )
+        # Returned immediately; the write is still in flight
+        assert not task.done()
+        await chat_helpers.drain_conversation_history_saves()
+        assert task.done()
+
+    asyncio.run(scenario())
+    assert client.get_conversation(conversation_id)["message_count"] == 2
+
+
+def test_scheduled_save_logs_failures(caplog):
+    _db, client = make_client()
+
+    async def scenario():
+        chat_helpers.schedule_conversation_history_save(
+            AsyncFirebaseClient(client=client), "missing", "hi", "hello", [], [],
+        )
+        await chat_helpers.drain_conversation_history_saves()
+
+    asyncio.run(scenario())
+    assert "Failed to save conversation history" in caplog.text
+
+
+def test_follow_up_waits_for_pending_save():
+    db = FakeFirestore(latency=0.02)
+    client = fake_firebase_client(db, UID)
+    firebase = AsyncFirebaseClient(client=client)
+    conversation_id = client.create_conversation()
+
+    async def scenario():
+        chat_helpers.schedule_conversation_history_save(firebase, conversation_id, "coffee 5", "Saved!", [], [])
+        chat_helpers.schedule_conversation_history_save(
+            firebase, conversation_id, "lunch 12", "Saved too!", [], [],
+        )
+        # The next request arrives before either save has committed
+        return await chat_helpers.get_or_create_conversation(firebase, conversation_id, pytz.UTC)
+
+    resolved_id, messages, _summary = asyncio.run(scenario())
+    assert resolved_id == conversation_id
+    # Both turns are visible, in the order they were scheduled
+    assert [m["content"] for m in messages] == ["coffee 5", "Saved!", "lunch 12", "Saved too!"]
+    assert chat_helpers._pending_history_saves == {}
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v"])
@@ -33,12 +33,13 @@ CUSTOM_CATS = [
 
 
 def make_firebase(has_categories=True, categories=None):
-    """Return a mock FirebaseClient with custom categories configured."""
-    fb = MagicMock()
+    """Return a mock AsyncFirebaseClient with custom categories configured."""
+    fb = AsyncMock()
     fb.user_id = "test_user_123"
     fb.has_categories_setup.return_value = has_categories
     fb.get_user_categories.return_value = categories if categories is not None else CUSTOM_CATS
     fb.save_expense.return_value = "expense_abc123"
+    fb.get_budget_period_settings.return_value = {"budget_month_start_day": 1}
     fb.get_expense_by_id.return_value = {
         "expense_name": "Test",
         "amount": 50.0,
@@ -63,30 +64,30 @@ def make_budget_manager():
 
 def test_validate_exact_match():
     fb = make_firebase()
-    result = validate_category("THERAPY", fb)
+    result = asyncio.run(validate_category("THERAPY", fb))
     assert result == "THERAPY"
 
 
 def test_validate_case_insensitive():
     """Model may send 'therapy' or 'THERAPY' — both should resolve."""
     fb = make_firebase()
-    assert validate_category("therapy", fb) == "THERAPY"
-    assert validate_category("THERAPY", fb) == "THERAPY"
-    assert validate_category("Therapy", fb) == "THERAPY"  # mixed case
+    assert asyncio.run(validate_category("therapy", fb)) == "THERAPY"
+    assert asyncio.run(validate_category("THERAPY", fb)) == "THERAPY"
+    assert asyncio.run(validate_category("Therapy", fb)) == "THERAPY"  # mixed case
 
 
 def test_validate_display_name():
     """Model may send the friendly display name instead of the key."""
     fb = make_firebase()
-    assert validate_category("Therapy", fb) == "THERAPY"
-    assert validate_category("Food & Dining", fb) == "FOOD_OUT"
-    assert validate_category("Pet Supplies", fb) == "PET_SUPPLIES"
+    assert asyncio.run(validate_category("Therapy", fb)) == "THERAPY"
+    assert asyncio.run(validate_category("Food & Dining", fb)) == "FOOD_OUT"
+    assert asyncio.run(validate_category("Pet Supplies", fb)) == "PET_SUPPLIES"
 
 
 def test_validate_invalid_category_raises():
     fb = make_firebase()
     try:
-        validate_category("NONEXISTENT", fb)
+        asyncio.run(validate_category("NONEXISTENT", fb))
         assert False, "Should have raised InvalidCategoryError"
     except InvalidCategoryError:
         pass
@@ -95,20 +96,20 @@ def test_validate_invalid_category_raises():
 def test_validate_fallback_to_enum_when_no_custom_categories():
     """When user has no custom categories, falls back to ExpenseType enum."""
     fb = make_firebase(has_categories=False)
-    result = validate_category("FOOD_OUT", fb)
+    result = asyncio.run(validate_category("FOOD_OUT", fb))
     assert result == "FOOD_OUT"
 
 
 def test_validate_fallback_enum_case_insensitive():
     fb = make_firebase(has_categories=False)
-    result = validate_category("food_out", fb)
+    result = asyncio.run(validate_category("food_out", fb))
     assert result == "FOOD_OUT"
 
 
 def test_validate_fallback_enum_invalid():
     fb = make_firebase(has_categories=False)
     try:
-        validate_category("THERAPY", fb)
+        asyncio.run(validate_category("THERAPY", fb))
         assert False, "Should raise — THERAPY not in ExpenseType"
     except InvalidCategoryError:
         pass
@@ -274,16 +275,11 @@ def test_chat_helpers_injects_auth_for_get_categories():
     import inspect
     import backend.chat_helpers as ch
 
-    source = inspect.getsource(ch._run_anthropic_streaming_loop)
+    source = inspect.getsource(ch._run_streaming_tool_loop)
     assert 'if tool_name != "get_categories"' not in source, (
         "auth_token injection should not exclude get_categories"
     )
 
-    source2 = inspect.getsource(ch._run_non_anthropic_tool_loop)
-    assert 'if tool_name != "get_categories"' not in source2, (
-        "auth_token injection should not exclude get_categories (non-anthropic path)"
-    )
-
 
 if __name__ == "__main__":
     import pytest
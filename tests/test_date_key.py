@@ -0,0 +1,94 @@
+"""
+Tests for the date_key (YYYYMMDD) field on expenses.
+
+Covers:
+- save_expense and update_expense write date_key
+- date-range and monthly queries read only documents inside the range,
+  including across a year boundary and with a category filter
+"""
+
+import sys
+import os
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from backend.output_schemas import Date, Expense, ExpenseType
+from tests.fake_firestore import FakeFirestore, fake_firebase_client
+
+UID = "u1"
+
+
+@pytest.fixture
+def db():
+    return FakeFirestore()
+
+
+@pytest.fixture
+def client(db):
+    client = fake_firebase_client(db, UID)
+    client.initialize_default_categories(1000, ["FOOD_OUT", "COFFEE"])
+    return client
+
+
+def seed_days(db, first: date, days: int, category="FOOD_OUT"):
+    for offset in range(days):
+        day = first + timedelta(days=offset)
+        db.seed(f"users/{UID}/expenses/{category}-{day.isoformat()}", {
+            "expense_name": "Lunch", "amount": 10.0, "category": category,
+            "date": {"day": day.day, "month": day.month, "year": day.year},
+            "date_key": day.year * 10000 + day.month * 100 + day.day,
+        })
+
+
+def test_save_and_update_write_date_key(db, client):
+    expense_id = client.save_expense(Expense(
+        expense_name="Coffee", amount=4.5, date=Date(day=7, month=3, year=2026), category=ExpenseType.COFFEE,
+    ))
+    path = f"users/{UID}/expenses/{expense_id}"
+    assert db.dump(path)[path]["date_key"] == 20260307
+
+    client.update_expense(expense_id, date=Date(day=1, month=12, year=2025))
+    assert db.dump(path)[path]["date_key"] == 20251201
+
+    client.update_expense(expense_id, amount=5.0)
+    assert db.dump(path)[path]["date_key"] == 20251201
+
+
+def test_date_range_reads_only_matching_documents(db, client):
+    seed_days(db, date(2025, 1, 1), 500)
+
+    db.reset_stats()
+    expenses = client.get_expenses_in_date_range(Date(day=28, month=12, year=2025), Date(day=3, month=1, year=2026))
+
+    assert sorted(e["date_key"] for e in expenses) == [
+        20251228, 20251229, 20251230, 20251231, 20260101, 20260102, 20260103,
+    ]
+    assert db.stats["docs_read"] == 7
+
+
+def test_date_range_with_category(db, client):
+    seed_days(db, date(2026, 3, 1), 31)
+    seed_days(db, date(2026, 3, 1), 31, category="COFFEE")
+
+    db.reset_stats()
+    expenses = client.get_expenses_in_date_range(Date(day=10, month=3, year=2026), Date(day=16, month=3, year=2026), "COFFEE")
+
+    assert len(expenses) == 7 and {e["category"] for e in expenses} == {"COFFEE"}
+    assert db.stats["docs_read"] == 7
+
+
+def test_monthly_expenses_reads_one_month(db, client):
+    seed_days(db, date(2026, 1, 15), 60)
+
+    db.reset_stats()
+    expenses = client.get_monthly_expenses(2026, 2)
+
+    assert len(expenses) == 28
+    assert db.stats["docs_read"] == 28
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
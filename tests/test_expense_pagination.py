@@ -0,0 +1,151 @@
+"""
+Tests for cursor-paginated and NDJSON-streamed expense listing.
+
+Covers:
+- iter_expenses / get_expense_page: stable date_key + ID order, pages that
+  resume after ties on the same day without gaps or repeats
+- GET /expenses with limit/cursor, its validation, and the unpaged default
+- GET /expenses streamed as application/x-ndjson
+"""
+
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from backend.firebase_client import FirebaseClient, clear_user_cache, expense_cursor
+from backend.output_schemas import Date
+from tests.fake_firestore import FakeFirestore, fake_firebase_client
+
+UID = "u1"
+MARCH = (Date(day=1, month=3, year=2026), Date(day=31, month=3, year=2026))
+
+
+@pytest.fixture
+def db():
+    db = FakeFirestore()
+    fake_firebase_client(db, UID).initialize_default_categories(1000, ["FOOD_OUT", "COFFEE"])
+    # Three expenses a day for March 1-10, plus one in February
+    for day in range(1, 11):
+        for n in range(3):
+            db.seed(f"users/{UID}/expenses/d{day:02d}-{n}", {
+                "expense_name": f"Lunch {n}", "amount": float(day), "category": "COFFEE" if n == 0 else "FOOD_OUT",
+                "date": {"day": day, "month": 3, "year": 2026}, "date_key": 20260300 + day,
+            })
+    db.seed(f"users/{UID}/expenses/feb", {
+        "expense_name": "Old", "amount": 1.0, "category": "FOOD_OUT",
+        "date": {"day": 28, "month": 2, "year": 2026}, "date_key": 20260228,
+    })
+    return db
+
+
+@pytest.fixture
+def client(db):
+    client = fake_firebase_client(db, UID)
+    db.reset_stats()
+    return client
+
+
+@pytest.fixture
+def api_client(db, monkeypatch):
+    from fastapi.testclient import TestClient
+    from backend import api
+    from backend.auth import AuthenticatedUser, get_current_user
+
+    def fake_init(self, user_id=None):
+        self.db = db
+        self.bucket = None
+        self.user_id = user_id
+
+    clear_user_cache()
+    monkeypatch.setattr(FirebaseClient, "__init__", fake_init)
+    api.app.dependency_overrides[get_current_user] = lambda: AuthenticatedUser(
+        uid=UID, email="test@example.com", email_verified=True,
+    )
+    yield TestClient(api.app)
+    api.app.dependency_overrides.pop(get_current_user, None)
+
+
+# ==================== Client ====================
+
+def test_pages_resume_after_same_day_ties(db, client):
+    ids = []
+    cursor = None
+    while True:
+        page = client.get_expense_page(*MARCH, limit=4, cursor=cursor)
+        ids.extend(e["id"] for e in page["expenses"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    expected = [f"d{day:02d}-{n}" for day in range(10, 0, -1) for n in (2, 1, 0)]
+    assert ids == expected
+    # 8 pages of limit + 1
+    assert db.stats["rpcs"] == 8 and db.stats["docs_read"] == 30 + 7
+
+
+def test_iter_expenses_category_and_cursor(client):
+    expenses = list(client.iter_expenses(*MARCH, category="COFFEE", cursor="20260308:d08-0", limit=2))
+    assert [e["id"] for e in expenses] == ["d07-0", "d06-0"]
+    assert expense_cursor(expenses[-1]) == "20260306:d06-0"
+
+
+@pytest.mark.parametrize("cursor", ["nope", "20260301", "x:d01-0", "20260301:a/b"])
+def test_malformed_cursor_is_rejected(client, cursor):
+    with pytest.raises(ValueError):
+        client.iter_expenses(*MARCH, cursor=cursor)
+
+
+# ==================== GET /expenses ====================
+
+def test_endpoint_pages_with_cursor(api_client):
+    first = api_client.get("/expenses?year=2026&month=3&limit=25")
+    assert first.status_code == 200, first.text
+    body = first.json()
+    assert set(body) == {"year", "month", "category", "start_date", "end_date", "count", "expenses", "next_cursor"}
+    assert body["count"] == 25 and body["next_cursor"] == "20260302:d02-2"
+    assert body["expenses"][0]["expense_name"] == "Lunch 2" and body["expenses"][0]["amount"] == 10.0
+
+    second = api_client.get(f"/expenses?year=2026&month=3&limit=25&cursor={body['next_cursor']}").json()
+    assert [e["id"] for e in second["expenses"]] == ["d02-1", "d02-0", "d01-2", "d01-1", "d01-0"]
+    assert second["next_cursor"] is None
+
+    ranged = api_client.get("/expenses?start_date=2026-02-01&end_date=2026-03-01&category=COFFEE&cursor=20260301:d01-1").json()
+    assert [e["id"] for e in ranged["expenses"]] == ["d01-0"]
+
+
+def test_endpoint_without_limit_is_unpaged(api_client):
+    body = api_client.get("/expenses?year=2026&month=3").json()
+    assert body["count"] == 30 and body["next_cursor"] is None
+
+
+@pytest.mark.parametrize("query", ["limit=0", "limit=501", "limit=5&cursor=bad"])
+def test_endpoint_rejects_bad_paging(api_client, query):
+    assert api_client.get(f"/expenses?year=2026&month=3&{query}").status_code == 400
+
+
+def test_endpoint_streams_ndjson(api_client):
+    paged = api_client.get("/expenses?year=2026&month=3&limit=7").json()
+
+    response = api_client.get("/expenses?year=2026&month=3&limit=7", headers={"Accept": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert lines[0] == {"year": 2026, "month": 3, "category": None, "start_date": None, "end_date": None}
+    assert lines[1:-1] == paged["expenses"]
+    assert lines[-1] == {"count": 7, "next_cursor": paged["next_cursor"]}
+
+    everything = api_client.get("/expenses?year=2026&month=3", headers={"Accept": "application/x-ndjson"})
+    lines = everything.text.splitlines()
+    assert len(lines) == 32 and json.loads(lines[-1]) == {"count": 30, "next_cursor": None}
+
+    bad = api_client.get("/expenses?year=2026&month=3&cursor=bad", headers={"Accept": "application/x-ndjson"})
+    assert bad.status_code == 400
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
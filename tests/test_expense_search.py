@@ -0,0 +1,213 @@
+"""
+Tests for indexed expense name search (search_terms + ranking).
+
+Covers:
+- search_terms / query_term: trigrams, bigrams and letters, normalization
+- ranking by match quality, then recency
+- save_expense and update_expense keep search_terms current
+- search reads only index candidates across the whole history, honours the
+  category filter, and stops finding deleted expenses
+- candidates are paged until no older expense can outrank the results, and
+  a search cut short by SEARCH_MAX_CANDIDATES is reported as truncated
+- the search_expenses MCP tool
+"""
+
+import asyncio
+import json
+import sys
+import os
+from datetime import datetime
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from backend import firebase_client
+from backend.async_firebase_client import AsyncFirebaseClient
+from backend.expense_search import match_quality, normalize, query_term, rank_matches, search_terms
+from backend.mcp.expense_server import _search_expenses
+from backend.output_schemas import Date, Expense, ExpenseType
+from tests.fake_firestore import FakeFirestore, fake_firebase_client
+
+UID = "u1"
+
+
+@pytest.fixture
+def db():
+    return FakeFirestore()
+
+
+@pytest.fixture
+def client(db):
+    return fake_firebase_client(db, UID)
+
+
+def search_ids(client, *args, **kwargs):
+    return [e["id"] for e in client.search_expenses_in_db(*args, **kwargs)["expenses"]]
+
+
+def seed_expense(db, doc_id, name, date_key, category="FOOD_OUT"):
+    db.seed(f"users/{UID}/expenses/{doc_id}", {
+        "expense_name": name, "amount": 10.0, "category": category,
+        "date": {"day": date_key % 100, "month": date_key // 100 % 100, "year": date_key // 10000},
+        "date_key": date_key, "search_terms": search_terms(name), "notes": "",
+    })
+
+
+# ==================== Terms and ranking ====================
+
+def test_search_terms_and_query_term():
+    assert normalize("  Café Zoë's!! ") == "cafe zoe s"
+    assert search_terms("Uber Eats") == sorted({
+        "u", "b", "e", "r", "a", "t", "s", "ub", "be", "er", "ea", "at", "ts", "ube", "ber", "eat", "ats",
+    })
+    assert search_terms("") == []
+
+    # Every term a query can be looked up by is in the names it should find
+    for name, query in [("Whole Foods Market", "foods"), ("Café Zoë", "CAFE"), ("Blue Bottle Coffee", "coffee blue"),
+                        ("7-Eleven", "7"), ("PG&E", "pg"), ("Whole Foods Market", "ho"),
+                        ("Whole Foods Market", "le f"), ("Whole Foods Market", "k")]:
+        assert query_term(query) in search_terms(name)
+    assert query_term("zuni cafe") == "zun"
+    assert query_term("le f") == "le"
+    assert query_term("?!") is None
+
+
+def test_match_quality_tiers():
+    assert match_quality("Starbucks", "starbucks") == 0
+    assert match_quality("Starbucks Reserve", "starbucks") == 1
+    assert match_quality("Blue Bottle Coffee", "bottle") == 2
+    assert match_quality("Blue Bottle Coffee", "ottl") == 3
+    assert match_quality("Blue Bottle Coffee", "coffee blue") == 4
+    assert match_quality("Blue Bottle Coffee", "tea") is None
+
+
+def test_rank_matches_quality_then_recency():
+    candidates = [
+        {"expense_name": "Coffee Bean", "date_key": 20260301},
+        {"expense_name": "Blue Bottle Coffee", "date_key": 20260305},
+        {"expense_name": "Coffee", "date_key": 20250101},
+        {"expense_name": "Coffee Bean", "date_key": 20260310},
+        {"expense_name": "Tea", "date_key": 20260311},
+    ]
+    ranked = rank_matches(candidates, "coffee")
+    assert [(e["expense_name"], e["date_key"]) for e in ranked] == [
+        ("Coffee", 20250101), ("Coffee Bean", 20260310), ("Coffee Bean", 20260301), ("Blue Bottle Coffee", 20260305),
+    ]
+    assert len(rank_matches(candidates, "coffee", limit=2)) == 2
+
+
+# ==================== Index maintenance ====================
+
+def test_save_and_update_maintain_search_terms(db, client):
+    expense_id = client.save_expense(Expense(
+        expense_name="Chipotle", amount=12.0, date=Date(day=7, month=3, year=2026), category=ExpenseType.FOOD_OUT,
+    ))
+    path = f"users/{UID}/expenses/{expense_id}"
+    assert db.dump(path)[path]["search_terms"] == search_terms("Chipotle")
+
+    client.update_expense(expense_id, expense_name="Sweetgreen")
+    assert db.dump(path)[path]["search_terms"] == search_terms("Sweetgreen")
+    assert search_ids(client, "chipotle") == []
+    assert search_ids(client, "sweet") == [expense_id]
+
+    client.delete_expense(expense_id)
+    assert search_ids(client, "sweet") == []
+
+
+# ==================== Search ====================
+
+def test_search_reads_only_candidates_across_years(db, client):
+    for i in range(300):
+        seed_expense(db, f"lunch{i:03d}", "Lunch", 20200101 + (i % 6) * 10000 + i % 28)
+    seed_expense(db, "zuni-2020", "Zuni Café", 20200415)
+    seed_expense(db, "zuni-2026", "Dinner at Zuni", 20260220)
+
+    db.reset_stats()
+    search = client.search_expenses_in_db("zuni")
+    results = search["expenses"]
+    assert not search["truncated"]
+
+    # Starts-with beats word-match regardless of date
+    assert [e["id"] for e in results] == ["zuni-2020", "zuni-2026"]
+    assert set(results[0]) == {"id", "expense_name", "amount", "category", "date", "date_key"}
+    assert db.stats["rpcs"] == 1 and db.stats["docs_read"] == 2
+
+
+def test_search_filters(db, client):
+    seed_expense(db, "a", "Starbucks", 20260301, "COFFEE")
+    seed_expense(db, "b", "Starbucks", 20260302, "FOOD_OUT")
+    seed_expense(db, "c", "Starbucks", 20250302, "COFFEE")
+
+    assert search_ids(client, "starbucks") == ["b", "a", "c"]
+    assert search_ids(client, "starbucks", category=ExpenseType.COFFEE) == ["a", "c"]
+    assert search_ids(client, "starbucks", limit=1) == ["b"]
+    assert search_ids(
+        client, "starbucks", start_date=datetime(2026, 1, 1), end_date=datetime(2026, 3, 1),
+    ) == ["a"]
+
+
+def test_short_queries_match_mid_word(db, client):
+    seed_expense(db, "a", "Whole Foods Market", 20260301)
+    seed_expense(db, "b", "Uber Eats", 20260302)
+
+    assert search_ids(client, "ho") == ["a"]
+    assert search_ids(client, "le f") == ["a"]
+    assert search_ids(client, "k") == ["a"]
+    assert search_ids(client, "e") == ["b", "a"]
+
+
+def test_search_pages_until_older_matches_cannot_outrank(db, client, monkeypatch):
+    monkeypatch.setattr(firebase_client, "SEARCH_CANDIDATE_LIMIT", 10)
+    for i in range(25):
+        seed_expense(db, f"bean{i:02d}", "Coffee Bean", 20260301 + i)
+    seed_expense(db, "old", "Coffee", 20190105)
+
+    db.reset_stats()
+    search = client.search_expenses_in_db("coffee")
+
+    # The exact match from years back still ranks first
+    assert search["expenses"][0]["id"] == "old" and not search["truncated"]
+    assert len(search["expenses"]) == 26
+    assert db.stats["rpcs"] == 3
+
+    # Enough exact matches on the first page: no older page is read
+    for i in range(10):
+        seed_expense(db, f"exact{i}", "Coffee", 20270101 + i)
+    db.reset_stats()
+    assert search_ids(client, "coffee", limit=5) == [f"exact{i}" for i in range(9, 4, -1)]
+    assert db.stats["rpcs"] == 1
+
+
+def test_search_reports_truncation(db, client, monkeypatch):
+    monkeypatch.setattr(firebase_client, "SEARCH_CANDIDATE_LIMIT", 10)
+    monkeypatch.setattr(firebase_client, "SEARCH_MAX_CANDIDATES", 20)
+    for i in range(50):
+        seed_expense(db, f"bean{i:02d}", "Coffee Bean", 20260101 + i)
+
+    db.reset_stats()
+    search = client.search_expenses_in_db("coffee")
+
+    assert search["truncated"] and db.stats["docs_read"] == 20
+    assert [e["id"] for e in search["expenses"]][:2] == ["bean49", "bean48"]
+
+    with patch("backend.mcp.expense_server.get_user_firebase", return_value=AsyncFirebaseClient(client=client)):
+        result = json.loads(asyncio.run(_search_expenses({"query": "coffee"}))[0].text)
+    assert result["truncated"] and "note" in result
+
+
+def test_search_tool(db, client):
+    seed_expense(db, "a", "Blue Bottle Coffee", 20260301, "COFFEE")
+    seed_expense(db, "b", "Coffee", 20240105, "COFFEE")
+
+    with patch("backend.mcp.expense_server.get_user_firebase", return_value=AsyncFirebaseClient(client=client)):
+        result = json.loads(asyncio.run(_search_expenses({"query": "coffee"}))[0].text)
+
+    assert [e["id"] for e in result["expenses"]] == ["b", "a"]
+    assert result["truncated"] is False
+    assert result["expenses"][0]["date"] == {"day": 5, "month": 1, "year": 2024}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
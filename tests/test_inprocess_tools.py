@@ -0,0 +1,91 @@
+"""
+Tests for InProcessToolClient — expense_server.py's tool handlers called directly.
+
+Runs the real handlers against the in-memory fake Firestore with a stubbed
+token verifier.
+
+Covers:
+- list_tools exposes the same tools and schemas as the server
+- call_tool wraps handler output in a CallToolResult identical in shape to the subprocess
+- schema violations come back as isError results, not exceptions
+- chat_helpers._execute_mcp_tool parses in-process results
+"""
+
+import asyncio
+import json
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from mcp.types import CallToolResult, ListToolsResult
+
+import backend.token_cache as token_cache
+from backend.firebase_client import FirebaseClient
+from backend.mcp.inprocess_tools import InProcessToolClient
+from tests.fake_firestore import FakeFirestore, fake_firebase_client
+
+
+@pytest.fixture
+def client(monkeypatch):
+    db = FakeFirestore()
+    fake_firebase_client(db, "user1").initialize_default_categories(2000, ["FOOD_OUT", "GROCERIES"])
+    token_cache.clear_token_cache()
+
+    def fake_init(self, user_id=None):
+        self.db = db
+        self.bucket = None
+        self.user_id = user_id
+
+    monkeypatch.setattr(FirebaseClient, "__init__", fake_init)
+    monkeypatch.setattr(
+        token_cache.firebase_auth, "verify_id_token", lambda token: {"uid": token, "exp": time.time() + 3600}
+    )
+
+    tool_client = InProcessToolClient()
+    asyncio.run(tool_client.start())
+    yield tool_client
+    token_cache.clear_token_cache()
+
+
+def test_list_tools_matches_server(client):
+    from backend.mcp import expense_server
+
+    result = asyncio.run(client.session.list_tools())
+    server_tools = asyncio.run(expense_server.handle_list_tools())
+
+    assert isinstance(result, ListToolsResult)
+    assert [t.name for t in result.tools] == [t.name for t in server_tools]
+    assert [t.inputSchema for t in result.tools] == [t.inputSchema for t in server_tools]
+
+
+def test_call_tool_returns_call_tool_result(client):
+    result = asyncio.run(client.session.call_tool("get_categories", {"auth_token": "user1"}))
+
+    assert isinstance(result, CallToolResult)
+    assert result.isError is False
+    payload = json.loads(result.content[0].text)
+    ids = {c["key"] for c in payload["categories"]}
+    assert {"FOOD_OUT", "GROCERIES"} <= ids
+
+
+def test_schema_violation_is_error_result(client):
+    result = asyncio.run(client.session.call_tool("get_categories", {}))
+
+    assert result.isError is True
+    assert result.content[0].text.startswith("Input validation error:")
+
+
+def test_execute_mcp_tool_parses_inprocess_result(client):
+    from backend.chat_helpers import _execute_mcp_tool
+
+    result_text, parsed = asyncio.run(_execute_mcp_tool(client, "get_categories", {"auth_token": "user1"}))
+
+    assert json.loads(result_text) == parsed
+    assert "categories" in parsed
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,231 @@
+"""
+Tests for UnifiedModelClient.acreate() — non-blocking model calls.
+
+Uses fake provider clients whose responses take SLOW_SECONDS (standing in
+for a 5–20s GPT-5 / Gemini call).
+
+Covers:
+- a slow acreate() call doesn't stop the event loop serving other requests
+  (the sync create() path is shown to block, for contrast)
+- concurrent acreate() calls overlap
+- per-call timeouts raise ModelTimeoutError and cancel the provider request
+- cancelling the awaiting task cancels the provider request
+- the Anthropic path goes through the async client with prompt caching
+"""
+
+import asyncio
+import gc
+import sys
+import os
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from backend import model_client
+from backend.model_client import ModelTimeoutError, UnifiedModelClient
+
+SLOW_SECONDS = 0.4
+OPENAI_MODEL = "gpt-5-mini"
+
+
+def openai_response(text="hello"):
+    return SimpleNamespace(
+        output=[SimpleNamespace(type="message", content=[SimpleNamespace(type="output_text", text=text)])],
+        usage=SimpleNamespace(input_tokens=5, output_tokens=2),
+    )
+
+
+class SlowAsyncOpenAI:
+    """Async Responses API that takes SLOW_SECONDS and records cancellation."""
+
+    def __init__(self, delay=SLOW_SECONDS):
+        self.delay = delay
+        self.responses = self
+        self.started = 0
+        self.cancelled = 0
+
+    async def create(self, **kwargs):
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return openai_response()
+
+
+class SlowSyncOpenAI:
+    def __init__(self):
+        self.responses = self
+
+    def create(self, **kwargs):
+        time.sleep(SLOW_SECONDS)
+        return openai_response()
+
+
+@pytest.fixture
+def slow_openai(monkeypatch):
+    fake = SlowAsyncOpenAI()
+    monkeypatch.setattr(model_client, "get_async_openai_client", lambda: fake)
+    monkeypatch.setattr(model_client, "get_openai_client", lambda: SlowSyncOpenAI())
+    return fake
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/chat")
+    async def chat(blocking: bool = False):
+        client = UnifiedModelClient(OPENAI_MODEL)
+        messages = [{"role": "user", "content": "hi"}]
+        if blocking:
+            response = client.create(system="s", messages=messages, tools=[])
+        else:
+            response = await client.acreate(system="s", messages=messages, tools=[])
+        return {"content": response.content}
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+async def serve_pings_during_chat(blocking: bool) -> tuple[dict, list[float], float]:
+    """
+    Start one slow chat request and keep hitting /ping while it runs.
+
+    Returns the chat body, the /ping latencies and the longest stretch the
+    event loop went without running anything else.
+    """
+    transport = httpx.ASGITransport(app=make_app())
+    # A full GC pass late in a long test run can take ~100ms; keep it out of
+    # the event-loop latency being measured
+    gc.collect()
+    gc.disable()
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            chat = asyncio.create_task(http.post("/chat", params={"blocking": blocking}))
+
+            latencies = []
+            longest_stall = 0.0
+            last = time.perf_counter()
+            while not chat.done():
+                await asyncio.sleep(0.01)
+                now = time.perf_counter()
+                longest_stall = max(longest_stall, now - last)
+                await http.get("/ping")
+                last = time.perf_counter()
+                latencies.append(last - now)
+            return (await chat).json(), latencies, longest_stall
+    finally:
+        gc.enable()
+
+
+# ==================== Concurrency ====================
+
+def test_other_requests_served_while_model_call_in_flight(slow_openai):
+    body, latencies, longest_stall = asyncio.run(serve_pings_during_chat(blocking=False))
+
+    assert body == {"content": "hello"}
+    assert len(latencies) >= 10
+    assert max(latencies) < SLOW_SECONDS / 4
+    assert longest_stall < SLOW_SECONDS / 4
+
+
+def test_sync_create_blocks_the_loop(slow_openai):
+    body, latencies, longest_stall = asyncio.run(serve_pings_during_chat(blocking=True))
+
+    assert body == {"content": "hello"}
+    # Nothing else ran for the whole model call
+    assert longest_stall >= SLOW_SECONDS * 0.8
+    assert len(latencies) <= 2
+
+
+def test_concurrent_calls_overlap(slow_openai):
+    async def scenario():
+        clients = [UnifiedModelClient(OPENAI_MODEL) for _ in range(5)]
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(
+            c.acreate(system="s", messages=[{"role": "user", "content": "hi"}], tools=[]) for c in clients
+        ))
+        return responses, time.perf_counter() - start
+
+    responses, elapsed = asyncio.run(scenario())
+    assert [r.content for r in responses] == ["hello"] * 5
+    assert elapsed < SLOW_SECONDS * 2
+
+
+# ==================== Timeouts and cancellation ====================
+
+def test_timeout_raises_and_cancels_request(slow_openai):
+    async def scenario():
+        client = UnifiedModelClient(OPENAI_MODEL)
+        await client.acreate(system="s", messages=[{"role": "user", "content": "hi"}], tools=[], timeout=0.05)
+
+    with pytest.raises(ModelTimeoutError):
+        asyncio.run(scenario())
+    assert slow_openai.cancelled == 1
+
+
+def test_default_timeout_from_env_constant(slow_openai, monkeypatch):
+    monkeypatch.setattr(model_client, "MODEL_CALL_TIMEOUT", 0.05)
+
+    async def scenario():
+        await UnifiedModelClient(OPENAI_MODEL).acreate(system="s", messages=[], tools=[])
+
+    with pytest.raises(ModelTimeoutError):
+        asyncio.run(scenario())
+
+
+def test_cancelling_caller_cancels_request(slow_openai):
+    async def scenario():
+        client = UnifiedModelClient(OPENAI_MODEL)
+        task = asyncio.create_task(
+            client.acreate(system="s", messages=[{"role": "user", "content": "hi"}], tools=[])
+        )
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    assert slow_openai.started == 1
+    assert slow_openai.cancelled == 1
+
+
+# ==================== Anthropic ====================
+
+def test_anthropic_acreate_uses_async_client(monkeypatch):
+    requests = []
+
+    class FakeAsyncAnthropic:
+        def __init__(self):
+            self.messages = self
+
+        async def create(self, **kwargs):
+            requests.append(kwargs)
+            return SimpleNamespace(
+                content=[SimpleNamespace(type="text", text="ok")],
+                stop_reason="end_turn",
+                usage=SimpleNamespace(input_tokens=3, output_tokens=1, cache_read_input_tokens=900),
+            )
+
+    monkeypatch.setattr(model_client, "get_async_anthropic_client", FakeAsyncAnthropic)
+
+    response = asyncio.run(UnifiedModelClient("claude-haiku-4-5").acreate(
+        system="system", messages=[{"role": "user", "content": "hi"}], tools=[],
+    ))
+
+    assert response.content == "ok"
+    assert response.cache_read_tokens == 900
+    assert requests[0]["system"][0]["cache_control"] == {"type": "ephemeral"}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
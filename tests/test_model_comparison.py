@@ -13,10 +13,17 @@ Scoring:
 
 Grades:  A=90-100  B=80-89  C=70-79  D=55-69  F=0-54
 
+Context report:
+  Before dispatching, every turn is also replayed through the token-budgeted
+  context builder (backend/context_builder.py), carrying the rolling summary
+  forward as the chat endpoint does, and the tokens it saves over replaying
+  the raw history are printed. --context-only prints just this report.
+
 Usage:
     python tests/test_model_comparison.py
     python tests/test_model_comparison.py --days 14
     python tests/test_model_comparison.py --output results.csv --concurrency 10
+    python tests/test_model_comparison.py --days 30 --context-only
 """
 
 from __future__ import annotations
@@ -40,6 +47,8 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from backend.model_client import UnifiedModelClient, SUPPORTED_MODELS
+from backend.chat_helpers import MAX_CONVERSATION_MESSAGES
+from backend.context_builder import build_context
 from backend.firebase_client import FirebaseClient
 from backend.system_prompts import get_expense_parsing_system_prompt
 from backend.mcp.expense_server import (
@@ -313,11 +322,24 @@ def fetch_recent_conversations(days: int = 7) -> list[dict]:
 
             if la_dt >= cutoff:
                 conv["user_id"] = user_id
+                conv["messages"] = fetch_conversation_messages(user_client, conv["conversation_id"])
                 all_conversations.append(conv)
 
     return all_conversations
 
 
+def fetch_conversation_messages(user_client: FirebaseClient, conversation_id: str) -> list[dict]:
+    """Read a conversation's whole history, oldest first, page by page."""
+    messages: list[dict] = []
+    cursor = None
+    while True:
+        page = user_client.get_conversation_messages(conversation_id, limit=500, before_seq=cursor)
+        messages = page["messages"] + messages
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return messages
+
+
 def extract_test_cases(conversation: dict) -> list[dict]:
     """
     Extract individual user turns from a conversation as test cases.
@@ -368,6 +390,68 @@ def extract_test_cases(conversation: dict) -> list[dict]:
     return test_cases
 
 
+# ── context budget report ─────────────────────────────────────────────────────
+
+def _is_user_turn(msg: dict) -> bool:
+    content = msg.get("content", "")
+    return (
+        msg.get("role") == "user"
+        and isinstance(content, str)
+        and bool(content.strip())
+        and not content.startswith('[{"type": "tool_result"')
+    )
+
+
+def replay_context_savings(conversations: list[dict]) -> dict:
+    """
+    Replay each conversation turn by turn through the context builder.
+
+    Each user turn sees the same tail of stored history the chat endpoint
+    reads (MAX_CONVERSATION_MESSAGES) plus the rolling summary built on
+    earlier turns, and is compared against replaying that tail verbatim.
+    """
+    totals = {"conversations": 0, "turns": 0, "raw_tokens": 0, "context_tokens": 0,
+              "summarized_turns": 0, "elided_results": 0}
+    per_turn: list[int] = []
+
+    for conv in conversations:
+        messages = conv.get("messages", [])
+        summary = None
+        totals["conversations"] += 1
+        for i, msg in enumerate(messages):
+            if not _is_user_turn(msg):
+                continue
+            history = messages[max(0, i - MAX_CONVERSATION_MESSAGES):i]
+            context = build_context(history, msg["content"], summary)
+            if context.summary_changed:
+                summary = context.context_summary
+
+            stats = context.stats
+            totals["turns"] += 1
+            totals["raw_tokens"] += stats.raw_tokens
+            totals["context_tokens"] += stats.context_tokens
+            totals["summarized_turns"] += stats.summarized_turns
+            totals["elided_results"] += stats.elided_results
+            per_turn.append(stats.context_tokens)
+
+    per_turn.sort()
+    totals["max_turn_tokens"] = per_turn[-1] if per_turn else 0
+    totals["p50_turn_tokens"] = per_turn[len(per_turn) // 2] if per_turn else 0
+    return totals
+
+
+def print_context_report(totals: dict) -> None:
+    raw, sent = totals["raw_tokens"], totals["context_tokens"]
+    saved_pct = 100 * (raw - sent) / raw if raw else 0.0
+    print("Context budget (estimated history tokens per model call)")
+    print(f"  Conversations : {totals['conversations']}   turns: {totals['turns']}")
+    print(f"  Raw replay    : {raw:,}")
+    print(f"  Budgeted      : {sent:,}   ({saved_pct:.1f}% saved)")
+    print(f"  Per turn      : p50 {totals['p50_turn_tokens']:,}   max {totals['max_turn_tokens']:,}")
+    print(f"  Folded turns  : {totals['summarized_turns']}   digested tool results: {totals['elided_results']}")
+    print()
+
+
 # ── output formatting ─────────────────────────────────────────────────────────
 
 def _ref_tools_from_group(case_results: list[dict]) -> set[str]:
@@ -601,7 +685,7 @@ def write_csv(all_results: list[dict], agg: dict[str, dict], output_path: str) -
 
 # ── main ──────────────────────────────────────────────────────────────────────
 
-async def main(days: int, concurrency: int, output: str) -> None:
+async def main(days: int, concurrency: int, output: str, context_only: bool = False) -> None:
     print("=" * 100)
     print(f"Model Comparison Test Harness  —  replaying past {days} day(s) of conversations")
     print("=" * 100)
@@ -638,6 +722,10 @@ async def main(days: int, concurrency: int, output: str) -> None:
         print("Tip: try --days 30 to extend the look-back window.")
         return
 
+    print_context_report(replay_context_savings(conversations))
+    if context_only:
+        return
+
     # ── collect all test cases upfront ────────────────────────────────────────
     all_cases: list[dict] = []
     case_idx = 0
@@ -749,6 +837,14 @@ if __name__ == "__main__":
         default=CONCURRENCY_LIMIT,
         help=f"Max simultaneous (model, case) tasks (default: {CONCURRENCY_LIMIT})",
     )
+    parser.add_argument(
+        "--context-only",
+        action="store_true",
+        help="Only print the context budget report; don't call any models",
+    )
     args = parser.parse_args()
 
-    asyncio.run(main(days=args.days, concurrency=args.concurrency, output=args.output))
+    asyncio.run(main(
+        days=args.days, concurrency=args.concurrency, output=args.output,
+        context_only=args.context_only,
+    ))
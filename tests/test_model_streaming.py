@@ -0,0 +1,319 @@
+"""
+Tests for UnifiedModelClient.astream() and the unified streaming tool loop.
+
+Uses fake Anthropic (Messages streaming) and OpenAI (Responses API streaming)
+clients that replay canned event sequences.
+
+Covers:
+- both providers are normalised to the same text / tool_call / done events
+- the chat tool loop emits identical SSE event shapes for every provider
+- time-to-first-token is measured and logged with token usage
+- a stalled stream raises ModelTimeoutError
+- Gemini streaming (skipped when google-genai isn't installed)
+"""
+
+import asyncio
+import json
+import sys
+import os
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from backend import model_client
+from backend.model_client import ModelTimeoutError, UnifiedModelClient
+
+ANTHROPIC_MODEL = "claude-haiku-4-5"
+OPENAI_MODEL = "gpt-5-mini"
+FIRST_TOKEN_DELAY = 0.05
+
+
+# ==================== Fake provider streams ====================
+
+class FakeAnthropicStream:
+    def __init__(self, turn):
+        self.turn = turn
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def __aiter__(self):
+        await asyncio.sleep(FIRST_TOKEN_DELAY)
+        for text in self.turn["text"]:
+            yield SimpleNamespace(type="content_block_start", content_block=SimpleNamespace(type="text"))
+            yield SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(type="text_delta", text=text))
+        for call_id, name, args in self.turn["tools"]:
+            yield SimpleNamespace(
+                type="content_block_start",
+                content_block=SimpleNamespace(type="tool_use", id=call_id, name=name),
+            )
+            yield SimpleNamespace(
+                type="content_block_delta",
+                delta=SimpleNamespace(type="input_json_delta", partial_json=json.dumps(args)),
+            )
+
+    async def get_final_message(self):
+        content = [SimpleNamespace(type="text", text="".join(self.turn["text"]))] if self.turn["text"] else []
+        content += [
+            SimpleNamespace(type="tool_use", id=call_id, name=name, input=args)
+            for call_id, name, args in self.turn["tools"]
+        ]
+        return SimpleNamespace(
+            content=content,
+            stop_reason="tool_use" if self.turn["tools"] else "end_turn",
+            usage=SimpleNamespace(input_tokens=10, output_tokens=5),
+        )
+
+
+class FakeAsyncAnthropic:
+    def __init__(self, turns):
+        self.turns = list(turns)
+        self.messages = self
+
+    def stream(self, **kwargs):
+        return FakeAnthropicStream(self.turns.pop(0))
+
+
+class FakeOpenAIStream:
+    def __init__(self, turn, stall=0.0):
+        self.turn = turn
+        self.stall = stall
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.closed = True
+        return False
+
+    async def __aiter__(self):
+        await asyncio.sleep(FIRST_TOKEN_DELAY)
+        output = []
+        for text in self.turn["text"]:
+            yield SimpleNamespace(type="response.output_text.delta", delta=text)
+        await asyncio.sleep(self.stall)
+        if self.turn["text"]:
+            output.append(SimpleNamespace(
+                type="message",
+                content=[SimpleNamespace(type="output_text", text="".join(self.turn["text"]))],
+            ))
+        for call_id, name, args in self.turn["tools"]:
+            item = SimpleNamespace(type="function_call", call_id=call_id, name=name, arguments="")
+            yield SimpleNamespace(type="response.output_item.added", item=item)
+            output.append(SimpleNamespace(
+                type="function_call", call_id=call_id, name=name, arguments=json.dumps(args),
+            ))
+        yield SimpleNamespace(type="response.completed", response=SimpleNamespace(
+            output=output, usage=SimpleNamespace(input_tokens=10, output_tokens=5),
+        ))
+
+
+class FakeAsyncOpenAI:
+    def __init__(self, turns, stall=0.0):
+        self.turns = list(turns)
+        self.stall = stall
+        self.requests = []
+        self.streams = []
+        self.responses = self
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        stream = FakeOpenAIStream(self.turns.pop(0), self.stall)
+        self.streams.append(stream)
+        return stream
+
+
+TURNS = [
+    {"text": ["Let me ", "check."], "tools": [("call_1", "get_categories", {"limit": 3})]},
+    {"text": ["You spent ", "$42."], "tools": []},
+]
+
+
+@pytest.fixture
+def fake_providers(monkeypatch):
+    fakes = {"anthropic": FakeAsyncAnthropic(TURNS), "openai": FakeAsyncOpenAI(TURNS)}
+    monkeypatch.setattr(model_client, "get_async_anthropic_client", lambda: fakes["anthropic"])
+    monkeypatch.setattr(model_client, "get_async_openai_client", lambda: fakes["openai"])
+    return fakes
+
+
+async def collect(model, **kwargs):
+    client = UnifiedModelClient(model)
+    return [event async for event in client.astream(
+        system="s", messages=[{"role": "user", "content": "hi"}], tools=[], **kwargs
+    )]
+
+
+# ==================== astream() ====================
+
+@pytest.mark.parametrize("model", [ANTHROPIC_MODEL, OPENAI_MODEL])
+def test_astream_normalises_events(fake_providers, model):
+    events = asyncio.run(collect(model))
+
+    assert [e.type for e in events] == ["text", "text", "tool_call", "done"]
+    assert [e.text for e in events[:2]] == ["Let me ", "check."]
+    assert (events[2].tool_call.id, events[2].tool_call.name) == ("call_1", "get_categories")
+
+    response = events[-1].response
+    assert response.stop_reason == "tool_use"
+    assert response.content == "Let me check."
+    assert response.tool_calls[0].arguments == {"limit": 3}
+    assert (response.input_tokens, response.output_tokens) == (10, 5)
+
+
+@pytest.mark.parametrize("model", [ANTHROPIC_MODEL, OPENAI_MODEL])
+def test_astream_measures_ttft(fake_providers, model):
+    response = asyncio.run(collect(model))[-1].response
+    assert FIRST_TOKEN_DELAY * 1000 * 0.8 <= response.ttft_ms < 1000
+
+
+def test_openai_stream_requested(fake_providers):
+    asyncio.run(collect(OPENAI_MODEL))
+    assert fake_providers["openai"].requests[0]["stream"] is True
+    assert fake_providers["openai"].streams[0].closed
+
+
+def test_stalled_stream_times_out(monkeypatch):
+    fake = FakeAsyncOpenAI(TURNS, stall=1.0)
+    monkeypatch.setattr(model_client, "get_async_openai_client", lambda: fake)
+
+    with pytest.raises(ModelTimeoutError):
+        asyncio.run(collect(OPENAI_MODEL, timeout=0.2))
+    # Abandoning the stream closes the provider connection
+    assert fake.streams[0].closed
+
+
+def test_gemini_stream(monkeypatch):
+    pytest.importorskip("google.genai")
+    from google.genai import types
+
+    chunks = [
+        SimpleNamespace(usage_metadata=None, candidates=[SimpleNamespace(content=types.Content(
+            role="model", parts=[types.Part(text="Hi ")]))]),
+        SimpleNamespace(
+            usage_metadata=SimpleNamespace(prompt_token_count=7, candidates_token_count=3),
+            candidates=[SimpleNamespace(content=types.Content(role="model", parts=[
+                types.Part(function_call=types.FunctionCall(name="get_categories", args={"limit": 3})),
+            ]))],
+        ),
+    ]
+
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def generate_content_stream(**kwargs):
+        return stream()
+
+    fake = SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(generate_content_stream=generate_content_stream)))
+    model = next(m for m, cfg in model_client.SUPPORTED_MODELS.items() if cfg["provider"] == "google")
+    client = UnifiedModelClient(model)
+
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    monkeypatch.setattr(model_client, "get_genai_client", lambda api_key=None: fake)
+
+    async def scenario():
+        return [e async for e in client.astream(system="s", messages=[{"role": "user", "content": "hi"}], tools=[])]
+
+    events = asyncio.run(scenario())
+    assert [e.type for e in events] == ["text", "tool_call", "done"]
+    assert events[-1].response.tool_calls[0].arguments == {"limit": 3}
+    assert events[-1].response.input_tokens == 7
+
+
+# ==================== Tool loop ====================
+
+class UsageRecorder:
+    def __init__(self):
+        self.calls = []
+
+    async def log_token_usage(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+
+
+class FakeSession:
+    async def call_tool(self, name, args):
+        return SimpleNamespace(content=[SimpleNamespace(text=json.dumps({"categories": ["FOOD"]}))])
+
+
+def run_loop(model):
+    from backend import chat_helpers
+
+    recorder = UsageRecorder()
+    result = chat_helpers.ToolLoopResult()
+    messages = [{"role": "user", "content": "how much did I spend?"}]
+
+    async def scenario():
+        return [
+            json.loads(event[len("data: "):])
+            async for event in chat_helpers._run_streaming_tool_loop(
+                SimpleNamespace(session=FakeSession()), messages, "system", "token", result,
+                model, [], "user1", recorder,
+            )
+        ]
+
+    return asyncio.run(scenario()), result, recorder, messages
+
+
+def test_tool_loop_sse_identical_across_providers(fake_providers):
+    anthropic_events, anthropic_result, _, anthropic_messages = run_loop(ANTHROPIC_MODEL)
+    openai_events, openai_result, _, openai_messages = run_loop(OPENAI_MODEL)
+
+    assert anthropic_events == openai_events
+    assert [e["type"] for e in openai_events] == [
+        "text", "text", "tool_start", "tool_end", "text", "text",
+    ]
+    assert openai_events[2] == {"type": "tool_start", "id": "call_1", "name": "get_categories", "args": {}}
+    assert anthropic_result.content_blocks == openai_result.content_blocks
+    assert openai_result.final_response_text == ["Let me check.", "You spent $42."]
+    assert openai_result.all_tool_calls[0]["args"] == {"limit": 3}
+    assert anthropic_messages == openai_messages
+
+
+@pytest.mark.parametrize("model, provider", [(ANTHROPIC_MODEL, "anthropic"), (OPENAI_MODEL, "openai")])
+def test_tool_loop_logs_ttft(fake_providers, model, provider):
+    _, _, recorder, _ = run_loop(model)
+
+    assert len(recorder.calls) == 2
+    for args, kwargs in recorder.calls:
+        assert args[2] == provider
+        assert kwargs["ttft_ms"] >= FIRST_TOKEN_DELAY * 1000 * 0.8
+
+
+def test_tool_loop_reports_stream_errors(monkeypatch):
+    class BrokenOpenAI:
+        def __init__(self):
+            self.responses = self
+
+        async def create(self, **kwargs):
+            raise RuntimeError("boom")
+
+    monkeypatch.setattr(model_client, "get_async_openai_client", BrokenOpenAI)
+    events, result, recorder, _ = run_loop(OPENAI_MODEL)
+
+    assert events == [{"type": "error", "content": "AI service error: boom"}]
+    assert result.had_error
+    assert recorder.calls == []
+
+
+def test_log_token_usage_records_ttft():
+    from tests.fake_firestore import FakeFirestore, fake_firebase_client
+
+    db = FakeFirestore()
+    client = fake_firebase_client(db, "user1")
+    client.log_token_usage("user1", OPENAI_MODEL, "openai", 12, 30, "chat", ttft_ms=412.345)
+    client.log_token_usage("user1", OPENAI_MODEL, "openai", 12, 30, "process_expense")
+
+    records = [d.to_dict() for d in db.collection("users").document("user1").collection("token_usage").stream()]
+    assert records[0]["ttft_ms"] == 412.3
+    assert "ttft_ms" not in records[1]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,187 @@
+"""
+Tests for concurrent dispatch of read-only tool calls within one model turn.
+
+Covers:
+- batching: consecutive read-only calls share a batch, writes run alone
+- read-only calls overlap; writes never overlap anything
+- results are yielded in call order regardless of completion order
+- the per-turn concurrency cap is respected
+- the non-Anthropic chat loop emits deterministic SSE events / content_blocks
+"""
+
+import asyncio
+import json
+import sys
+import os
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.mcp.tool_dispatch import plan_tool_batches, run_tool_calls
+
+
+class Recorder:
+    """Fake tool executor that records overlap and sleeps per-tool."""
+
+    def __init__(self, delays: dict):
+        self.delays = delays
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.events: list[tuple[str, str]] = []
+
+    async def __call__(self, name: str, args: dict):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.events.append(("start", args["tag"]))
+        await asyncio.sleep(self.delays.get(args["tag"], 0.01))
+        self.events.append(("end", args["tag"]))
+        self.in_flight -= 1
+        return f"result-{args['tag']}"
+
+
+async def collect(calls, execute, **kwargs):
+    return [item async for item in run_tool_calls(calls, execute, **kwargs)]
+
+
+# ==================== Batching ====================
+
+def test_plan_groups_consecutive_reads():
+    names = ["query_expenses", "compare_periods", "save_expense", "get_budget_status", "get_categories"]
+    assert plan_tool_batches(names) == [[0, 1], [2], [3, 4]]
+
+
+def test_plan_writes_are_singletons():
+    names = ["save_expense", "delete_expense", "update_expense"]
+    assert plan_tool_batches(names) == [[0], [1], [2]]
+
+
+def test_unknown_tools_treated_as_writes():
+    assert plan_tool_batches(["query_expenses", "mystery_tool", "query_expenses"]) == [[0], [1], [2]]
+
+
+# ==================== Execution ====================
+
+def test_reads_overlap_and_yield_in_order():
+    # The first call is slowest, so completion order is reversed
+    recorder = Recorder({"a": 0.15, "b": 0.10, "c": 0.05})
+    calls = [
+        ("query_expenses", {"tag": "a"}),
+        ("get_spending_by_category", {"tag": "b"}),
+        ("compare_periods", {"tag": "c"}),
+    ]
+
+    start = time.perf_counter()
+    results = asyncio.run(collect(calls, recorder))
+    elapsed = time.perf_counter() - start
+
+    assert results == [(0, "result-a"), (1, "result-b"), (2, "result-c")]
+    assert recorder.max_in_flight == 3
+    assert elapsed < 0.25, f"reads appear serialized ({elapsed:.2f}s)"
+
+
+def test_writes_are_barriers():
+    recorder = Recorder({})
+    calls = [
+        ("query_expenses", {"tag": "r1"}),
+        ("get_budget_status", {"tag": "r2"}),
+        ("save_expense", {"tag": "w"}),
+        ("get_budget_remaining", {"tag": "r3"}),
+    ]
+    asyncio.run(collect(calls, recorder))
+
+    events = recorder.events
+    write_start = events.index(("start", "w"))
+    write_end = events.index(("end", "w"))
+    # Both earlier reads finished before the write began ...
+    assert events.index(("end", "r1")) < write_start
+    assert events.index(("end", "r2")) < write_start
+    # ... and nothing ran while it was in flight
+    assert write_end == write_start + 1
+    assert events.index(("start", "r3")) > write_end
+
+
+def test_concurrency_cap():
+    recorder = Recorder({})
+    calls = [("query_expenses", {"tag": str(i)}) for i in range(10)]
+    results = asyncio.run(collect(calls, recorder, max_parallel=3))
+    assert [index for index, _ in results] == list(range(10))
+    assert recorder.max_in_flight == 3
+
+
+def test_exception_propagates_and_cancels_rest():
+    cancelled = []
+
+    async def execute(name, args):
+        if args["tag"] == "boom":
+            raise RuntimeError("tool failed")
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(args["tag"])
+            raise
+
+    calls = [("query_expenses", {"tag": "boom"}), ("query_expenses", {"tag": "slow"})]
+    try:
+        asyncio.run(collect(calls, execute))
+        assert False, "Should have raised"
+    except RuntimeError:
+        pass
+    assert cancelled == ["slow"]
+
+
+# ==================== Chat loop integration ====================
+
+def test_tool_loop_event_order(monkeypatch):
+    import backend.chat_helpers as ch
+
+    tool_calls = [
+        SimpleNamespace(id="t1", name="compare_periods", arguments={"tag": "a"}),
+        SimpleNamespace(id="t2", name="get_spending_by_category", arguments={"tag": "b"}),
+    ]
+    responses = [
+        SimpleNamespace(stop_reason="tool_use", content="", tool_calls=tool_calls, input_tokens=1, output_tokens=1),
+        SimpleNamespace(stop_reason="end_turn", content="done", tool_calls=[], input_tokens=1, output_tokens=1),
+    ]
+
+    class FakeModelClient:
+        def __init__(self, model):
+            pass
+
+        async def astream(self, **kwargs):
+            yield SimpleNamespace(type="done", response=responses.pop(0))
+
+    recorder = Recorder({"a": 0.1, "b": 0.02})
+
+    class FakeSession:
+        async def call_tool(self, name, args):
+            text = await recorder(name, args)
+            return SimpleNamespace(content=[SimpleNamespace(text=json.dumps({"r": text}))])
+
+    monkeypatch.setattr(ch, "UnifiedModelClient", FakeModelClient)
+    model = next(m for m, cfg in ch.SUPPORTED_MODELS.items() if cfg["provider"] != "anthropic")
+    result = ch.ToolLoopResult()
+
+    async def run():
+        return [
+            json.loads(event[len("data: "):])
+            async for event in ch._run_streaming_tool_loop(
+                SimpleNamespace(session=FakeSession()), [], "system", "token", result,
+                model, [], None, None,
+            )
+        ]
+
+    events = asyncio.run(run())
+    assert [(e["type"], e.get("id")) for e in events] == [
+        ("tool_start", "t1"), ("tool_start", "t2"),
+        ("tool_end", "t1"), ("tool_end", "t2"),
+        ("text", None),
+    ]
+    assert [b.get("id") for b in result.content_blocks] == ["t1", "t2", None]
+    assert recorder.max_in_flight == 2
+    assert all("auth_token" not in call["args"] for call in result.all_tool_calls)
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v"])
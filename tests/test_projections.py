@@ -0,0 +1,105 @@
+"""
+Tests for projected (select()) expense reads into ExpenseRow records.
+
+Covers:
+- the query helpers read only the requested fields when given fields
+- unknown projection fields are rejected
+- aggregate paths (period totals, largest expenses) give the same results
+  from projected rows as from full documents
+"""
+
+import asyncio
+import json
+import sys
+import os
+from datetime import date
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from backend.async_firebase_client import AsyncFirebaseClient
+from backend.budget_manager import BudgetManager
+from backend.firebase_client import ExpenseRow
+from backend.mcp.expense_server import _get_largest_expenses
+from backend.output_schemas import Date
+from backend.period_calculator import BudgetPeriod
+from tests.fake_firestore import FakeFirestore, fake_firebase_client
+
+UID = "u1"
+MARCH = (Date(day=1, month=3, year=2026), Date(day=31, month=3, year=2026))
+
+
+@pytest.fixture
+def db():
+    db = FakeFirestore()
+    for day in range(1, 21):
+        db.seed(f"users/{UID}/expenses/e{day:02d}", {
+            "expense_name": f"Expense {day}", "amount": float(day),
+            "category": "COFFEE" if day % 2 else "FOOD_OUT",
+            "date": {"day": day, "month": 3, "year": 2026}, "date_key": 20260300 + day,
+            "input_type": "voice", "notes": "x" * 200,
+        })
+    return db
+
+
+@pytest.fixture
+def client(db):
+    client = fake_firebase_client(db, UID)
+    db.reset_stats()
+    return client
+
+
+def test_fields_select_a_projection_into_rows(db, client):
+    full = client.get_expenses_in_date_range(*MARCH)
+    full_bytes = db.stats["bytes_read"]
+
+    db.reset_stats()
+    rows = client.get_expenses_in_date_range(*MARCH, fields=["category", "amount"])
+
+    assert len(rows) == len(full) == 20
+    assert all(isinstance(row, ExpenseRow) for row in rows)
+    assert not hasattr(rows[0], "__dict__")
+    assert rows[0].amount == 1.0 and rows[0].category == "COFFEE"
+    assert rows[0].expense_name is None and rows[0].date is None
+    assert db.stats["bytes_read"] * 5 < full_bytes
+
+    monthly = client.get_monthly_expenses(2026, 3, category="FOOD_OUT", fields=["amount"])
+    assert sorted(row.amount for row in monthly) == [float(d) for d in range(2, 21, 2)]
+
+
+def test_unknown_fields_are_rejected(client):
+    with pytest.raises(ValueError, match="notes"):
+        client.get_expenses_in_date_range(*MARCH, fields=["amount", "notes"])
+
+
+def test_period_spending_by_category_from_rows(client):
+    # Not the user's budget cadence, so no rollup: scans the period
+    period = BudgetPeriod(
+        start_date=date(2026, 3, 5), end_date=date(2026, 3, 10), period_id="custom-2026-03-05",
+        label="Mar 5 - 10", days_in_period=6, days_elapsed=0,
+    )
+    manager = BudgetManager(client)
+
+    assert manager.get_period_spending_by_category(period) == {"COFFEE": 5.0 + 7.0 + 9.0, "FOOD_OUT": 6.0 + 8.0 + 10.0}
+    assert manager.calculate_total_period_spending(period) == 45.0
+    assert manager.calculate_period_spending("COFFEE", period) == 21.0
+    assert manager.get_monthly_spending_by_category(2026, 3) == {"COFFEE": 100.0, "FOOD_OUT": 110.0}
+
+
+def test_largest_expenses_from_rows(client):
+    firebase = AsyncFirebaseClient(client=client)
+    with patch("backend.mcp.expense_server.get_user_firebase", return_value=firebase):
+        result = json.loads(asyncio.run(_get_largest_expenses({
+            "start_date": MARCH[0].model_dump(), "end_date": MARCH[1].model_dump(), "category": "COFFEE",
+        }))[0].text)
+
+    assert [e["name"] for e in result["largest_expenses"]] == ["Expense 19", "Expense 17", "Expense 15"]
+    assert result["largest_expenses"][0] == {
+        "name": "Expense 19", "amount": 19.0, "date": {"day": 19, "month": 3, "year": 2026}, "category": "COFFEE",
+    }
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
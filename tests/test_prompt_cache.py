@@ -0,0 +1,192 @@
+"""
+Tests for Anthropic prompt caching — cache_control breakpoints and cache token accounting.
+
+Covers:
+- breakpoints land on the last tool, the system prompt, the last message and
+  the previous user message (never more than four)
+- inputs (shared memoized tool lists, the loop's message list) are not mutated
+- ANTHROPIC_PROMPT_CACHING=false leaves requests untouched
+- the streaming tool loop sends cached requests and logs cache read/write tokens
+- log_token_usage persists cache token counts
+"""
+
+import asyncio
+import json
+import sys
+import os
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from backend import model_client
+from backend.model_client import anthropic_cache_usage, apply_anthropic_prompt_cache
+
+
+TOOLS = [
+    {"name": "save_expense", "description": "", "input_schema": {"type": "object"}},
+    {"name": "get_categories", "description": "", "input_schema": {"type": "object"}},
+]
+
+
+def count_breakpoints(system, messages, tools) -> int:
+    text = json.dumps([system, messages, tools])
+    return text.count('"cache_control"')
+
+
+def test_breakpoints_on_tools_system_and_prefix():
+    messages = [
+        {"role": "user", "content": "coffee 5"},
+        {"role": "assistant", "content": [{"type": "tool_use", "id": "t1", "name": "save_expense", "input": {}}]},
+        {"role": "user", "content": [{"type": "tool_result", "tool_use_id": "t1", "content": "ok"}]},
+    ]
+    system, sent, tools = apply_anthropic_prompt_cache("You are a budget assistant", messages, TOOLS)
+
+    assert "cache_control" not in tools[0]
+    assert tools[-1]["cache_control"] == {"type": "ephemeral"}
+    assert system == [{"type": "text", "text": "You are a budget assistant", "cache_control": {"type": "ephemeral"}}]
+    # Last message: the tool_result block
+    assert sent[2]["content"][-1]["cache_control"] == {"type": "ephemeral"}
+    # Previous user message: string content becomes a marked text block
+    assert sent[0]["content"] == [{"type": "text", "text": "coffee 5", "cache_control": {"type": "ephemeral"}}]
+    assert sent[1] is messages[1]
+    assert count_breakpoints(system, sent, tools) == 4
+
+
+def test_inputs_are_not_mutated():
+    messages = [{"role": "user", "content": [{"type": "text", "text": "hi"}]}]
+    tools_before = json.dumps(TOOLS)
+
+    apply_anthropic_prompt_cache("system", messages, TOOLS)
+
+    assert json.dumps(TOOLS) == tools_before
+    assert messages == [{"role": "user", "content": [{"type": "text", "text": "hi"}]}]
+
+
+def test_long_history_still_four_breakpoints():
+    messages = []
+    for i in range(20):
+        messages.append({"role": "user", "content": f"question {i}"})
+        messages.append({"role": "assistant", "content": f"answer {i}"})
+    messages.append({"role": "user", "content": "latest"})
+
+    system, sent, tools = apply_anthropic_prompt_cache("system", messages, TOOLS)
+
+    assert count_breakpoints(system, sent, tools) == 4
+    marked = [i for i, m in enumerate(sent) if isinstance(m["content"], list)]
+    assert marked == [38, 40]
+
+
+def test_empty_parts_are_skipped():
+    system, messages, tools = apply_anthropic_prompt_cache("", [{"role": "user", "content": ""}], [])
+    assert system == ""
+    assert tools == []
+    assert messages == [{"role": "user", "content": ""}]
+
+
+def test_disabled_leaves_request_untouched(monkeypatch):
+    monkeypatch.setattr(model_client, "ANTHROPIC_PROMPT_CACHING", False)
+    messages = [{"role": "user", "content": "hi"}]
+
+    system, sent, tools = apply_anthropic_prompt_cache("system", messages, TOOLS)
+
+    assert system == "system"
+    assert sent is messages
+    assert tools is TOOLS
+
+
+def test_cache_usage_tolerates_missing_fields():
+    assert anthropic_cache_usage(SimpleNamespace(input_tokens=10)) == (0, 0)
+    usage = SimpleNamespace(cache_read_input_tokens=1200, cache_creation_input_tokens=None)
+    assert anthropic_cache_usage(usage) == (1200, 0)
+
+
+# ==================== Streaming loop ====================
+
+class FakeStream:
+    def __init__(self, usage):
+        self.usage = usage
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        raise StopAsyncIteration
+
+    async def get_final_message(self):
+        return SimpleNamespace(content=[], stop_reason="end_turn", usage=self.usage)
+
+
+class FakeAsyncAnthropic:
+    requests = []
+
+    def __init__(self, api_key=None):
+        self.messages = self
+
+    def stream(self, **kwargs):
+        FakeAsyncAnthropic.requests.append(kwargs)
+        return FakeStream(SimpleNamespace(
+            input_tokens=12, output_tokens=30, cache_read_input_tokens=2400, cache_creation_input_tokens=80,
+        ))
+
+
+class UsageRecorder:
+    def __init__(self):
+        self.calls = []
+
+    async def log_token_usage(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+
+
+def test_streaming_loop_sends_breakpoints_and_logs_cache_tokens(monkeypatch):
+    from backend import chat_helpers
+
+    FakeAsyncAnthropic.requests = []
+    monkeypatch.setattr(model_client, "get_async_anthropic_client", FakeAsyncAnthropic)
+    recorder = UsageRecorder()
+    messages = [{"role": "user", "content": "how much did I spend?"}]
+
+    async def scenario():
+        async for _event in chat_helpers._run_streaming_tool_loop(
+            None, messages, "system prompt", "token", chat_helpers.ToolLoopResult(),
+            "claude-haiku-4-5", TOOLS, "user1", recorder,
+        ):
+            pass
+
+    asyncio.run(scenario())
+
+    request = FakeAsyncAnthropic.requests[0]
+    assert request["system"][0]["cache_control"] == {"type": "ephemeral"}
+    assert request["tools"][-1]["cache_control"] == {"type": "ephemeral"}
+    assert request["messages"][-1]["content"][-1]["cache_control"] == {"type": "ephemeral"}
+    assert messages == [{"role": "user", "content": "how much did I spend?"}]
+
+    args, kwargs = recorder.calls[0]
+    assert args[3:5] == (12, 30)
+    assert kwargs == {"cache_read_tokens": 2400, "cache_write_tokens": 80, "ttft_ms": None}
+
+
+def test_log_token_usage_records_cache_tokens():
+    from tests.fake_firestore import FakeFirestore, fake_firebase_client
+
+    db = FakeFirestore()
+    client = fake_firebase_client(db, "user1")
+    client.log_token_usage("user1", "claude-haiku-4-5", "anthropic", 12, 30, "chat",
+                           cache_read_tokens=2400, cache_write_tokens=80)
+
+    docs = list(db.collection("users").document("user1").collection("token_usage").stream())
+    record = docs[0].to_dict()
+    assert record["cache_read_tokens"] == 2400
+    assert record["cache_write_tokens"] == 80
+    assert record["input_tokens"] == 12
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,132 @@
+"""
+Tests for the provider SDK client registry.
+
+Covers:
+- the same client (and connection pool) is handed out on every call
+- separate clients per API key and per provider
+- async clients are per event loop
+- pools are built with the configured limits / HTTP/2 setting
+- close_provider_clients() closes and forgets every client
+"""
+
+import asyncio
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from backend import provider_clients
+from backend.provider_clients import (
+    close_provider_clients,
+    get_anthropic_client,
+    get_async_anthropic_client,
+    get_async_openai_client,
+    get_openai_client,
+    get_provider_client_stats,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-ant-test")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    asyncio.run(close_provider_clients())
+    provider_clients._stats.update(created=0, reused=0)
+    yield
+    asyncio.run(close_provider_clients())
+
+
+def test_sync_clients_are_reused():
+    first = get_anthropic_client()
+    assert get_anthropic_client() is first
+    assert get_openai_client() is get_openai_client()
+    assert get_openai_client() is not first
+
+    stats = get_provider_client_stats()
+    assert stats["created"] == 2
+    assert stats["reused"] == 3
+
+
+def test_clients_keyed_by_api_key(monkeypatch):
+    first = get_anthropic_client()
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-ant-rotated")
+    rotated = get_anthropic_client()
+
+    assert rotated is not first
+    assert rotated.api_key == "sk-ant-rotated"
+
+
+def test_pool_uses_configured_limits(monkeypatch):
+    monkeypatch.setattr(provider_clients, "PROVIDER_MAX_KEEPALIVE", 7)
+    monkeypatch.setattr(provider_clients, "PROVIDER_HTTP2", True)
+
+    pool = get_anthropic_client()._client._transport._pool
+    assert pool._max_keepalive_connections == 7
+    assert pool._http2 is True
+
+
+def test_async_clients_reused_within_a_loop():
+    async def scenario():
+        a = get_async_anthropic_client()
+        b = get_async_anthropic_client()
+        await asyncio.sleep(0)
+        return a, b, get_async_openai_client()
+
+    a, b, openai_client = asyncio.run(scenario())
+    assert a is b
+    assert openai_client is not a
+
+
+def test_async_clients_are_per_loop():
+    async def grab():
+        return get_async_anthropic_client()
+
+    assert asyncio.run(grab()) is not asyncio.run(grab())
+
+
+def test_close_closes_and_forgets_clients():
+    sync_client = get_anthropic_client()
+
+    async def scenario():
+        async_client = get_async_anthropic_client()
+        await close_provider_clients()
+        return async_client, get_async_anthropic_client()
+
+    async_client, after = asyncio.run(scenario())
+
+    assert sync_client._client.is_closed
+    assert async_client._client.is_closed
+    assert after is not async_client
+    assert get_anthropic_client() is not sync_client
+
+
+def test_model_client_uses_registry(monkeypatch):
+    from backend import model_client
+
+    seen = []
+    monkeypatch.setattr(model_client, "get_anthropic_client", lambda: seen.append(1) or FakeAnthropic())
+
+    client = model_client.UnifiedModelClient("claude-haiku-4-5")
+    client.create(system="s", messages=[{"role": "user", "content": "hi"}], tools=[])
+    client.create(system="s", messages=[{"role": "user", "content": "hi"}], tools=[])
+    assert len(seen) == 2
+
+
+class FakeAnthropic:
+    def __init__(self):
+        self.messages = self
+
+    def create(self, **kwargs):
+        from types import SimpleNamespace
+
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text="ok")],
+            stop_reason="end_turn",
+            usage=SimpleNamespace(input_tokens=1, output_tokens=1),
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
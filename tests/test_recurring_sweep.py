@@ -0,0 +1,207 @@
+"""
+Tests for the due-date-indexed recurring expense sweep.
+
+Covers:
+- next_trigger_date agrees with should_create_pending for every frequency
+- templates are saved with next_trigger_date
+- the sweep reads only due templates and writes each user's results in one batch
+- rerunning is a no-op; a failed user is retried by the next run
+- a template whose pending expense is still awaiting is skipped
+"""
+
+import asyncio
+import sys
+import os
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from backend import recurring_manager, recurring_sweep
+from backend.async_firebase_client import AsyncFirebaseClient
+from backend.output_schemas import Date, ExpenseType, FrequencyType, RecurringExpense
+from backend.recurring_manager import RecurringManager
+from backend.recurring_sweep import run_recurring_sweep
+from tests.fake_firestore import FakeFirestore, fake_firebase_client
+
+TODAY = date(2026, 3, 15)
+
+
+def template(frequency=FrequencyType.MONTHLY, last_reminded=None, **schedule):
+    schedule = schedule or {"day_of_month": 1}
+    return RecurringExpense(
+        expense_name="Rent", amount=1000.0, category=ExpenseType.RENT, frequency=frequency,
+        last_reminded=Date(day=last_reminded.day, month=last_reminded.month, year=last_reminded.year)
+        if last_reminded else None,
+        **schedule,
+    )
+
+
+class FakeClients:
+    """Stands in for AsyncFirebaseClient: global and per-user clients over one FakeFirestore."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __call__(self):
+        return AsyncFirebaseClient(client=fake_firebase_client(self.db))
+
+    def for_user(self, uid):
+        return AsyncFirebaseClient(client=fake_firebase_client(self.db, uid))
+
+
+@pytest.fixture
+def today(monkeypatch):
+    current = {"date": TODAY}
+    monkeypatch.setattr(recurring_manager, "get_today_in_user_timezone", lambda: current["date"])
+    monkeypatch.setattr(recurring_sweep, "get_today_in_user_timezone", lambda: current["date"])
+    return current
+
+
+@pytest.fixture
+def db(monkeypatch, today):
+    db = FakeFirestore()
+    monkeypatch.setattr(recurring_sweep, "AsyncFirebaseClient", FakeClients(db))
+    return db
+
+
+# ==================== Due dates ====================
+
+@pytest.mark.parametrize("frequency,schedule", [
+    (FrequencyType.MONTHLY, {"day_of_month": 31}),
+    (FrequencyType.MONTHLY, {"last_of_month": True}),
+    (FrequencyType.WEEKLY, {"day_of_week": 2}),
+    (FrequencyType.BIWEEKLY, {"day_of_week": 4}),
+    (FrequencyType.YEARLY, {"month_of_year": 2, "day_of_month": 29}),
+])
+def test_due_date_matches_should_create_pending(today, frequency, schedule):
+    for reminded_offset in range(0, 60, 3):
+        last_reminded = TODAY - timedelta(days=reminded_offset)
+        recurring = template(frequency, last_reminded, **schedule)
+        due = RecurringManager.calculate_due_date(recurring)
+        assert due > last_reminded
+
+        for day in range(0, 400, 1):
+            today["date"] = last_reminded + timedelta(days=day)
+            should_create, _ = RecurringManager.should_create_pending(recurring)
+            assert should_create == (due <= today["date"]), (recurring, today["date"], due)
+
+
+def test_due_date_never_reminded_or_inactive(today):
+    assert RecurringManager.calculate_due_date(template()) == date(2026, 3, 1)
+    inactive = template()
+    inactive.active = False
+    assert RecurringManager.calculate_due_date(inactive) is None
+
+
+def test_saved_template_stores_next_trigger_date(db):
+    client = fake_firebase_client(db, "u1")
+    template_id = client.save_recurring_expense(template(last_reminded=date(2026, 3, 1)))
+
+    stored = db.dump(f"users/u1/recurring_expenses/{template_id}")
+    assert stored[f"users/u1/recurring_expenses/{template_id}"]["next_trigger_date"] == "2026-04-01"
+
+
+# ==================== Sweep ====================
+
+def seed_templates(db, uid, due, not_due):
+    client = fake_firebase_client(db, uid)
+    ids = []
+    for _ in range(due):
+        ids.append(client.save_recurring_expense(template(last_reminded=date(2026, 2, 1))))
+    for _ in range(not_due):
+        client.save_recurring_expense(template(last_reminded=date(2026, 3, 1)))
+    return ids
+
+
+def test_sweep_reads_only_due_templates(db):
+    seed_templates(db, "u1", due=2, not_due=10)
+    seed_templates(db, "u2", due=1, not_due=10)
+    inactive = template(last_reminded=date(2026, 1, 1))
+    inactive.active = False
+    fake_firebase_client(db, "u3").save_recurring_expense(inactive)
+
+    db.reset_stats()
+    result = asyncio.run(run_recurring_sweep())
+
+    assert result["created_count"] == 3
+    assert result["templates_due"] == 3
+    assert result["users_checked"] == 2
+    assert result["failed_users"] == []
+    assert set(result["timing"]) == {"query_ms", "process_ms", "total_ms"}
+    # Due templates only, plus one pending-expense query and one batch per user
+    assert db.stats["docs_read"] == 3
+    assert db.stats["commits"] == 2
+    assert db.stats["rpcs"] == 1 + 2 * 2
+
+    pending = db.dump("users/u1/pending_expenses/")
+    assert len(pending) == 2
+    assert all(p["date"] == {"day": 1, "month": 3, "year": 2026} for p in pending.values())
+    templates = db.dump("users/u1/recurring_expenses/").values()
+    assert sorted(t["next_trigger_date"] for t in templates)[-2:] == ["2026-04-01", "2026-04-01"]
+    assert sum(t["last_reminded"] == {"day": 15, "month": 3, "year": 2026} for t in templates) == 2
+
+
+def test_rerun_is_a_no_op(db):
+    seed_templates(db, "u1", due=2, not_due=0)
+    asyncio.run(run_recurring_sweep())
+
+    db.reset_stats()
+    result = asyncio.run(run_recurring_sweep())
+
+    assert result["created_count"] == 0 and result["templates_due"] == 0
+    assert db.stats["docs_read"] == 0 and db.stats["commits"] == 0
+    assert len(db.dump("users/u1/pending_expenses/")) == 2
+
+
+def test_failed_user_is_retried_next_run(db, monkeypatch):
+    seed_templates(db, "u1", due=1, not_due=0)
+    seed_templates(db, "u2", due=1, not_due=0)
+
+    clients = FakeClients(db)
+
+    class FailingU2(FakeClients):
+        def for_user(self, uid):
+            if uid == "u2":
+                raise RuntimeError("unavailable")
+            return clients.for_user(uid)
+
+    monkeypatch.setattr(recurring_sweep, "AsyncFirebaseClient", FailingU2(db))
+    first = asyncio.run(run_recurring_sweep())
+    assert first["created_count"] == 1 and first["failed_users"] == ["u2"]
+
+    monkeypatch.setattr(recurring_sweep, "AsyncFirebaseClient", clients)
+    second = asyncio.run(run_recurring_sweep())
+    assert second["created_count"] == 1 and second["users_checked"] == 1
+    assert len(db.dump("users/u2/pending_expenses/")) == 1
+
+
+def test_awaiting_pending_is_skipped(db):
+    [template_id] = seed_templates(db, "u1", due=1, not_due=0)
+    db.seed("users/u1/pending_expenses/old", {"template_id": template_id, "awaiting_confirmation": True})
+
+    db.reset_stats()
+    result = asyncio.run(run_recurring_sweep())
+
+    assert result["created_count"] == 0
+    assert result["details"] == ["[u1] Skipped Rent - pending already exists"]
+    assert db.stats["commits"] == 0
+    # Still due, so it's checked again once the pending expense is handled
+    assert asyncio.run(run_recurring_sweep())["templates_due"] == 1
+
+
+def test_stale_due_date_is_repaired(db):
+    client = fake_firebase_client(db, "u1")
+    template_id = client.save_recurring_expense(template(last_reminded=date(2026, 3, 1)))
+    client.update_recurring_expense(template_id, {"next_trigger_date": "2026-03-01"})
+
+    result = asyncio.run(run_recurring_sweep())
+
+    assert result["created_count"] == 0 and result["repaired_count"] == 1
+    stored = db.dump(f"users/u1/recurring_expenses/{template_id}")[f"users/u1/recurring_expenses/{template_id}"]
+    assert stored["next_trigger_date"] == "2026-04-01"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
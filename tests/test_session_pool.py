@@ -0,0 +1,156 @@
+"""
+Tests for MCPSessionPool — a pool of MCP server subprocesses behind one session.
+
+Uses in-memory fake clients instead of real subprocesses.
+
+Covers:
+- least-busy dispatch spreads concurrent calls across servers
+- failed calls trigger a health check and respawn of the dead server
+- periodic health checks respawn servers that stop answering pings
+- start() fails when no server comes up; close() cleans every server up
+"""
+
+import asyncio
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from backend.mcp.session_pool import MCPSessionPool
+
+
+class FakeSession:
+    def __init__(self, client):
+        self.client = client
+
+    async def call_tool(self, name, arguments=None):
+        if self.client.dead:
+            raise ConnectionError("server process exited")
+        self.client.calls += 1
+        await asyncio.sleep(self.client.delay)
+        return {"server": self.client.serial, "tool": name}
+
+    async def list_tools(self):
+        return ["get_categories"]
+
+    async def send_ping(self):
+        if self.client.dead:
+            raise ConnectionError("server process exited")
+
+
+class FakeClient:
+    created = []
+
+    def __init__(self, delay=0.02, fail_connect=False):
+        self.delay = delay
+        self.fail_connect = fail_connect
+        self.dead = False
+        self.calls = 0
+        self.cleaned_up = False
+        self.session = None
+        self.serial = len(FakeClient.created)
+        FakeClient.created.append(self)
+
+    async def connect_to_server(self, path):
+        if self.fail_connect:
+            raise RuntimeError("spawn failed")
+        self.session = FakeSession(self)
+
+    async def cleanup(self):
+        self.cleaned_up = True
+
+
+def setup_function():
+    FakeClient.created = []
+
+
+def make_pool(size=3, **kwargs):
+    return MCPSessionPool("server.py", size=size, client_factory=FakeClient, **kwargs)
+
+
+def test_least_busy_dispatch_spreads_load():
+    async def scenario():
+        pool = make_pool(size=3, health_check_interval=0)
+        await pool.start()
+        results = await asyncio.gather(*(pool.session.call_tool("get_categories") for _ in range(9)))
+        stats = pool.stats()
+        await pool.close()
+        return results, stats
+
+    results, stats = asyncio.run(scenario())
+    assert sorted({r["server"] for r in results}) == [0, 1, 2]
+    assert [s["calls"] for s in stats["servers"]] == [3, 3, 3]
+    assert all(s["in_flight"] == 0 for s in stats["servers"])
+
+
+def test_failed_call_respawns_server():
+    async def scenario():
+        pool = make_pool(size=2, health_check_interval=0)
+        await pool.start()
+        FakeClient.created[0].dead = True
+
+        # The call routed to the dead server fails ...
+        outcomes = await asyncio.gather(
+            *(pool.call_tool("get_categories") for _ in range(2)), return_exceptions=True
+        )
+        # ... the pool notices and respawns it
+        for _ in range(50):
+            if pool.healthy_count == 2 and len(FakeClient.created) == 3:
+                break
+            await asyncio.sleep(0.01)
+        after = await asyncio.gather(*(pool.call_tool("get_categories") for _ in range(4)))
+        stats = pool.stats()
+        await pool.close()
+        return outcomes, after, stats
+
+    outcomes, after, stats = asyncio.run(scenario())
+    assert sum(isinstance(o, ConnectionError) for o in outcomes) == 1
+    assert FakeClient.created[0].cleaned_up
+    assert stats["servers"][0]["restarts"] == 1
+    assert {r["server"] for r in after} == {1, 2}
+
+
+def test_health_loop_respawns_unresponsive_server():
+    async def scenario():
+        pool = make_pool(size=2, health_check_interval=0.02)
+        await pool.start()
+        FakeClient.created[1].dead = True
+        await asyncio.sleep(0.15)
+        stats = pool.stats()
+        await pool.close()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert stats["healthy"] == 2
+    assert stats["servers"][1]["restarts"] >= 1
+    assert FakeClient.created[1].cleaned_up
+
+
+def test_start_fails_when_no_server_starts():
+    async def scenario():
+        pool = MCPSessionPool(
+            "server.py", size=2, client_factory=lambda: FakeClient(fail_connect=True), health_check_interval=0,
+        )
+        await pool.start(timeout=0.1)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(scenario())
+
+
+def test_close_cleans_up_every_server():
+    async def scenario():
+        pool = make_pool(size=3, health_check_interval=0)
+        await pool.start()
+        await pool.close()
+        with pytest.raises(RuntimeError):
+            await pool.call_tool("get_categories")
+
+    asyncio.run(scenario())
+    assert len(FakeClient.created) == 3
+    assert all(client.cleaned_up for client in FakeClient.created)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
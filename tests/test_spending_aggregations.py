@@ -0,0 +1,141 @@
+"""
+Tests for server-side sum()/count() spending aggregations.
+
+Covers:
+- get_spending_summary and compare_periods transfer no expense documents
+- totals match the streamed results, with and without a category filter
+- per-category breakdowns aggregate each category, and fall back to
+  streaming when an expense's category isn't listed
+- every path falls back to streaming when aggregation queries fail
+"""
+
+import asyncio
+import json
+import sys
+import os
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from google.api_core.exceptions import MethodNotImplemented
+
+from backend.async_firebase_client import AsyncFirebaseClient
+from backend.budget_manager import BudgetManager
+from backend.mcp.expense_server import _compare_periods, _get_spending_summary
+from backend.output_schemas import Date, ExpenseType
+from tests.fake_firestore import FakeAggregationQuery, FakeFirestore, fake_firebase_client
+
+UID = "u1"
+MARCH = (Date(day=1, month=3, year=2026), Date(day=31, month=3, year=2026))
+
+
+@pytest.fixture
+def db():
+    db = FakeFirestore()
+    client = fake_firebase_client(db, UID)
+    client.initialize_default_categories(1000, ["FOOD_OUT", "COFFEE"])
+    for day in range(1, 29):
+        for month in (2, 3):
+            seed_expense(db, f"{month}-{day}-food", month, day, "FOOD_OUT", 10.0)
+            seed_expense(db, f"{month}-{day}-coffee", month, day, "COFFEE", 2.5)
+    return db
+
+
+@pytest.fixture
+def client(db):
+    client = fake_firebase_client(db, UID)
+    client.get_user_categories()
+    db.reset_stats()
+    return client
+
+
+@pytest.fixture
+def no_aggregation(monkeypatch):
+    def unavailable(self, transaction=None):
+        raise MethodNotImplemented("aggregation queries are not supported")
+
+    monkeypatch.setattr(FakeAggregationQuery, "get", unavailable)
+
+
+def seed_expense(db, doc_id, month, day, category, amount):
+    db.seed(f"users/{UID}/expenses/{doc_id}", {
+        "expense_name": doc_id, "amount": amount, "category": category,
+        "date": {"day": day, "month": month, "year": 2026},
+        "date_key": 20260000 + month * 100 + day,
+    })
+
+
+def run_tool(tool, client, arguments):
+    with patch("backend.mcp.expense_server.get_user_firebase", return_value=AsyncFirebaseClient(client=client)):
+        return json.loads(asyncio.run(tool(arguments))[0].text)
+
+
+def as_dict(d: Date) -> dict:
+    return d.model_dump()
+
+
+# ==================== Summary tools ====================
+
+def test_spending_summary_reads_no_documents(db, client):
+    result = run_tool(_get_spending_summary, client, {"start_date": as_dict(MARCH[0]), "end_date": as_dict(MARCH[1])})
+
+    assert result["total"] == pytest.approx(28 * 12.5) and result["count"] == 56
+    assert result["average_per_transaction"] == pytest.approx(6.25)
+    assert db.stats["docs_read"] == 0 and db.stats["aggregations"] == 1
+
+
+def test_compare_periods_reads_no_documents(db, client):
+    result = run_tool(_compare_periods, client, {
+        "period1_start": {"day": 1, "month": 2, "year": 2026}, "period1_end": {"day": 14, "month": 2, "year": 2026},
+        "period2_start": {"day": 1, "month": 3, "year": 2026}, "period2_end": {"day": 28, "month": 3, "year": 2026},
+        "category": "COFFEE",
+    })
+
+    assert result["period1"]["total"] == pytest.approx(14 * 2.5) and result["period1"]["count"] == 14
+    assert result["period2"]["total"] == pytest.approx(28 * 2.5) and result["period2"]["count"] == 28
+    assert result["comparison"]["difference"] == pytest.approx(14 * 2.5)
+    assert db.stats["docs_read"] == 0 and db.stats["aggregations"] == 2
+
+
+# ==================== Client totals ====================
+
+def test_totals_match_streamed_results(db, client):
+    streamed = client.get_expenses_in_date_range(*MARCH, category="FOOD_OUT")
+    db.reset_stats()
+
+    summary = client.get_total_spending_for_range(*MARCH, category=ExpenseType.FOOD_OUT)
+    assert summary == {"total": sum(e["amount"] for e in streamed), "count": len(streamed)}
+    assert client.calculate_monthly_total(2026, 2) == pytest.approx(28 * 12.5)
+    assert BudgetManager(client).calculate_monthly_spending_for_category_id("COFFEE", 2026, 2) == pytest.approx(70.0)
+    assert db.stats["docs_read"] == 0
+
+
+def test_spending_by_category_aggregates_each_category(db, client):
+    totals = client.get_spending_by_category(*MARCH)
+
+    assert totals == {"FOOD_OUT": pytest.approx(280.0), "COFFEE": pytest.approx(70.0)}
+    # Whole range + FOOD_OUT, COFFEE, OTHER
+    assert db.stats["aggregations"] == 4 and db.stats["docs_read"] == 0
+
+
+def test_spending_by_category_streams_unlisted_categories(db, client):
+    seed_expense(db, "legacy", 3, 5, "RETIRED_CATEGORY", 99.0)
+
+    totals = client.get_spending_by_category(*MARCH)
+
+    assert totals["RETIRED_CATEGORY"] == 99.0 and totals["COFFEE"] == pytest.approx(70.0)
+    assert db.stats["docs_read"] == 57
+
+
+# ==================== Fallback ====================
+
+def test_falls_back_to_streaming_without_aggregation(db, client, no_aggregation):
+    assert client.get_total_spending_for_range(*MARCH) == {"total": pytest.approx(350.0), "count": 56}
+    assert client.get_spending_by_category(*MARCH) == {"FOOD_OUT": pytest.approx(280.0), "COFFEE": pytest.approx(70.0)}
+    assert client.calculate_monthly_total(2026, 3, "COFFEE") == pytest.approx(70.0)
+    assert db.stats["docs_read"] == 56 * 2 + 28
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,251 @@
+"""
+Tests for per-period spending rollups (users/{uid}/spending_rollups/{period_id}).
+
+Covers:
+- first read builds the rollup from a full scan
+- save/update/delete keep an existing rollup in step
+- delete_category rebuilds the affected rollups after reassigning, even if
+  the reassignment fails partway
+- writes and rebuilds use the stored start day, not a stale cached one
+- the consistency checker detects drift and rebuild repairs it
+- a budget read for the current period costs a single document read
+"""
+
+import sys
+import os
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from backend.budget_manager import BudgetManager
+from backend.output_schemas import Date, Expense, ExpenseType
+from backend.period_calculator import get_period_containing_date
+from tests.fake_firestore import FakeFirestore, fake_firebase_client
+
+UID = "test_user_123"
+MARCH = get_period_containing_date(date(2026, 3, 10), month_start_day=1)
+APRIL = get_period_containing_date(date(2026, 4, 10), month_start_day=1)
+
+
+def make_client():
+    db = FakeFirestore()
+    client = fake_firebase_client(db, UID)
+    client.initialize_default_categories(1000, ["FOOD_OUT", "GROCERIES", "COFFEE"])
+    return db, client
+
+
+def add_expense(client, name, amount, day, month, category="FOOD_OUT"):
+    expense = Expense(
+        expense_name=name,
+        amount=amount,
+        date=Date(day=day, month=month, year=2026),
+        category=ExpenseType.OTHER,
+    )
+    return client.save_expense(expense, category_str=category)
+
+
+def stored_rollup(db, period):
+    snapshot = db.document(f"users/{UID}/spending_rollups/{period.period_id}").get()
+    return snapshot.to_dict() if snapshot.exists else None
+
+
+# ==================== Build on first read ====================
+
+def test_first_read_builds_rollup():
+    db, client = make_client()
+    add_expense(client, "Lunch", 12.50, 3, 3)
+    add_expense(client, "Dinner", 30.00, 20, 3)
+    add_expense(client, "Coffee", 4.25, 5, 3, category="COFFEE")
+    add_expense(client, "April lunch", 99.00, 2, 4)
+
+    # Writes never create a partial rollup
+    assert stored_rollup(db, MARCH) is None
+
+    rollup = client.get_period_spending_rollup(MARCH)
+    assert rollup["categories"]["FOOD_OUT"] == {"total": 42.5, "count": 2}
+    assert rollup["categories"]["COFFEE"] == {"total": 4.25, "count": 1}
+    assert rollup["total"] == 46.75
+    assert rollup["count"] == 3
+    assert stored_rollup(db, MARCH) is not None
+
+
+def test_misaligned_period_is_not_rolled_up():
+    _, client = make_client()
+    client.set_budget_period_settings(UID, {"budget_month_start_day": 15})
+    # Calendar March doesn't line up with a 15th-to-14th cadence
+    assert client.get_period_spending_rollup(MARCH) is None
+
+
+# ==================== Write maintenance ====================
+
+def test_save_update_delete_maintain_rollup():
+    db, client = make_client()
+    add_expense(client, "Lunch", 10.00, 3, 3)
+    client.get_period_spending_rollup(MARCH)
+
+    expense_id = add_expense(client, "Dinner", 25.10, 4, 3)
+    assert stored_rollup(db, MARCH)["categories"]["FOOD_OUT"] == {"total": 35.1, "count": 2}
+
+    # Amount + category change
+    client.update_expense(expense_id, amount=20.00, category_str="GROCERIES")
+    rollup = stored_rollup(db, MARCH)
+    assert rollup["categories"]["FOOD_OUT"] == {"total": 10.0, "count": 1}
+    assert rollup["categories"]["GROCERIES"] == {"total": 20.0, "count": 1}
+
+    # Moving the expense into another period only touches rollups that exist
+    client.update_expense(expense_id, date=Date(day=1, month=4, year=2026))
+    assert "GROCERIES" not in stored_rollup(db, MARCH)["categories"]
+    assert stored_rollup(db, APRIL) is None
+
+    client.get_period_spending_rollup(APRIL)
+    client.delete_expense(expense_id)
+    assert stored_rollup(db, APRIL)["count"] == 0
+    assert client.check_spending_rollup(MARCH)["consistent"]
+
+
+def test_delete_category_folds_totals():
+    db, client = make_client()
+    add_expense(client, "Beans", 15.00, 3, 3, category="COFFEE")
+    add_expense(client, "Latte", 5.00, 4, 3, category="COFFEE")
+    add_expense(client, "Lunch", 10.00, 5, 3)
+    client.get_period_spending_rollup(MARCH)
+
+    client.delete_category("COFFEE", reassign_to="OTHER")
+
+    rollup = stored_rollup(db, MARCH)
+    assert "COFFEE" not in rollup["categories"]
+    assert rollup["categories"]["OTHER"] == {"total": 20.0, "count": 2}
+    assert rollup["total"] == 30.0
+    assert client.check_spending_rollup(MARCH)["consistent"]
+
+
+def test_delete_category_rebuilds_rollups_after_a_partial_failure(monkeypatch):
+    from backend.firebase_client import ChunkedWriteBatch
+    from tests.fake_firestore import FakeWriteBatch
+
+    db, client = make_client()
+    for day in (3, 4, 5):
+        add_expense(client, "Beans", 5.00, day, 3, category="COFFEE")
+    add_expense(client, "Lunch", 10.00, 6, 3)
+    client.get_period_spending_rollup(MARCH)
+
+    # Commit two updates per chunk and fail the second chunk
+    monkeypatch.setattr(client, "write_batch", lambda: ChunkedWriteBatch(db, limit=2))
+    commit = FakeWriteBatch.commit
+    commits = []
+
+    def failing_commit(self):
+        commits.append(self)
+        if len(commits) == 2:
+            raise RuntimeError("commit failed")
+        return commit(self)
+
+    monkeypatch.setattr(FakeWriteBatch, "commit", failing_commit)
+    with pytest.raises(RuntimeError):
+        client.delete_category("COFFEE", reassign_to="OTHER")
+
+    rollup = stored_rollup(db, MARCH)
+    assert rollup["categories"]["COFFEE"] == {"total": 5.0, "count": 1}
+    assert rollup["categories"]["OTHER"] == {"total": 10.0, "count": 2}
+    assert client.check_spending_rollup(MARCH)["consistent"]
+
+
+def test_changing_month_start_day_clears_rollups():
+    db, client = make_client()
+    add_expense(client, "Lunch", 10.00, 3, 3)
+    add_expense(client, "Lunch", 10.00, 3, 4)
+    client.get_period_spending_rollup(MARCH)
+    client.get_period_spending_rollup(APRIL)
+
+    db.reset_stats()
+    assert client._clear_spending_rollups(UID) == 2
+    # One keys-only query, one batched commit
+    assert db.stats["rpcs"] == 2 and db.stats["commits"] == 1
+
+    client.get_period_spending_rollup(MARCH)
+    client.set_budget_period_settings(UID, {"budget_month_start_day": 15})
+    assert stored_rollup(db, MARCH) is None
+
+
+def test_writes_use_start_day_changed_by_another_process():
+    """A cached start day (e.g. in an MCP server) doesn't send deltas to the old period."""
+    db, client = make_client()
+    add_expense(client, "Lunch", 10.00, 20, 3)
+    client.get_period_spending_rollup(MARCH)
+    client.get_budget_period_settings(UID)  # cached with start day 1
+
+    # The API server changes the start day and rebuilds the new period
+    db.document(f"users/{UID}").set({"budget_month_start_day": 15}, merge=True)
+    db.document(f"users/{UID}/spending_rollups/{MARCH.period_id}").delete()
+    mid_march = get_period_containing_date(date(2026, 3, 20), month_start_day=15)
+    client.rebuild_spending_rollup(mid_march)
+
+    expense_id = add_expense(client, "Dinner", 25.00, 21, 3)
+    assert stored_rollup(db, mid_march)["categories"]["FOOD_OUT"] == {"total": 35.0, "count": 2}
+    client.update_expense(expense_id, amount=5.00)
+    client.delete_expense(expense_id)
+    assert stored_rollup(db, mid_march)["categories"]["FOOD_OUT"] == {"total": 10.0, "count": 1}
+
+    # A stale-cadence period is scanned but never stored
+    assert client.rebuild_spending_rollup(MARCH)["total"] == 10.0
+    assert stored_rollup(db, MARCH) is None
+
+
+# ==================== Consistency checker ====================
+
+def test_checker_detects_drift_and_rebuild_repairs():
+    db, client = make_client()
+    add_expense(client, "Lunch", 10.00, 3, 3)
+    add_expense(client, "Groceries", 40.00, 6, 3, category="GROCERIES")
+
+    assert client.check_spending_rollup(MARCH)["missing"]
+    client.get_period_spending_rollup(MARCH)
+    assert client.check_spending_rollup(MARCH)["consistent"]
+
+    # Simulate a write that bypassed the rollup
+    db.document(f"users/{UID}/expenses/rogue").set({
+        "expense_name": "Rogue", "amount": 7.0, "category": "FOOD_OUT",
+        "date": {"day": 9, "month": 3, "year": 2026}, "date_key": 20260309,
+    })
+    report = client.check_spending_rollup(MARCH)
+    assert not report["consistent"]
+    assert set(report["differences"]) == {"FOOD_OUT"}
+    assert report["differences"]["FOOD_OUT"]["scan"] == {"total": 17.0, "count": 2}
+
+    client.rebuild_spending_rollup(MARCH)
+    assert client.check_spending_rollup(MARCH)["consistent"]
+
+
+def test_list_expense_periods():
+    _, client = make_client()
+    add_expense(client, "Lunch", 10.00, 3, 3)
+    add_expense(client, "Lunch", 10.00, 30, 3)
+    add_expense(client, "Lunch", 10.00, 1, 4)
+
+    periods = client.list_expense_periods()
+    assert [p.period_id for p in periods] == [MARCH.period_id, APRIL.period_id]
+
+
+# ==================== Read cost ====================
+
+def test_budget_read_is_single_document():
+    db, client = make_client()
+    for day in range(1, 29):
+        add_expense(client, f"Lunch {day}", 10.00, day, 3)
+
+    manager = BudgetManager(client)
+    manager.get_period_spending_by_category(MARCH)  # builds the rollup
+
+    # Period settings come from the user cache; only the rollup doc is read
+    db.reset_stats()
+    spending = manager.get_period_spending_by_category(MARCH)
+    assert spending == {"FOOD_OUT": 280.0}
+    assert db.stats["docs_read"] == 1
+    assert manager.calculate_period_spending("FOOD_OUT", MARCH) == 280.0
+    assert manager.calculate_total_period_spending(MARCH) == 280.0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,108 @@
+"""
+Tests for the verified-token cache shared by auth.py and the MCP server.
+
+Covers:
+- repeat verifications of the same token hit the cache
+- entries expire at the token's exp claim
+- failed verifications are never cached
+- tokens are not stored in the clear
+"""
+
+import asyncio
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from backend import token_cache
+from backend.token_cache import verify_id_token_cached, clear_token_cache, get_token_cache_stats
+
+
+class StubVerifier:
+    def __init__(self, lifetime: float = 3600):
+        self.calls = 0
+        self.lifetime = lifetime
+
+    def __call__(self, token: str) -> dict:
+        self.calls += 1
+        if token == "bad":
+            raise ValueError("invalid token")
+        return {"uid": "user-" + token, "email": "a@b.c", "exp": time.time() + self.lifetime}
+
+
+def setup_function():
+    clear_token_cache()
+
+
+def test_repeat_verification_hits_cache():
+    verify = StubVerifier()
+    for _ in range(5):
+        assert verify_id_token_cached("tok", verifier=verify)["uid"] == "user-tok"
+    assert verify.calls == 1
+    assert get_token_cache_stats()["hits"] == 4
+
+
+def test_distinct_tokens_verified_separately():
+    verify = StubVerifier()
+    verify_id_token_cached("a", verifier=verify)
+    verify_id_token_cached("b", verifier=verify)
+    assert verify.calls == 2
+
+
+def test_entry_expires_at_exp():
+    verify = StubVerifier(lifetime=0.05)
+    verify_id_token_cached("tok", verifier=verify)
+    time.sleep(0.06)
+    verify_id_token_cached("tok", verifier=verify)
+    assert verify.calls == 2
+
+
+def test_already_expired_token_not_cached():
+    verify = StubVerifier(lifetime=-1)
+    verify_id_token_cached("tok", verifier=verify)
+    verify_id_token_cached("tok", verifier=verify)
+    assert verify.calls == 2
+
+
+def test_failures_not_cached():
+    verify = StubVerifier()
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            verify_id_token_cached("bad", verifier=verify)
+    assert verify.calls == 2
+
+
+def test_returned_claims_are_copies():
+    verify = StubVerifier()
+    verify_id_token_cached("tok", verifier=verify)["uid"] = "someone-else"
+    assert verify_id_token_cached("tok", verifier=verify)["uid"] == "user-tok"
+
+
+def test_raw_token_not_used_as_key():
+    verify_id_token_cached("secret-token", verifier=StubVerifier())
+    assert all("secret-token" not in str(key) for key in token_cache._token_cache._data)
+
+
+def test_get_current_user_uses_cache(monkeypatch):
+    from backend.auth import get_current_user
+
+    verify = StubVerifier()
+    monkeypatch.setattr(token_cache.firebase_auth, "verify_id_token", verify)
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials="tok")
+
+    for _ in range(3):
+        user = asyncio.run(get_current_user(credentials))
+        assert user.uid == "user-tok"
+    assert verify.calls == 1
+
+    with pytest.raises(HTTPException):
+        asyncio.run(get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials="bad")))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,199 @@
+"""
+Tests for the MCP tool catalog — tools listed once per connection, patched
+tool definitions memoized per (provider, category IDs).
+
+Covers:
+- list_tools is called once per session, again for a new session
+- category enum patching and auth_token stripping per provider format
+- identical category sets share one memoized list; the source schema is untouched
+- LRU eviction bounds the number of memoized definition lists
+- chat_helpers.run_claude_tool_loop reads definitions from the catalog
+"""
+
+import asyncio
+import sys
+import os
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from backend.mcp import tool_catalog
+from backend.mcp.tool_catalog import (
+    clear_tool_catalog,
+    get_tool_catalog,
+    get_tool_catalog_stats,
+    get_tool_definitions,
+    invalidate_tool_catalog,
+    patch_category_enum,
+)
+from backend.ttl_cache import TTLCache
+
+
+SAVE_EXPENSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "auth_token": {"type": "string"},
+        "name": {"type": "string"},
+        "amount": {"type": "number"},
+        "category": {"type": "string", "enum": ["FOOD_OUT", "OTHER"]},
+    },
+    "required": ["auth_token", "name", "amount", "category"],
+}
+
+
+class FakeSession:
+    """Stands in for client.session; counts list_tools round trips."""
+
+    def __init__(self):
+        self.list_calls = 0
+
+    async def list_tools(self):
+        self.list_calls += 1
+        return SimpleNamespace(tools=[
+            SimpleNamespace(name="save_expense", description="Save an expense", inputSchema=SAVE_EXPENSE_SCHEMA),
+            SimpleNamespace(
+                name="get_categories",
+                description=None,
+                inputSchema={"type": "object", "properties": {"auth_token": {"type": "string"}},
+                             "required": ["auth_token"]},
+            ),
+        ])
+
+
+CATEGORIES = [{"category_id": "COFFEE"}, {"category_id": "RENT"}]
+
+
+def setup_function():
+    clear_tool_catalog()
+
+
+def test_catalog_fetched_once_per_session():
+    async def scenario():
+        first, second = FakeSession(), FakeSession()
+        for _ in range(5):
+            await get_tool_definitions(first, "anthropic", CATEGORIES)
+        await get_tool_definitions(second, "anthropic", CATEGORIES)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first.list_calls == 1
+    assert second.list_calls == 1
+    stats = get_tool_catalog_stats()
+    assert stats["catalog_fetches"] == 2
+    assert stats["catalog_hits"] == 4
+
+
+def test_invalidate_refetches():
+    async def scenario():
+        session = FakeSession()
+        await get_tool_catalog(session)
+        invalidate_tool_catalog(session)
+        await get_tool_catalog(session)
+        return session
+
+    assert asyncio.run(scenario()).list_calls == 2
+
+
+def test_anthropic_definitions_patched_and_stripped():
+    tools = asyncio.run(get_tool_definitions(FakeSession(), "anthropic", CATEGORIES))
+    save = tools[0]
+
+    assert set(save) == {"name", "description", "input_schema"}
+    assert save["input_schema"]["properties"]["category"]["enum"] == ["COFFEE", "RENT"]
+    assert "auth_token" not in save["input_schema"]["properties"]
+    assert save["input_schema"]["required"] == ["name", "amount", "category"]
+    # The server's schema is never modified
+    assert SAVE_EXPENSE_SCHEMA["properties"]["category"]["enum"] == ["FOOD_OUT", "OTHER"]
+    assert "auth_token" in SAVE_EXPENSE_SCHEMA["required"]
+
+
+def test_realtime_definitions_use_function_format():
+    tools = asyncio.run(get_tool_definitions(FakeSession(), "realtime", CATEGORIES))
+
+    assert tools[0]["type"] == "function"
+    assert tools[0]["parameters"]["properties"]["category"]["enum"] == ["COFFEE", "RENT"]
+    assert tools[1]["description"] == ""
+    assert tools[1]["parameters"]["required"] == []
+
+
+def test_default_categories_fall_back_to_expense_type():
+    from backend.output_schemas import ExpenseType
+
+    tools = asyncio.run(get_tool_definitions(FakeSession(), "anthropic", None))
+    assert tools[0]["input_schema"]["properties"]["category"]["enum"] == [e.name for e in ExpenseType]
+
+
+def test_same_categories_share_memoized_list():
+    async def scenario():
+        session = FakeSession()
+        a = await get_tool_definitions(session, "anthropic", CATEGORIES)
+        b = await get_tool_definitions(session, "anthropic", [dict(c) for c in CATEGORIES])
+        c = await get_tool_definitions(session, "anthropic", CATEGORIES[::-1])
+        d = await get_tool_definitions(session, "realtime", CATEGORIES)
+        return a, b, c, d
+
+    a, b, c, d = asyncio.run(scenario())
+    assert a is b
+    assert c is not a
+    assert d is not a
+    assert get_tool_catalog_stats()["definitions"]["hits"] == 1
+
+
+def test_lru_evicts_least_recent_category_set(monkeypatch):
+    monkeypatch.setattr(tool_catalog, "_definition_cache", TTLCache(maxsize=2, ttl=3600))
+
+    async def scenario():
+        session = FakeSession()
+        a = await get_tool_definitions(session, "anthropic", [{"category_id": "A"}])
+        await get_tool_definitions(session, "anthropic", [{"category_id": "B"}])
+        await get_tool_definitions(session, "anthropic", [{"category_id": "C"}])
+        again = await get_tool_definitions(session, "anthropic", [{"category_id": "A"}])
+        return a, again
+
+    a, again = asyncio.run(scenario())
+    assert again is not a
+    assert again == a
+    assert tool_catalog._definition_cache.evictions == 2
+
+
+def test_unknown_format_rejected():
+    with pytest.raises(ValueError):
+        asyncio.run(get_tool_definitions(FakeSession(), "cohere", CATEGORIES))
+
+
+def test_patch_category_enum_copies():
+    patched = patch_category_enum(SAVE_EXPENSE_SCHEMA, ("X",))
+    assert patched["properties"]["category"]["enum"] == ["X"]
+    assert patched is not SAVE_EXPENSE_SCHEMA
+
+
+def test_tool_loop_uses_catalog(monkeypatch):
+    from backend import chat_helpers
+
+    seen = {}
+
+    async def fake_streaming_loop(client, messages, system_prompt, token, result, model, tools, *args):
+        seen.setdefault("tools", []).append(tools)
+        yield "data: {}\n\n"
+
+    monkeypatch.setattr(chat_helpers, "_run_streaming_tool_loop", fake_streaming_loop)
+    model = next(m for m, info in chat_helpers.SUPPORTED_MODELS.items() if info["provider"] != "anthropic")
+    client = SimpleNamespace(session=FakeSession())
+
+    async def scenario():
+        for _ in range(3):
+            async for _event in chat_helpers.run_claude_tool_loop(
+                client, [], "system", "", "token", chat_helpers.ToolLoopResult(),
+                model=model, user_categories=CATEGORIES,
+            ):
+                pass
+
+    asyncio.run(scenario())
+    assert client.session.list_calls == 1
+    assert seen["tools"][0] is seen["tools"][2]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
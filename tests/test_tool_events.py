@@ -0,0 +1,192 @@
+"""
+Tests for the append-only tool event log.
+
+Covers:
+- events are buffered, then written in one batch per TOOL_EVENT_FLUSH_SIZE
+  events or after TOOL_EVENT_FLUSH_SECONDS
+- a failed write keeps the events for the next flush; the buffer is bounded
+- tool calls in the chat tool loop are recorded with latency, size and success
+- per-tool latency percentiles
+"""
+
+import asyncio
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from backend import chat_helpers, tool_events
+from backend.async_firebase_client import AsyncFirebaseClient
+from backend.tool_events import (
+    flush_tool_events,
+    get_tool_event_stats,
+    record_tool_event,
+    shutdown_tool_events,
+    summarize_tool_latency,
+    tool_succeeded,
+)
+from tests.fake_firestore import FakeFirestore, fake_firebase_client
+
+UID = "test_user_123"
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """Fresh event buffer and counters, writing to a FakeFirestore."""
+    db = FakeFirestore()
+    global_client = fake_firebase_client(db)
+    monkeypatch.setattr(tool_events, "_buffer", [])
+    monkeypatch.setattr(tool_events, "_timer", None)
+    monkeypatch.setattr(tool_events, "_timer_loop", None)
+    monkeypatch.setattr(tool_events, "_flushing", None)
+    monkeypatch.setattr(tool_events, "_stats", {key: 0 for key in tool_events._stats})
+    monkeypatch.setattr(tool_events, "AsyncFirebaseClient", lambda: AsyncFirebaseClient(client=global_client))
+    return db
+
+
+def stored_events(db):
+    return list(db.dump("tool_events/").values())
+
+
+# ==================== Buffering ====================
+
+def test_events_written_in_one_batch_per_flush_size(db, monkeypatch):
+    monkeypatch.setattr(tool_events, "TOOL_EVENT_FLUSH_SIZE", 10)
+
+    async def scenario():
+        for i in range(25):
+            record_tool_event("get_categories", UID, 12.34, '{"categories": []}')
+            await asyncio.sleep(0.01)
+
+    db.reset_stats()
+    asyncio.run(scenario())
+
+    # Two full batches written; the remaining five wait for the timer
+    assert db.stats["commits"] == 2
+    assert len(stored_events(db)) == 20
+    assert get_tool_event_stats()["buffered"] == 5
+
+    event = stored_events(db)[0]
+    assert event["uid"] == UID and event["tool"] == "get_categories"
+    assert event["latency_ms"] == 12.3
+    assert event["result_bytes"] == len('{"categories": []}')
+    assert event["success"] is True and event["source"] == "chat"
+
+
+def test_timer_flushes_partial_batch(db, monkeypatch):
+    monkeypatch.setattr(tool_events, "TOOL_EVENT_FLUSH_SECONDS", 0.05)
+
+    async def scenario():
+        for _ in range(3):
+            record_tool_event("save_expense", UID, 5, '{"success": true}')
+        assert stored_events(db) == []
+        await asyncio.sleep(0.2)
+
+    db.reset_stats()
+    asyncio.run(scenario())
+
+    assert db.stats["commits"] == 1
+    assert len(stored_events(db)) == 3
+    assert get_tool_event_stats()["flushed"] == 3
+
+
+def test_shutdown_writes_buffer(db):
+    async def scenario():
+        record_tool_event("save_expense", UID, 5, "{}")
+        await shutdown_tool_events()
+
+    asyncio.run(scenario())
+    assert len(stored_events(db)) == 1
+    assert get_tool_event_stats()["buffered"] == 0
+
+
+def test_failed_flush_keeps_events(db, monkeypatch):
+    record_tool_event("save_expense", UID, 5, "{}")
+
+    class Unavailable:
+        async def write_tool_events(self, events):
+            raise RuntimeError("unavailable")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(tool_events, "AsyncFirebaseClient", Unavailable)
+        assert asyncio.run(flush_tool_events()) == 0
+    assert get_tool_event_stats()["buffered"] == 1
+    assert get_tool_event_stats()["failed_flushes"] == 1
+
+    assert asyncio.run(flush_tool_events()) == 1
+    assert len(stored_events(db)) == 1
+
+
+def test_buffer_drops_oldest_past_cap(db, monkeypatch):
+    monkeypatch.setattr(tool_events, "TOOL_EVENT_MAX_BUFFER", 3)
+    for i in range(5):
+        record_tool_event(f"tool{i}", UID, 1, "{}")
+
+    assert [e["tool"] for e in tool_events._buffer] == ["tool2", "tool3", "tool4"]
+    assert get_tool_event_stats()["dropped"] == 2
+
+
+def test_tool_succeeded():
+    assert tool_succeeded('{"success": true}')
+    assert tool_succeeded("plain text")
+    assert not tool_succeeded('{"error": "Tool execution failed"}')
+    assert not tool_succeeded({"success": False, "message": "no such category"})
+
+
+# ==================== Instrumentation ====================
+
+class FakeSession:
+    async def call_tool(self, name, args):
+        if name == "broken":
+            raise RuntimeError("boom")
+        return json.dumps({"success": True, "tool": name})
+
+
+class FakeMCP:
+    session = FakeSession()
+
+
+def test_chat_tool_calls_are_recorded(db):
+    async def scenario():
+        await chat_helpers._execute_mcp_tool(FakeMCP(), "get_categories", {}, UID)
+        await chat_helpers._execute_mcp_tool(FakeMCP(), "broken", {}, UID)
+        await flush_tool_events()
+
+    asyncio.run(scenario())
+
+    events = sorted(stored_events(db), key=lambda e: e["tool"])
+    assert [(e["tool"], e["success"]) for e in events] == [("broken", False), ("get_categories", True)]
+    assert all(e["uid"] == UID and e["latency_ms"] >= 0 for e in events)
+
+
+# ==================== Analytics ====================
+
+def test_latency_percentiles_per_tool():
+    events = [{"tool": "query_expenses", "latency_ms": float(ms), "success": True} for ms in range(1, 101)]
+    events.append({"tool": "save_expense", "latency_ms": 80.0, "success": False})
+
+    summary = summarize_tool_latency(events)
+
+    assert summary["query_expenses"] == {"calls": 100, "errors": 0, "p50_ms": 50.0, "p95_ms": 95.0}
+    assert summary["save_expense"] == {"calls": 1, "errors": 1, "p50_ms": 80.0, "p95_ms": 80.0}
+
+
+def test_get_tool_events_reads_window_only(db):
+    client = fake_firebase_client(db)
+    client.write_tool_events([
+        {"uid": UID, "tool": "x", "day": "2020-01-01", "latency_ms": 1.0, "success": True, "result_bytes": 9},
+        {"uid": UID, "tool": "x", "day": tool_events._usage_day(), "latency_ms": 2.0, "success": True, "result_bytes": 9},
+    ])
+
+    db.reset_stats()
+    events = client.get_tool_events(days=7)
+
+    assert db.stats["docs_read"] == 1
+    assert events == [{"uid": UID, "tool": "x", "day": tool_events._usage_day(), "latency_ms": 2.0, "success": True}]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,187 @@
+"""
+Tests for the pre-aggregated, time-bounded admin usage analytics.
+
+Covers:
+- log_token_usage updates the day's usage_daily aggregate in the same commit
+- analytics reads are range queries: documents outside the window are never
+  transferred
+- raw token_usage records page newest-first via a cursor
+- /admin/analytics builds its summary from the aggregates and the tool
+  event log
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from backend.async_firebase_client import AsyncFirebaseClient
+from backend.firebase_client import _usage_day, ttft_percentile
+from tests.fake_firestore import FakeFirestore, fake_firebase_client
+
+UID = "test_user_123"
+MODEL = "claude-haiku-4-5"
+
+
+def make_client(uid=UID):
+    db = FakeFirestore()
+    return db, fake_firebase_client(db, uid)
+
+
+def seed_token_usage(db, uid, count, age_days, start=0):
+    """Raw token_usage records, *age_days* old, one second apart."""
+    base = datetime.now(timezone.utc) - timedelta(days=age_days)
+    for i in range(start, start + count):
+        db.seed(f"users/{uid}/token_usage/r{i:04d}", {
+            "model": MODEL, "provider": "anthropic", "endpoint": "chat",
+            "input_tokens": 10, "output_tokens": 5, "timestamp": base - timedelta(seconds=i),
+        })
+
+
+# ==================== Writes ====================
+
+def test_log_token_usage_updates_daily_aggregate():
+    db, client = make_client()
+
+    db.reset_stats()
+    client.log_token_usage(UID, MODEL, "anthropic", 100, 20, "chat", cache_read_tokens=50, ttft_ms=180)
+    client.log_token_usage(UID, MODEL, "anthropic", 40, 10, "chat", ttft_ms=900)
+    client.log_token_usage(UID, MODEL, "anthropic", 5, 5, "process_expense")
+
+    # One commit per call: raw record + aggregate
+    assert db.stats["commits"] == 3
+    assert db.stats["rpcs"] == 3
+
+    day = _usage_day()
+    chat = db.dump(f"users/{UID}/usage_daily/{day}_{MODEL}_chat")[f"users/{UID}/usage_daily/{day}_{MODEL}_chat"]
+    assert chat["calls"] == 2
+    assert (chat["input_tokens"], chat["output_tokens"], chat["cache_read_tokens"]) == (140, 30, 50)
+    assert chat["ttft_buckets"] == {"200": 1, "1000": 1}
+    assert (chat["uid"], chat["day"], chat["endpoint"]) == (UID, day, "chat")
+    assert len(db.dump(f"users/{UID}/usage_daily/")) == 2
+    assert len(db.dump(f"users/{UID}/token_usage/")) == 3
+
+
+# ==================== Time-bounded reads ====================
+
+def test_daily_reads_only_transfer_the_window():
+    db, client = make_client()
+    for age in range(60):
+        day = _usage_day(datetime.now(timezone.utc) - timedelta(days=age))
+        db.seed(f"users/{UID}/usage_daily/{day}_{MODEL}_chat", {
+            "uid": UID, "day": day, "model": MODEL, "provider": "anthropic", "endpoint": "chat",
+            "calls": 1, "input_tokens": 1, "output_tokens": 1,
+        })
+        db.seed(f"tool_events/ev{age:03d}", {"uid": UID, "tool": "x", "day": day, "latency_ms": 5.0, "success": True})
+
+    db.reset_stats()
+    rows = client.get_usage_daily(days=7)
+    assert 7 <= len(rows) <= 8
+    assert db.stats["docs_read"] == len(rows)
+
+    db.reset_stats()
+    assert len(client.get_tool_events(days=7)) == len(rows)
+    assert db.stats["docs_read"] == len(rows)
+
+
+def test_token_usage_pages_newest_first():
+    db, client = make_client()
+    seed_token_usage(db, UID, 25, age_days=1)
+    seed_token_usage(db, "other_user", 5, age_days=1, start=100)
+    seed_token_usage(db, UID, 10, age_days=90, start=200)
+
+    seen = []
+    cursor = None
+    while True:
+        db.reset_stats()
+        page = client.get_token_usage_page(days=30, limit=10, cursor=cursor)
+        assert db.stats["docs_read"] <= 11
+        seen += page["records"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 30
+    assert [r["timestamp"] for r in seen] == sorted((r["timestamp"] for r in seen), reverse=True)
+
+    mine = client.get_token_usage_page(days=30, limit=100, uid="other_user")
+    assert {r["uid"] for r in mine["records"]} == {"other_user"}
+    assert len(mine["records"]) == 5
+
+
+def test_token_usage_pages_keep_timestamp_ties():
+    """Records from different users with the same timestamp aren't dropped at page boundaries."""
+    db, client = make_client()
+    for uid in ("alice", "bob", "carol"):
+        seed_token_usage(db, uid, 4, age_days=1)
+
+    seen = []
+    cursor = None
+    while True:
+        page = client.get_token_usage_page(days=30, limit=5, cursor=cursor)
+        seen += [(r["uid"], r["timestamp"]) for r in page["records"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == len(set(seen)) == 12
+
+    with pytest.raises(ValueError):
+        client.get_token_usage_page(days=30, cursor="2026-03-01T00:00:00")
+
+
+def test_ttft_percentile_from_buckets():
+    assert ttft_percentile({}, 0.5) is None
+    buckets = {"100": 50, "500": 45, "3000": 5}
+    assert ttft_percentile(buckets, 0.5) == 100
+    assert ttft_percentile(buckets, 0.95) == 500
+    assert ttft_percentile(buckets, 0.99) == 3000
+    assert ttft_percentile({"inf": 3}, 0.5) == 30000
+
+
+# ==================== Endpoint ====================
+
+def test_admin_analytics_summarizes_aggregates(monkeypatch):
+    from fastapi.testclient import TestClient
+    from backend import api
+
+    db, user_client = make_client()
+    for _ in range(3):
+        user_client.log_token_usage(UID, MODEL, "anthropic", 100, 10, "chat", cache_read_tokens=100, ttft_ms=250)
+    fake_firebase_client(db, "u2").log_token_usage("u2", "gpt-5-mini", "openai", 50, 5, "process_expense")
+    day = _usage_day()
+    global_client = fake_firebase_client(db)
+    global_client.write_tool_events([
+        {"uid": UID, "tool": "save_expense", "day": day, "latency_ms": 40.0, "success": True},
+        {"uid": UID, "tool": "save_expense", "day": day, "latency_ms": 90.0, "success": False},
+    ])
+
+    monkeypatch.setattr(api, "ADMIN_API_KEY", "secret")
+    monkeypatch.setattr(api, "AsyncFirebaseClient", lambda: AsyncFirebaseClient(client=global_client))
+
+    db.reset_stats()
+    response = TestClient(api.app).get("/admin/analytics?days=7", headers={"X-API-Key": "secret"})
+    assert response.status_code == 200, response.text
+    data = response.json()
+
+    # Two aggregate docs + two tool events, not four raw records + conversations
+    assert db.stats["docs_read"] == 4
+    summary = data["summary"]
+    assert summary["total_api_calls"] == 4
+    assert summary["total_input_tokens"] == 350
+    assert summary["cache_hit_rate"] == round(300 / 650, 4)
+    assert summary["unique_users"] == 2
+    assert summary["ttft_by_provider"] == {"anthropic": {"calls": 3, "p50_ms": 300, "p95_ms": 300}}
+    assert summary["tool_latency"] == {"save_expense": {"calls": 2, "errors": 1, "p50_ms": 40.0, "p95_ms": 90.0}}
+    assert data["tool_calls"] == [
+        {"uid": UID, "tool_name": "save_expense", "day": day, "calls": 2, "timestamp": day},
+    ]
+    chat_row = next(r for r in data["token_usage"] if r["endpoint"] == "chat")
+    assert chat_row["calls"] == 3 and chat_row["day"] == day
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,168 @@
+"""
+Tests for the process-local user cache (categories, period settings, total
+budget, selected model) layered into FirebaseClient, and the TTLCache behind it.
+
+Covers:
+- TTL expiry, LRU eviction and hit/miss counters
+- repeated reads in a chat turn hit the cache instead of Firestore
+- every settings/category write invalidates the cached value
+- validate_category confirms cached categories with an uncached read
+"""
+
+import asyncio
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from backend.async_firebase_client import AsyncFirebaseClient
+from backend.exceptions import InvalidCategoryError
+from backend.firebase_client import get_user_cache_stats
+from backend.mcp.expense_server import validate_category
+from backend.ttl_cache import TTLCache
+from tests.fake_firestore import FakeFirestore, fake_firebase_client
+
+UID = "test_user_123"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_client():
+    db = FakeFirestore()
+    client = fake_firebase_client(db, UID)
+    client.initialize_default_categories(1000, ["FOOD_OUT", "GROCERIES", "COFFEE"])
+    return db, client
+
+
+# ==================== TTLCache ====================
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    clock.now = 5.1
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cached_none_is_a_hit():
+    cache = TTLCache()
+    sentinel = object()
+    cache.set("missing-doc", None)
+    assert cache.get("missing-doc", sentinel) is None
+    assert cache.stats()["hits"] == 1
+
+
+# ==================== FirebaseClient read path ====================
+
+def test_save_expense_turn_reads_settings_once():
+    """The lookups a save_expense tool call makes cost one read each, once."""
+    db, client = make_client()
+    db.reset_stats()
+
+    for _ in range(3):
+        client.has_categories_setup()
+    client.get_user_categories()
+    client.get_user_categories()
+    client.get_budget_period_settings(UID)
+    client.get_total_monthly_budget()
+    client.get_category_cap("FOOD_OUT")
+    client.get_user_settings(UID)
+
+    # One category query + one users/{uid} doc read
+    assert db.stats["rpcs"] == 2
+    stats = get_user_cache_stats()
+    assert stats["misses"] == 2
+    assert stats["hits"] == 7
+
+
+def test_returned_values_are_copies():
+    _, client = make_client()
+    categories = client.get_user_categories()
+    categories[0]["monthly_cap"] = 999999
+    categories.clear()
+    assert client.get_user_categories()[0]["monthly_cap"] != 999999
+
+
+# ==================== Invalidation ====================
+
+def test_category_writes_invalidate():
+    _, client = make_client()
+    client.get_user_categories()
+
+    new_id = client.create_category({
+        "display_name": "Pets", "icon": "paw", "color": "#000000", "monthly_cap": 50,
+    })
+    assert new_id in [c["category_id"] for c in client.get_user_categories()]
+
+    client.update_category(new_id, {"monthly_cap": 75})
+    assert client.get_category_cap(new_id) == 75
+
+    order = [c["category_id"] for c in client.get_user_categories()][::-1]
+    client.reorder_categories(order)
+    assert [c["category_id"] for c in client.get_user_categories()] == order
+
+    client.delete_category(new_id)
+    assert client.get_category(new_id) is None
+
+
+def test_settings_writes_invalidate():
+    _, client = make_client()
+    assert client.get_total_monthly_budget() == 1000
+    assert client.get_budget_period_settings(UID)["budget_month_start_day"] == 1
+
+    client.set_total_monthly_budget(2500)
+    assert client.get_total_monthly_budget() == 2500
+
+    client.set_budget_period_settings(UID, {"budget_month_start_day": 15})
+    assert client.get_budget_period_settings(UID)["budget_month_start_day"] == 15
+
+    client.update_user_settings(UID, {"selected_model": "gpt-5-mini"})
+    assert client.get_user_settings(UID)["selected_model"] == "gpt-5-mini"
+
+
+def test_get_category_sees_external_create():
+    """A category written by another process is found without waiting for the TTL."""
+    db, client = make_client()
+    client.get_user_categories()
+    db.document(f"users/{UID}/categories/PETS").set({"display_name": "Pets", "monthly_cap": 10})
+    assert client.get_category("PETS")["monthly_cap"] == 10
+    assert "PETS" in [c["category_id"] for c in client.get_user_categories()]
+
+
+def test_validate_category_sees_external_delete():
+    """A category deleted by another process is rejected before the TTL expires."""
+    db, client = make_client()
+    firebase = AsyncFirebaseClient(client=client)
+    assert asyncio.run(validate_category("coffee", firebase)) == "COFFEE"
+
+    db.document(f"users/{UID}/categories/COFFEE").delete()
+    with pytest.raises(InvalidCategoryError):
+        asyncio.run(validate_category("coffee", firebase))
+    assert "COFFEE" not in [c["category_id"] for c in client.get_user_categories()]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])